@@ -0,0 +1,198 @@
+import base64
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from almacenamiento.motor import (
+    Motor,
+    Validacion,
+    CondicionFallida,
+    TransaccionCancelada,
+    TablaInexistente,
+    TablaExistente,
+)
+
+# --------------------------------------------------
+# Motor DynamoDB
+#
+# Traduce la interfaz a un cliente de bajo nivel de boto3 (el de
+# database.py, con el circuito y los perfiles de tiempo). boto3 usa bytes
+# para B y BS; la interfaz usa base64 como el JSON de DynamoDB.
+#
+# La API no lo necesita (los routers usan boto3 directamente): sirve a
+# los scripts que trabajan con cualquier motor, como
+# scripts/copiar_almacenamiento.
+# --------------------------------------------------
+
+ERRORES = {
+    error.codigo: error
+    for error in (Validacion, CondicionFallida, TablaInexistente, TablaExistente)
+}
+
+
+def a_boto(valor):
+    """Item o valor del formato de la interfaz al de boto3 (B en bytes)."""
+    if isinstance(valor, dict):
+        if len(valor) == 1:
+            tipo, dato = next(iter(valor.items()))
+            if tipo == "B" and isinstance(dato, str):
+                return {"B": base64.b64decode(dato)}
+            if tipo == "BS" and isinstance(dato, list):
+                return {"BS": [base64.b64decode(elemento) for elemento in dato]}
+        return {clave: a_boto(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [a_boto(v) for v in valor]
+    return valor
+
+
+def desde_boto(valor):
+    if isinstance(valor, dict):
+        if len(valor) == 1:
+            tipo, dato = next(iter(valor.items()))
+            if tipo == "B" and isinstance(dato, bytes):
+                return {"B": base64.b64encode(dato).decode("ascii")}
+            if tipo == "BS" and isinstance(dato, list):
+                return {"BS": [base64.b64encode(elemento).decode("ascii") for elemento in dato]}
+        return {clave: desde_boto(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [desde_boto(v) for v in valor]
+    return valor
+
+
+def _parametros(**kwargs) -> dict:
+    return {clave: valor for clave, valor in kwargs.items() if valor}
+
+
+class MotorDynamoDB(Motor):
+
+    nombre = "dynamodb"
+
+    def __init__(self, client=None):
+        if client is None:
+            from database import get_dynamodb_data_client
+            client = get_dynamodb_data_client()
+        self.client = client
+
+    def _llamar(self, operacion: str, **kwargs) -> dict:
+        try:
+            return getattr(self.client, operacion)(**kwargs)
+        except ClientError as error:
+            codigo = error.response["Error"]["Code"]
+            mensaje = error.response["Error"].get("Message", "")
+            if codigo == "ConditionalCheckFailedException":
+                raise CondicionFallida(mensaje, desde_boto(error.response.get("Item"))) from error
+            if codigo == "TransactionCanceledException":
+                raise TransaccionCancelada(desde_boto(error.response.get("CancellationReasons", []))) from error
+            excepcion = ERRORES.get(codigo)
+            if excepcion is None:
+                raise
+            raise excepcion(mensaje) from error
+
+    # ------------------------------
+    # Tablas
+    # ------------------------------
+    def crear_tabla(self, definicion: dict) -> dict:
+        return self._llamar("create_table", **definicion)["TableDescription"]
+
+    def describir_tabla(self, tabla: str) -> dict:
+        return self._llamar("describe_table", TableName=tabla)["Table"]
+
+    def actualizar_tabla(self, tabla: str, cambios: dict) -> dict:
+        return self._llamar("update_table", TableName=tabla, **cambios)["TableDescription"]
+
+    def borrar_tabla(self, tabla: str) -> dict:
+        return self._llamar("delete_table", TableName=tabla)["TableDescription"]
+
+    def tablas(self) -> list:
+        nombres = []
+        kwargs = {}
+        while True:
+            response = self._llamar("list_tables", **kwargs)
+            nombres += response["TableNames"]
+            if "LastEvaluatedTableName" not in response:
+                return nombres
+            kwargs["ExclusiveStartTableName"] = response["LastEvaluatedTableName"]
+
+    def configurar_ttl(self, tabla: str, especificacion: dict) -> dict:
+        return self._llamar(
+            "update_time_to_live", TableName=tabla, TimeToLiveSpecification=especificacion,
+        )["TimeToLiveSpecification"]
+
+    def describir_ttl(self, tabla: str) -> dict:
+        return self._llamar("describe_time_to_live", TableName=tabla)["TimeToLiveDescription"]
+
+    # ------------------------------
+    # Lectura
+    # ------------------------------
+    def obtener(self, tabla: str, clave: dict, proyeccion: str = None, nombres: dict = None) -> Optional[dict]:
+        response = self._llamar("get_item", TableName=tabla, Key=a_boto(clave), **_parametros(
+            ProjectionExpression=proyeccion, ExpressionAttributeNames=nombres,
+        ))
+        return desde_boto(response.get("Item"))
+
+    def obtener_lote(self, tabla: str, claves: list, proyeccion: str = None, nombres: dict = None) -> list:
+        items = []
+        pedido = {"Keys": a_boto(claves), **_parametros(ProjectionExpression=proyeccion, ExpressionAttributeNames=nombres)}
+        while pedido["Keys"]:
+            response = self._llamar("batch_get_item", RequestItems={tabla: pedido})
+            items += desde_boto(response["Responses"].get(tabla, []))
+            pedido["Keys"] = response.get("UnprocessedKeys", {}).get(tabla, {}).get("Keys", [])
+        return items
+
+    def consultar(self, tabla: str, condicion_clave: str, indice: str = None, filtro: str = None,
+                  proyeccion: str = None, nombres: dict = None, valores: dict = None, limite: int = None,
+                  inicio: dict = None, adelante: bool = True) -> dict:
+        response = self._llamar("query", TableName=tabla, KeyConditionExpression=condicion_clave,
+                                ScanIndexForward=adelante, **_parametros(
+                                    IndexName=indice, FilterExpression=filtro, ProjectionExpression=proyeccion,
+                                    ExpressionAttributeNames=nombres, ExpressionAttributeValues=a_boto(valores),
+                                    Limit=limite, ExclusiveStartKey=a_boto(inicio),
+                                ))
+        return desde_boto({clave: response[clave] for clave in ("Items", "Count", "ScannedCount", "LastEvaluatedKey") if clave in response})
+
+    def recorrer(self, tabla: str, filtro: str = None, proyeccion: str = None, nombres: dict = None,
+                 valores: dict = None, limite: int = None, inicio: dict = None) -> dict:
+        response = self._llamar("scan", TableName=tabla, **_parametros(
+            FilterExpression=filtro, ProjectionExpression=proyeccion, ExpressionAttributeNames=nombres,
+            ExpressionAttributeValues=a_boto(valores), Limit=limite, ExclusiveStartKey=a_boto(inicio),
+        ))
+        return desde_boto({clave: response[clave] for clave in ("Items", "Count", "ScannedCount", "LastEvaluatedKey") if clave in response})
+
+    # ------------------------------
+    # Escritura
+    # ------------------------------
+    def poner(self, tabla: str, item: dict, condicion: str = None, nombres: dict = None, valores: dict = None):
+        response = self._llamar("put_item", TableName=tabla, Item=a_boto(item), ReturnValues="ALL_OLD", **_parametros(
+            ConditionExpression=condicion, ExpressionAttributeNames=nombres, ExpressionAttributeValues=a_boto(valores),
+        ))
+        return desde_boto(response.get("Attributes"))
+
+    def actualizar(self, tabla: str, clave: dict, expresion: str, condicion: str = None,
+                   nombres: dict = None, valores: dict = None) -> tuple:
+        # DynamoDB devuelve solo uno de los dos: se pide el nuevo
+        response = self._llamar("update_item", TableName=tabla, Key=a_boto(clave), UpdateExpression=expresion,
+                                ReturnValues="ALL_NEW", **_parametros(
+                                    ConditionExpression=condicion, ExpressionAttributeNames=nombres,
+                                    ExpressionAttributeValues=a_boto(valores),
+                                ))
+        return None, desde_boto(response.get("Attributes"))
+
+    def borrar(self, tabla: str, clave: dict, condicion: str = None, nombres: dict = None, valores: dict = None):
+        response = self._llamar("delete_item", TableName=tabla, Key=a_boto(clave), ReturnValues="ALL_OLD", **_parametros(
+            ConditionExpression=condicion, ExpressionAttributeNames=nombres, ExpressionAttributeValues=a_boto(valores),
+        ))
+        return desde_boto(response.get("Attributes"))
+
+    def escribir_lote(self, tabla: str, poner: list = (), borrar: list = ()):
+        pedidos = [{"PutRequest": {"Item": a_boto(item)}} for item in poner]
+        pedidos += [{"DeleteRequest": {"Key": a_boto(clave)}} for clave in borrar]
+
+        for inicio in range(0, len(pedidos), 25):
+            pendientes = {tabla: pedidos[inicio:inicio + 25]}
+            while pendientes:
+                response = self._llamar("batch_write_item", RequestItems=pendientes)
+                pendientes = response.get("UnprocessedItems")
+
+    def transaccion(self, operaciones: list) -> list:
+        self._llamar("transact_write_items", TransactItems=a_boto(operaciones))
+        return [(None, None)] * len(operaciones)
@@ -0,0 +1,759 @@
+import base64
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+from almacenamiento.motor import Validacion
+
+# --------------------------------------------------
+# Expresiones de DynamoDB para los motores locales
+#
+# Condición / filtro / clave:
+#   a = b, a <> b, <, <=, >, >=, a BETWEEN b AND c, a IN (b, c),
+#   AND, OR, NOT, paréntesis, attribute_exists, attribute_not_exists,
+#   attribute_type, begins_with, contains, size
+# Actualización:
+#   SET a = b, a = b + c, a = b - c, if_not_exists(a, b), list_append(a, b)
+#   REMOVE a      ADD a :n (números y conjuntos)      DELETE a :conjunto
+# Proyección:
+#   a, b.c, d[0]
+#
+# Los árboles se guardan en caché por texto de la expresión: los
+# #nombres y :valores se resuelven al evaluar.
+# --------------------------------------------------
+
+_TOKENS = re.compile(r"""
+    \s*(?:
+      (?P<nombre>\#[A-Za-z0-9_]+)
+    | (?P<valor>:[A-Za-z0-9_]+)
+    | (?P<posicion>\[\s*\d+\s*\])
+    | (?P<simbolo><>|<=|>=|=|<|>|\(|\)|,|\.|\+|-)
+    | (?P<palabra>[A-Za-z_][A-Za-z0-9_]*)
+    )""", re.VERBOSE)
+
+FUNCIONES_CONDICION = {"attribute_exists", "attribute_not_exists", "attribute_type", "begins_with", "contains"}
+COMPARADORES = {"=", "<>", "<", "<=", ">", ">="}
+CLAUSULAS = ("SET", "REMOVE", "ADD", "DELETE")
+
+
+def _tokenizar(texto: str) -> list:
+    tokens = []
+    posicion = 0
+    texto = texto.rstrip()
+
+    while posicion < len(texto):
+        encontrado = _TOKENS.match(texto, posicion)
+        if encontrado is None or encontrado.end() == posicion:
+            raise Validacion(f"Invalid expression: syntax error near '{texto[posicion:posicion + 10]}'")
+        tipo = encontrado.lastgroup
+        tokens.append((tipo, encontrado.group(tipo)))
+        posicion = encontrado.end()
+
+    return tokens
+
+
+class _Analizador:
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self.tokens = _tokenizar(texto)
+        self.posicion = 0
+
+    # ------------------------------
+    # Utilidades
+    # ------------------------------
+    def _actual(self):
+        return self.tokens[self.posicion] if self.posicion < len(self.tokens) else (None, None)
+
+    def _siguiente_es(self, texto: str, desplazamiento: int = 0) -> bool:
+        indice = self.posicion + desplazamiento
+        if indice >= len(self.tokens):
+            return False
+        tipo, valor = self.tokens[indice]
+        if tipo == "palabra":
+            return valor.upper() == texto.upper()
+        return valor == texto
+
+    def _tomar(self, texto: str = None):
+        tipo, valor = self._actual()
+        if tipo is None or (texto is not None and not self._siguiente_es(texto)):
+            esperado = f"'{texto}'" if texto else "más texto"
+            raise Validacion(f"Invalid expression: se esperaba {esperado} en '{self.texto}'")
+        self.posicion += 1
+        return tipo, valor
+
+    def _terminar(self, arbol):
+        if self.posicion != len(self.tokens):
+            raise Validacion(f"Invalid expression: sobra '{self._actual()[1]}' en '{self.texto}'")
+        return arbol
+
+    # ------------------------------
+    # Rutas y operandos
+    # ------------------------------
+    def ruta(self):
+        tipo, valor = self._tomar()
+        if tipo not in ("nombre", "palabra"):
+            raise Validacion(f"Invalid expression: se esperaba un atributo en '{self.texto}'")
+        partes = [("atributo", valor)]
+
+        while True:
+            tipo, valor = self._actual()
+            if tipo == "posicion":
+                self.posicion += 1
+                partes.append(("posicion", int(valor.strip("[] "))))
+            elif valor == ".":
+                self.posicion += 1
+                tipo, valor = self._tomar()
+                if tipo not in ("nombre", "palabra"):
+                    raise Validacion(f"Invalid expression: se esperaba un atributo en '{self.texto}'")
+                partes.append(("atributo", valor))
+            else:
+                return ("ruta", tuple(partes))
+
+    def operando(self):
+        tipo, valor = self._actual()
+        if tipo == "valor":
+            self.posicion += 1
+            return ("valor", valor)
+        if tipo == "palabra" and valor == "size" and self._siguiente_es("(", 1):
+            self.posicion += 2
+            ruta = self.ruta()
+            self._tomar(")")
+            return ("size", ruta)
+        return self.ruta()
+
+    # ------------------------------
+    # Condiciones
+    # ------------------------------
+    def condicion(self):
+        izquierda = self._conjuncion()
+        while self._siguiente_es("OR"):
+            self.posicion += 1
+            izquierda = ("or", izquierda, self._conjuncion())
+        return izquierda
+
+    def _conjuncion(self):
+        izquierda = self._negacion()
+        while self._siguiente_es("AND"):
+            self.posicion += 1
+            izquierda = ("and", izquierda, self._negacion())
+        return izquierda
+
+    def _negacion(self):
+        if self._siguiente_es("NOT"):
+            self.posicion += 1
+            return ("not", self._negacion())
+        return self._primaria()
+
+    def _primaria(self):
+        tipo, valor = self._actual()
+
+        if valor == "(":
+            self.posicion += 1
+            arbol = self.condicion()
+            self._tomar(")")
+            return arbol
+
+        if tipo == "palabra" and valor in FUNCIONES_CONDICION and self._siguiente_es("(", 1):
+            self.posicion += 2
+            argumentos = [self.operando()]
+            while self._siguiente_es(","):
+                self.posicion += 1
+                argumentos.append(self.operando())
+            self._tomar(")")
+            return ("funcion", valor, tuple(argumentos))
+
+        izquierda = self.operando()
+        tipo, valor = self._actual()
+
+        if valor in COMPARADORES:
+            self.posicion += 1
+            return ("comparar", valor, izquierda, self.operando())
+
+        if self._siguiente_es("BETWEEN"):
+            self.posicion += 1
+            desde = self.operando()
+            self._tomar("AND")
+            return ("entre", izquierda, desde, self.operando())
+
+        if self._siguiente_es("IN"):
+            self.posicion += 1
+            self._tomar("(")
+            opciones = [self.operando()]
+            while self._siguiente_es(","):
+                self.posicion += 1
+                opciones.append(self.operando())
+            self._tomar(")")
+            return ("en", izquierda, tuple(opciones))
+
+        raise Validacion(f"Invalid expression: condición incompleta en '{self.texto}'")
+
+    # ------------------------------
+    # Actualización
+    # ------------------------------
+    def actualizacion(self):
+        clausulas = {}
+
+        while self.posicion < len(self.tokens):
+            tipo, palabra = self._tomar()
+            palabra = palabra.upper() if tipo == "palabra" else palabra
+            if palabra not in CLAUSULAS:
+                raise Validacion(f"Invalid UpdateExpression: se esperaba SET, REMOVE, ADD o DELETE en '{self.texto}'")
+            if palabra in clausulas:
+                raise Validacion(f"Invalid UpdateExpression: la cláusula {palabra} aparece dos veces")
+
+            acciones = []
+            while True:
+                ruta = self.ruta()
+                if palabra == "SET":
+                    self._tomar("=")
+                    acciones.append((ruta, self._valor_set()))
+                elif palabra == "REMOVE":
+                    acciones.append((ruta, None))
+                else:
+                    acciones.append((ruta, self.operando()))
+
+                if not self._siguiente_es(","):
+                    break
+                self.posicion += 1
+            clausulas[palabra] = tuple(acciones)
+
+        if not clausulas:
+            raise Validacion("Invalid UpdateExpression: la expresión está vacía")
+        return clausulas
+
+    def _valor_set(self):
+        izquierda = self._operando_set()
+        if self._siguiente_es("+") or self._siguiente_es("-"):
+            _, signo = self._tomar()
+            return ("aritmetica", signo, izquierda, self._operando_set())
+        return izquierda
+
+    def _operando_set(self):
+        tipo, valor = self._actual()
+        if tipo == "palabra" and valor in ("if_not_exists", "list_append") and self._siguiente_es("(", 1):
+            self.posicion += 2
+            primero = self.ruta() if valor == "if_not_exists" else self._operando_set()
+            self._tomar(",")
+            segundo = self._operando_set()
+            self._tomar(")")
+            return (valor, primero, segundo)
+        return self.operando()
+
+    # ------------------------------
+    # Proyección
+    # ------------------------------
+    def proyeccion(self):
+        rutas = [self.ruta()]
+        while self._siguiente_es(","):
+            self.posicion += 1
+            rutas.append(self.ruta())
+        return tuple(rutas)
+
+
+@lru_cache(maxsize=4096)
+def analizar_condicion(texto: str):
+    analizador = _Analizador(texto)
+    return analizador._terminar(analizador.condicion())
+
+
+@lru_cache(maxsize=4096)
+def analizar_actualizacion(texto: str):
+    analizador = _Analizador(texto)
+    return analizador._terminar(analizador.actualizacion())
+
+
+@lru_cache(maxsize=4096)
+def analizar_proyeccion(texto: str):
+    analizador = _Analizador(texto)
+    return analizador._terminar(analizador.proyeccion())
+
+
+# --------------------------------------------------
+# Marcadores usados (DynamoDB rechaza #nombres y :valores sin usar)
+# --------------------------------------------------
+def marcadores(arbol, encontrados: set = None) -> set:
+    encontrados = set() if encontrados is None else encontrados
+
+    if isinstance(arbol, dict):
+        for acciones in arbol.values():
+            marcadores(acciones, encontrados)
+    elif isinstance(arbol, tuple):
+        if len(arbol) == 2 and arbol[0] == "valor":
+            encontrados.add(arbol[1])
+        elif len(arbol) == 2 and arbol[0] == "atributo" and arbol[1].startswith("#"):
+            encontrados.add(arbol[1])
+        else:
+            for parte in arbol:
+                marcadores(parte, encontrados)
+
+    return encontrados
+
+
+def verificar_marcadores(arboles: list, nombres: dict, valores: dict):
+    usados = set()
+    for arbol in arboles:
+        if arbol is not None:
+            marcadores(arbol, usados)
+
+    for marcador in usados:
+        if marcador.startswith("#") and marcador not in (nombres or {}):
+            raise Validacion(f"An expression attribute name used in the document path is not defined; attribute name: {marcador}")
+        if marcador.startswith(":") and marcador not in (valores or {}):
+            raise Validacion(f"An expression attribute value used in expression is not defined; attribute value: {marcador}")
+
+    sobrantes = [n for n in (nombres or {}) if n not in usados] + [v for v in (valores or {}) if v not in usados]
+    if sobrantes:
+        raise Validacion(f"Value provided in ExpressionAttributeNames/Values unused in expressions: keys: {{{', '.join(sobrantes)}}}")
+
+
+# --------------------------------------------------
+# Valores tipados
+# --------------------------------------------------
+def _tipo_y_dato(valor: dict):
+    return next(iter(valor.items()))
+
+
+def valor_de_clave(valor: dict):
+    """Valor comparable de un atributo de clave (S o B)."""
+    tipo, dato = _tipo_y_dato(valor)
+    if tipo == "S":
+        return dato
+    if tipo == "B":
+        return base64.b64decode(dato)
+    raise Validacion(f"Los motores locales solo admiten claves de tipo S o B, no {tipo}")
+
+
+def _comparable(valor: dict):
+    tipo, dato = _tipo_y_dato(valor)
+    if tipo == "N":
+        return tipo, Decimal(dato)
+    if tipo == "B":
+        return tipo, base64.b64decode(dato)
+    return tipo, dato
+
+
+def iguales(a: dict, b: dict) -> bool:
+    tipo_a, dato_a = _tipo_y_dato(a)
+    tipo_b, dato_b = _tipo_y_dato(b)
+    if tipo_a != tipo_b:
+        return False
+    if tipo_a == "N":
+        return Decimal(dato_a) == Decimal(dato_b)
+    if tipo_a == "B":
+        return base64.b64decode(dato_a) == base64.b64decode(dato_b)
+    if tipo_a == "NS":
+        return {Decimal(n) for n in dato_a} == {Decimal(n) for n in dato_b}
+    if tipo_a == "BS":
+        return {base64.b64decode(x) for x in dato_a} == {base64.b64decode(x) for x in dato_b}
+    if tipo_a == "SS":
+        return set(dato_a) == set(dato_b)
+    if tipo_a == "L":
+        return len(dato_a) == len(dato_b) and all(iguales(x, y) for x, y in zip(dato_a, dato_b))
+    if tipo_a == "M":
+        return dato_a.keys() == dato_b.keys() and all(iguales(dato_a[k], dato_b[k]) for k in dato_a)
+    return dato_a == dato_b
+
+
+def _numero(valor: Decimal) -> str:
+    texto = format(valor.normalize(), "f")
+    return "0" if texto in ("-0", "") else texto
+
+
+# --------------------------------------------------
+# Rutas sobre items
+# --------------------------------------------------
+def _nombre(parte, nombres: dict) -> str:
+    _, texto = parte
+    return nombres[texto] if texto.startswith("#") else texto
+
+
+def leer_ruta(item: dict, ruta, nombres: dict):
+    """Valor tipado en la ruta, o None si no existe."""
+    actual = {"M": item}
+    for parte in ruta[1]:
+        tipo, dato = _tipo_y_dato(actual)
+        if parte[0] == "atributo":
+            if tipo != "M":
+                return None
+            actual = dato.get(_nombre(parte, nombres))
+        else:
+            if tipo != "L" or parte[1] >= len(dato):
+                return None
+            actual = dato[parte[1]]
+        if actual is None:
+            return None
+    return actual
+
+
+def _escribir_ruta(item: dict, ruta, nombres: dict, valor):
+    """Asigna (o con valor None, quita) el valor en la ruta; los contenedores intermedios deben existir."""
+    partes = ruta[1]
+    contenedor = {"M": item}
+
+    for parte in partes[:-1]:
+        siguiente = None
+        tipo, dato = _tipo_y_dato(contenedor)
+        if parte[0] == "atributo" and tipo == "M":
+            siguiente = dato.get(_nombre(parte, nombres))
+        elif parte[0] == "posicion" and tipo == "L" and parte[1] < len(dato):
+            siguiente = dato[parte[1]]
+        if siguiente is None:
+            raise Validacion("The document path provided in the update expression is invalid for update")
+        contenedor = siguiente
+
+    ultima = partes[-1]
+    tipo, dato = _tipo_y_dato(contenedor)
+    if ultima[0] == "atributo":
+        if tipo != "M":
+            raise Validacion("The document path provided in the update expression is invalid for update")
+        if valor is None:
+            dato.pop(_nombre(ultima, nombres), None)
+        else:
+            dato[_nombre(ultima, nombres)] = valor
+    else:
+        if tipo != "L":
+            raise Validacion("The document path provided in the update expression is invalid for update")
+        if valor is None:
+            if ultima[1] < len(dato):
+                del dato[ultima[1]]
+        elif ultima[1] < len(dato):
+            dato[ultima[1]] = valor
+        else:
+            dato.append(valor)
+
+
+def copiar(valor):
+    """Copia profunda de un valor o item tipado (solo dicts y listas)."""
+    if isinstance(valor, dict):
+        return {clave: copiar(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [copiar(v) for v in valor]
+    return valor
+
+
+# --------------------------------------------------
+# Evaluación de condiciones
+# --------------------------------------------------
+def _operando(arbol, item: dict, nombres: dict, valores: dict):
+    if arbol[0] == "valor":
+        return valores[arbol[1]]
+    if arbol[0] == "ruta":
+        return leer_ruta(item, arbol, nombres)
+    if arbol[0] == "size":
+        valor = leer_ruta(item, arbol[1], nombres)
+        if valor is None:
+            return None
+        tipo, dato = _tipo_y_dato(valor)
+        if tipo == "B":
+            return {"N": str(len(base64.b64decode(dato)))}
+        if tipo in ("S", "L", "M", "SS", "NS", "BS"):
+            return {"N": str(len(dato))}
+        return None
+    raise Validacion("Invalid expression: operando no válido")
+
+
+def _comparar(operador: str, a, b) -> bool:
+    if a is None or b is None:
+        return operador == "<>"
+    if operador == "=":
+        return iguales(a, b)
+    if operador == "<>":
+        return not iguales(a, b)
+
+    tipo_a, dato_a = _comparable(a)
+    tipo_b, dato_b = _comparable(b)
+    if tipo_a != tipo_b or tipo_a not in ("S", "N", "B"):
+        return False
+    if operador == "<":
+        return dato_a < dato_b
+    if operador == "<=":
+        return dato_a <= dato_b
+    if operador == ">":
+        return dato_a > dato_b
+    return dato_a >= dato_b
+
+
+def _funcion(nombre: str, argumentos: tuple, item: dict, nombres: dict, valores: dict) -> bool:
+    if nombre == "attribute_exists":
+        return leer_ruta(item, argumentos[0], nombres) is not None
+    if nombre == "attribute_not_exists":
+        return leer_ruta(item, argumentos[0], nombres) is None
+
+    valor = _operando(argumentos[0], item, nombres, valores)
+    if valor is None:
+        return False
+    tipo, dato = _tipo_y_dato(valor)
+
+    if nombre == "attribute_type":
+        esperado = _operando(argumentos[1], item, nombres, valores)
+        return tipo == esperado.get("S")
+
+    buscado = _operando(argumentos[1], item, nombres, valores)
+    if buscado is None:
+        return False
+    tipo_buscado, dato_buscado = _tipo_y_dato(buscado)
+
+    if nombre == "begins_with":
+        if tipo == "S" and tipo_buscado == "S":
+            return dato.startswith(dato_buscado)
+        if tipo == "B" and tipo_buscado == "B":
+            return base64.b64decode(dato).startswith(base64.b64decode(dato_buscado))
+        return False
+
+    # contains
+    if tipo == "S" and tipo_buscado == "S":
+        return dato_buscado in dato
+    if tipo == "SS" and tipo_buscado == "S":
+        return dato_buscado in dato
+    if tipo in ("NS", "BS") and tipo_buscado == tipo[0]:
+        return any(iguales({tipo[0]: elemento}, buscado) for elemento in dato)
+    if tipo == "L":
+        return any(iguales(elemento, buscado) for elemento in dato)
+    return False
+
+
+def evaluar(arbol, item: dict, nombres: dict, valores: dict) -> bool:
+    tipo = arbol[0]
+    if tipo == "and":
+        return evaluar(arbol[1], item, nombres, valores) and evaluar(arbol[2], item, nombres, valores)
+    if tipo == "or":
+        return evaluar(arbol[1], item, nombres, valores) or evaluar(arbol[2], item, nombres, valores)
+    if tipo == "not":
+        return not evaluar(arbol[1], item, nombres, valores)
+    if tipo == "comparar":
+        return _comparar(
+            arbol[1],
+            _operando(arbol[2], item, nombres, valores),
+            _operando(arbol[3], item, nombres, valores),
+        )
+    if tipo == "entre":
+        valor = _operando(arbol[1], item, nombres, valores)
+        return (
+            _comparar(">=", valor, _operando(arbol[2], item, nombres, valores))
+            and _comparar("<=", valor, _operando(arbol[3], item, nombres, valores))
+        )
+    if tipo == "en":
+        valor = _operando(arbol[1], item, nombres, valores)
+        return any(_comparar("=", valor, _operando(opcion, item, nombres, valores)) for opcion in arbol[2])
+    if tipo == "funcion":
+        return _funcion(arbol[1], arbol[2], item, nombres, valores)
+    raise Validacion("Invalid expression")
+
+
+# --------------------------------------------------
+# Actualización
+# --------------------------------------------------
+def _valor_set(arbol, item: dict, nombres: dict, valores: dict):
+    tipo = arbol[0]
+
+    if tipo == "if_not_exists":
+        actual = leer_ruta(item, arbol[1], nombres)
+        return actual if actual is not None else _valor_set(arbol[2], item, nombres, valores)
+
+    if tipo == "list_append":
+        primera = _valor_set(arbol[1], item, nombres, valores)
+        segunda = _valor_set(arbol[2], item, nombres, valores)
+        if primera is None or segunda is None or "L" not in primera or "L" not in segunda:
+            raise Validacion("An operand in the update expression has an incorrect data type")
+        return {"L": primera["L"] + segunda["L"]}
+
+    if tipo == "aritmetica":
+        izquierda = _valor_set(arbol[2], item, nombres, valores)
+        derecha = _valor_set(arbol[3], item, nombres, valores)
+        if izquierda is None or derecha is None:
+            raise Validacion("The provided expression refers to an attribute that does not exist in the item")
+        if "N" not in izquierda or "N" not in derecha:
+            raise Validacion("An operand in the update expression has an incorrect data type")
+        resultado = Decimal(izquierda["N"]) + Decimal(derecha["N"]) * (1 if arbol[1] == "+" else -1)
+        return {"N": _numero(resultado)}
+
+    valor = _operando(arbol, item, nombres, valores)
+    if valor is None:
+        raise Validacion("The provided expression refers to an attribute that does not exist in the item")
+    return valor
+
+
+def aplicar_actualizacion(arbol: dict, item: dict, nombres: dict, valores: dict) -> dict:
+    """Item nuevo; los valores de SET se calculan sobre el item anterior."""
+    nuevo = copiar(item)
+
+    asignaciones = [
+        (ruta, copiar(_valor_set(valor, item, nombres, valores)))
+        for ruta, valor in arbol.get("SET", ())
+    ]
+    for ruta, valor in asignaciones:
+        _escribir_ruta(nuevo, ruta, nombres, valor)
+
+    # REMOVE de posiciones de lista: de la mayor a la menor, para no correrlas
+    for ruta, _ in sorted(arbol.get("REMOVE", ()), key=lambda accion: -accion[0][1][-1][1] if accion[0][1][-1][0] == "posicion" else 0):
+        _escribir_ruta(nuevo, ruta, nombres, None)
+
+    for ruta, operando in arbol.get("ADD", ()):
+        agregado = _operando(operando, item, nombres, valores)
+        actual = leer_ruta(nuevo, ruta, nombres)
+        tipo, dato = _tipo_y_dato(agregado)
+
+        if tipo == "N":
+            if actual is not None and "N" not in actual:
+                raise Validacion("An operand in the update expression has an incorrect data type")
+            base = Decimal(actual["N"]) if actual is not None else Decimal(0)
+            _escribir_ruta(nuevo, ruta, nombres, {"N": _numero(base + Decimal(dato))})
+        elif tipo in ("SS", "NS", "BS"):
+            if actual is not None and tipo not in actual:
+                raise Validacion("An operand in the update expression has an incorrect data type")
+            existentes = list(actual[tipo]) if actual is not None else []
+            for elemento in dato:
+                if not any(iguales({tipo: [elemento]}, {tipo: [otro]}) for otro in existentes):
+                    existentes.append(elemento)
+            _escribir_ruta(nuevo, ruta, nombres, {tipo: existentes})
+        else:
+            raise Validacion("Incorrect operand type for operator or function; operator: ADD")
+
+    for ruta, operando in arbol.get("DELETE", ()):
+        quitado = _operando(operando, item, nombres, valores)
+        actual = leer_ruta(nuevo, ruta, nombres)
+        tipo, dato = _tipo_y_dato(quitado)
+        if tipo not in ("SS", "NS", "BS"):
+            raise Validacion("Incorrect operand type for operator or function; operator: DELETE")
+        if actual is None:
+            continue
+        if tipo not in actual:
+            raise Validacion("An operand in the update expression has an incorrect data type")
+        restantes = [
+            elemento for elemento in actual[tipo]
+            if not any(iguales({tipo: [elemento]}, {tipo: [otro]}) for otro in dato)
+        ]
+        _escribir_ruta(nuevo, ruta, nombres, {tipo: restantes} if restantes else None)
+
+    return nuevo
+
+
+def atributos_actualizados(arbol: dict, nombres: dict) -> set:
+    """Nombres de primer nivel que toca la expresión (UPDATED_NEW / UPDATED_OLD)."""
+    return {
+        _nombre(ruta[1][0], nombres)
+        for acciones in arbol.values()
+        for ruta, _ in acciones
+    }
+
+
+# --------------------------------------------------
+# Proyección
+# --------------------------------------------------
+def proyectar(item: dict, rutas: tuple, nombres: dict) -> dict:
+    resultado = {}
+    for ruta in rutas:
+        valor = leer_ruta(item, ruta, nombres)
+        if valor is None:
+            continue
+
+        partes = ruta[1]
+        if len(partes) == 1:
+            resultado[_nombre(partes[0], nombres)] = copiar(valor)
+            continue
+
+        # Ruta anidada: se arma el mismo camino con solo lo pedido
+        contenedor = resultado
+        for parte, siguiente in zip(partes[:-1], partes[1:]):
+            nombre = _nombre(parte, nombres) if parte[0] == "atributo" else parte[1]
+            vacio = {"M": {}} if siguiente[0] == "atributo" else {"L": []}
+            if isinstance(contenedor, dict):
+                contenedor = contenedor.setdefault(nombre, vacio)
+            else:
+                contenedor.append(vacio)
+                contenedor = contenedor[-1]
+            contenedor = contenedor["M"] if "M" in contenedor else contenedor["L"]
+        ultima = partes[-1]
+        if isinstance(contenedor, dict):
+            contenedor[_nombre(ultima, nombres)] = copiar(valor)
+        else:
+            contenedor.append(copiar(valor))
+    return resultado
+
+
+# --------------------------------------------------
+# Condición de clave -> (valor de partición, rango)
+# --------------------------------------------------
+def condicion_de_clave(arbol, nombres: dict, valores: dict, clave_particion: str, clave_rango: str) -> tuple:
+    """
+    Separa la KeyConditionExpression en el valor de la clave de partición
+    y el rango sobre la clave de rango: (operador, valores) o None.
+    """
+    condiciones = []
+
+    def separar(nodo):
+        if nodo[0] == "and":
+            separar(nodo[1])
+            separar(nodo[2])
+        else:
+            condiciones.append(nodo)
+
+    separar(arbol)
+
+    particion = None
+    rango = None
+    for nodo in condiciones:
+        atributo, operador, argumentos = _condicion_simple(nodo, nombres, valores)
+        if atributo == clave_particion and operador == "=" and particion is None:
+            particion = valor_de_clave(argumentos[0])
+        elif atributo == clave_rango and clave_rango is not None and rango is None:
+            rango = (operador, tuple(valor_de_clave(argumento) for argumento in argumentos))
+        else:
+            raise Validacion("Query key condition not supported")
+
+    if particion is None:
+        raise Validacion("Query condition missed key schema element")
+    return particion, rango
+
+
+def _condicion_simple(nodo, nombres: dict, valores: dict) -> tuple:
+    if nodo[0] == "comparar" and nodo[1] != "<>" and nodo[2][0] == "ruta" and nodo[3][0] == "valor":
+        return _atributo_de_clave(nodo[2], nombres), nodo[1], (valores[nodo[3][1]],)
+    if nodo[0] == "entre" and nodo[1][0] == "ruta":
+        return _atributo_de_clave(nodo[1], nombres), "between", (valores[nodo[2][1]], valores[nodo[3][1]])
+    if nodo[0] == "funcion" and nodo[1] == "begins_with":
+        return _atributo_de_clave(nodo[2][0], nombres), "begins_with", (valores[nodo[2][1][1]],)
+    raise Validacion("Query key condition not supported")
+
+
+def _atributo_de_clave(ruta, nombres: dict) -> str:
+    if len(ruta[1]) != 1:
+        raise Validacion("Query key condition not supported")
+    return _nombre(ruta[1][0], nombres)
+
+
+def limites(rango) -> tuple:
+    """(inferior, incluye_inferior, superior, incluye_superior) del rango; None = sin límite."""
+    if rango is None:
+        return None, True, None, True
+
+    operador, argumentos = rango
+    if operador == "=":
+        return argumentos[0], True, argumentos[0], True
+    if operador == "<":
+        return None, True, argumentos[0], False
+    if operador == "<=":
+        return None, True, argumentos[0], True
+    if operador == ">":
+        return argumentos[0], False, None, True
+    if operador == ">=":
+        return argumentos[0], True, None, True
+    if operador == "between":
+        return argumentos[0], True, argumentos[1], True
+    # begins_with: desde el prefijo hasta el primer valor que ya no lo tiene
+    return argumentos[0], True, sucesor(argumentos[0]), False
+
+
+def sucesor(prefijo):
+    """Menor valor mayor que todos los que empiezan con `prefijo` (None si no hay)."""
+    if isinstance(prefijo, str):
+        for posicion in range(len(prefijo) - 1, -1, -1):
+            if ord(prefijo[posicion]) < 0x10FFFF:
+                return prefijo[:posicion] + chr(ord(prefijo[posicion]) + 1)
+        return None
+
+    for posicion in range(len(prefijo) - 1, -1, -1):
+        if prefijo[posicion] < 0xFF:
+            return prefijo[:posicion] + bytes([prefijo[posicion] + 1])
+    return None
@@ -0,0 +1,600 @@
+import threading
+import time
+from typing import Optional
+
+from almacenamiento.expresiones import (
+    analizar_actualizacion,
+    analizar_condicion,
+    analizar_proyeccion,
+    aplicar_actualizacion,
+    atributos_actualizados,
+    condicion_de_clave,
+    copiar,
+    evaluar,
+    limites,
+    proyectar,
+    valor_de_clave,
+    verificar_marcadores,
+)
+from almacenamiento.motor import (
+    Motor,
+    Validacion,
+    CondicionFallida,
+    TransaccionCancelada,
+    TablaInexistente,
+    TablaExistente,
+    tamano_item,
+)
+
+# --------------------------------------------------
+# Base de los motores locales (memoria y sqlite)
+#
+# Acá está toda la semántica de DynamoDB: validación de claves,
+# condiciones, actualizaciones, proyecciones de índices, paginación y
+# transacciones. Cada motor solo implementa cómo guardar y recorrer:
+#
+#   _cargar_esquemas / _guardar_esquema / _quitar_tabla
+#   _leer(tabla, pk, sk)                      item o None
+#   _particion(tabla, indice, ipk, ...)       (posición, item) en orden
+#   _recorrer(tabla, desde)                   ((pk, sk), item) en orden
+#   _escribir(tabla, esquema, cambios)        [(anterior, nuevo)] de una vez
+#   _agregar_indice / _quitar_indice
+#
+# Las posiciones son tuplas comparables: (sk,) en la tabla y
+# (isk, pk, sk) en un índice. Una clave de rango que no existe vale "".
+# --------------------------------------------------
+
+
+class Indice:
+
+    def __init__(self, definicion: dict):
+        self.nombre = definicion["IndexName"]
+        self.particion, self.rango = _atributos_de_clave(definicion["KeySchema"])
+        proyeccion = definicion.get("Projection", {})
+        self.proyeccion = proyeccion.get("ProjectionType", "ALL")
+        self.incluidos = set(proyeccion.get("NonKeyAttributes", []))
+
+
+class Esquema:
+    """Claves e índices de una tabla, a partir de su descripción."""
+
+    def __init__(self, descripcion: dict):
+        self.descripcion = descripcion
+        self.nombre = descripcion["TableName"]
+        self.particion, self.rango = _atributos_de_clave(descripcion["KeySchema"])
+        self.tipos = {
+            atributo["AttributeName"]: atributo["AttributeType"]
+            for atributo in descripcion["AttributeDefinitions"]
+        }
+        self.indices = {
+            definicion["IndexName"]: Indice(definicion)
+            for definicion in descripcion.get("GlobalSecondaryIndexes", []) + descripcion.get("LocalSecondaryIndexes", [])
+        }
+
+    def indice(self, nombre: str) -> Indice:
+        if nombre not in self.indices:
+            raise Validacion(f"The table does not have the specified index: {nombre}")
+        return self.indices[nombre]
+
+    # ------------------------------
+    # Claves
+    # ------------------------------
+    def _valor(self, item: dict, atributo: str, obligatorio: bool):
+        valor = item.get(atributo)
+        if valor is None:
+            if obligatorio:
+                raise Validacion(f"One of the required keys was not given a value: {atributo}")
+            return None
+
+        tipo = next(iter(valor))
+        if tipo != self.tipos.get(atributo, tipo):
+            raise Validacion(
+                f"One or more parameter values were invalid: Type mismatch for key {atributo} "
+                f"expected: {self.tipos[atributo]} actual: {tipo}"
+            )
+        dato = valor_de_clave(valor)
+        if len(dato) == 0:
+            raise Validacion(
+                f"One or more parameter values are not valid. The AttributeValue for a key "
+                f"attribute cannot contain an empty value. Key: {atributo}"
+            )
+        return dato
+
+    def clave(self, item: dict) -> tuple:
+        """(pk, sk) del item; sk es "" si la tabla no tiene clave de rango."""
+        pk = self._valor(item, self.particion, True)
+        sk = self._valor(item, self.rango, True) if self.rango else ""
+        return pk, sk
+
+    def solo_clave(self, clave: dict) -> tuple:
+        """Como clave(), pero exige que `clave` tenga exactamente los atributos de clave."""
+        esperados = {self.particion, self.rango} - {None}
+        if set(clave) != esperados:
+            raise Validacion("The provided key element does not match the schema")
+        return self.clave(clave)
+
+    def atributos_de_clave(self, item: dict, indice: Optional[Indice] = None) -> dict:
+        atributos = [self.particion, self.rango]
+        if indice is not None:
+            atributos += [indice.particion, indice.rango]
+        return {atributo: item[atributo] for atributo in atributos if atributo and atributo in item}
+
+    def entradas(self, item: dict) -> dict:
+        """{índice: (ipk, isk)} de los índices en los que aparece el item (índices dispersos)."""
+        entradas = {}
+        for indice in self.indices.values():
+            ipk = self._valor(item, indice.particion, False)
+            if ipk is None:
+                continue
+            if indice.rango:
+                isk = self._valor(item, indice.rango, False)
+                if isk is None:
+                    continue
+            else:
+                isk = ""
+            entradas[indice.nombre] = (ipk, isk)
+        return entradas
+
+    def proyectar_indice(self, item: dict, indice: Optional[Indice]) -> dict:
+        if indice is None or indice.proyeccion == "ALL":
+            return item
+        visibles = {self.particion, self.rango, indice.particion, indice.rango}
+        if indice.proyeccion == "INCLUDE":
+            visibles |= indice.incluidos
+        return {atributo: valor for atributo, valor in item.items() if atributo in visibles}
+
+
+def _atributos_de_clave(definicion: list) -> tuple:
+    particion = next((c["AttributeName"] for c in definicion if c["KeyType"] == "HASH"), None)
+    rango = next((c["AttributeName"] for c in definicion if c["KeyType"] == "RANGE"), None)
+    if particion is None:
+        raise Validacion("Invalid KeySchema: falta la clave HASH")
+    return particion, rango
+
+
+class MotorLocal(Motor):
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._esquemas = {}
+
+    # ------------------------------
+    # Primitivas de cada motor
+    # ------------------------------
+    def _operacion(self, escritura: bool = False):
+        """Context manager que aísla la operación (todas o ninguna de sus escrituras)."""
+        return self._lock
+
+    def _cargar_esquemas(self) -> dict:
+        raise NotImplementedError
+
+    def _guardar_esquema(self, tabla: str, descripcion: dict):
+        raise NotImplementedError
+
+    def _quitar_tabla(self, tabla: str):
+        raise NotImplementedError
+
+    def _leer(self, tabla: str, pk, sk) -> Optional[dict]:
+        raise NotImplementedError
+
+    def _particion(self, tabla: str, indice: Optional[str], ipk, inferior, incluye_inferior,
+                   superior, incluye_superior, adelante: bool, desde: Optional[tuple]):
+        raise NotImplementedError
+
+    def _recorrer(self, tabla: str, desde: Optional[tuple]):
+        raise NotImplementedError
+
+    def _escribir(self, tabla: str, esquema: Esquema, cambios: list):
+        raise NotImplementedError
+
+    def _agregar_indice(self, tabla: str, esquema: Esquema, indice: str):
+        raise NotImplementedError
+
+    def _quitar_indice(self, tabla: str, indice: str):
+        raise NotImplementedError
+
+    # ------------------------------
+    # Esquemas
+    # ------------------------------
+    def _esquema(self, tabla: str) -> Esquema:
+        esquema = self._esquemas.get(tabla)
+        if esquema is None:
+            # Otro proceso (sqlite) pudo haberla creado
+            self._esquemas = {
+                nombre: Esquema(descripcion)
+                for nombre, descripcion in self._cargar_esquemas().items()
+            }
+            esquema = self._esquemas.get(tabla)
+        if esquema is None:
+            raise TablaInexistente(f"Requested resource not found: Table: {tabla} not found")
+        return esquema
+
+    def _publicar(self, descripcion: dict) -> Esquema:
+        esquema = Esquema(descripcion)
+        self._guardar_esquema(descripcion["TableName"], descripcion)
+        self._esquemas[descripcion["TableName"]] = esquema
+        return esquema
+
+    # ------------------------------
+    # Tablas
+    # ------------------------------
+    def crear_tabla(self, definicion: dict) -> dict:
+        tabla = definicion["TableName"]
+        with self._operacion(escritura=True):
+            try:
+                self._esquema(tabla)
+            except TablaInexistente:
+                pass
+            else:
+                raise TablaExistente(f"Table already exists: {tabla}")
+
+            descripcion = {
+                "TableName": tabla,
+                "KeySchema": definicion["KeySchema"],
+                "AttributeDefinitions": definicion["AttributeDefinitions"],
+                "TableStatus": "ACTIVE",
+                "CreationDateTime": time.time(),
+                "TableArn": f"arn:aws:dynamodb:local:000000000000:table/{tabla}",
+                "BillingModeSummary": {"BillingMode": definicion.get("BillingMode", "PROVISIONED")},
+            }
+            for tipo in ("GlobalSecondaryIndexes", "LocalSecondaryIndexes"):
+                if definicion.get(tipo):
+                    descripcion[tipo] = [{**indice, "IndexStatus": "ACTIVE"} for indice in definicion[tipo]]
+
+            esquema = Esquema(descripcion)
+            for atributo in [esquema.particion, esquema.rango] + [
+                clave for indice in esquema.indices.values() for clave in (indice.particion, indice.rango)
+            ]:
+                if atributo and atributo not in esquema.tipos:
+                    raise Validacion(f"One or more parameter values were invalid: falta AttributeDefinition de {atributo}")
+
+            self._publicar(descripcion)
+            return self._descripcion(esquema)
+
+    def describir_tabla(self, tabla: str) -> dict:
+        with self._operacion():
+            return self._descripcion(self._esquema(tabla))
+
+    def _descripcion(self, esquema: Esquema) -> dict:
+        descripcion = {**esquema.descripcion, "ItemCount": 0, "TableSizeBytes": 0}
+        descripcion.pop("TimeToLiveDescription", None)
+        return descripcion
+
+    def actualizar_tabla(self, tabla: str, cambios: dict) -> dict:
+        with self._operacion(escritura=True):
+            esquema = self._esquema(tabla)
+            descripcion = copiar(esquema.descripcion)
+
+            tipos = {atributo["AttributeName"]: atributo for atributo in descripcion["AttributeDefinitions"]}
+            for atributo in cambios.get("AttributeDefinitions", []):
+                tipos[atributo["AttributeName"]] = atributo
+            descripcion["AttributeDefinitions"] = list(tipos.values())
+
+            indices = descripcion.get("GlobalSecondaryIndexes", [])
+            nuevos, quitados = [], []
+            for cambio in cambios.get("GlobalSecondaryIndexUpdates", []):
+                if "Create" in cambio:
+                    nombre = cambio["Create"]["IndexName"]
+                    if any(indice["IndexName"] == nombre for indice in indices):
+                        raise Validacion(f"Attempting to create an index which already exists: {nombre}")
+                    indices.append({**cambio["Create"], "IndexStatus": "ACTIVE"})
+                    nuevos.append(nombre)
+                elif "Delete" in cambio:
+                    nombre = cambio["Delete"]["IndexName"]
+                    if not any(indice["IndexName"] == nombre for indice in indices):
+                        raise TablaInexistente(f"Requested resource not found: index {nombre}")
+                    indices = [indice for indice in indices if indice["IndexName"] != nombre]
+                    quitados.append(nombre)
+            if indices:
+                descripcion["GlobalSecondaryIndexes"] = indices
+            else:
+                descripcion.pop("GlobalSecondaryIndexes", None)
+
+            esquema = self._publicar(descripcion)
+            for nombre in quitados:
+                self._quitar_indice(tabla, nombre)
+            for nombre in nuevos:
+                self._agregar_indice(tabla, esquema, nombre)
+
+            return self._descripcion(esquema)
+
+    def borrar_tabla(self, tabla: str) -> dict:
+        with self._operacion(escritura=True):
+            descripcion = self._descripcion(self._esquema(tabla))
+            self._quitar_tabla(tabla)
+            self._esquemas.pop(tabla, None)
+            return {**descripcion, "TableStatus": "DELETING"}
+
+    def tablas(self) -> list:
+        with self._operacion():
+            self._esquemas = {
+                nombre: Esquema(descripcion)
+                for nombre, descripcion in self._cargar_esquemas().items()
+            }
+            return sorted(self._esquemas)
+
+    def configurar_ttl(self, tabla: str, especificacion: dict) -> dict:
+        with self._operacion(escritura=True):
+            descripcion = copiar(self._esquema(tabla).descripcion)
+            if especificacion.get("Enabled"):
+                descripcion["TimeToLiveDescription"] = {
+                    "TimeToLiveStatus": "ENABLED",
+                    "AttributeName": especificacion["AttributeName"],
+                }
+            else:
+                descripcion.pop("TimeToLiveDescription", None)
+            self._publicar(descripcion)
+            return especificacion
+
+    def describir_ttl(self, tabla: str) -> dict:
+        with self._operacion():
+            return self._esquema(tabla).descripcion.get("TimeToLiveDescription", {"TimeToLiveStatus": "DISABLED"})
+
+    # ------------------------------
+    # Lectura
+    # ------------------------------
+    def obtener(self, tabla: str, clave: dict, proyeccion: str = None, nombres: dict = None) -> Optional[dict]:
+        rutas = analizar_proyeccion(proyeccion) if proyeccion else None
+        verificar_marcadores([rutas], nombres, {})
+
+        with self._operacion():
+            esquema = self._esquema(tabla)
+            item = self._leer(tabla, *esquema.solo_clave(clave))
+
+        if item is None:
+            return None
+        return proyectar(item, rutas, nombres or {}) if rutas else copiar(item)
+
+    def obtener_lote(self, tabla: str, claves: list, proyeccion: str = None, nombres: dict = None) -> list:
+        rutas = analizar_proyeccion(proyeccion) if proyeccion else None
+        verificar_marcadores([rutas], nombres, {})
+
+        with self._operacion():
+            esquema = self._esquema(tabla)
+            posiciones = [esquema.solo_clave(clave) for clave in claves]
+            if len(set(posiciones)) != len(posiciones):
+                raise Validacion("Provided list of item keys contains duplicates")
+            items = [self._leer(tabla, pk, sk) for pk, sk in posiciones]
+
+        return [
+            proyectar(item, rutas, nombres or {}) if rutas else copiar(item)
+            for item in items if item is not None
+        ]
+
+    def consultar(
+        self,
+        tabla: str,
+        condicion_clave: str,
+        indice: str = None,
+        filtro: str = None,
+        proyeccion: str = None,
+        nombres: dict = None,
+        valores: dict = None,
+        limite: int = None,
+        inicio: dict = None,
+        adelante: bool = True,
+    ) -> dict:
+        arbol_clave = analizar_condicion(condicion_clave)
+        arbol_filtro = analizar_condicion(filtro) if filtro else None
+        rutas = analizar_proyeccion(proyeccion) if proyeccion else None
+        verificar_marcadores([arbol_clave, arbol_filtro, rutas], nombres, valores)
+        nombres, valores = nombres or {}, valores or {}
+
+        with self._operacion():
+            esquema = self._esquema(tabla)
+            definicion = esquema.indice(indice) if indice else None
+            particion, rango = (definicion or esquema).particion, (definicion or esquema).rango
+
+            ipk, condicion_rango = condicion_de_clave(arbol_clave, nombres, valores, particion, rango)
+            desde = None
+            if inicio:
+                pk, sk = esquema.clave(inicio)
+                if definicion is None:
+                    desde = (sk,)
+                else:
+                    isk = esquema._valor(inicio, rango, True) if rango else ""
+                    desde = (isk, pk, sk)
+
+            iterador = self._particion(
+                tabla, indice, ipk, *limites(condicion_rango), adelante, desde,
+            )
+            return self._pagina(esquema, definicion, iterador, arbol_filtro, rutas, nombres, valores, limite)
+
+    def recorrer(
+        self,
+        tabla: str,
+        filtro: str = None,
+        proyeccion: str = None,
+        nombres: dict = None,
+        valores: dict = None,
+        limite: int = None,
+        inicio: dict = None,
+    ) -> dict:
+        arbol_filtro = analizar_condicion(filtro) if filtro else None
+        rutas = analizar_proyeccion(proyeccion) if proyeccion else None
+        verificar_marcadores([arbol_filtro, rutas], nombres, valores)
+        nombres, valores = nombres or {}, valores or {}
+
+        with self._operacion():
+            esquema = self._esquema(tabla)
+            desde = esquema.clave(inicio) if inicio else None
+            iterador = self._recorrer(tabla, desde)
+            return self._pagina(esquema, None, iterador, arbol_filtro, rutas, nombres, valores, limite)
+
+    def _pagina(self, esquema, indice, iterador, arbol_filtro, rutas, nombres, valores, limite) -> dict:
+        items = []
+        evaluados = 0
+        leidos = 0
+        ultimo = None
+        hay_mas = False
+
+        for _, item in iterador:
+            if limite is not None and evaluados >= limite:
+                hay_mas = True
+                break
+
+            visible = esquema.proyectar_indice(item, indice)
+            evaluados += 1
+            leidos += tamano_item(visible)
+            ultimo = visible
+
+            if arbol_filtro is not None and not evaluar(arbol_filtro, visible, nombres, valores):
+                continue
+            items.append(proyectar(visible, rutas, nombres) if rutas else copiar(visible))
+
+        respuesta = {"Items": items, "Count": len(items), "ScannedCount": evaluados, "BytesLeidos": leidos}
+        if hay_mas:
+            respuesta["LastEvaluatedKey"] = esquema.atributos_de_clave(ultimo, indice)
+        return respuesta
+
+    # ------------------------------
+    # Escritura
+    # ------------------------------
+    def poner(self, tabla: str, item: dict, condicion: str = None, nombres: dict = None, valores: dict = None):
+        arbol = analizar_condicion(condicion) if condicion else None
+        verificar_marcadores([arbol], nombres, valores)
+
+        with self._operacion(escritura=True):
+            esquema = self._esquema(tabla)
+            pk, sk = esquema.clave(item)
+            esquema.entradas(item)
+            anterior = self._leer(tabla, pk, sk)
+            self._verificar(arbol, anterior, nombres, valores)
+            self._escribir(tabla, esquema, [(anterior, copiar(item))])
+            return anterior
+
+    def actualizar(
+        self,
+        tabla: str,
+        clave: dict,
+        expresion: str,
+        condicion: str = None,
+        nombres: dict = None,
+        valores: dict = None,
+    ) -> tuple:
+        arbol = analizar_actualizacion(expresion)
+        arbol_condicion = analizar_condicion(condicion) if condicion else None
+        verificar_marcadores([arbol, arbol_condicion], nombres, valores)
+
+        with self._operacion(escritura=True):
+            esquema = self._esquema(tabla)
+            anterior, nuevo = self._actualizado(esquema, clave, arbol, arbol_condicion, nombres, valores)
+            self._escribir(tabla, esquema, [(anterior, nuevo)])
+            return anterior, nuevo
+
+    def _actualizado(self, esquema: Esquema, clave: dict, arbol, arbol_condicion, nombres, valores) -> tuple:
+        nombres, valores = nombres or {}, valores or {}
+        pk, sk = esquema.solo_clave(clave)
+
+        tocados = atributos_actualizados(arbol, nombres)
+        for atributo in (esquema.particion, esquema.rango):
+            if atributo in tocados:
+                raise Validacion(
+                    f"One or more parameter values were invalid: Cannot update attribute {atributo}. "
+                    f"This attribute is part of the key"
+                )
+
+        anterior = self._leer(esquema.nombre, pk, sk)
+        self._verificar(arbol_condicion, anterior, nombres, valores)
+        nuevo = aplicar_actualizacion(arbol, anterior or copiar(clave), nombres, valores)
+        esquema.entradas(nuevo)
+        return anterior, nuevo
+
+    def borrar(self, tabla: str, clave: dict, condicion: str = None, nombres: dict = None, valores: dict = None):
+        arbol = analizar_condicion(condicion) if condicion else None
+        verificar_marcadores([arbol], nombres, valores)
+
+        with self._operacion(escritura=True):
+            esquema = self._esquema(tabla)
+            anterior = self._leer(tabla, *esquema.solo_clave(clave))
+            self._verificar(arbol, anterior, nombres, valores)
+            if anterior is not None:
+                self._escribir(tabla, esquema, [(anterior, None)])
+            return anterior
+
+    def escribir_lote(self, tabla: str, poner: list = (), borrar: list = ()):
+        with self._operacion(escritura=True):
+            esquema = self._esquema(tabla)
+            posiciones = [esquema.clave(item) for item in poner] + [esquema.solo_clave(clave) for clave in borrar]
+            if len(set(posiciones)) != len(posiciones):
+                raise Validacion("Provided list of item keys contains duplicates")
+            for item in poner:
+                esquema.entradas(item)
+
+            nuevos = list(poner) + [None] * len(borrar)
+            cambios = [
+                (self._leer(tabla, pk, sk), copiar(nuevo) if nuevo is not None else None)
+                for (pk, sk), nuevo in zip(posiciones, nuevos)
+            ]
+            cambios = [(anterior, nuevo) for anterior, nuevo in cambios if anterior is not None or nuevo is not None]
+            self._escribir(tabla, esquema, cambios)
+
+    def transaccion(self, operaciones: list) -> list:
+        preparadas = []
+        for operacion in operaciones:
+            tipo, datos = next(iter(operacion.items()))
+            preparadas.append((
+                tipo,
+                datos,
+                analizar_condicion(datos["ConditionExpression"]) if datos.get("ConditionExpression") else None,
+                analizar_actualizacion(datos["UpdateExpression"]) if tipo == "Update" else None,
+            ))
+            verificar_marcadores(
+                [preparadas[-1][2], preparadas[-1][3]],
+                datos.get("ExpressionAttributeNames"),
+                datos.get("ExpressionAttributeValues"),
+            )
+
+        with self._operacion(escritura=True):
+            cambios = []
+            motivos = []
+            vistas = set()
+
+            for tipo, datos, arbol_condicion, arbol in preparadas:
+                esquema = self._esquema(datos["TableName"])
+                nombres = datos.get("ExpressionAttributeNames") or {}
+                valores = datos.get("ExpressionAttributeValues") or {}
+                pk, sk = esquema.clave(datos["Item"]) if tipo == "Put" else esquema.solo_clave(datos["Key"])
+
+                if (esquema.nombre, pk, sk) in vistas:
+                    raise Validacion("Transaction request cannot include multiple operations on one item")
+                vistas.add((esquema.nombre, pk, sk))
+
+                try:
+                    if tipo == "Update":
+                        anterior, nuevo = self._actualizado(esquema, datos["Key"], arbol, arbol_condicion, nombres, valores)
+                    else:
+                        anterior = self._leer(esquema.nombre, pk, sk)
+                        self._verificar(arbol_condicion, anterior, nombres, valores)
+                        if tipo == "Put":
+                            esquema.entradas(datos["Item"])
+                            nuevo = copiar(datos["Item"])
+                        elif tipo == "Delete":
+                            nuevo = None
+                        else:
+                            nuevo = anterior
+                except CondicionFallida as error:
+                    motivo = {"Code": "ConditionalCheckFailed", "Message": error.mensaje}
+                    if datos.get("ReturnValuesOnConditionCheckFailure") == "ALL_OLD" and error.item:
+                        motivo["Item"] = error.item
+                    motivos.append(motivo)
+                    cambios.append(None)
+                    continue
+
+                motivos.append({"Code": "None"})
+                cambios.append((esquema, tipo, anterior, nuevo))
+
+            if any(motivo["Code"] != "None" for motivo in motivos):
+                raise TransaccionCancelada(motivos)
+
+            for esquema, tipo, anterior, nuevo in cambios:
+                if tipo != "ConditionCheck" and (anterior is not None or nuevo is not None):
+                    self._escribir(esquema.nombre, esquema, [(anterior, nuevo)])
+
+            return [(anterior, nuevo) for _, _, anterior, nuevo in cambios]
+
+    def _verificar(self, arbol, item: Optional[dict], nombres: dict, valores: dict):
+        if arbol is None:
+            return
+        if not evaluar(arbol, item or {}, nombres or {}, valores or {}):
+            raise CondicionFallida(item=item)
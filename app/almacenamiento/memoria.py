@@ -0,0 +1,156 @@
+from bisect import bisect_left, bisect_right, insort
+
+from almacenamiento.expresiones import copiar
+from almacenamiento.local import MotorLocal, Esquema
+
+# --------------------------------------------------
+# Motor en memoria
+#
+# Cada tabla es un diccionario de particiones con sus claves de rango
+# ordenadas (bisect), y cada índice una lista ordenada de posiciones
+# (isk, pk, sk) por partición. Los datos viven en el proceso: sirve para
+# benchmarks y pruebas locales sin DynamoDB Local ni Docker, no para
+# varios workers (cada uno tendría su propia copia).
+# --------------------------------------------------
+
+
+class _Tabla:
+
+    def __init__(self):
+        self.particiones = {}     # pk -> {sk: item}
+        self.claves = {}          # pk -> [sk ordenados]
+        self.orden = []           # pk ordenados (Scan)
+        self.indices = {}         # índice -> {ipk: [(isk, pk, sk) ordenados]}
+
+
+class MotorMemoria(MotorLocal):
+
+    nombre = "memoria"
+
+    def __init__(self):
+        super().__init__()
+        self._descripciones = {}
+        self._tablas = {}
+
+    # ------------------------------
+    # Esquemas
+    # ------------------------------
+    def _cargar_esquemas(self) -> dict:
+        return dict(self._descripciones)
+
+    def _guardar_esquema(self, tabla: str, descripcion: dict):
+        self._descripciones[tabla] = descripcion
+        datos = self._tablas.setdefault(tabla, _Tabla())
+        for indice in Esquema(descripcion).indices:
+            datos.indices.setdefault(indice, {})
+
+    def _quitar_tabla(self, tabla: str):
+        self._descripciones.pop(tabla, None)
+        self._tablas.pop(tabla, None)
+
+    # ------------------------------
+    # Lectura
+    # ------------------------------
+    def _leer(self, tabla: str, pk, sk):
+        return self._tablas[tabla].particiones.get(pk, {}).get(sk)
+
+    def _particion(self, tabla, indice, ipk, inferior, incluye_inferior, superior, incluye_superior, adelante, desde):
+        datos = self._tablas[tabla]
+        if indice is None:
+            posiciones = datos.claves.get(ipk, [])
+            clave = None
+        else:
+            posiciones = datos.indices[indice].get(ipk, [])
+            clave = _rango_de_indice
+
+        desde_pos = 0
+        hasta_pos = len(posiciones)
+        if inferior is not None:
+            buscar = bisect_left if incluye_inferior else bisect_right
+            desde_pos = buscar(posiciones, inferior, key=clave)
+        if superior is not None:
+            buscar = bisect_right if incluye_superior else bisect_left
+            hasta_pos = buscar(posiciones, superior, key=clave)
+
+        if desde is not None:
+            marca = desde if indice is not None else desde[0]
+            if adelante:
+                desde_pos = max(desde_pos, bisect_right(posiciones, marca))
+            else:
+                hasta_pos = min(hasta_pos, bisect_left(posiciones, marca))
+
+        # Copia del tramo: las escrituras del mismo hilo no corren los índices
+        tramo = posiciones[desde_pos:hasta_pos]
+        if not adelante:
+            tramo.reverse()
+
+        for posicion in tramo:
+            if indice is None:
+                yield (posicion,), datos.particiones[ipk][posicion]
+            else:
+                yield posicion, datos.particiones[posicion[1]][posicion[2]]
+
+    def _recorrer(self, tabla, desde):
+        datos = self._tablas[tabla]
+        inicio = 0
+        if desde is not None:
+            inicio = bisect_left(datos.orden, desde[0])
+
+        for pk in datos.orden[inicio:]:
+            claves = datos.claves[pk]
+            primera = bisect_right(claves, desde[1]) if desde is not None and pk == desde[0] else 0
+            for sk in claves[primera:]:
+                yield (pk, sk), datos.particiones[pk][sk]
+
+    # ------------------------------
+    # Escritura
+    # ------------------------------
+    def _escribir(self, tabla: str, esquema: Esquema, cambios: list):
+        datos = self._tablas[tabla]
+
+        for anterior, nuevo in cambios:
+            if anterior is not None:
+                pk, sk = esquema.clave(anterior)
+                for indice, (ipk, isk) in esquema.entradas(anterior).items():
+                    _quitar(datos.indices[indice], ipk, (isk, pk, sk))
+                del datos.particiones[pk][sk]
+                _quitar(datos.claves, pk, sk)
+                if not datos.particiones[pk]:
+                    del datos.particiones[pk]
+                    datos.orden.pop(bisect_left(datos.orden, pk))
+
+            if nuevo is not None:
+                pk, sk = esquema.clave(nuevo)
+                if pk not in datos.particiones:
+                    datos.particiones[pk] = {}
+                    insort(datos.orden, pk)
+                datos.particiones[pk][sk] = copiar(nuevo)
+                insort(datos.claves.setdefault(pk, []), sk)
+                for indice, (ipk, isk) in esquema.entradas(nuevo).items():
+                    insort(datos.indices[indice].setdefault(ipk, []), (isk, pk, sk))
+
+    def _agregar_indice(self, tabla: str, esquema: Esquema, indice: str):
+        datos = self._tablas[tabla]
+        entradas = datos.indices[indice] = {}
+        for particion in datos.particiones.values():
+            for item in particion.values():
+                pk, sk = esquema.clave(item)
+                posicion = esquema.entradas(item).get(indice)
+                if posicion is not None:
+                    entradas.setdefault(posicion[0], []).append((posicion[1], pk, sk))
+        for posiciones in entradas.values():
+            posiciones.sort()
+
+    def _quitar_indice(self, tabla: str, indice: str):
+        self._tablas[tabla].indices.pop(indice, None)
+
+
+def _rango_de_indice(posicion: tuple):
+    return posicion[0]
+
+
+def _quitar(listas: dict, clave, valor):
+    posiciones = listas[clave]
+    posiciones.pop(bisect_left(posiciones, valor))
+    if not posiciones:
+        del listas[clave]
@@ -0,0 +1,227 @@
+import base64
+import math
+from typing import Optional
+
+# --------------------------------------------------
+# Interfaz de los motores de almacenamiento
+#
+# Todos los motores exponen la misma tabla única con la semántica de
+# DynamoDB: clave PK/SK, índices secundarios globales dispersos,
+# expresiones de condición, actualización y proyección, lotes y
+# transacciones (todas o ninguna).
+#
+# Los items viajan en el formato JSON de DynamoDB, igual que por HTTP:
+#
+#   {"PK": {"S": "INSTITUCION#..."}, "habil": {"BOOL": true},
+#    "requisitos": {"L": [{"S": "DPI"}]}, "descripcion": {"B": "<base64>"}}
+#
+# Las expresiones son las de DynamoDB (con #nombres y :valores), así que
+# el mismo código de la API funciona sobre cualquier motor.
+#
+# Motores:
+#   dynamodb   DynamoDB (AWS o DynamoDB Local), almacenamiento/dynamodb.py
+#   memoria    diccionarios por proceso, almacenamiento/memoria.py
+#   sqlite     un archivo con índices, almacenamiento/sqlite.py
+# --------------------------------------------------
+
+
+class ErrorDeAlmacenamiento(Exception):
+    """Error con el mismo código que devolvería DynamoDB."""
+
+    codigo = "InternalServerError"
+
+    def __init__(self, mensaje: str):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+
+
+class Validacion(ErrorDeAlmacenamiento):
+    codigo = "ValidationException"
+
+
+class CondicionFallida(ErrorDeAlmacenamiento):
+    codigo = "ConditionalCheckFailedException"
+
+    def __init__(self, mensaje: str = "The conditional request failed", item: dict = None):
+        super().__init__(mensaje)
+        self.item = item
+
+
+class TransaccionCancelada(ErrorDeAlmacenamiento):
+    codigo = "TransactionCanceledException"
+
+    def __init__(self, motivos: list):
+        codigos = ", ".join(motivo["Code"] for motivo in motivos)
+        super().__init__(f"Transaction cancelled, please refer cancellation reasons for specific reasons [{codigos}]")
+        self.motivos = motivos
+
+
+class TablaInexistente(ErrorDeAlmacenamiento):
+    codigo = "ResourceNotFoundException"
+
+
+class TablaExistente(ErrorDeAlmacenamiento):
+    codigo = "ResourceInUseException"
+
+
+class Motor:
+    """
+    Operaciones de un motor. `tabla` es el nombre de la tabla; `clave`
+    es un item con solo los atributos de clave. Las expresiones reciben
+    sus `nombres` (#n) y `valores` (:v) como en DynamoDB.
+    """
+
+    nombre = ""
+
+    # ------------------------------
+    # Tablas
+    # ------------------------------
+    def crear_tabla(self, definicion: dict) -> dict:
+        """Crea la tabla (definición de CreateTable). Devuelve su descripción."""
+        raise NotImplementedError
+
+    def describir_tabla(self, tabla: str) -> dict:
+        raise NotImplementedError
+
+    def actualizar_tabla(self, tabla: str, cambios: dict) -> dict:
+        """Agrega o quita índices (GlobalSecondaryIndexUpdates de UpdateTable)."""
+        raise NotImplementedError
+
+    def borrar_tabla(self, tabla: str) -> dict:
+        raise NotImplementedError
+
+    def tablas(self) -> list:
+        raise NotImplementedError
+
+    def configurar_ttl(self, tabla: str, especificacion: dict) -> dict:
+        raise NotImplementedError
+
+    def describir_ttl(self, tabla: str) -> dict:
+        raise NotImplementedError
+
+    # ------------------------------
+    # Lectura
+    # ------------------------------
+    def obtener(self, tabla: str, clave: dict, proyeccion: str = None, nombres: dict = None) -> Optional[dict]:
+        raise NotImplementedError
+
+    def consultar(
+        self,
+        tabla: str,
+        condicion_clave: str,
+        indice: str = None,
+        filtro: str = None,
+        proyeccion: str = None,
+        nombres: dict = None,
+        valores: dict = None,
+        limite: int = None,
+        inicio: dict = None,
+        adelante: bool = True,
+    ) -> dict:
+        """
+        Items de una partición (de la tabla o de un índice), en orden de
+        clave de rango: {"Items", "Count", "ScannedCount", "LastEvaluatedKey"?}.
+        `limite` cuenta los items evaluados, antes del filtro. Los motores
+        locales agregan "BytesLeidos" (tamaño de lo evaluado, para el RCU).
+        """
+        raise NotImplementedError
+
+    def recorrer(
+        self,
+        tabla: str,
+        filtro: str = None,
+        proyeccion: str = None,
+        nombres: dict = None,
+        valores: dict = None,
+        limite: int = None,
+        inicio: dict = None,
+    ) -> dict:
+        """Scan de la tabla, con el mismo formato de respuesta que consultar."""
+        raise NotImplementedError
+
+    def obtener_lote(self, tabla: str, claves: list, proyeccion: str = None, nombres: dict = None) -> list:
+        raise NotImplementedError
+
+    # ------------------------------
+    # Escritura
+    # ------------------------------
+    def poner(
+        self,
+        tabla: str,
+        item: dict,
+        condicion: str = None,
+        nombres: dict = None,
+        valores: dict = None,
+    ) -> Optional[dict]:
+        """Escribe el item completo. Devuelve el anterior (o None)."""
+        raise NotImplementedError
+
+    def actualizar(
+        self,
+        tabla: str,
+        clave: dict,
+        expresion: str,
+        condicion: str = None,
+        nombres: dict = None,
+        valores: dict = None,
+    ) -> tuple:
+        """Aplica la UpdateExpression (crea el item si no existe). Devuelve (anterior, nuevo)."""
+        raise NotImplementedError
+
+    def borrar(
+        self,
+        tabla: str,
+        clave: dict,
+        condicion: str = None,
+        nombres: dict = None,
+        valores: dict = None,
+    ) -> Optional[dict]:
+        raise NotImplementedError
+
+    def escribir_lote(self, tabla: str, poner: list = (), borrar: list = ()):
+        """Puts y deletes sin condición (BatchWriteItem)."""
+        raise NotImplementedError
+
+    def transaccion(self, operaciones: list) -> list:
+        """
+        Operaciones de TransactWriteItems ({"Put" | "Update" | "Delete" |
+        "ConditionCheck": {...}}): se aplican todas o ninguna. Si alguna
+        condición falla lanza TransaccionCancelada con un motivo por operación.
+        Devuelve (anterior, nuevo) de cada operación.
+        """
+        raise NotImplementedError
+
+    def cerrar(self):
+        pass
+
+
+# --------------------------------------------------
+# Tamaño de items (unidades de capacidad)
+# --------------------------------------------------
+def tamano_valor(valor: dict) -> int:
+    tipo, dato = next(iter(valor.items()))
+    if tipo == "S":
+        return len(dato.encode("utf-8"))
+    if tipo == "N":
+        return math.ceil(len(dato.lstrip("-").replace(".", "")) / 2) + 1
+    if tipo == "B":
+        return len(base64.b64decode(dato))
+    if tipo in ("BOOL", "NULL"):
+        return 1
+    if tipo == "L":
+        return 3 + sum(tamano_valor(elemento) + 1 for elemento in dato)
+    if tipo == "M":
+        return 3 + sum(len(nombre.encode("utf-8")) + tamano_valor(v) + 1 for nombre, v in dato.items())
+    if tipo == "SS":
+        return sum(len(elemento.encode("utf-8")) for elemento in dato)
+    if tipo == "NS":
+        return sum(tamano_valor({"N": elemento}) for elemento in dato)
+    if tipo == "BS":
+        return sum(len(base64.b64decode(elemento)) for elemento in dato)
+    raise Validacion(f"Tipo de atributo desconocido: {tipo}")
+
+
+def tamano_item(item: Optional[dict]) -> int:
+    if not item:
+        return 0
+    return sum(len(nombre.encode("utf-8")) + tamano_valor(valor) for nombre, valor in item.items())
@@ -0,0 +1,33 @@
+from almacenamiento.motor import Motor
+
+# --------------------------------------------------
+# Creación de motores por nombre (ALMACENAMIENTO)
+# --------------------------------------------------
+
+MOTORES = ("dynamodb", "memoria", "sqlite")
+
+# Motores que atiende el propio proceso (sin HTTP)
+MOTORES_LOCALES = ("memoria", "sqlite")
+
+
+def crear_motor(nombre: str, ruta: str = None, client=None) -> Motor:
+    """
+    nombre: dynamodb | memoria | sqlite
+    ruta:   archivo de la base (sqlite)
+    client: cliente de bajo nivel de boto3 (dynamodb; por defecto el de lectura)
+    """
+    if nombre == "dynamodb":
+        from almacenamiento.dynamodb import MotorDynamoDB
+        return MotorDynamoDB(client)
+
+    if nombre == "memoria":
+        from almacenamiento.memoria import MotorMemoria
+        return MotorMemoria()
+
+    if nombre == "sqlite":
+        from almacenamiento.sqlite import MotorSQLite
+        if not ruta:
+            raise ValueError("El motor sqlite necesita la ruta del archivo (ALMACENAMIENTO_SQLITE)")
+        return MotorSQLite(ruta)
+
+    raise ValueError(f"Motor de almacenamiento desconocido: {nombre} (opciones: {', '.join(MOTORES)})")
@@ -0,0 +1,326 @@
+import io
+import json
+import math
+import uuid
+
+from botocore.awsrequest import AWSResponse
+
+from almacenamiento.expresiones import analizar_actualizacion, analizar_proyeccion, atributos_actualizados, proyectar
+from almacenamiento.motor import ErrorDeAlmacenamiento, Validacion, TransaccionCancelada, CondicionFallida, tamano_item
+
+# --------------------------------------------------
+# Protocolo de DynamoDB sobre un motor local
+#
+# Un handler de `before-send.dynamodb` de botocore atiende la petición
+# ya serializada (JSON de DynamoDB, como por HTTP) con el motor y
+# devuelve la respuesta sin salir del proceso. boto3 (cliente, recurso,
+# paginadores, conditions) y todo el código de la API funcionan igual:
+# solo cambia a quién le habla el cliente.
+#
+# Se informan ConsumedCapacity y ScannedCount con las reglas de
+# DynamoDB (lecturas de 4 KB, escrituras de 1 KB, transacciones al
+# doble), así los presupuestos de benchmarks/ se pueden medir sin
+# DynamoDB Local.
+# --------------------------------------------------
+
+PREFIJO_ERROR = "com.amazonaws.dynamodb.v20120810#"
+
+MAXIMO_LOTE_LECTURA = 100
+MAXIMO_LOTE_ESCRITURA = 25
+MAXIMO_TRANSACCION = 100
+
+PARAMETROS_ANTIGUOS = {
+    "AttributesToGet", "KeyConditions", "QueryFilter", "ScanFilter", "Expected", "AttributeUpdates",
+    "ConditionalOperator",
+}
+
+
+class _Cuerpo(io.BytesIO):
+
+    def stream(self, **kwargs):
+        yield self.getvalue()
+
+
+# --------------------------------------------------
+# Capacidad consumida
+# --------------------------------------------------
+def unidades_lectura(tamano: int, consistente: bool = False) -> float:
+    return max(1, math.ceil(tamano / 4096)) * (1.0 if consistente else 0.5)
+
+
+def unidades_escritura(tamano: int) -> float:
+    return float(max(1, math.ceil(tamano / 1024)))
+
+
+def _consumo(pedido: dict, tabla: str, lectura: float = 0.0, escritura: float = 0.0) -> dict:
+    if pedido.get("ReturnConsumedCapacity", "NONE") == "NONE":
+        return {}
+    consumo = {"TableName": tabla, "CapacityUnits": lectura + escritura}
+    if lectura:
+        consumo["ReadCapacityUnits"] = lectura
+    if escritura:
+        consumo["WriteCapacityUnits"] = escritura
+    return {"ConsumedCapacity": consumo}
+
+
+def _consumo_por_tabla(pedido: dict, unidades: dict, clave: str) -> dict:
+    if pedido.get("ReturnConsumedCapacity", "NONE") == "NONE":
+        return {}
+    return {"ConsumedCapacity": [
+        {"TableName": tabla, "CapacityUnits": total, clave: total}
+        for tabla, total in unidades.items()
+    ]}
+
+
+def _expresiones(pedido: dict) -> dict:
+    return {
+        "nombres": pedido.get("ExpressionAttributeNames"),
+        "valores": pedido.get("ExpressionAttributeValues"),
+    }
+
+
+def _proyectado(item, pedido: dict):
+    if item is None or not pedido.get("ProjectionExpression"):
+        return item
+    return proyectar(item, analizar_proyeccion(pedido["ProjectionExpression"]), pedido.get("ExpressionAttributeNames") or {})
+
+
+def _atributos(pedido: dict, anterior, nuevo) -> dict:
+    tipo = pedido.get("ReturnValues", "NONE")
+    if tipo == "NONE":
+        return {}
+    if tipo == "ALL_OLD":
+        return {"Attributes": anterior} if anterior else {}
+    if tipo == "ALL_NEW":
+        return {"Attributes": nuevo} if nuevo else {}
+
+    # UPDATED_OLD / UPDATED_NEW: solo los atributos que tocó la expresión
+    tocados = atributos_actualizados(
+        analizar_actualizacion(pedido["UpdateExpression"]), pedido.get("ExpressionAttributeNames") or {},
+    )
+    origen = (anterior if tipo == "UPDATED_OLD" else nuevo) or {}
+    atributos = {nombre: valor for nombre, valor in origen.items() if nombre in tocados}
+    return {"Attributes": atributos} if atributos else {}
+
+
+# --------------------------------------------------
+# Operaciones
+# --------------------------------------------------
+def _get_item(motor, pedido: dict) -> dict:
+    tabla = pedido["TableName"]
+    item = motor.obtener(tabla, pedido["Key"])
+    respuesta = _consumo(pedido, tabla, lectura=unidades_lectura(tamano_item(item), pedido.get("ConsistentRead", False)))
+    if pedido.get("ProjectionExpression"):
+        # Se valida aunque el item no exista
+        analizar_proyeccion(pedido["ProjectionExpression"])
+    if item is not None:
+        respuesta["Item"] = _proyectado(item, pedido)
+    return respuesta
+
+
+def _put_item(motor, pedido: dict) -> dict:
+    tabla = pedido["TableName"]
+    anterior = motor.poner(
+        tabla, pedido["Item"], pedido.get("ConditionExpression"), **_expresiones(pedido),
+    )
+    tamano = max(tamano_item(anterior), tamano_item(pedido["Item"]))
+    return {**_atributos(pedido, anterior, None), **_consumo(pedido, tabla, escritura=unidades_escritura(tamano))}
+
+
+def _update_item(motor, pedido: dict) -> dict:
+    tabla = pedido["TableName"]
+    anterior, nuevo = motor.actualizar(
+        tabla, pedido["Key"], pedido["UpdateExpression"], pedido.get("ConditionExpression"), **_expresiones(pedido),
+    )
+    tamano = max(tamano_item(anterior), tamano_item(nuevo))
+    return {**_atributos(pedido, anterior, nuevo), **_consumo(pedido, tabla, escritura=unidades_escritura(tamano))}
+
+
+def _delete_item(motor, pedido: dict) -> dict:
+    tabla = pedido["TableName"]
+    anterior = motor.borrar(tabla, pedido["Key"], pedido.get("ConditionExpression"), **_expresiones(pedido))
+    return {
+        **_atributos(pedido, anterior, None),
+        **_consumo(pedido, tabla, escritura=unidades_escritura(tamano_item(anterior))),
+    }
+
+
+def _pagina(pedido: dict, resultado: dict) -> dict:
+    tabla = pedido["TableName"]
+    respuesta = {
+        "Items": resultado["Items"],
+        "Count": resultado["Count"],
+        "ScannedCount": resultado["ScannedCount"],
+        **_consumo(pedido, tabla, lectura=unidades_lectura(resultado["BytesLeidos"], pedido.get("ConsistentRead", False))),
+    }
+    if pedido.get("Select") == "COUNT":
+        del respuesta["Items"]
+    if "LastEvaluatedKey" in resultado:
+        respuesta["LastEvaluatedKey"] = resultado["LastEvaluatedKey"]
+    return respuesta
+
+
+def _query(motor, pedido: dict) -> dict:
+    if "KeyConditionExpression" not in pedido:
+        raise Validacion("Either the KeyConditions or KeyConditionExpression parameter must be specified in the request.")
+    resultado = motor.consultar(
+        pedido["TableName"],
+        pedido["KeyConditionExpression"],
+        indice=pedido.get("IndexName"),
+        filtro=pedido.get("FilterExpression"),
+        proyeccion=pedido.get("ProjectionExpression"),
+        limite=pedido.get("Limit"),
+        inicio=pedido.get("ExclusiveStartKey"),
+        adelante=pedido.get("ScanIndexForward", True),
+        **_expresiones(pedido),
+    )
+    return _pagina(pedido, resultado)
+
+
+def _scan(motor, pedido: dict) -> dict:
+    if "IndexName" in pedido or "TotalSegments" in pedido:
+        raise Validacion("Los motores locales no admiten Scan sobre índices ni Scan en paralelo")
+    resultado = motor.recorrer(
+        pedido["TableName"],
+        filtro=pedido.get("FilterExpression"),
+        proyeccion=pedido.get("ProjectionExpression"),
+        limite=pedido.get("Limit"),
+        inicio=pedido.get("ExclusiveStartKey"),
+        **_expresiones(pedido),
+    )
+    return _pagina(pedido, resultado)
+
+
+def _batch_get_item(motor, pedido: dict) -> dict:
+    if sum(len(tabla["Keys"]) for tabla in pedido["RequestItems"].values()) > MAXIMO_LOTE_LECTURA:
+        raise Validacion("Too many items requested for the BatchGetItem call")
+
+    respuestas = {}
+    unidades = {}
+    for tabla, lectura in pedido["RequestItems"].items():
+        items = motor.obtener_lote(tabla, lectura["Keys"])
+        consistente = lectura.get("ConsistentRead", False)
+        unidades[tabla] = sum(unidades_lectura(tamano_item(item), consistente) for item in items) or unidades_lectura(0, consistente)
+        respuestas[tabla] = [_proyectado(item, lectura) for item in items]
+
+    return {"Responses": respuestas, "UnprocessedKeys": {}, **_consumo_por_tabla(pedido, unidades, "ReadCapacityUnits")}
+
+
+def _batch_write_item(motor, pedido: dict) -> dict:
+    if sum(len(pedidos) for pedidos in pedido["RequestItems"].values()) > MAXIMO_LOTE_ESCRITURA:
+        raise Validacion("Too many items requested for the BatchWriteItem call")
+
+    unidades = {}
+    for tabla, pedidos in pedido["RequestItems"].items():
+        poner = [p["PutRequest"]["Item"] for p in pedidos if "PutRequest" in p]
+        borrar = [p["DeleteRequest"]["Key"] for p in pedidos if "DeleteRequest" in p]
+        motor.escribir_lote(tabla, poner, borrar)
+        unidades[tabla] = sum(unidades_escritura(tamano_item(item)) for item in poner) + len(borrar)
+
+    return {"UnprocessedItems": {}, **_consumo_por_tabla(pedido, unidades, "WriteCapacityUnits")}
+
+
+def _transact_write_items(motor, pedido: dict) -> dict:
+    operaciones = pedido["TransactItems"]
+    if len(operaciones) > MAXIMO_TRANSACCION:
+        raise Validacion("Member must have length less than or equal to 100")
+
+    cambios = motor.transaccion(operaciones)
+    unidades = {}
+    for operacion, (anterior, nuevo) in zip(operaciones, cambios):
+        tabla = next(iter(operacion.values()))["TableName"]
+        tamano = max(tamano_item(anterior), tamano_item(nuevo))
+        unidades[tabla] = unidades.get(tabla, 0.0) + 2 * unidades_escritura(tamano)
+
+    return _consumo_por_tabla(pedido, unidades, "WriteCapacityUnits")
+
+
+def _transact_get_items(motor, pedido: dict) -> dict:
+    respuestas = []
+    unidades = {}
+    for operacion in pedido["TransactItems"]:
+        lectura = operacion["Get"]
+        item = motor.obtener(lectura["TableName"], lectura["Key"])
+        unidades[lectura["TableName"]] = unidades.get(lectura["TableName"], 0.0) + 2 * unidades_lectura(tamano_item(item), True)
+        respuestas.append({"Item": _proyectado(item, lectura)} if item is not None else {})
+    return {"Responses": respuestas, **_consumo_por_tabla(pedido, unidades, "ReadCapacityUnits")}
+
+
+def _list_tables(motor, pedido: dict) -> dict:
+    nombres = [nombre for nombre in motor.tablas() if nombre > pedido.get("ExclusiveStartTableName", "")]
+    limite = pedido.get("Limit", 100)
+    respuesta = {"TableNames": nombres[:limite]}
+    if len(nombres) > limite:
+        respuesta["LastEvaluatedTableName"] = nombres[limite - 1]
+    return respuesta
+
+
+OPERACIONES = {
+    "GetItem": _get_item,
+    "PutItem": _put_item,
+    "UpdateItem": _update_item,
+    "DeleteItem": _delete_item,
+    "Query": _query,
+    "Scan": _scan,
+    "BatchGetItem": _batch_get_item,
+    "BatchWriteItem": _batch_write_item,
+    "TransactWriteItems": _transact_write_items,
+    "TransactGetItems": _transact_get_items,
+    "ListTables": _list_tables,
+    "CreateTable": lambda motor, pedido: {"TableDescription": motor.crear_tabla(pedido)},
+    "DescribeTable": lambda motor, pedido: {"Table": motor.describir_tabla(pedido["TableName"])},
+    "UpdateTable": lambda motor, pedido: {"TableDescription": motor.actualizar_tabla(pedido["TableName"], pedido)},
+    "DeleteTable": lambda motor, pedido: {"TableDescription": motor.borrar_tabla(pedido["TableName"])},
+    "UpdateTimeToLive": lambda motor, pedido: {
+        "TimeToLiveSpecification": motor.configurar_ttl(pedido["TableName"], pedido["TimeToLiveSpecification"]),
+    },
+    "DescribeTimeToLive": lambda motor, pedido: {"TimeToLiveDescription": motor.describir_ttl(pedido["TableName"])},
+}
+
+
+# --------------------------------------------------
+# Handler de botocore
+# --------------------------------------------------
+class Protocolo:
+
+    def __init__(self, motor):
+        self.motor = motor
+
+    def atender(self, request, **kwargs) -> AWSResponse:
+        destino = request.headers.get("X-Amz-Target", b"")
+        destino = destino.decode() if isinstance(destino, bytes) else destino
+        operacion = destino.rsplit(".", 1)[-1]
+
+        cuerpo = request.body or b"{}"
+        pedido = json.loads(cuerpo.decode("utf-8") if isinstance(cuerpo, bytes) else cuerpo)
+
+        try:
+            if operacion not in OPERACIONES:
+                raise Validacion(f"Operación no soportada por el motor {self.motor.nombre}: {operacion}")
+            antiguos = PARAMETROS_ANTIGUOS & set(pedido)
+            if antiguos:
+                raise Validacion(f"Los motores locales solo aceptan expresiones, no {', '.join(sorted(antiguos))}")
+            return self._respuesta(request.url, 200, OPERACIONES[operacion](self.motor, pedido))
+
+        except ErrorDeAlmacenamiento as error:
+            cuerpo = {"__type": PREFIJO_ERROR + error.codigo, "message": error.mensaje}
+            if isinstance(error, TransaccionCancelada):
+                cuerpo["CancellationReasons"] = error.motivos
+            if isinstance(error, CondicionFallida) and error.item and pedido.get("ReturnValuesOnConditionCheckFailure") == "ALL_OLD":
+                cuerpo["Item"] = error.item
+            estado = 500 if error.codigo == "InternalServerError" else 400
+            return self._respuesta(request.url, estado, cuerpo)
+
+    @staticmethod
+    def _respuesta(url: str, estado: int, cuerpo: dict) -> AWSResponse:
+        headers = {
+            "Content-Type": "application/x-amz-json-1.0",
+            "x-amzn-RequestId": uuid.uuid4().hex,
+        }
+        return AWSResponse(url, estado, headers, _Cuerpo(json.dumps(cuerpo).encode("utf-8")))
+
+
+def instalar(client, motor):
+    """Hace que `client` (o el client de un recurso) hable con `motor` en lugar de hacerlo por HTTP."""
+    client.meta.events.register("before-send.dynamodb", Protocolo(motor).atender)
+    return client
@@ -0,0 +1,231 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+
+from almacenamiento.local import MotorLocal, Esquema
+
+# --------------------------------------------------
+# Motor SQLite
+#
+# Toda la tabla única en un archivo:
+#
+#   tablas   (nombre, esquema)                    descripción de cada tabla
+#   items    (tabla, pk, sk, datos)               item en JSON de DynamoDB
+#   indices  (tabla, indice, ipk, isk, pk, sk)    una fila por item e índice
+#
+# items e indices son WITHOUT ROWID con la clave como PRIMARY KEY: una
+# Query es un recorrido por rango de la clave primaria de SQLite, en el
+# mismo orden que DynamoDB (TEXT compara por bytes UTF-8, igual que S).
+#
+# Modo WAL: los lectores no esperan a los escritores y varios workers
+# (procesos) pueden compartir el archivo. Cada escritura (incluidas las
+# transacciones de varios items) es una transacción BEGIN IMMEDIATE.
+# Cada hilo usa su propia conexión.
+# --------------------------------------------------
+
+ESPERA_BLOQUEO_MS = int(os.getenv("ALMACENAMIENTO_SQLITE_ESPERA_MS", "5000"))
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS tablas (
+    nombre  TEXT PRIMARY KEY,
+    esquema TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    tabla TEXT NOT NULL,
+    pk    NOT NULL,
+    sk    NOT NULL,
+    datos TEXT NOT NULL,
+    PRIMARY KEY (tabla, pk, sk)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS indices (
+    tabla  TEXT NOT NULL,
+    indice TEXT NOT NULL,
+    ipk    NOT NULL,
+    isk    NOT NULL,
+    pk     NOT NULL,
+    sk     NOT NULL,
+    PRIMARY KEY (tabla, indice, ipk, isk, pk, sk)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS indices_por_item ON indices (tabla, pk, sk);
+"""
+
+
+class MotorSQLite(MotorLocal):
+
+    nombre = "sqlite"
+
+    def __init__(self, ruta: str):
+        super().__init__()
+        self.ruta = ruta
+        self._local = threading.local()
+        self._conexiones = []
+        # Un worker creado con fork no puede usar las conexiones del padre
+        os.register_at_fork(after_in_child=self._olvidar_conexiones)
+        # executescript hace su propio COMMIT: va fuera de _operacion
+        with self._lock:
+            self._conexion().executescript(ESQUEMA_SQL)
+
+    # ------------------------------
+    # Conexiones y transacciones
+    # ------------------------------
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, isolation_level=None, check_same_thread=False)
+            conexion.execute(f"PRAGMA busy_timeout = {ESPERA_BLOQUEO_MS}")
+            conexion.execute("PRAGMA journal_mode = WAL")
+            conexion.execute("PRAGMA synchronous = NORMAL")
+            self._local.conexion = conexion
+            self._conexiones.append(conexion)
+        return conexion
+
+    @contextlib.contextmanager
+    def _operacion(self, escritura: bool = False):
+        if not escritura:
+            # Una lectura es una sola consulta: WAL le da una foto consistente
+            yield
+            return
+
+        with self._lock:
+            conexion = self._conexion()
+            if conexion.in_transaction:
+                # Escritura anidada (p. ej. crear_tabla dentro de otra operación)
+                yield
+                return
+
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+            conexion.execute("COMMIT")
+
+    def _olvidar_conexiones(self):
+        self._lock = threading.RLock()
+        self._conexiones = []
+        self._local = threading.local()
+
+    def cerrar(self):
+        for conexion in self._conexiones:
+            conexion.close()
+        self._olvidar_conexiones()
+
+    # ------------------------------
+    # Esquemas
+    # ------------------------------
+    def _cargar_esquemas(self) -> dict:
+        filas = self._conexion().execute("SELECT nombre, esquema FROM tablas")
+        return {nombre: json.loads(esquema) for nombre, esquema in filas}
+
+    def _guardar_esquema(self, tabla: str, descripcion: dict):
+        self._conexion().execute(
+            "INSERT OR REPLACE INTO tablas (nombre, esquema) VALUES (?, ?)",
+            (tabla, json.dumps(descripcion)),
+        )
+
+    def _quitar_tabla(self, tabla: str):
+        conexion = self._conexion()
+        for sql in ("DELETE FROM indices WHERE tabla = ?", "DELETE FROM items WHERE tabla = ?",
+                    "DELETE FROM tablas WHERE nombre = ?"):
+            conexion.execute(sql, (tabla,))
+
+    # ------------------------------
+    # Lectura
+    # ------------------------------
+    def _leer(self, tabla: str, pk, sk):
+        fila = self._conexion().execute(
+            "SELECT datos FROM items WHERE tabla = ? AND pk = ? AND sk = ?", (tabla, pk, sk),
+        ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def _particion(self, tabla, indice, ipk, inferior, incluye_inferior, superior, incluye_superior, adelante, desde):
+        orden = "" if adelante else " DESC"
+
+        if indice is None:
+            sql = "SELECT sk, datos FROM items WHERE tabla = ? AND pk = ?"
+            parametros = [tabla, ipk]
+            rango, posicion = "sk", "sk"
+            orden_sql = f" ORDER BY sk{orden}"
+        else:
+            sql = (
+                "SELECT i.isk, i.pk, i.sk, it.datos FROM indices i "
+                "JOIN items it ON it.tabla = i.tabla AND it.pk = i.pk AND it.sk = i.sk "
+                "WHERE i.tabla = ? AND i.indice = ? AND i.ipk = ?"
+            )
+            parametros = [tabla, indice, ipk]
+            rango, posicion = "i.isk", "(i.isk, i.pk, i.sk)"
+            orden_sql = f" ORDER BY i.isk{orden}, i.pk{orden}, i.sk{orden}"
+
+        if inferior is not None:
+            sql += f" AND {rango} {'>=' if incluye_inferior else '>'} ?"
+            parametros.append(inferior)
+        if superior is not None:
+            sql += f" AND {rango} {'<=' if incluye_superior else '<'} ?"
+            parametros.append(superior)
+        if desde is not None:
+            marcas = ", ".join("?" * len(desde))
+            sql += f" AND {posicion} {'>' if adelante else '<'} ({marcas})"
+            parametros.extend(desde)
+
+        cursor = self._conexion().execute(sql + orden_sql, parametros)
+        try:
+            for fila in cursor:
+                yield tuple(fila[:-1]), json.loads(fila[-1])
+        finally:
+            cursor.close()
+
+    def _recorrer(self, tabla, desde):
+        sql = "SELECT pk, sk, datos FROM items WHERE tabla = ?"
+        parametros = [tabla]
+        if desde is not None:
+            sql += " AND (pk, sk) > (?, ?)"
+            parametros.extend(desde)
+
+        cursor = self._conexion().execute(sql + " ORDER BY pk, sk", parametros)
+        try:
+            for pk, sk, datos in cursor:
+                yield (pk, sk), json.loads(datos)
+        finally:
+            cursor.close()
+
+    # ------------------------------
+    # Escritura
+    # ------------------------------
+    def _escribir(self, tabla: str, esquema: Esquema, cambios: list):
+        conexion = self._conexion()
+
+        for anterior, nuevo in cambios:
+            if anterior is not None:
+                pk, sk = esquema.clave(anterior)
+                conexion.execute("DELETE FROM indices WHERE tabla = ? AND pk = ? AND sk = ?", (tabla, pk, sk))
+                if nuevo is None:
+                    conexion.execute("DELETE FROM items WHERE tabla = ? AND pk = ? AND sk = ?", (tabla, pk, sk))
+
+            if nuevo is not None:
+                pk, sk = esquema.clave(nuevo)
+                conexion.execute(
+                    "INSERT OR REPLACE INTO items (tabla, pk, sk, datos) VALUES (?, ?, ?, ?)",
+                    (tabla, pk, sk, json.dumps(nuevo, separators=(",", ":"))),
+                )
+                conexion.executemany(
+                    "INSERT INTO indices (tabla, indice, ipk, isk, pk, sk) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(tabla, indice, ipk, isk, pk, sk) for indice, (ipk, isk) in esquema.entradas(nuevo).items()],
+                )
+
+    def _agregar_indice(self, tabla: str, esquema: Esquema, indice: str):
+        conexion = self._conexion()
+        filas = []
+        for (datos,) in conexion.execute("SELECT datos FROM items WHERE tabla = ?", (tabla,)).fetchall():
+            item = json.loads(datos)
+            posicion = esquema.entradas(item).get(indice)
+            if posicion is not None:
+                filas.append((tabla, indice, posicion[0], posicion[1], *esquema.clave(item)))
+        conexion.executemany(
+            "INSERT INTO indices (tabla, indice, ipk, isk, pk, sk) VALUES (?, ?, ?, ?, ?, ?)", filas,
+        )
+
+    def _quitar_indice(self, tabla: str, indice: str):
+        self._conexion().execute("DELETE FROM indices WHERE tabla = ? AND indice = ?", (tabla, indice))
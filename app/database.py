@@ -1,4 +1,7 @@
 import os
+import threading
+import time
+
 import boto3
 from botocore.config import Config
 from botocore.exceptions import (
@@ -6,50 +9,303 @@ from botocore.exceptions import (
     EndpointConnectionError,
     ReadTimeoutError,
     ConnectTimeoutError,
+    ConnectionClosedError,
 )
 
+from almacenamiento import protocolo
+from almacenamiento.motores import crear_motor, MOTORES, MOTORES_LOCALES
+
+# Tabla única del modelo (single-table design)
+TABLE_NAME = os.getenv("DYNAMODB_TABLE", "api_data_nube")
+
+# --------------------------------------------------
+# Motor de almacenamiento (almacenamiento/)
+#
+# dynamodb (por defecto): AWS o DynamoDB Local por HTTP.
+# memoria / sqlite: el propio proceso atiende las llamadas de boto3 con
+# un motor local, sin red ni Docker. La tabla y sus índices se crean al
+# crear el primer cliente.
+# --------------------------------------------------
+ALMACENAMIENTO = os.getenv("ALMACENAMIENTO", "dynamodb").lower()
+ALMACENAMIENTO_SQLITE = os.getenv("ALMACENAMIENTO_SQLITE", "almacenamiento.db")
+
+if ALMACENAMIENTO not in MOTORES:
+    raise ValueError(f"ALMACENAMIENTO debe ser uno de: {', '.join(MOTORES)}")
+
 def is_aws():
     return os.getenv("AWS_EXECUTION_ENV") is not None
 
-def get_dynamodb_client():
-    config = Config(
-        connect_timeout=1,
-        read_timeout=1,
-        retries={"max_attempts": 1}
+# --------------------------------------------------
+# Resiliencia
+#
+# - Un perfil de tiempos por tipo de operación: lecturas (GetItem, Query,
+#   Scan), escrituras (Put/Update/Transact) y control (health, crear tabla).
+# - Reintentos en modo "adaptive" de botocore: espera exponencial con
+#   jitter ante ProvisionedThroughputExceeded/Throttling y un limitador
+#   de tasa del lado del cliente que baja el ritmo cuando hay throttling.
+# - Un circuito compartido por todos los clientes: tras varias fallas
+#   seguidas (timeouts, conexión, 5xx o throttling que agotó los
+#   reintentos) se abre y las llamadas fallan al instante con
+#   DynamoDBNoDisponible (503) hasta que una llamada de prueba salga bien.
+# --------------------------------------------------
+
+PERFILES = {
+    "lectura": {
+        "connect_timeout": float(os.getenv("DYNAMODB_TIMEOUT_CONEXION", "1")),
+        "read_timeout": float(os.getenv("DYNAMODB_TIMEOUT_LECTURA", "2")),
+        "max_attempts": int(os.getenv("DYNAMODB_INTENTOS_LECTURA", "3")),
+    },
+    "escritura": {
+        "connect_timeout": float(os.getenv("DYNAMODB_TIMEOUT_CONEXION", "1")),
+        "read_timeout": float(os.getenv("DYNAMODB_TIMEOUT_ESCRITURA", "3")),
+        "max_attempts": int(os.getenv("DYNAMODB_INTENTOS_ESCRITURA", "5")),
+    },
+    "control": {
+        "connect_timeout": 1,
+        "read_timeout": 1,
+        "max_attempts": 1,
+    },
+}
+
+ERRORES_DE_CAPACIDAD = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+
+ERRORES_DE_RED = (EndpointConnectionError, ReadTimeoutError, ConnectTimeoutError, ConnectionClosedError)
+
+# Conexiones HTTP por cliente: deben alcanzar para los hilos del threadpool
+# de FastAPI (40) más los de lotes y cascadas; con menos, urllib3 descarta
+# conexiones y cada petición extra paga un handshake nuevo
+DYNAMODB_MAX_CONEXIONES = int(os.getenv("DYNAMODB_MAX_CONEXIONES", "50"))
+
+CIRCUITO_FALLAS = int(os.getenv("CIRCUITO_FALLAS", "5"))
+CIRCUITO_ESPERA = float(os.getenv("CIRCUITO_ESPERA", "10"))
+
+
+class DynamoDBNoDisponible(Exception):
+    """El circuito está abierto: no se intenta la llamada."""
+
+    def __init__(self, reintentar_en: float):
+        super().__init__("DynamoDB no está disponible por el momento.")
+        self.reintentar_en = reintentar_en
+
+
+class Circuito:
+    """
+    cerrado -> abierto:     CIRCUITO_FALLAS fallas seguidas.
+    abierto -> semiabierto: pasados CIRCUITO_ESPERA segundos.
+    semiabierto:            deja pasar una sola llamada de prueba;
+                            si sale bien se cierra, si falla se vuelve a abrir.
+
+    Solo la prueba decide si se cierra: las llamadas que ya estaban en
+    curso cuando se abrió no lo cierran al terminar bien, ni alargan la
+    espera si fallan. Los errores que no son de red (validación, datos
+    mal armados) no cuentan como éxito ni como falla.
+    """
+
+    def __init__(self, fallas: int = CIRCUITO_FALLAS, espera: float = CIRCUITO_ESPERA):
+        self.fallas_maximas = fallas
+        self.espera = espera
+        self._lock = threading.Lock()
+        self._hilo = threading.local()   # es_prueba: la llamada de este hilo es la de prueba
+        self.estado = "cerrado"
+        self.fallas_seguidas = 0
+        self.abierto_desde = None
+        self.prueba_en_curso = False
+        self.metricas = {"llamadas": 0, "fallas": 0, "reintentos": 0, "rechazadas": 0, "aperturas": 0}
+        self.ultimo_error = None
+
+    # ------------------------------
+    # Eventos de botocore
+    # (before-call y after-call de una llamada corren en el mismo hilo)
+    # ------------------------------
+    def antes(self, **kwargs):
+        self._hilo.es_prueba = False
+        with self._lock:
+            if self.estado == "abierto":
+                restante = self.abierto_desde + self.espera - time.monotonic()
+                if restante > 0:
+                    self.metricas["rechazadas"] += 1
+                    raise DynamoDBNoDisponible(restante)
+                self.estado = "semiabierto"
+
+            if self.estado == "semiabierto":
+                if self.prueba_en_curso:
+                    self.metricas["rechazadas"] += 1
+                    raise DynamoDBNoDisponible(1.0)
+                self.prueba_en_curso = True
+                self._hilo.es_prueba = True
+
+            self.metricas["llamadas"] += 1
+
+    def despues(self, http_response, parsed, **kwargs):
+        with self._lock:
+            self.metricas["reintentos"] += parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+        codigo = parsed.get("Error", {}).get("Code")
+        if http_response.status_code >= 500 or codigo in ERRORES_DE_CAPACIDAD:
+            self._falla(codigo or f"HTTP {http_response.status_code}")
+        else:
+            self._exito()
+
+    def despues_error(self, exception, **kwargs):
+        if isinstance(exception, ERRORES_DE_RED):
+            self._falla(type(exception).__name__)
+        else:
+            self._sin_resultado()
+
+    # ------------------------------
+    # Transiciones
+    # ------------------------------
+    def _fue_prueba(self) -> bool:
+        es_prueba = getattr(self._hilo, "es_prueba", False)
+        self._hilo.es_prueba = False
+        return es_prueba
+
+    def _exito(self):
+        es_prueba = self._fue_prueba()
+        with self._lock:
+            if es_prueba:
+                self.prueba_en_curso = False
+                self.estado = "cerrado"
+                self.fallas_seguidas = 0
+            elif self.estado == "cerrado":
+                self.fallas_seguidas = 0
+
+    def _falla(self, motivo: str):
+        es_prueba = self._fue_prueba()
+        with self._lock:
+            self.metricas["fallas"] += 1
+            self.ultimo_error = motivo
+
+            if es_prueba:
+                self.prueba_en_curso = False
+                self.metricas["aperturas"] += 1
+                self._abrir()
+            elif self.estado == "cerrado":
+                self.fallas_seguidas += 1
+                if self.fallas_seguidas >= self.fallas_maximas:
+                    self.metricas["aperturas"] += 1
+                    self._abrir()
+
+    def _sin_resultado(self):
+        # Una prueba que no dijo nada libera el lugar para la siguiente
+        if self._fue_prueba():
+            with self._lock:
+                self.prueba_en_curso = False
+
+    def _abrir(self):
+        self.estado = "abierto"
+        self.abierto_desde = time.monotonic()
+
+    def instalar(self, client):
+        eventos = client.meta.events
+        eventos.register("before-call.dynamodb", self.antes)
+        eventos.register("after-call.dynamodb", self.despues)
+        eventos.register("after-call-error.dynamodb", self.despues_error)
+        return client
+
+    def estado_actual(self) -> dict:
+        with self._lock:
+            return {
+                "estado": self.estado,
+                "fallas_seguidas": self.fallas_seguidas,
+                "ultimo_error": self.ultimo_error,
+                **self.metricas,
+            }
+
+
+circuito = Circuito()
+
+
+def _config(perfil: str) -> Config:
+    tiempos = PERFILES[perfil]
+    return Config(
+        connect_timeout=tiempos["connect_timeout"],
+        read_timeout=tiempos["read_timeout"],
+        max_pool_connections=DYNAMODB_MAX_CONEXIONES,
+        retries={"mode": "adaptive", "max_attempts": tiempos["max_attempts"]},
     )
 
+
+def es_almacenamiento_local() -> bool:
+    return ALMACENAMIENTO in MOTORES_LOCALES
+
+
+def _conexion() -> dict:
+    if es_almacenamiento_local():
+        # Nunca se conecta: protocolo.py responde antes de enviar
+        return {
+            "region_name": "us-east-1",
+            "endpoint_url": "http://almacenamiento.local",
+            "aws_access_key_id": "dummy",
+            "aws_secret_access_key": "dummy",
+        }
+
     if is_aws():
         # AWS DynamoDB (SIN endpoint_url)
-        return boto3.client(
-            "dynamodb",
-            region_name=os.getenv("AWS_REGION", "us-east-1"),
-            config=config,
-        )
-    else:
-        # DynamoDB Local
-        return boto3.client(
-            "dynamodb",
-            region_name="us-east-1",
-            endpoint_url=os.getenv("DYNAMODB_ENDPOINT"),
-            aws_access_key_id="dummy",
-            aws_secret_access_key="dummy",
-            config=config,
-        )
+        return {"region_name": os.getenv("AWS_REGION", "us-east-1")}
+
+    # DynamoDB Local
+    return {
+        "region_name": "us-east-1",
+        "endpoint_url": os.getenv("DYNAMODB_ENDPOINT"),
+        "aws_access_key_id": "dummy",
+        "aws_secret_access_key": "dummy",
+    }
 
+# --------------------------------------------------
+# Motor local (uno por proceso)
+# --------------------------------------------------
+_motor_local = None
+_motor_local_lock = threading.Lock()
+
+
+def get_motor_local():
+    global _motor_local
+    with _motor_local_lock:
+        if _motor_local is None:
+            _motor_local = crear_motor(ALMACENAMIENTO, ALMACENAMIENTO_SQLITE)
+            _preparar_tabla(_motor_local)
+    return _motor_local
+
+
+def _preparar_tabla(motor):
+    from scripts.crear_tabla import crear_tabla, agregar_indices_faltantes, configurar_ttl
+
+    client = protocolo.instalar(boto3.client("dynamodb", config=_config("control"), **_conexion()), motor)
+    if not crear_tabla(TABLE_NAME, client):
+        agregar_indices_faltantes(TABLE_NAME, client)
+    configurar_ttl(TABLE_NAME, client)
+
+
+def _instalar(client):
+    circuito.instalar(client)
+    if es_almacenamiento_local():
+        protocolo.instalar(client, get_motor_local())
+    return client
+
+# --------------------------------------------------
+# Clientes
+# --------------------------------------------------
+
+# Health check y administración de la tabla
+def get_dynamodb_client():
+    return _instalar(boto3.client("dynamodb", config=_config("control"), **_conexion()))
+
+# Recurso para escrituras (routers, transacciones, scripts)
 def get_dynamodb_resource():
-    if is_aws():
-        return boto3.resource(
-            "dynamodb",
-            region_name=os.getenv("AWS_REGION", "us-east-1"),
-        )
-    else:
-        return boto3.resource(
-            "dynamodb",
-            region_name="us-east-1",
-            endpoint_url=os.getenv("DYNAMODB_ENDPOINT"),
-            aws_access_key_id="dummy",
-            aws_secret_access_key="dummy",
-        )
+    recurso = boto3.resource("dynamodb", config=_config("escritura"), **_conexion())
+    _instalar(recurso.meta.client)
+    return recurso
+
+# Cliente de bajo nivel para lecturas.
+# No se usa resource.meta.client porque el recurso registra
+# transformaciones que volverían a serializar los parámetros.
+def get_dynamodb_data_client():
+    return _instalar(boto3.client("dynamodb", config=_config("lectura"), **_conexion()))
 
 def check_dynamodb_connection():
     try:
@@ -58,10 +314,14 @@ def check_dynamodb_connection():
 
         return {
             "ok": True,
-            "env": "aws" if is_aws() else "local"
+            "env": "aws" if is_aws() and not es_almacenamiento_local() else "local",
+            "almacenamiento": ALMACENAMIENTO,
         }
 
-    except (EndpointConnectionError, ReadTimeoutError, ConnectTimeoutError) as e:
+    except DynamoDBNoDisponible:
+        return {"ok": False, "error": "circuito_abierto", "details": circuito.estado_actual()}
+
+    except ERRORES_DE_RED as e:
         return {"ok": False, "error": "timeout/conexion", "details": str(e)}
 
     except ClientError as e:
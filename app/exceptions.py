@@ -1,6 +1,9 @@
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
+from botocore.exceptions import ClientError
+
+from database import DynamoDBNoDisponible, ERRORES_DE_CAPACIDAD
 
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -41,4 +44,33 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "message": "Error en los datos enviados.",
             "details": errores
         },
-    )
\ No newline at end of file
+    )
+
+# --------------------------------------------------
+# DynamoDB degradado: 503 con Retry-After en lugar de 500
+# --------------------------------------------------
+def _no_disponible(reintentar_en: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(max(1, round(reintentar_en)))},
+        content={
+            "success": False,
+            "error_code": "DYNAMODB_NO_DISPONIBLE",
+            "message": "El servicio de datos no está disponible por el momento, intentar de nuevo.",
+        },
+    )
+
+
+async def dynamodb_no_disponible_handler(request: Request, exc: DynamoDBNoDisponible):
+    return _no_disponible(exc.reintentar_en)
+
+
+async def dynamodb_red_handler(request: Request, exc: Exception):
+    return _no_disponible(1)
+
+
+async def dynamodb_client_error_handler(request: Request, exc: ClientError):
+    # Throttling que agotó los reintentos; cualquier otro error sigue siendo un 500
+    if exc.response.get("Error", {}).get("Code") in ERRORES_DE_CAPACIDAD:
+        return _no_disponible(1)
+    raise exc
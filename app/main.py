@@ -1,16 +1,71 @@
+import logging
+import os
+import threading
+
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
-from exceptions import validation_exception_handler
-from database import check_dynamodb_connection
+from botocore.exceptions import ClientError
+from exceptions import (
+    validation_exception_handler,
+    dynamodb_no_disponible_handler,
+    dynamodb_red_handler,
+    dynamodb_client_error_handler,
+)
+from database import check_dynamodb_connection, circuito, DynamoDBNoDisponible, ERRORES_DE_RED
 from routers.instituciones import router as instituciones_router
 from routers.tramites import router as tramites_router
 from routers.proyectos import router as proyectos_router
 from routers.programas import router as programas_router
+from routers.autocompletado import router as autocompletado_router
+from routers.cambios import router as cambios_router
+from routers.requisitos import router as requisitos_router
+from routers.perfilado import router as perfilado_router
+from utils.perfilado import PerfiladoMiddleware, perfilado_habilitado, etiquetar_handlers
+from utils.compresion import CompresionMiddleware, asegurar_base64
+from utils.busqueda import indice_tramites
+from utils.autocompletado import indice_nombres
+from utils.vigencia_indices import vigencia_indices
+from utils.catalogo import catalogo
+from utils.requisitos import cache as requisitos
+from utils.coalescencia import coalescedor
+from utils.escritura_lotes import escritor
+from utils.idempotencia import IdempotenciaMiddleware
+from utils.admision import AdmisionMiddleware, control as admision
 from mangum import Mangum
 
 app = FastAPI()
 
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
+app.add_exception_handler(DynamoDBNoDisponible, dynamodb_no_disponible_handler)
+app.add_exception_handler(ClientError, dynamodb_client_error_handler)
+for error_de_red in ERRORES_DE_RED:
+    app.add_exception_handler(error_de_red, dynamodb_red_handler)
+
+# Índices en memoria (búsqueda y autocompletado): se construyen al
+# arrancar en un hilo aparte, uno después del otro, así el arranque y las
+# primeras peticiones no esperan (una consulta a un índice que todavía se
+# construye sí espera a que termine).
+#
+# Costo por proceso: dos scans completos de la tabla (el filtro no reduce
+# lo que DynamoDB cobra), del orden de tamaño de la tabla / 4 KB * 0.5 RCU
+# cada uno, que se multiplica por cada worker y cada Lambda nueva.
+# BUSQUEDA_SNAPSHOT evita el de la búsqueda y BUSQUEDA_PRECARGA=false
+# difiere ambos a la primera consulta de cada índice. Después se mantienen
+# con el índice de cambios (utils/vigencia_indices.py), sin más scans.
+BUSQUEDA_PRECARGA = os.getenv("BUSQUEDA_PRECARGA", "true").lower() == "true"
+
+def _construir_indices():
+    for indice in (indice_tramites, indice_nombres):
+        try:
+            indice.asegurar()
+        except Exception:
+            # Se reintenta en la primera consulta a ese índice
+            logging.getLogger(__name__).exception("No se pudo precargar un índice en memoria")
+
+@app.on_event("startup")
+def precargar_indices():
+    if BUSQUEDA_PRECARGA:
+        threading.Thread(target=_construir_indices, daemon=True).start()
 
 @app.get("/")
 def root():
@@ -20,10 +75,54 @@ def root():
 def health():
     return {
         "fastapi": "ok",
-        "dynamodb": check_dynamodb_connection()
+        "dynamodb": check_dynamodb_connection(),
+        "busqueda": indice_tramites.estado(),
+        "autocompletado": indice_nombres.estado(),
+        "vigencia_indices": vigencia_indices.estado(),
+        "catalogo": catalogo.estado(),
+        "circuito": circuito.estado_actual(),
+    }
+
+# Lecturas idénticas que compartieron una llamada a DynamoDB,
+# estado del circuito (llamadas, reintentos, rechazos), creates agrupados
+# control de admisión (en curso, esperas y rechazos por clase) y caché
+# del catálogo de requisitos
+@app.get("/metricas")
+def metricas():
+    return {
+        "coalescencia": coalescedor.metricas(),
+        "circuito": circuito.estado_actual(),
+        "escritura_lotes": escritor.estado(),
+        "admision": admision.estado(),
+        "requisitos": requisitos.estado(),
     }
+
 app.include_router(instituciones_router)
 app.include_router(tramites_router)
 app.include_router(proyectos_router)
 app.include_router(programas_router)
-handler = Mangum(app)
\ No newline at end of file
+app.include_router(autocompletado_router)
+app.include_router(cambios_router)
+app.include_router(requisitos_router)
+
+# Perfilado bajo demanda: solo se registra si PERFILADO_TOKEN está definido
+if perfilado_habilitado():
+    app.add_middleware(PerfiladoMiddleware)
+    app.include_router(perfilado_router)
+    # Después de registrar todas las rutas
+    etiquetar_handlers(app)
+
+# Idempotency-Key en los POST de creación (dentro de la compresión:
+# se guarda y se repite la respuesta sin comprimir)
+app.add_middleware(IdempotenciaMiddleware)
+
+app.add_middleware(CompresionMiddleware)
+
+# Control de admisión: el más externo, rechaza antes de leer el cuerpo
+app.add_middleware(AdmisionMiddleware)
+
+mangum_handler = Mangum(app)
+
+# Punto de entrada de Lambda: las respuestas comprimidas viajan en base64
+def handler(event, context):
+    return asegurar_base64(mangum_handler(event, context))
\ No newline at end of file
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Literal
+
+TipoSugerencia = Literal["institucion", "tramite", "proyecto", "programa"]
+
+
+# Modelo de RESPUESTA del autocompletado
+class SugerenciaItem(BaseModel):
+    tipo: TipoSugerencia
+    id: str
+    nombre: str
+    habil: bool
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Literal
+
+TipoCambio = Literal["INSTITUCION", "TRAMITE", "PROYECTO", "PROGRAMA", "REQUISITO"]
+
+
+# Un registro cambiado: `datos` es el registro completo en su estado actual
+class CambioItem(BaseModel):
+    tipo: TipoCambio
+    id: str
+    fecha_actualizacion: str
+    datos: Dict[str, Any]
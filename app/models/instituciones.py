@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional
+from typing import List, Optional
 
 # Modelo para CREAR una institución
 # Define qué campos puede enviar el cliente
@@ -58,9 +58,63 @@ class InstitucionResponse(BaseModel):
     fecha_creacion: str
     fecha_actualizacion: str
 
+    # Contadores de registros hijos (se mantienen en cada escritura)
+    total_tramites: int = 0
+    tramites_activos: int = 0
+    total_proyectos: int = 0
+    proyectos_activos: int = 0
+    total_programas: int = 0
+    programas_activos: int = 0
+
+# Resumen de una institución: conteos sin recorrer la partición
+class Conteo(BaseModel):
+    total: int
+    activos: int
+
+class InstitucionResumen(BaseModel):
+    id_institucion: str
+    nombre: str
+    habil: bool
+    tramites: Conteo
+    proyectos: Conteo
+    programas: Conteo
+
+# Modelo para consultas por DEPARTAMENTO / MUNICIPIO
+class InstitucionGeoItem(BaseModel):
+    id_institucion: str
+    nombre: str
+    departamento_sede: str
+    municipio_sede: str
+    habil: bool
+
+# Conteos precalculados por departamento
+class MunicipioConteo(BaseModel):
+    municipio: str
+    total: int
+
+class DepartamentoConteo(BaseModel):
+    departamento: str
+    total: int
+    municipios: List[MunicipioConteo]
+
 # Modelo para LISTADOS
 # Solo id y nombre (optimiza respuestas)
 class InstitucionListItem(BaseModel):
     id_institucion: str
     nombre: str
 
+
+# Avance de un trabajo de habilitar / deshabilitar en cascada
+class TrabajoCascada(BaseModel):
+    id_trabajo: str
+    id_institucion: str
+    habil: bool
+    estado: str
+    paginas: int
+    procesados: int
+    actualizados: int
+    sin_cambio: int
+    fallidos: int
+    ids_fallidos: List[str] = []
+    fecha_creacion: str
+    fecha_actualizacion: str
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+
+MAXIMO_IDS = 1000
+
+
+# Selección de registros para una actualización por lote:
+# ids explícitos (con id_institucion se evita buscarlos) o todos los
+# de una institución que cumplan los filtros de cada tipo
+class LoteBase(BaseModel):
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=MAXIMO_IDS)
+    id_institucion: Optional[str] = None
+
+    @model_validator(mode="after")
+    def con_seleccion(self):
+        if not self.ids and not self.id_institucion:
+            raise ValueError("Enviar ids, id_institucion o ambos.")
+        return self
+
+
+# Resultado por registro
+class ResultadoLoteItem(BaseModel):
+    id: str
+    resultado: Literal["actualizado", "no_encontrado", "fallido"]
+    detalle: Optional[str] = None
+
+
+class ResultadoLote(BaseModel):
+    actualizados: int
+    no_encontrados: int
+    fallidos: int
+    resultados: List[ResultadoLoteItem]
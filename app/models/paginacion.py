@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+# Respuesta paginada: `siguiente` se envía como ?cursor= para pedir
+# la página siguiente (None = no hay más)
+class Pagina(BaseModel, Generic[T]):
+    items: List[T]
+    siguiente: Optional[str] = None
@@ -2,6 +2,8 @@ from pydantic import BaseModel, field_validator
 from typing import Optional
 from datetime import datetime
 
+from models.lote import LoteBase
+
 
 class ProgramaBase(BaseModel):
     id_institucion: str
@@ -49,3 +51,8 @@ class ProgramaListItem(BaseModel):
     id_programa: str
     nombre: str
     habil: bool
+
+
+# Actualización por lote (PATCH /programas/lote)
+class ProgramaLote(LoteBase):
+    cambios: ProgramaUpdate
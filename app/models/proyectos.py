@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 from datetime import datetime
 
+from models.lote import LoteBase
+
 class ProyectoBase(BaseModel):
     id_institucion: str
     nombre: str
@@ -29,6 +31,13 @@ class ProyectoListItem(BaseModel):
     estado_proyecto: str
     habil: bool
 
+class ProyectoEstadoItem(BaseModel):
+    id_proyecto: str
+    id_institucion: str
+    nombre: str
+    estado_proyecto: str
+    habil: bool
+
 class ProyectoUpdate(BaseModel):
     nombre: Optional[str] = None
     descripcion: Optional[str] = None
@@ -49,3 +58,8 @@ class ProyectoResponse(ProyectoBase):
     id_proyecto: str
     fecha_creacion: str
     fecha_actualizacion: Optional[str] = None
+
+# Actualización por lote (PATCH /proyectos/lote)
+class ProyectoLote(LoteBase):
+    estado_proyecto: Optional[str] = Field(None, description="Solo proyectos en este estado")
+    cambios: ProyectoUpdate
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, field_validator
+
+
+class RequisitoUpdate(BaseModel):
+    texto: str
+
+    @field_validator("texto")
+    @classmethod
+    def no_solo_espacios(cls, value: str):
+        if not value.strip():
+            raise ValueError("No puede estar vacío o contener solo espacios.")
+
+        return value.strip()
+
+
+class RequisitoResponse(BaseModel):
+    id_requisito: str
+    texto: str
+    fecha_creacion: str
+    fecha_actualizacion: str
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 
+from models.lote import LoteBase
+
 
 # ------------------------------
 # Base
@@ -103,3 +105,21 @@ class TramiteListItem(BaseModel):
     id_tramite: str
     nombre_tramite: str
     habil: bool
+
+
+# ------------------------------
+# Búsqueda
+# ------------------------------
+class TramiteBusquedaItem(BaseModel):
+    id_tramite: str
+    id_institucion: str
+    nombre_tramite: str
+    habil: bool
+    puntaje: float
+
+# ------------------------------
+# Actualización por lote (PATCH /tramites/lote)
+# ------------------------------
+class TramiteLote(LoteBase):
+    tipo_tramite: Optional[str] = Field(None, description="Solo trámites de este tipo")
+    cambios: TramiteUpdate
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Query
+from typing import List, Optional
+
+from models.autocompletado import SugerenciaItem, TipoSugerencia
+
+from utils.autocompletado import indice_nombres
+from utils.respuestas import responder_lista
+
+router = APIRouter(
+    prefix="/autocompletar",
+    tags=["Autocompletado"]
+)
+
+# --------------------------------------------------
+# Sugerencias por prefijo de nombre
+# GET /autocompletar?prefijo=min&tipo=institucion
+# (sin tipo se buscan los cuatro)
+# --------------------------------------------------
+@router.get("", response_model=List[SugerenciaItem])
+def autocompletar(
+    prefijo: str = Query(..., min_length=1),
+    tipo: Optional[TipoSugerencia] = Query(None),
+    habil: Optional[bool] = Query(None),
+    limite: int = Query(10, ge=1, le=50),
+):
+    indice_nombres.asegurar()
+    return responder_lista(indice_nombres.sugerir(prefijo, tipo=tipo, limite=limite, habil=habil))
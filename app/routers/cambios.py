@@ -0,0 +1,154 @@
+from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime, timezone
+from typing import Optional
+
+from boto3.dynamodb.conditions import Key
+
+from models.cambios import CambioItem
+from models.instituciones import InstitucionResponse
+from models.paginacion import Pagina
+from models.programas import ProgramaResponse
+from models.proyectos import ProyectoResponse
+from models.requisitos import RequisitoResponse
+from models.tramites import TramiteResponse
+
+from utils.lectura_rapida import consultar, obtener_items
+from utils.respuestas import responder_lista, item_confiable
+from utils.paginacion import codificar_cursor, decodificar_cursor
+from utils.cambios import particion_mes, meses_desde, tipo_e_id
+
+router = APIRouter(
+    prefix="/cambios",
+    tags=["Cambios"]
+)
+
+# Meses consultados como máximo por página (acota los viajes a DynamoDB
+# cuando "desde" es antiguo y hay meses sin cambios)
+MESES_POR_PAGINA = 12
+
+# `datos` lleva los campos públicos de cada tipo, como su GET: los
+# atributos internos (índices, marcas de la cascada) no salen
+MODELOS = {
+    "INSTITUCION": InstitucionResponse,
+    "TRAMITE": TramiteResponse,
+    "PROYECTO": ProyectoResponse,
+    "PROGRAMA": ProgramaResponse,
+    "REQUISITO": RequisitoResponse,
+}
+
+
+def _normalizar_desde(desde: str) -> str:
+    """Fecha ISO 8601 -> mismo formato que fecha_actualizacion (UTC sin zona)."""
+    try:
+        fecha = datetime.fromisoformat(desde)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="El parámetro 'desde' debe ser una fecha ISO 8601.")
+
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return fecha.isoformat()
+
+
+def _mes_valido(mes: str) -> bool:
+    """True si `mes` es exactamente YYYY-MM (como lo escribe particion_mes)."""
+    if len(mes) != 7:
+        return False
+    try:
+        datetime.strptime(mes, "%Y-%m")
+    except ValueError:
+        return False
+    return True
+
+
+def _cambios(entradas: list) -> list:
+    """
+    Entradas del GSI4 (solo claves) -> cambios con el registro completo,
+    leído de la tabla en el orden del índice. Un registro que volvió a
+    cambiar después de su entrada se omite: aparece más adelante, en su
+    último cambio.
+    """
+    items = {
+        (item["PK"], item["SK"]): item
+        for item in obtener_items([{"PK": entrada["PK"], "SK": entrada["SK"]} for entrada in entradas])
+    }
+
+    cambios = []
+    for entrada in entradas:
+        item = items.get((entrada["PK"], entrada["SK"]))
+        if item is not None and item.get("GSI4SK") == entrada["GSI4SK"]:
+            cambios.append(_cambio(item))
+    return cambios
+
+
+def _cambio(item: dict) -> dict:
+    tipo, id_registro = tipo_e_id(item)
+    datos = item_confiable(item, MODELOS[tipo])
+
+    return {
+        "tipo": tipo,
+        "id": id_registro,
+        "fecha_actualizacion": item["fecha_actualizacion"],
+        "datos": datos,
+    }
+
+# --------------------------------------------------
+# Registros cambiados desde una fecha (sincronización incremental)
+# GET /cambios?desde=2025-01-31T00:00:00&limite=100&cursor=
+#
+# Devuelve instituciones, trámites, proyectos y programas en orden de
+# fecha_actualizacion (desde inclusive). Mientras `siguiente` no sea
+# null hay más páginas; al terminar, la próxima sincronización usa como
+# `desde` la mayor fecha_actualizacion recibida.
+# --------------------------------------------------
+@router.get("", response_model=Pagina[CambioItem])
+def listar_cambios(
+    desde: str = Query(..., min_length=4),
+    limite: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+):
+    desde = _normalizar_desde(desde)
+    inicio = decodificar_cursor(cursor)
+
+    # El cursor indica el mes donde seguir y, si quedó a mitad de
+    # un mes, la última clave leída
+    mes_inicial = desde[:7]
+    if inicio is not None:
+        if not inicio.get("GSI4PK", "").startswith("CAMBIOS#"):
+            raise HTTPException(status_code=400, detail="El cursor no es válido.")
+        mes_inicial = inicio["GSI4PK"][len("CAMBIOS#"):]
+        if not _mes_valido(mes_inicial):
+            raise HTTPException(status_code=400, detail="El cursor no es válido.")
+        if "GSI4SK" not in inicio:
+            inicio = None
+
+    meses = list(meses_desde(mes_inicial, datetime.utcnow()))
+    entradas = []
+    siguiente = None
+
+    for posicion, mes in enumerate(meses):
+        if posicion == MESES_POR_PAGINA:
+            siguiente = {"GSI4PK": particion_mes(mes)}
+            break
+
+        response = consultar(
+            Key("GSI4PK").eq(particion_mes(mes)) & Key("GSI4SK").gte(desde),
+            indice="GSI4",
+            proyeccion=["PK", "SK", "GSI4SK"],
+            limite=limite - len(entradas),
+            inicio=inicio,
+        )
+        inicio = None
+
+        entradas.extend(response.get("Items", []))
+
+        if "LastEvaluatedKey" in response:
+            siguiente = response["LastEvaluatedKey"]
+            break
+
+        if len(entradas) >= limite:
+            if posicion + 1 < len(meses):
+                siguiente = {"GSI4PK": particion_mes(meses[posicion + 1])}
+            break
+
+    return responder_lista({"items": _cambios(entradas), "siguiente": codificar_cursor(siguiente)})
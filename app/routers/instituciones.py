@@ -2,27 +2,44 @@ from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime
 from typing import List, Optional
 
-from database import get_dynamodb_resource
-
 from models.instituciones import (
     InstitucionCreate,
     InstitucionUpdate,
     InstitucionResponse,
     InstitucionListItem,
+    InstitucionGeoItem,
+    DepartamentoConteo,
+    InstitucionResumen,
+    TrabajoCascada,
 )
+from models.paginacion import Pagina
 
 from utils.id_generator import generate_id
-from boto3.dynamodb.conditions import Key
+from utils.lectura_rapida import obtener_item, consultar
+from utils.respuestas import responder_item, responder_lista
+from utils.autocompletado import indice_nombres
+from utils.paginacion import pagina, decodificar_cursor
+from utils.cambios import claves_gsi4
+from utils.entidades import escribir_cambios, NO_HAY_CAMBIOS
+from utils.contadores import CONTADORES, CONTADORES_INICIALES
+from utils.catalogo import catalogo
+from utils import cascada
+from utils.transacciones import escribir, poner, actualizar, TransaccionCancelada
+from utils.geografia import (
+    CONTADORES_PK,
+    claves_gsi2,
+    clave_lugar,
+    prefijo_municipio,
+    ajustes_contadores,
+    agrupar_contadores,
+)
+from boto3.dynamodb.conditions import Key, Attr
 
 router = APIRouter(
     prefix="/instituciones",
     tags=["Instituciones"]
 )
 
-dynamodb = get_dynamodb_resource()
-TABLE_NAME = "api_data_nube"
-table = dynamodb.Table(TABLE_NAME)
-
 # --------------------------------------------------
 # Crear institución
 # --------------------------------------------------
@@ -40,6 +57,12 @@ def crear_institucion(data: InstitucionCreate):
         "GSI1PK": "INSTITUCIONES",
         "GSI1SK": f"INSTITUCION#{id_institucion}",
 
+        # GSI para consultas por departamento / municipio
+        **claves_gsi2(data.departamento_sede, data.municipio_sede, id_institucion),
+
+        # GSI de cambios (sincronización incremental)
+        **claves_gsi4("INSTITUCION", id_institucion, now),
+
         # Datos
         "id_institucion": id_institucion,
         **data.model_dump(),
@@ -47,39 +70,149 @@ def crear_institucion(data: InstitucionCreate):
         "habil": True,
         "fecha_creacion": now,
         "fecha_actualizacion": now,
+
+        # Contadores de trámites, proyectos y programas
+        **CONTADORES_INICIALES,
     }
 
-    table.put_item(Item=item)
+    # La institución y sus conteos por departamento/municipio van juntos
+    escribir([
+        poner(item, condicion="attribute_not_exists(PK)"),
+        *ajustes_contadores([(data.departamento_sede, data.municipio_sede, 1)]),
+    ])
+    indice_nombres.indexar("institucion", item)
     return item
 
+# --------------------------------------------------
+# Conteo de instituciones por departamento y municipio
+# GET /instituciones/departamentos
+# (rutas fijas declaradas antes de /{id_institucion})
+# --------------------------------------------------
+@router.get("/departamentos", response_model=List[DepartamentoConteo])
+def contar_por_departamento():
+    response = consultar(Key("PK").eq(CONTADORES_PK))
+    return responder_lista(agrupar_contadores(response.get("Items", [])))
+
+# --------------------------------------------------
+# Instituciones de un departamento (opcional: de un municipio)
+# GET /instituciones/departamentos/{departamento}?municipio=&cursor=
+# --------------------------------------------------
+@router.get("/departamentos/{departamento}", response_model=Pagina[InstitucionGeoItem])
+def listar_por_departamento(
+    departamento: str,
+    municipio: Optional[str] = Query(None, min_length=1),
+    habil: Optional[bool] = Query(None),
+    limite: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+):
+    condicion = Key("GSI2PK").eq(f"DEPARTAMENTO#{clave_lugar(departamento)}")
+    if municipio is not None:
+        condicion = condicion & Key("GSI2SK").begins_with(prefijo_municipio(municipio))
+
+    response = consultar(
+        condicion,
+        indice="GSI2",
+        proyeccion=["id_institucion", "nombre", "departamento_sede", "municipio_sede", "habil"],
+        filtro=Attr("habil").eq(habil) if habil is not None else None,
+        limite=limite,
+        inicio=decodificar_cursor(cursor),
+    )
+
+    return responder_lista(pagina(response, response.get("Items", [])))
+
 # --------------------------------------------------
 # Obtener institución por ID
 # --------------------------------------------------
 @router.get("/{id_institucion}", response_model=InstitucionResponse)
 def obtener_institucion(id_institucion: str):
-    response = table.get_item(
-        Key={
+    # Snapshot del catálogo, si está configurado y vigente para este id
+    item = catalogo.institucion(id_institucion)
+
+    if item is None:
+        item = obtener_item(
+            {
+                "PK": f"INSTITUCION#{id_institucion}",
+                "SK": "METADATA",
+            }
+        )
+
+    if item is None:
+        raise HTTPException(status_code=404, detail="Institución no encontrada, verificar id_institucion ingresado")
+
+    return responder_item(item, InstitucionResponse)
+
+# --------------------------------------------------
+# Resumen de una institución (conteos precalculados)
+# GET /instituciones/{id_institucion}/resumen
+# --------------------------------------------------
+@router.get("/{id_institucion}/resumen", response_model=InstitucionResumen)
+def resumen_institucion(id_institucion: str):
+    item = obtener_item(
+        {
             "PK": f"INSTITUCION#{id_institucion}",
             "SK": "METADATA",
-        }
+        },
+        proyeccion=["id_institucion", "nombre", "habil", *CONTADORES_INICIALES],
     )
 
-    if "Item" not in response:
+    if item is None:
         raise HTTPException(status_code=404, detail="Institución no encontrada, verificar id_institucion ingresado")
 
-    return response["Item"]
+    resumen = {
+        "id_institucion": item["id_institucion"],
+        "nombre": item["nombre"],
+        "habil": item["habil"],
+    }
+    for tipo, (atributo_total, atributo_activos) in CONTADORES.items():
+        resumen[f"{tipo.lower()}s"] = {
+            "total": int(item.get(atributo_total, 0)),
+            "activos": int(item.get(atributo_activos, 0)),
+        }
+
+    return responder_lista(resumen)
+
+# --------------------------------------------------
+# Avance de un trabajo en cascada
+# GET /instituciones/{id_institucion}/cascada/{id_trabajo}
+# --------------------------------------------------
+@router.get("/{id_institucion}/cascada/{id_trabajo}", response_model=TrabajoCascada)
+def obtener_trabajo_cascada(id_institucion: str, id_trabajo: str):
+    trabajo = cascada.obtener(id_institucion, id_trabajo)
+
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado, verificar id_trabajo ingresado")
+
+    return responder_item(trabajo, TrabajoCascada)
+
+# --------------------------------------------------
+# Continuar un trabajo en cascada que quedó a medias
+# POST /instituciones/{id_institucion}/cascada/{id_trabajo}/reanudar
+# --------------------------------------------------
+@router.post("/{id_institucion}/cascada/{id_trabajo}/reanudar", response_model=TrabajoCascada)
+def reanudar_trabajo_cascada(id_institucion: str, id_trabajo: str):
+    trabajo = cascada.obtener(id_institucion, id_trabajo)
+
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado, verificar id_trabajo ingresado")
+
+    # Un trabajo completado se devuelve tal cual
+    return cascada.ejecutar(trabajo)
 
 # --------------------------------------------------
 # Listar instituciones (OPTIMIZADO)
 # --------------------------------------------------
 @router.get("", response_model=List[InstitucionListItem])
 def listar_instituciones(habil: Optional[bool] = Query(None)):
-    response = table.query(
-        IndexName="GSI1",
-        KeyConditionExpression=Key("GSI1PK").eq("INSTITUCIONES")
-    )
+    items = catalogo.instituciones()
+
+    if items is None:
+        response = consultar(
+            Key("GSI1PK").eq("INSTITUCIONES"),
+            indice="GSI1",
+            proyeccion=["id_institucion", "nombre", "habil"],
+        )
+        items = response.get("Items", [])
 
-    items = response.get("Items", [])
     instituciones = []
 
     for item in items:
@@ -91,7 +224,7 @@ def listar_instituciones(habil: Optional[bool] = Query(None)):
             "nombre": item["nombre"],
         })
 
-    return instituciones
+    return responder_lista(instituciones)
 
 # --------------------------------------------------
 # Actualizar institución
@@ -99,15 +232,15 @@ def listar_instituciones(habil: Optional[bool] = Query(None)):
 @router.patch("/{id_institucion}", response_model=InstitucionResponse)
 def actualizar_institucion(id_institucion: str, data: InstitucionUpdate):
 
-    # Verificar existencia
-    institucion_response = table.get_item(
-        Key={
+    # Verificar existencia (el item completo: se necesita si cambia la sede)
+    institucion = obtener_item(
+        {
             "PK": f"INSTITUCION#{id_institucion}",
             "SK": "METADATA"
-        }
+        },
     )
 
-    if "Item" not in institucion_response:
+    if institucion is None:
         raise HTTPException(
             status_code=404,
             detail="La institución no existe."
@@ -115,97 +248,117 @@ def actualizar_institucion(id_institucion: str, data: InstitucionUpdate):
 
     now = datetime.utcnow().isoformat()
 
-    update_expression = []
-    expression_values = {}
+    cambios = data.model_dump(exclude_none=True)
+    departamento = cambios.get("departamento_sede", institucion["departamento_sede"])
+    municipio = cambios.get("municipio_sede", institucion["municipio_sede"])
 
-    for field, value in data.model_dump(exclude_none=True).items():
-        update_expression.append(f"{field} = :{field}")
-        expression_values[f":{field}"] = value
+    if cambios and (departamento, municipio) != (institucion["departamento_sede"], institucion["municipio_sede"]):
+        return _mover_institucion(institucion, cambios, departamento, municipio, now)
 
-    if not update_expression:
-        raise HTTPException(status_code=400, detail="No hay campos para actualizar o no coinciden con los existentes")
+    if not cambios:
+        raise HTTPException(status_code=400, detail=NO_HAY_CAMBIOS)
 
-    update_expression.append("fecha_actualizacion = :fecha_actualizacion")
-    expression_values[":fecha_actualizacion"] = now
-
-    response = table.update_item(
-        Key={
-            "PK": f"INSTITUCION#{id_institucion}",
-            "SK": "METADATA",
-        },
-        UpdateExpression="SET " + ", ".join(update_expression),
-        ExpressionAttributeValues=expression_values,
-        ReturnValues="ALL_NEW",
+    item = escribir_cambios(
+        {"PK": institucion["PK"], "SK": institucion["SK"]},
+        cambios,
+        "INSTITUCION",
+        id_institucion,
+        no_encontrado="La institución no existe.",
     )
 
-    return response["Attributes"]
+    indice_nombres.indexar("institucion", item)
+    return item
 
 # --------------------------------------------------
-# Habilitar institución
+# Cambio de sede: actualiza la institución, sus claves GSI2 y los
+# conteos en una transacción. La condición sobre la sede anterior
+# evita descontar dos veces si otra petición la movió primero.
 # --------------------------------------------------
-@router.patch("/{id_institucion}/habilitar")
-def habilitar_institucion(id_institucion: str):
-    now = datetime.utcnow().isoformat()
+def _mover_institucion(institucion: dict, cambios: dict, departamento: str, municipio: str, now: str):
+    id_institucion = institucion["id_institucion"]
+    nuevo = {
+        **institucion,
+        **cambios,
+        **claves_gsi2(departamento, municipio, id_institucion),
+        **claves_gsi4("INSTITUCION", id_institucion, now),
+        "fecha_actualizacion": now,
+    }
 
-    # Verificar existencia
-    institucion_response = table.get_item(
-        Key={
-            "PK": f"INSTITUCION#{id_institucion}",
-            "SK": "METADATA"
-        }
-    )
+    asignaciones = {
+        campo: nuevo[campo]
+        for campo in [*cambios, "GSI2PK", "GSI2SK", "GSI4PK", "GSI4SK", "fecha_actualizacion"]
+    }
 
-    if "Item" not in institucion_response:
+    try:
+        escribir([
+            actualizar(
+                {"PK": institucion["PK"], "SK": institucion["SK"]},
+                "SET " + ", ".join(f"{campo} = :{campo}" for campo in asignaciones),
+                {
+                    **{f":{campo}": valor for campo, valor in asignaciones.items()},
+                    ":departamento_anterior": institucion["departamento_sede"],
+                    ":municipio_anterior": institucion["municipio_sede"],
+                },
+                condicion="departamento_sede = :departamento_anterior AND municipio_sede = :municipio_anterior",
+            ),
+            *ajustes_contadores([
+                (institucion["departamento_sede"], institucion["municipio_sede"], -1),
+                (departamento, municipio, 1),
+            ]),
+        ])
+    except TransaccionCancelada:
         raise HTTPException(
-            status_code=404,
-            detail="La institución no existe."
+            status_code=409,
+            detail="La institución fue modificada por otra petición, intentar de nuevo."
         )
 
-    table.update_item(
-        Key={
-            "PK": f"INSTITUCION#{id_institucion}",
-            "SK": "METADATA",
-        },
-        UpdateExpression="SET habil = :habil, fecha_actualizacion = :fecha",
-        ExpressionAttributeValues={
-            ":habil": True,
-            ":fecha": now,
-        },
+    indice_nombres.indexar("institucion", nuevo)
+    return nuevo
+
+# --------------------------------------------------
+# Habilitar institución
+# ?cascada=true también habilita sus trámites, proyectos y programas
+# --------------------------------------------------
+@router.patch("/{id_institucion}/habilitar")
+def habilitar_institucion(id_institucion: str, cascada_hijos: bool = Query(False, alias="cascada")):
+    # La condición de la escritura verifica que exista (sin leer antes)
+    escribir_cambios(
+        {"PK": f"INSTITUCION#{id_institucion}", "SK": "METADATA"},
+        {"habil": True},
+        "INSTITUCION",
+        id_institucion,
+        no_encontrado="La institución no existe.",
     )
 
+    indice_nombres.actualizar_habil("institucion", id_institucion, True)
+
+    if cascada_hijos:
+        return {
+            "message": "Institución activada correctamente",
+            "cascada": TrabajoCascada(**cascada.iniciar(id_institucion, True)),
+        }
     return {"message": "Institución activada correctamente"}
 
 # --------------------------------------------------
 # Eliminar institución (lógico)
+# ?cascada=true también deshabilita sus trámites, proyectos y programas
 # --------------------------------------------------
 @router.delete("/{id_institucion}")
-def eliminar_institucion(id_institucion: str):
-    now = datetime.utcnow().isoformat()
-
-    # Verificar existencia
-    institucion_response = table.get_item(
-        Key={
-            "PK": f"INSTITUCION#{id_institucion}",
-            "SK": "METADATA"
-        }
+def eliminar_institucion(id_institucion: str, cascada_hijos: bool = Query(False, alias="cascada")):
+    # La condición de la escritura verifica que exista (sin leer antes)
+    escribir_cambios(
+        {"PK": f"INSTITUCION#{id_institucion}", "SK": "METADATA"},
+        {"habil": False},
+        "INSTITUCION",
+        id_institucion,
+        no_encontrado="La institución no existe.",
     )
 
-    if "Item" not in institucion_response:
-        raise HTTPException(
-            status_code=404,
-            detail="La institución no existe."
-        )
-
-    table.update_item(
-        Key={
-            "PK": f"INSTITUCION#{id_institucion}",
-            "SK": "METADATA",
-        },
-        UpdateExpression="SET habil = :habil, fecha_actualizacion = :fecha",
-        ExpressionAttributeValues={
-            ":habil": False,
-            ":fecha": now,
-        },
-    )
+    indice_nombres.actualizar_habil("institucion", id_institucion, False)
 
+    if cascada_hijos:
+        return {
+            "message": "Institución desactivada correctamente",
+            "cascada": TrabajoCascada(**cascada.iniciar(id_institucion, False)),
+        }
     return {"message": "Institución desactivada correctamente"}
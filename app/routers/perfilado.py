@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from utils.perfilado import (
+    token_valido,
+    perfiles_cpu,
+    diferencias_memoria,
+    buscar_perfil_cpu,
+    perfiles_cpu_en_disco,
+    iniciar_ventana_memoria,
+    estado_ventana_memoria,
+)
+
+
+def verificar_token(x_perfilado: Optional[str] = Header(None)):
+    if not token_valido(x_perfilado):
+        raise HTTPException(status_code=403, detail="Token de perfilado inválido.")
+
+
+router = APIRouter(
+    prefix="/admin/perfilado",
+    tags=["Perfilado"],
+    dependencies=[Depends(verificar_token)],
+)
+
+# --------------------------------------------------
+# Listar perfiles disponibles
+# GET /admin/perfilado
+# --------------------------------------------------
+@router.get("")
+def listar_perfiles():
+    return {
+        "cpu": [
+            {campo: valor for campo, valor in perfil.items() if campo != "plegado"}
+            for perfil in perfiles_cpu
+        ],
+        # Con PERFILADO_DIR compartido: también los de los demás workers
+        "cpu_en_disco": perfiles_cpu_en_disco(),
+        "memoria": estado_ventana_memoria(),
+        "diferencias_memoria": [
+            {"id": d["id"], "inicio": d["inicio"], "fin": d["fin"], "peticiones": d["peticiones"]}
+            for d in diferencias_memoria
+        ],
+    }
+
+# --------------------------------------------------
+# Descargar perfil de CPU (pilas plegadas)
+# GET /admin/perfilado/cpu/{id_perfil}
+# --------------------------------------------------
+@router.get("/cpu/{id_perfil}", response_class=PlainTextResponse)
+def obtener_perfil_cpu(id_perfil: str):
+    perfil = buscar_perfil_cpu(id_perfil)
+
+    if perfil is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado.")
+
+    return perfil["plegado"]
+
+# --------------------------------------------------
+# Iniciar ventana de memoria (tracemalloc)
+# POST /admin/perfilado/memoria?peticiones=100
+# --------------------------------------------------
+@router.post("/memoria")
+def iniciar_memoria(peticiones: int = Query(100, ge=1, le=100000)):
+    iniciar_ventana_memoria(peticiones)
+    return estado_ventana_memoria()
+
+# --------------------------------------------------
+# Obtener diferencias de memoria
+# GET /admin/perfilado/memoria
+# --------------------------------------------------
+@router.get("/memoria")
+def obtener_memoria():
+    return {
+        "estado": estado_ventana_memoria(),
+        "diferencias": list(diferencias_memoria),
+    }
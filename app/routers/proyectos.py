@@ -1,16 +1,21 @@
-from fastapi import APIRouter, HTTPException, Query
-from datetime import datetime
-from uuid import uuid4
-from typing import List, Optional
+from fastapi import APIRouter, Query
+from typing import Optional
 
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Key, Attr
 
-from database import get_dynamodb_resource
+from utils.lectura_rapida import consultar
+from utils.respuestas import responder_lista
+from utils.paginacion import pagina, decodificar_cursor
+from utils.estados import claves_gsi3, clave_estado, prefijo_institucion
+from utils.entidades import Entidad, registrar_rutas
+from models.paginacion import Pagina
 from models.proyectos import (
     ProyectoCreate,
     ProyectoUpdate,
     ProyectoResponse,
-    ProyectoListItem
+    ProyectoListItem,
+    ProyectoEstadoItem,
+    ProyectoLote,
 )
 
 router = APIRouter(
@@ -18,209 +23,67 @@ router = APIRouter(
     tags=["Proyectos"]
 )
 
-dynamodb = get_dynamodb_resource()
-table = dynamodb.Table("api_data_nube")
 
-# --------------------------------------------------
-# Crear proyecto
-# POST /proyectos
-# --------------------------------------------------
-@router.post("", response_model=ProyectoResponse)
-def crear_proyecto(data: ProyectoCreate):
-
-    # Verificar que la institución exista
-    institucion_response = table.get_item(
-        Key={
-            "PK": f"INSTITUCION#{data.id_institucion}",
-            "SK": "METADATA"  # ajusta si usas otro valor
-        }
-    )
-
-    if "Item" not in institucion_response:
-        raise HTTPException(
-            status_code=404,
-            detail="La institución no existe."
-        )
-
-    now = datetime.utcnow().isoformat()
-    id_proyecto = f"PRY-{uuid4().hex[:8]}"
-
-    item = {
-        # PK principal (agrupado por institución)
-        "PK": f"INSTITUCION#{data.id_institucion}",
-        "SK": f"PROYECTO#{id_proyecto}",
+# Un cambio de estado mueve el proyecto en el índice por estado (GSI3)
+def _claves_estado(valores: dict, id_institucion: str, id_proyecto: str) -> dict:
+    if "estado_proyecto" not in valores:
+        return {}
+    return claves_gsi3(valores["estado_proyecto"], id_institucion, id_proyecto)
 
-        # GSI para acceso directo por id_proyecto
-        "GSI1PK": f"PROYECTO#{id_proyecto}",
-        "GSI1SK": "METADATA",
 
-        # Datos
-        "id_proyecto": id_proyecto,
-        "id_institucion": data.id_institucion,
-        "nombre": data.nombre,
-        "descripcion": data.descripcion,
-        "estado_proyecto": data.estado_proyecto,
-        "habil": data.habil,
-        "fecha_creacion": now,
-        "fecha_actualizacion": now,
-    }
+# El estado se compara normalizado, igual que en /por-estado
+def _filtro_lote(data: ProyectoLote):
+    if not data.estado_proyecto:
+        return None
+    return {"GSI3PK": f"ESTADO_PROYECTO#{clave_estado(data.estado_proyecto)}"}
 
-    table.put_item(Item=item)
-    return item
 
 # --------------------------------------------------
-# Listar proyectos por institución (OPTIMIZADO)
-# GET /proyectos?id_institucion=...
+# Declaración (rutas CRUD en utils/entidades.py)
 # --------------------------------------------------
-@router.get("", response_model=List[ProyectoListItem])
-def listar_proyectos(
-    id_institucion: str = Query(...),
-    habil: Optional[bool] = Query(None),
-):
-
-    # Verificar que la institución exista
-    institucion_response = table.get_item(
-        Key={
-            "PK": f"INSTITUCION#{id_institucion}",
-            "SK": "METADATA"  # ajusta si usas otro valor
-        }
-    )
-
-    if "Item" not in institucion_response:
-        raise HTTPException(
-            status_code=404,
-            detail="La institución no existe."
-        )
-
-    response = table.query(
-        KeyConditionExpression=(
-            Key("PK").eq(f"INSTITUCION#{id_institucion}") &
-            Key("SK").begins_with("PROYECTO#")
-        )
-    )
-
-    items = response.get("Items", [])
-    proyectos = []
-
-    for item in items:
-        if habil is not None and item.get("habil") != habil:
-            continue
-
-        proyectos.append({
-            "id_proyecto": item["id_proyecto"],
-            "nombre": item["nombre"],
-            "estado_proyecto": item["estado_proyecto"],
-            "habil": item["habil"],
-        })
-
-    return proyectos
-
-# --------------------------------------------------
-# Obtener proyecto por ID (GSI)
-# GET /proyectos/{id_proyecto}
-# --------------------------------------------------
-@router.get("/{id_proyecto}", response_model=ProyectoResponse)
-def obtener_proyecto(id_proyecto: str):
-    response = table.query(
-        IndexName="GSI1",
-        KeyConditionExpression=Key("GSI1PK").eq(f"PROYECTO#{id_proyecto}")
-    )
-
-    items = response.get("Items", [])
-    if not items:
-        raise HTTPException(status_code=404, detail="Proyecto no encontrado, verificar id_proyecto ingresado")
-
-    return items[0]
+PROYECTO = Entidad(
+    tipo="PROYECTO",
+    prefijo_id="PRY",
+    etiqueta="Proyecto",
+    modelo_crear=ProyectoCreate,
+    modelo_actualizar=ProyectoUpdate,
+    modelo_respuesta=ProyectoResponse,
+    modelo_lista=ProyectoListItem,
+    modelo_lote=ProyectoLote,
+    claves_derivadas=_claves_estado,
+    filtro_lote=_filtro_lote,
+    verbo_baja="eliminar",
+)
 
 # --------------------------------------------------
-# Actualizar proyecto
-# PATCH /proyectos/{id_proyecto}
+# Proyectos por estado (todas las instituciones)
+# GET /proyectos/por-estado/{estado}?id_institucion=&cursor=
 # --------------------------------------------------
-@router.patch("/{id_proyecto}", response_model=ProyectoResponse)
-def actualizar_proyecto(id_proyecto: str, data: ProyectoUpdate):
-    now = datetime.utcnow().isoformat()
-
-    response = table.query(
-        IndexName="GSI1",
-        KeyConditionExpression=Key("GSI1PK").eq(f"PROYECTO#{id_proyecto}")
-    )
-
-    items = response.get("Items", [])
-    if not items:
-        raise HTTPException(status_code=404, detail="Proyecto no encontrado, verificar id_proyecto ingresado")
-
-    proyecto = items[0]
-
-    update_expression = []
-    expression_values = {}
-
-    for field, value in data.model_dump(exclude_none=True).items():
-        update_expression.append(f"{field} = :{field}")
-        expression_values[f":{field}"] = value
-
-    if not update_expression:
-        raise HTTPException(status_code=400, detail="No hay campos para actualizar o no coinciden con los existentes")
-
-    update_expression.append("fecha_actualizacion = :fecha")
-    expression_values[":fecha"] = now
-
-    response = table.update_item(
-        Key={
-            "PK": proyecto["PK"],
-            "SK": proyecto["SK"],
-        },
-        UpdateExpression="SET " + ", ".join(update_expression),
-        ExpressionAttributeValues=expression_values,
-        ReturnValues="ALL_NEW",
+@router.get("/por-estado/{estado}", response_model=Pagina[ProyectoEstadoItem])
+def listar_por_estado(
+    estado: str,
+    id_institucion: Optional[str] = Query(None, min_length=1),
+    habil: Optional[bool] = Query(None),
+    limite: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+):
+    condicion = Key("GSI3PK").eq(f"ESTADO_PROYECTO#{clave_estado(estado)}")
+    if id_institucion is not None:
+        condicion = condicion & Key("GSI3SK").begins_with(prefijo_institucion(id_institucion))
+
+    response = consultar(
+        condicion,
+        indice="GSI3",
+        proyeccion=["id_proyecto", "id_institucion", "nombre", "estado_proyecto", "habil"],
+        filtro=Attr("habil").eq(habil) if habil is not None else None,
+        limite=limite,
+        inicio=decodificar_cursor(cursor),
     )
 
-    return response["Attributes"]
-
-# --------------------------------------------------
-# Eliminar proyecto (delete lógico)
-# --------------------------------------------------
-@router.delete("/{id_proyecto}")
-def eliminar_proyecto(id_proyecto: str):
-    return _set_habil_proyecto(id_proyecto, False)
-
-# --------------------------------------------------
-# Habilitar proyecto
-# --------------------------------------------------
-@router.patch("/{id_proyecto}/habilitar")
-def habilitar_proyecto(id_proyecto: str):
-    return _set_habil_proyecto(id_proyecto, True)
+    return responder_lista(pagina(response, response.get("Items", [])))
 
 # --------------------------------------------------
-# Función interna reutilizable
+# POST /proyectos, GET /proyectos?id_institucion=..., GET/PATCH/DELETE
+# /proyectos/{id_proyecto}, PATCH /proyectos/lote y /{id_proyecto}/habilitar
 # --------------------------------------------------
-def _set_habil_proyecto(id_proyecto: str, habil: bool):
-    now = datetime.utcnow().isoformat()
-
-    response = table.query(
-        IndexName="GSI1",
-        KeyConditionExpression=Key("GSI1PK").eq(f"PROYECTO#{id_proyecto}")
-    )
-
-    items = response.get("Items", [])
-    if not items:
-        raise HTTPException(status_code=404, detail="Proyecto no encontrado, verificar id_proyecto ingresado")
-
-    proyecto = items[0]
-
-    table.update_item(
-        Key={
-            "PK": proyecto["PK"],
-            "SK": proyecto["SK"],
-        },
-        UpdateExpression="SET habil = :habil, fecha_actualizacion = :fecha",
-        ExpressionAttributeValues={
-            ":habil": habil,
-            ":fecha": now,
-        },
-    )
-
-    return {
-        "message": "Proyecto habilitado correctamente"
-        if habil else
-        "Proyecto deshabilitado correctamente"
-    }
+registrar_rutas(router, PROYECTO)
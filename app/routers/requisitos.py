@@ -0,0 +1,71 @@
+from fastapi import APIRouter, HTTPException
+from datetime import datetime
+
+from botocore.exceptions import ClientError
+
+from models.requisitos import RequisitoUpdate, RequisitoResponse
+
+from database import get_dynamodb_resource, TABLE_NAME
+from utils.lectura_rapida import obtener_item
+from utils.respuestas import responder_item
+from utils.cambios import valores_cambio, SET_CAMBIO
+from utils.requisitos import clave_requisito, cache, registrar_alias
+
+router = APIRouter(
+    prefix="/requisitos",
+    tags=["Requisitos"]
+)
+
+dynamodb = get_dynamodb_resource()
+
+table = dynamodb.Table(TABLE_NAME)
+
+
+# --------------------------------------------------
+# Obtener requisito del catálogo compartido
+# GET /requisitos/{id_requisito}
+# --------------------------------------------------
+@router.get("/{id_requisito}", response_model=RequisitoResponse)
+def obtener_requisito(id_requisito: str):
+    item = obtener_item(clave_requisito(id_requisito))
+    # Un alias (id de un texto corregido) no es un requisito
+    if item is None or "alias_de" in item:
+        raise HTTPException(status_code=404, detail="Requisito no encontrado, verificar id_requisito ingresado")
+
+    return responder_item(item, RequisitoResponse)
+
+
+# --------------------------------------------------
+# Corregir el texto de un requisito
+# PATCH /requisitos/{id_requisito}
+#
+# Cambia el texto en todos los trámites que lo referencian (modo
+# REQUISITOS_NORMALIZADOS) con una sola escritura. El cambio queda en el
+# índice de cambios como tipo REQUISITO, y el id del texto nuevo como
+# alias de este requisito (utils/requisitos.py).
+# --------------------------------------------------
+@router.patch("/{id_requisito}", response_model=RequisitoResponse)
+def actualizar_requisito(id_requisito: str, data: RequisitoUpdate):
+    now = datetime.utcnow().isoformat()
+
+    try:
+        response = table.update_item(
+            Key=clave_requisito(id_requisito),
+            UpdateExpression="SET texto = :texto, fecha_actualizacion = :fecha, " + SET_CAMBIO,
+            ConditionExpression="attribute_exists(PK) AND attribute_not_exists(alias_de)",
+            ExpressionAttributeValues={
+                ":texto": data.texto,
+                ":fecha": now,
+                **valores_cambio("REQUISITO", id_requisito, now),
+            },
+            ReturnValues="ALL_NEW",
+        )
+    except ClientError as error:
+        if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            raise HTTPException(status_code=404, detail="Requisito no encontrado, verificar id_requisito ingresado")
+        raise
+
+    # Los demás procesos lo ven al vencer su caché
+    cache.olvidar(id_requisito)
+    registrar_alias(id_requisito, data.texto)
+    return response["Attributes"]
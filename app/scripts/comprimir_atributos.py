@@ -0,0 +1,130 @@
+"""
+Reescribe `descripcion` y `requisitos` de los trámites, proyectos y
+programas existentes en el formato comprimido (utils/atributos_comprimidos.py).
+
+Uso (desde la carpeta app/):
+    python -m scripts.comprimir_atributos
+    python -m scripts.comprimir_atributos --revertir   # vuelve a texto plano
+
+Es idempotente: solo lee los items con esos atributos sin comprimir (o
+comprimidos, con --revertir) y solo escribe los que cambian. Cada
+escritura exige que fecha_actualizacion no haya cambiado desde la
+lectura, así no pisa una edición hecha mientras corre. No cambia
+fecha_actualizacion: el contenido es el mismo.
+"""
+import sys
+
+from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.types import Binary
+from botocore.exceptions import ClientError
+
+from database import TABLE_NAME
+from utils.atributos_comprimidos import ATRIBUTOS_COMPRIMIBLES, comprimir_valor, descomprimir_valor
+from utils.lote import en_paralelo, con_reintentos
+from utils.transacciones import client
+
+TIPOS = ("TRAMITE#", "PROYECTO#", "PROGRAMA#")
+
+# Tipo DynamoDB de cada atributo sin comprimir
+TIPOS_ORIGINALES = {"descripcion": "S", "requisitos": "L"}
+
+
+def _candidatos(revertir: bool):
+    """Items con algún atributo comprimible en el formato a cambiar, tal como están guardados."""
+    hijos = Attr("SK").begins_with(TIPOS[0])
+    for tipo in TIPOS[1:]:
+        hijos = hijos | Attr("SK").begins_with(tipo)
+
+    formato = None
+    for atributo in ATRIBUTOS_COMPRIMIBLES:
+        condicion = Attr(atributo).attribute_type("B" if revertir else TIPOS_ORIGINALES[atributo])
+        formato = condicion if formato is None else formato | condicion
+
+    # Cliente del recurso y no lectura_rapida: se necesitan los valores
+    # sin descomprimir para saber cuáles ya están comprimidos
+    kwargs = {
+        "TableName": TABLE_NAME,
+        "FilterExpression": hijos & formato,
+        "ProjectionExpression": ", ".join(["PK", "SK", "fecha_actualizacion", *ATRIBUTOS_COMPRIMIBLES]),
+    }
+    while True:
+        response = client.scan(**kwargs)
+        yield from response.get("Items", [])
+
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _nuevos_valores(item: dict, revertir: bool) -> dict:
+    valores = {}
+    for atributo in ATRIBUTOS_COMPRIMIBLES:
+        if atributo not in item:
+            continue
+
+        comprimido = isinstance(item[atributo], Binary)
+        if revertir and comprimido:
+            valores[atributo] = descomprimir_valor(item[atributo])
+        elif not revertir and not comprimido:
+            nuevo = comprimir_valor(atributo, item[atributo])
+            if nuevo is not item[atributo]:
+                valores[atributo] = nuevo
+    return valores
+
+
+def _reescribir(item: dict, revertir: bool) -> str:
+    valores = _nuevos_valores(item, revertir)
+    if not valores:
+        return "sin_cambio"
+
+    if "fecha_actualizacion" in item:
+        condicion = "fecha_actualizacion = :fecha"
+        fecha = {":fecha": item["fecha_actualizacion"]}
+    else:
+        condicion = "attribute_not_exists(fecha_actualizacion)"
+        fecha = {}
+
+    try:
+        con_reintentos(lambda: client.update_item(
+            TableName=TABLE_NAME,
+            Key={"PK": item["PK"], "SK": item["SK"]},
+            UpdateExpression="SET " + ", ".join(f"#{atributo} = :{atributo}" for atributo in valores),
+            ConditionExpression=condicion,
+            ExpressionAttributeNames={f"#{atributo}": atributo for atributo in valores},
+            ExpressionAttributeValues={**{f":{atributo}": valor for atributo, valor in valores.items()}, **fecha},
+        ))
+    except ClientError as error:
+        if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            # Se editó mientras corría: la edición ya se guardó en el formato actual
+            return "editado"
+        raise
+
+    return "reescrito"
+
+
+def migrar(revertir: bool = False) -> dict:
+    totales = {"reescrito": 0, "sin_cambio": 0, "editado": 0}
+    pagina = []
+
+    def procesar():
+        for resultado in en_paralelo(lambda item: _reescribir(item, revertir), pagina):
+            totales[resultado] += 1
+        pagina.clear()
+
+    for item in _candidatos(revertir):
+        pagina.append(item)
+        if len(pagina) >= 100:
+            procesar()
+    procesar()
+
+    return totales
+
+
+if __name__ == "__main__":
+    revertir = "--revertir" in sys.argv[1:]
+    totales = migrar(revertir)
+    print(
+        f"{totales['reescrito']} items {'descomprimidos' if revertir else 'comprimidos'}, "
+        f"{totales['sin_cambio']} sin cambio (texto corto), "
+        f"{totales['editado']} editados durante la migración."
+    )
@@ -0,0 +1,81 @@
+"""
+Copia la tabla única de un motor de almacenamiento a otro
+(almacenamiento/): por ejemplo, de DynamoDB a un archivo SQLite para
+una instalación liviana o para medir con datos reales sin red.
+
+Uso (desde la carpeta app/):
+    python -m scripts.copiar_almacenamiento dynamodb sqlite:datos.db
+    python -m scripts.copiar_almacenamiento sqlite:datos.db dynamodb
+
+`dynamodb` es la tabla de DYNAMODB_TABLE en DYNAMODB_ENDPOINT (o AWS),
+así que se ejecuta con ALMACENAMIENTO=dynamodb (el valor por defecto).
+Crea la tabla de destino si no existe, con los índices y el TTL de
+scripts/crear_tabla. Los items que ya están en el destino se pisan.
+"""
+import sys
+
+from almacenamiento.motor import TablaInexistente
+from almacenamiento.motores import crear_motor
+from database import TABLE_NAME, es_almacenamiento_local
+from scripts.crear_tabla import definicion_tabla, ATRIBUTO_TTL
+
+ITEMS_POR_PAGINA = 500
+ITEMS_POR_LOTE = 25
+
+
+def _motor(especificacion: str):
+    nombre, _, ruta = especificacion.partition(":")
+    if nombre not in ("dynamodb", "sqlite"):
+        raise SystemExit(f"Motor no válido: {especificacion} (dynamodb o sqlite:<archivo>)")
+    if nombre == "dynamodb" and es_almacenamiento_local():
+        raise SystemExit("Para copiar desde o hacia DynamoDB ejecutar con ALMACENAMIENTO=dynamodb")
+    return crear_motor(nombre, ruta)
+
+
+def _preparar_destino(destino):
+    definicion = definicion_tabla(TABLE_NAME)
+    try:
+        tabla = destino.describir_tabla(TABLE_NAME)
+    except TablaInexistente:
+        destino.crear_tabla(definicion)
+    else:
+        existentes = {indice["IndexName"] for indice in tabla.get("GlobalSecondaryIndexes", [])}
+        faltantes = [i for i in definicion["GlobalSecondaryIndexes"] if i["IndexName"] not in existentes]
+        if faltantes:
+            raise SystemExit(
+                f"A la tabla de destino le faltan índices ({', '.join(i['IndexName'] for i in faltantes)}): "
+                "correr primero scripts.crear_tabla sobre ella"
+            )
+
+    if destino.describir_ttl(TABLE_NAME).get("TimeToLiveStatus") not in ("ENABLED", "ENABLING"):
+        destino.configurar_ttl(TABLE_NAME, {"Enabled": True, "AttributeName": ATRIBUTO_TTL})
+
+
+def copiar(origen, destino) -> int:
+    _preparar_destino(destino)
+    copiados = 0
+    inicio = None
+
+    while True:
+        pagina = origen.recorrer(TABLE_NAME, limite=ITEMS_POR_PAGINA, inicio=inicio)
+        items = pagina["Items"]
+        for desde in range(0, len(items), ITEMS_POR_LOTE):
+            destino.escribir_lote(TABLE_NAME, poner=items[desde:desde + ITEMS_POR_LOTE])
+        copiados += len(items)
+
+        inicio = pagina.get("LastEvaluatedKey")
+        if not inicio:
+            return copiados
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        raise SystemExit(__doc__)
+
+    origen, destino = _motor(sys.argv[1]), _motor(sys.argv[2])
+    try:
+        total = copiar(origen, destino)
+    finally:
+        origen.cerrar()
+        destino.cerrar()
+    print(f"{total} items copiados de {sys.argv[1]} a {sys.argv[2]} ({TABLE_NAME}).")
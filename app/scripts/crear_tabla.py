@@ -0,0 +1,193 @@
+"""
+Crea la tabla única de la API (si no existe) y agrega los índices
+secundarios que le falten a una tabla existente. También activa el TTL
+sobre `expira` (vencimiento de las Idempotency-Key).
+
+Uso (desde la carpeta app/):
+    python -m scripts.crear_tabla
+    python -m scripts.crear_tabla --recrear-indices
+
+--recrear-indices borra y vuelve a crear los índices existentes cuya
+proyección no es la de PROYECCIONES (DynamoDB no permite cambiarla).
+Mientras se recrea, las consultas a ese índice fallan.
+
+Respeta DYNAMODB_TABLE y DYNAMODB_ENDPOINT igual que la API.
+"""
+import sys
+import time
+
+from database import get_dynamodb_client, TABLE_NAME
+
+# Índices secundarios globales usados por los routers
+INDICES = ["GSI1", "GSI2", "GSI3", "GSI4"]
+
+# GSI4 (cambios) recibe una copia de cada item escrito, todos en la
+# partición del mes: solo lleva sus claves e id_institucion, y quien
+# necesita el registro completo lo lee de la tabla
+PROYECCIONES = {
+    "GSI4": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["id_institucion"]},
+}
+
+# Atributo (epoch en segundos) con el que DynamoDB borra items vencidos
+ATRIBUTO_TTL = "expira"
+
+
+def definicion_tabla(nombre: str = TABLE_NAME) -> dict:
+    atributos = [
+        {"AttributeName": "PK", "AttributeType": "S"},
+        {"AttributeName": "SK", "AttributeType": "S"},
+    ]
+    indices = []
+
+    for indice in INDICES:
+        atributos += [
+            {"AttributeName": f"{indice}PK", "AttributeType": "S"},
+            {"AttributeName": f"{indice}SK", "AttributeType": "S"},
+        ]
+        indices.append({
+            "IndexName": indice,
+            "KeySchema": [
+                {"AttributeName": f"{indice}PK", "KeyType": "HASH"},
+                {"AttributeName": f"{indice}SK", "KeyType": "RANGE"},
+            ],
+            "Projection": PROYECCIONES.get(indice, {"ProjectionType": "ALL"}),
+        })
+
+    return {
+        "TableName": nombre,
+        "KeySchema": [
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        "AttributeDefinitions": atributos,
+        "GlobalSecondaryIndexes": indices,
+        "BillingMode": "PAY_PER_REQUEST",
+    }
+
+
+def crear_tabla(nombre: str = TABLE_NAME, client=None) -> bool:
+    """Devuelve True si la tabla se creó, False si ya existía."""
+    client = client or get_dynamodb_client()
+
+    if nombre in client.list_tables()["TableNames"]:
+        return False
+
+    client.create_table(**definicion_tabla(nombre))
+    client.get_waiter("table_exists").wait(TableName=nombre)
+    return True
+
+
+def agregar_indices_faltantes(nombre: str = TABLE_NAME, client=None) -> list:
+    """
+    Crea en una tabla existente los índices de INDICES que no tenga.
+    DynamoDB solo permite crear un GSI por llamada: se crean de a uno.
+    Devuelve los nombres creados.
+    """
+    client = client or get_dynamodb_client()
+    definicion = definicion_tabla(nombre)
+
+    tabla = client.describe_table(TableName=nombre)["Table"]
+    existentes = {indice["IndexName"] for indice in tabla.get("GlobalSecondaryIndexes", [])}
+    creados = []
+
+    for indice in definicion["GlobalSecondaryIndexes"]:
+        if indice["IndexName"] in existentes:
+            continue
+
+        client.update_table(
+            TableName=nombre,
+            AttributeDefinitions=definicion["AttributeDefinitions"],
+            GlobalSecondaryIndexUpdates=[{"Create": indice}],
+        )
+        _esperar_indices_activos(client, nombre)
+        creados.append(indice["IndexName"])
+
+    return creados
+
+
+def recrear_indices_distintos(nombre: str = TABLE_NAME, client=None) -> list:
+    """Borra y vuelve a crear los índices cuya proyección cambió. Devuelve sus nombres."""
+    client = client or get_dynamodb_client()
+    definicion = definicion_tabla(nombre)
+
+    tabla = client.describe_table(TableName=nombre)["Table"]
+    actuales = {indice["IndexName"]: indice["Projection"] for indice in tabla.get("GlobalSecondaryIndexes", [])}
+    recreados = []
+
+    for indice in definicion["GlobalSecondaryIndexes"]:
+        actual = actuales.get(indice["IndexName"])
+        if actual is None or _misma_proyeccion(actual, indice["Projection"]):
+            continue
+
+        client.update_table(
+            TableName=nombre,
+            GlobalSecondaryIndexUpdates=[{"Delete": {"IndexName": indice["IndexName"]}}],
+        )
+        _esperar_indice_borrado(client, nombre, indice["IndexName"])
+        client.update_table(
+            TableName=nombre,
+            AttributeDefinitions=definicion["AttributeDefinitions"],
+            GlobalSecondaryIndexUpdates=[{"Create": indice}],
+        )
+        _esperar_indices_activos(client, nombre)
+        recreados.append(indice["IndexName"])
+
+    return recreados
+
+
+def _misma_proyeccion(actual: dict, esperada: dict) -> bool:
+    return (
+        actual.get("ProjectionType") == esperada.get("ProjectionType")
+        and sorted(actual.get("NonKeyAttributes", [])) == sorted(esperada.get("NonKeyAttributes", []))
+    )
+
+
+def configurar_ttl(nombre: str = TABLE_NAME, client=None) -> bool:
+    """Activa el TTL sobre ATRIBUTO_TTL. Devuelve True si se activó, False si ya estaba."""
+    client = client or get_dynamodb_client()
+
+    actual = client.describe_time_to_live(TableName=nombre)["TimeToLiveDescription"]
+    if actual.get("TimeToLiveStatus") in ("ENABLED", "ENABLING"):
+        return False
+
+    client.update_time_to_live(
+        TableName=nombre,
+        TimeToLiveSpecification={"Enabled": True, "AttributeName": ATRIBUTO_TTL},
+    )
+    return True
+
+
+def _esperar_indices_activos(client, nombre: str):
+    while True:
+        tabla = client.describe_table(TableName=nombre)["Table"]
+        indices = tabla.get("GlobalSecondaryIndexes", [])
+        if tabla["TableStatus"] == "ACTIVE" and all(i["IndexStatus"] == "ACTIVE" for i in indices):
+            return
+        time.sleep(2)
+
+
+def _esperar_indice_borrado(client, nombre: str, indice: str):
+    while True:
+        tabla = client.describe_table(TableName=nombre)["Table"]
+        if all(i["IndexName"] != indice for i in tabla.get("GlobalSecondaryIndexes", [])):
+            return
+        time.sleep(2)
+
+
+if __name__ == "__main__":
+    if crear_tabla():
+        print(f"Tabla {TABLE_NAME} creada.")
+    else:
+        creados = agregar_indices_faltantes()
+        if creados:
+            print(f"Índices agregados a {TABLE_NAME}: {', '.join(creados)}.")
+        else:
+            print(f"La tabla {TABLE_NAME} ya existe.")
+
+        if "--recrear-indices" in sys.argv[1:]:
+            recreados = recrear_indices_distintos()
+            if recreados:
+                print(f"Índices recreados en {TABLE_NAME}: {', '.join(recreados)}.")
+
+    if configurar_ttl():
+        print(f"TTL activado sobre {ATRIBUTO_TTL}.")
@@ -0,0 +1,57 @@
+"""
+Completa el índice de cambios (GSI4) en los registros existentes.
+
+Uso (desde la carpeta app/), después de `python -m scripts.crear_tabla`:
+    python -m scripts.indice_cambios
+
+Es idempotente: solo escribe los registros cuyas claves faltan o no coinciden.
+Los registros sin fecha_actualizacion usan fecha_creacion.
+"""
+from boto3.dynamodb.conditions import Attr
+
+from database import get_dynamodb_resource, TABLE_NAME
+from utils.cambios import TIPOS_CAMBIO, claves_gsi4
+from utils.lectura_rapida import escanear
+
+table = get_dynamodb_resource().Table(TABLE_NAME)
+
+
+def _tipo(item: dict):
+    if item["SK"] == "METADATA":
+        return "INSTITUCION" if item["PK"].startswith("INSTITUCION#") else None
+
+    tipo = item["SK"].split("#", 1)[0]
+    return tipo if tipo in TIPOS_CAMBIO else None
+
+
+def completar_registros() -> int:
+    actualizados = 0
+
+    filtro = Attr("PK").begins_with("INSTITUCION#")
+    registros = escanear(
+        filtro=filtro,
+        proyeccion=["PK", "SK", *TIPOS_CAMBIO.values(), "fecha_creacion", "fecha_actualizacion", "GSI4PK", "GSI4SK"],
+    )
+
+    for registro in registros:
+        tipo = _tipo(registro)
+        fecha = registro.get("fecha_actualizacion") or registro.get("fecha_creacion")
+        if tipo is None or not fecha:
+            continue
+
+        claves = claves_gsi4(tipo, registro[TIPOS_CAMBIO[tipo]], fecha)
+        if all(registro.get(nombre) == valor for nombre, valor in claves.items()):
+            continue
+
+        table.update_item(
+            Key={"PK": registro["PK"], "SK": registro["SK"]},
+            UpdateExpression="SET GSI4PK = :pk, GSI4SK = :sk",
+            ExpressionAttributeValues={":pk": claves["GSI4PK"], ":sk": claves["GSI4SK"]},
+        )
+        actualizados += 1
+
+    return actualizados
+
+
+if __name__ == "__main__":
+    print(f"{completar_registros()} registros actualizados.")
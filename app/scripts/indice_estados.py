@@ -0,0 +1,42 @@
+"""
+Completa el índice de proyectos por estado (GSI3) en los proyectos existentes.
+
+Uso (desde la carpeta app/), después de `python -m scripts.crear_tabla`:
+    python -m scripts.indice_estados
+
+Es idempotente: solo escribe los proyectos cuyas claves faltan o no coinciden.
+"""
+from boto3.dynamodb.conditions import Attr
+
+from database import get_dynamodb_resource, TABLE_NAME
+from utils.estados import claves_gsi3
+from utils.lectura_rapida import escanear
+
+table = get_dynamodb_resource().Table(TABLE_NAME)
+
+
+def completar_proyectos() -> int:
+    actualizados = 0
+
+    proyectos = escanear(
+        filtro=Attr("SK").begins_with("PROYECTO#"),
+        proyeccion=["PK", "SK", "id_proyecto", "id_institucion", "estado_proyecto", "GSI3PK", "GSI3SK"],
+    )
+
+    for proyecto in proyectos:
+        claves = claves_gsi3(proyecto["estado_proyecto"], proyecto["id_institucion"], proyecto["id_proyecto"])
+        if all(proyecto.get(nombre) == valor for nombre, valor in claves.items()):
+            continue
+
+        table.update_item(
+            Key={"PK": proyecto["PK"], "SK": proyecto["SK"]},
+            UpdateExpression="SET GSI3PK = :pk, GSI3SK = :sk",
+            ExpressionAttributeValues={":pk": claves["GSI3PK"], ":sk": claves["GSI3SK"]},
+        )
+        actualizados += 1
+
+    return actualizados
+
+
+if __name__ == "__main__":
+    print(f"{completar_proyectos()} proyectos actualizados.")
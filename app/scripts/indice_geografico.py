@@ -0,0 +1,76 @@
+"""
+Completa el índice geográfico (GSI2) de las instituciones existentes y
+recalcula los conteos por departamento y municipio.
+
+Uso (desde la carpeta app/), después de `python -m scripts.crear_tabla`:
+    python -m scripts.indice_geografico
+
+Es idempotente: se puede volver a correr para reparar conteos. Los contadores
+se reescriben con el total del scan; conviene correrlo con poco tráfico de escritura.
+"""
+from boto3.dynamodb.conditions import Attr
+
+from database import get_dynamodb_resource, TABLE_NAME
+from utils.geografia import CONTADORES_PK, claves_gsi2, clave_contador
+from utils.lectura_rapida import escanear
+
+table = get_dynamodb_resource().Table(TABLE_NAME)
+
+
+def completar_instituciones() -> dict:
+    """Escribe GSI2PK/GSI2SK donde falten o no coincidan. Devuelve los conteos."""
+    conteos = {}
+    actualizadas = 0
+
+    instituciones = escanear(
+        filtro=Attr("PK").begins_with("INSTITUCION#") & Attr("SK").eq("METADATA"),
+        proyeccion=["PK", "SK", "id_institucion", "departamento_sede", "municipio_sede", "GSI2PK", "GSI2SK"],
+    )
+
+    for institucion in instituciones:
+        departamento = institucion["departamento_sede"]
+        municipio = institucion["municipio_sede"]
+        claves = claves_gsi2(departamento, municipio, institucion["id_institucion"])
+
+        if any(institucion.get(nombre) != valor for nombre, valor in claves.items()):
+            table.update_item(
+                Key={"PK": institucion["PK"], "SK": institucion["SK"]},
+                UpdateExpression="SET GSI2PK = :pk, GSI2SK = :sk",
+                ExpressionAttributeValues={":pk": claves["GSI2PK"], ":sk": claves["GSI2SK"]},
+            )
+            actualizadas += 1
+
+        for muni in (None, municipio):
+            clave = clave_contador(departamento, muni)
+            contador = conteos.setdefault(clave["SK"], {
+                **clave,
+                "departamento": departamento,
+                **({"municipio": muni} if muni else {}),
+                "total": 0,
+            })
+            contador["total"] += 1
+
+    print(f"{actualizadas} instituciones actualizadas.")
+    return conteos
+
+
+def reescribir_contadores(conteos: dict):
+    """Reemplaza los contadores: los que ya no tienen instituciones quedan en cero."""
+    existentes = table.query(
+        KeyConditionExpression="PK = :pk",
+        ExpressionAttributeValues={":pk": CONTADORES_PK},
+        ProjectionExpression="PK, SK",
+    )["Items"]
+
+    with table.batch_writer() as lote:
+        for contador in existentes:
+            if contador["SK"] not in conteos:
+                lote.delete_item(Key={"PK": contador["PK"], "SK": contador["SK"]})
+        for contador in conteos.values():
+            lote.put_item(Item=contador)
+
+    print(f"{len(conteos)} contadores escritos.")
+
+
+if __name__ == "__main__":
+    reescribir_contadores(completar_instituciones())
@@ -0,0 +1,95 @@
+"""
+Pasa los requisitos de los trámites existentes al catálogo compartido
+(utils/requisitos.py): crea un item por requisito distinto y deja en
+cada trámite solo sus ids (`requisitos_ref`).
+
+Uso (desde la carpeta app/):
+    python -m scripts.normalizar_requisitos
+    python -m scripts.normalizar_requisitos --revertir   # vuelve a texto en cada trámite
+
+Es idempotente: solo lee los trámites que todavía tienen los requisitos
+en el formato a cambiar. Cada escritura exige que fecha_actualizacion no
+haya cambiado desde la lectura, así no pisa una edición hecha mientras
+corre. No cambia fecha_actualizacion: el contenido es el mismo.
+
+Después de migrar, activar REQUISITOS_NORMALIZADOS=true para que los
+trámites nuevos y los PATCH también guarden referencias.
+"""
+import sys
+
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from database import TABLE_NAME
+from utils.atributos_comprimidos import comprimir_valor
+from utils.lectura_rapida import escanear
+from utils.lote import en_paralelo, con_reintentos
+from utils.requisitos import registrar, ATRIBUTO_REFERENCIAS
+from utils.transacciones import client
+
+
+def _candidatos(revertir: bool):
+    origen = ATRIBUTO_REFERENCIAS if revertir else "requisitos"
+    # escanear devuelve `requisitos` en texto en los dos casos
+    # (descomprimido o resuelto desde las referencias)
+    return escanear(
+        filtro=Attr("SK").begins_with("TRAMITE#") & Attr(origen).exists(),
+        proyeccion=["PK", "SK", "fecha_actualizacion", "requisitos"],
+    )
+
+
+def _reescribir(item: dict, revertir: bool) -> str:
+    if revertir:
+        atributo, valor, quitar = "requisitos", comprimir_valor("requisitos", item["requisitos"]), ATRIBUTO_REFERENCIAS
+    else:
+        atributo, valor, quitar = ATRIBUTO_REFERENCIAS, registrar(item["requisitos"]), "requisitos"
+
+    if "fecha_actualizacion" in item:
+        condicion = "fecha_actualizacion = :fecha"
+        fecha = {":fecha": item["fecha_actualizacion"]}
+    else:
+        condicion = "attribute_not_exists(fecha_actualizacion)"
+        fecha = {}
+
+    try:
+        con_reintentos(lambda: client.update_item(
+            TableName=TABLE_NAME,
+            Key={"PK": item["PK"], "SK": item["SK"]},
+            UpdateExpression=f"SET {atributo} = :valor REMOVE {quitar}",
+            ConditionExpression=condicion,
+            ExpressionAttributeValues={":valor": valor, **fecha},
+        ))
+    except ClientError as error:
+        if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            # Se editó mientras corría: la edición ya se guardó en el formato actual
+            return "editado"
+        raise
+
+    return "reescrito"
+
+
+def migrar(revertir: bool = False) -> dict:
+    totales = {"reescrito": 0, "editado": 0}
+    pagina = []
+
+    def procesar():
+        for resultado in en_paralelo(lambda item: _reescribir(item, revertir), pagina):
+            totales[resultado] += 1
+        pagina.clear()
+
+    for item in _candidatos(revertir):
+        pagina.append(item)
+        if len(pagina) >= 100:
+            procesar()
+    procesar()
+
+    return totales
+
+
+if __name__ == "__main__":
+    revertir = "--revertir" in sys.argv[1:]
+    totales = migrar(revertir)
+    print(
+        f"{totales['reescrito']} trámites {'con requisitos en texto' if revertir else 'con referencias'}, "
+        f"{totales['editado']} editados durante la migración."
+    )
@@ -0,0 +1,81 @@
+"""
+Recalcula los contadores de trámites, proyectos y programas de cada
+institución a partir de una consulta a su partición.
+
+Uso (desde la carpeta app/):
+    python -m scripts.reparar_contadores            # todas las instituciones
+    python -m scripts.reparar_contadores INST-1234  # solo algunas
+
+Los contadores se reescriben con SET: si mientras tanto se crea o
+deshabilita un hijo de esa institución, conviene volver a correrlo.
+"""
+import sys
+
+from boto3.dynamodb.conditions import Key
+
+from database import get_dynamodb_resource, TABLE_NAME
+from utils.contadores import CONTADORES, clave_institucion
+from utils.lectura_rapida import consultar
+
+table = get_dynamodb_resource().Table(TABLE_NAME)
+
+
+def contar_hijos(id_institucion: str) -> dict:
+    conteos = {atributo: 0 for atributos in CONTADORES.values() for atributo in atributos}
+    inicio = None
+
+    while True:
+        response = consultar(
+            Key("PK").eq(f"INSTITUCION#{id_institucion}"),
+            proyeccion=["SK", "habil"],
+            inicio=inicio,
+        )
+
+        for item in response.get("Items", []):
+            tipo = item["SK"].split("#", 1)[0]
+            if tipo not in CONTADORES:
+                continue
+
+            atributo_total, atributo_activos = CONTADORES[tipo]
+            conteos[atributo_total] += 1
+            if item.get("habil"):
+                conteos[atributo_activos] += 1
+
+        inicio = response.get("LastEvaluatedKey")
+        if not inicio:
+            return conteos
+
+
+def reparar(id_institucion: str) -> dict:
+    conteos = contar_hijos(id_institucion)
+
+    table.update_item(
+        Key=clave_institucion(id_institucion),
+        UpdateExpression="SET " + ", ".join(f"{atributo} = :{atributo}" for atributo in conteos),
+        ExpressionAttributeValues={f":{atributo}": valor for atributo, valor in conteos.items()},
+        ConditionExpression="attribute_exists(PK)",
+    )
+    return conteos
+
+
+def todas_las_instituciones():
+    inicio = None
+    while True:
+        response = consultar(
+            Key("GSI1PK").eq("INSTITUCIONES"),
+            indice="GSI1",
+            proyeccion=["id_institucion"],
+            inicio=inicio,
+        )
+        for item in response.get("Items", []):
+            yield item["id_institucion"]
+
+        inicio = response.get("LastEvaluatedKey")
+        if not inicio:
+            return
+
+
+if __name__ == "__main__":
+    ids = sys.argv[1:] or todas_las_instituciones()
+    for id_institucion in ids:
+        print(id_institucion, reparar(id_institucion))
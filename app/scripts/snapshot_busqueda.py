@@ -0,0 +1,17 @@
+"""
+Genera el snapshot del índice de búsqueda de trámites.
+
+Uso (desde la carpeta app/):
+    python -m scripts.snapshot_busqueda busqueda.json
+
+Con BUSQUEDA_SNAPSHOT=busqueda.json la API construye el índice desde
+este archivo en lugar de escanear la tabla al arrancar.
+"""
+import sys
+
+from utils.busqueda import guardar_snapshot
+
+if __name__ == "__main__":
+    ruta = sys.argv[1] if len(sys.argv) > 1 else "busqueda.json"
+    cantidad = guardar_snapshot(ruta)
+    print(f"{cantidad} trámites guardados en {ruta}.")
@@ -0,0 +1,26 @@
+"""
+Genera el snapshot del catálogo público (instituciones y trámites hábiles).
+
+Uso (desde la carpeta app/):
+    python -m scripts.snapshot_catalogo catalogo.bin
+    python -m scripts.snapshot_catalogo --verificar catalogo.bin
+
+Con CATALOGO_SNAPSHOT=catalogo.bin los GET de instituciones y trámites
+se sirven desde este archivo (ver utils/catalogo.py). Generarlo dentro
+de app/ antes de construir lambda_build/Dockerfile para empaquetarlo.
+"""
+import sys
+
+from utils.catalogo import generar, Snapshot
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+
+    if argumentos and argumentos[0] == "--verificar":
+        ruta = argumentos[1] if len(argumentos) > 1 else "catalogo.bin"
+        meta = Snapshot(ruta).meta
+        print(f"{ruta}: versión {meta['version']}, {meta['instituciones']} instituciones, {meta['tramites']} trámites.")
+    else:
+        ruta = argumentos[0] if argumentos else "catalogo.bin"
+        meta = generar(ruta)
+        print(f"{meta['instituciones']} instituciones y {meta['tramites']} trámites guardados en {ruta} (versión {meta['version']}).")
@@ -0,0 +1,143 @@
+"""
+Servidor de producción: gunicorn administra los procesos y cada worker
+corre la app con uvicorn sobre uvloop + httptools.
+
+Uso (desde la carpeta app/):
+    python servidor.py
+
+- Workers: SERVIDOR_TRABAJADORES o, si no está definido, los CPUs que el
+  contenedor puede usar (afinidad del proceso y límite de cgroup v1/v2).
+- La app se importa una vez en el proceso principal (preload) y se
+  comparte con los workers por fork; cada worker abre sus propias
+  conexiones a DynamoDB y las calienta antes de recibir tráfico.
+- Cada worker se recicla tras SERVIDOR_MAX_PETICIONES peticiones (con
+  variación aleatoria para que no se reinicien todos a la vez).
+- Con ALMACENAMIENTO=memoria los datos viven en el worker: se usa uno
+  solo y no se recicla.
+- SIGTERM: se dejan de aceptar conexiones y se esperan las peticiones en
+  curso hasta SERVIDOR_ESPERA_CIERRE segundos.
+"""
+import logging
+import math
+import os
+
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+SERVIDOR_PUERTO = int(os.getenv("SERVIDOR_PUERTO", "8000"))
+SERVIDOR_MAX_PETICIONES = int(os.getenv("SERVIDOR_MAX_PETICIONES", "5000"))
+SERVIDOR_ESPERA_CIERRE = int(os.getenv("SERVIDOR_ESPERA_CIERRE", "30"))
+
+# Los datos del motor en memoria no se comparten entre procesos
+EN_MEMORIA = os.getenv("ALMACENAMIENTO", "dynamodb").lower() == "memoria"
+
+logger = logging.getLogger("gunicorn.error")
+
+
+class Trabajador(UvicornWorker):
+    # Sin "auto": si falta uvloop o httptools el worker no arranca
+    # en lugar de caer en silencio a asyncio/h11
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+
+# --------------------------------------------------
+# CPUs disponibles
+# --------------------------------------------------
+def _cuota_cgroup():
+    """CPUs permitidos por cgroup (None si no hay límite)."""
+    try:
+        # cgroup v2: "max 100000" o "<cuota> <periodo>"
+        with open("/sys/fs/cgroup/cpu.max") as archivo:
+            cuota, periodo = archivo.read().split()
+        if cuota != "max":
+            return int(cuota) / int(periodo)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # cgroup v1: cuota -1 = sin límite
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as archivo:
+            cuota = int(archivo.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as archivo:
+            periodo = int(archivo.read())
+        if cuota > 0:
+            return cuota / periodo
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def cpus_disponibles() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    cuota = _cuota_cgroup()
+    if cuota is not None:
+        cpus = min(cpus, math.ceil(cuota))
+
+    return max(1, cpus)
+
+
+def trabajadores() -> int:
+    # Los handlers son cortos y esperan a DynamoDB en el threadpool: un
+    # worker por CPU alcanza para llenar cada núcleo sin pelear por el GIL
+    if EN_MEMORIA:
+        return 1
+    configurado = os.getenv("SERVIDOR_TRABAJADORES")
+    return int(configurado) if configurado else cpus_disponibles()
+
+
+# --------------------------------------------------
+# Hooks de gunicorn
+# --------------------------------------------------
+def post_worker_init(worker):
+    """Ya en el worker: abre una conexión en cada cliente de la app."""
+    from database import TABLE_NAME
+    from utils import lectura_rapida, transacciones
+
+    for client in (lectura_rapida.client, transacciones.client):
+        try:
+            client.describe_table(TableName=TABLE_NAME)
+        except Exception as error:
+            # Sin DynamoDB el worker igual arranca: /health lo reporta
+            logger.warning("No se pudo precalentar la conexión a DynamoDB: %s", error)
+
+
+def configuracion() -> dict:
+    return {
+        "bind": f"0.0.0.0:{SERVIDOR_PUERTO}",
+        "workers": trabajadores(),
+        "worker_class": Trabajador,
+        "preload_app": True,
+        "max_requests": 0 if EN_MEMORIA else SERVIDOR_MAX_PETICIONES,
+        "max_requests_jitter": 0 if EN_MEMORIA else SERVIDOR_MAX_PETICIONES // 10,
+        "graceful_timeout": SERVIDOR_ESPERA_CIERRE,
+        # Un worker que no responde al proceso principal en este tiempo se reinicia
+        "timeout": 60,
+        "keepalive": 5,
+        "accesslog": "-",
+        "post_worker_init": post_worker_init,
+    }
+
+
+class Servidor(BaseApplication):
+
+    def __init__(self, opciones: dict):
+        self.opciones = opciones
+        super().__init__()
+
+    def load_config(self):
+        for nombre, valor in self.opciones.items():
+            self.cfg.set(nombre, valor)
+
+    def load(self):
+        from main import app
+        return app
+
+
+if __name__ == "__main__":
+    Servidor(configuracion()).run()
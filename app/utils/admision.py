@@ -0,0 +1,270 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+
+# --------------------------------------------------
+# Control de admisión
+#
+# Cuando DynamoDB se pone lento, los handlers se acumulan en el
+# threadpool y la latencia sube para todos. Este middleware limita las
+# peticiones en curso por clase de ruta y rechaza temprano (503 con
+# Retry-After) en lugar de dejarlas esperar hasta el timeout de API
+# Gateway:
+#
+#   - lectura:  GET, incluido /cambios      (las más baratas)
+#   - escritura: POST / PATCH / DELETE
+#   - masiva:   lotes y cascadas            (las primeras en caer)
+#
+# Cada clase tiene un máximo en curso y una espera máxima en cola por un
+# lugar libre. Además, cada clase deja de admitir cuando el total en
+# curso del proceso pasa su umbral (masiva 50 %, escritura 80 % de
+# ADMISION_TOTAL): con carga alta se cortan primero las pesadas y las
+# lecturas siguen entrando.
+#
+# Los máximos por defecto salen del threadpool (HILOS_THREADPOOL): admitir
+# más peticiones que hilos solo las pasa a esperar un hilo dentro del
+# proceso, donde ya no se pueden rechazar a tiempo.
+#
+# Opcional: límite por cliente con token bucket; una escritura cuesta 2
+# fichas y una masiva 10. Excederlo responde 429. El cliente es el último
+# X-Forwarded-For (el que agrega API Gateway o el balanceador; los
+# anteriores los manda el propio cliente y puede inventarlos), o la IP de
+# la conexión si no hay proxy.
+#
+# ADMISION=false lo desactiva.
+# --------------------------------------------------
+
+# Hilos del threadpool donde corren los handlers (limitador por defecto
+# de anyio, el que usa run_in_threadpool de Starlette)
+HILOS_THREADPOOL = 40
+
+ADMISION = os.getenv("ADMISION", "true").lower() != "false"
+ADMISION_TOTAL = int(os.getenv("ADMISION_TOTAL", str(HILOS_THREADPOOL)))
+
+# Fichas por segundo y ráfaga por cliente (0 = sin límite por cliente)
+ADMISION_TASA_CLIENTE = float(os.getenv("ADMISION_TASA_CLIENTE", "0"))
+ADMISION_RAFAGA_CLIENTE = float(os.getenv("ADMISION_RAFAGA_CLIENTE", "40"))
+
+CLASES = {
+    "lectura": {
+        "en_curso": int(os.getenv("ADMISION_LECTURAS", str(HILOS_THREADPOOL))),
+        "espera_ms": float(os.getenv("ADMISION_ESPERA_LECTURAS_MS", "500")),
+        "umbral_total": 1.0,
+        "fichas": 1,
+    },
+    "escritura": {
+        "en_curso": int(os.getenv("ADMISION_ESCRITURAS", str(int(HILOS_THREADPOOL * 0.8)))),
+        "espera_ms": float(os.getenv("ADMISION_ESPERA_ESCRITURAS_MS", "250")),
+        "umbral_total": 0.8,
+        "fichas": 2,
+    },
+    "masiva": {
+        "en_curso": int(os.getenv("ADMISION_MASIVAS", "4")),
+        "espera_ms": float(os.getenv("ADMISION_ESPERA_MASIVAS_MS", "0")),
+        "umbral_total": 0.5,
+        "fichas": 10,
+    },
+}
+
+# Rutas que nunca se limitan (monitoreo y documentación)
+RUTAS_EXENTAS = {"/", "/health", "/metricas", "/docs", "/redoc", "/openapi.json"}
+PREFIJOS_EXENTOS = ("/admin",)
+
+# Clientes recordados por el token bucket antes de limpiar los inactivos
+MAXIMO_CLIENTES = 10000
+
+
+# Valores que FastAPI interpreta como True en un parámetro bool
+VERDADEROS = {"1", "on", "t", "true", "y", "yes"}
+
+
+def clase_de_ruta(metodo: str, ruta: str, consulta: bytes) -> str:
+    lectura = metodo in ("GET", "HEAD")
+    if ruta.endswith("/lote") or ("/cascada/" in ruta and not lectura):
+        return "masiva"
+    if _inicia_cascada(consulta):
+        return "masiva"
+    return "lectura" if lectura else "escritura"
+
+
+def _inicia_cascada(consulta: bytes) -> bool:
+    """?cascada=<verdadero> (si se repite, FastAPI usa el último valor)."""
+    if b"cascada" not in consulta:
+        return False
+    valores = parse_qs(consulta.decode("latin-1")).get("cascada")
+    return bool(valores) and valores[-1].lower() in VERDADEROS
+
+
+# --------------------------------------------------
+# Token bucket por cliente
+# --------------------------------------------------
+class LimitePorCliente:
+
+    def __init__(self, tasa: float = ADMISION_TASA_CLIENTE, rafaga: float = ADMISION_RAFAGA_CLIENTE):
+        self.tasa = tasa
+        self.rafaga = rafaga
+        self._lock = threading.Lock()
+        self._cubetas = {}       # cliente -> [fichas, instante]
+
+    def tomar(self, cliente: str, fichas: int) -> float:
+        """0 si se admitió; si no, segundos hasta que haya fichas suficientes."""
+        ahora = time.monotonic()
+
+        with self._lock:
+            if len(self._cubetas) > MAXIMO_CLIENTES:
+                self._limpiar(ahora)
+
+            disponibles, instante = self._cubetas.get(cliente, (self.rafaga, ahora))
+            disponibles = min(self.rafaga, disponibles + (ahora - instante) * self.tasa)
+
+            if disponibles >= fichas:
+                self._cubetas[cliente] = [disponibles - fichas, ahora]
+                return 0
+            self._cubetas[cliente] = [disponibles, ahora]
+            return (fichas - disponibles) / self.tasa
+
+    def _limpiar(self, ahora: float):
+        # Una cubeta que ya se volvió a llenar es igual a una nueva
+        lleno = self.rafaga / self.tasa
+        self._cubetas = {
+            cliente: cubeta for cliente, cubeta in self._cubetas.items()
+            if ahora - cubeta[1] < lleno
+        }
+
+
+# --------------------------------------------------
+# Contadores y semáforos del proceso
+# --------------------------------------------------
+class ControlDeAdmision:
+
+    def __init__(self):
+        self._semaforos = {}     # (loop, clase) -> Semaphore
+        self.en_curso = {clase: 0 for clase in CLASES}
+        self._metricas = {
+            clase: {"admitidas": 0, "rechazadas": 0, "limitadas": 0, "espera_total_ms": 0.0, "espera_max_ms": 0.0}
+            for clase in CLASES
+        }
+        self.limite_cliente = LimitePorCliente() if ADMISION_TASA_CLIENTE > 0 else None
+
+    async def admitir(self, clase: str, cliente: str):
+        """
+        Ocupa un lugar de la clase y devuelve el semáforo para liberarlo,
+        o None y la respuesta de rechazo.
+        """
+        limites = CLASES[clase]
+        metricas = self._metricas[clase]
+
+        if self.limite_cliente is not None:
+            espera = self.limite_cliente.tomar(cliente, limites["fichas"])
+            if espera:
+                metricas["limitadas"] += 1
+                return None, _rechazo(429, "LIMITE_DE_PETICIONES", "Demasiadas peticiones de este cliente.", espera)
+
+        # Carga total alta: las clases pesadas no entran
+        if sum(self.en_curso.values()) >= ADMISION_TOTAL * limites["umbral_total"]:
+            metricas["rechazadas"] += 1
+            return None, _rechazo(503, "SOBRECARGA", "El servicio está saturado, intentar de nuevo.", 1)
+
+        semaforo = self._semaforo(clase)
+        llegada = time.monotonic()
+
+        if semaforo.locked():
+            try:
+                await asyncio.wait_for(semaforo.acquire(), timeout=limites["espera_ms"] / 1000)
+            except asyncio.TimeoutError:
+                metricas["rechazadas"] += 1
+                return None, _rechazo(503, "SOBRECARGA", "El servicio está saturado, intentar de nuevo.", 1)
+        else:
+            await semaforo.acquire()
+
+        espera_ms = (time.monotonic() - llegada) * 1000
+        metricas["admitidas"] += 1
+        metricas["espera_total_ms"] += espera_ms
+        metricas["espera_max_ms"] = max(metricas["espera_max_ms"], espera_ms)
+        return semaforo, None
+
+    def _semaforo(self, clase: str) -> asyncio.Semaphore:
+        # Un semáforo por loop: cada worker tiene el suyo (y los tests, varios)
+        clave = (id(asyncio.get_running_loop()), clase)
+        semaforo = self._semaforos.get(clave)
+        if semaforo is None:
+            semaforo = self._semaforos[clave] = asyncio.Semaphore(CLASES[clase]["en_curso"])
+        return semaforo
+
+    def estado(self) -> dict:
+        return {
+            "habilitada": ADMISION,
+            "total_maximo": ADMISION_TOTAL,
+            "limite_por_cliente": ADMISION_TASA_CLIENTE or None,
+            "clases": {
+                clase: {
+                    "en_curso": self.en_curso[clase],
+                    "maximo": CLASES[clase]["en_curso"],
+                    "admitidas": metricas["admitidas"],
+                    "rechazadas": metricas["rechazadas"],
+                    "limitadas": metricas["limitadas"],
+                    "espera_promedio_ms": round(metricas["espera_total_ms"] / metricas["admitidas"], 2) if metricas["admitidas"] else 0,
+                    "espera_max_ms": round(metricas["espera_max_ms"], 2),
+                }
+                for clase, metricas in self._metricas.items()
+            },
+        }
+
+
+control = ControlDeAdmision()
+
+
+# --------------------------------------------------
+# Middleware ASGI
+# --------------------------------------------------
+class AdmisionMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISION:
+            await self.app(scope, receive, send)
+            return
+
+        ruta = scope["path"]
+        if ruta in RUTAS_EXENTAS or ruta.startswith(PREFIJOS_EXENTOS):
+            await self.app(scope, receive, send)
+            return
+
+        clase = clase_de_ruta(scope["method"], ruta, scope.get("query_string", b""))
+        semaforo, rechazo = await control.admitir(clase, _cliente(scope))
+        if rechazo is not None:
+            await rechazo(scope, receive, send)
+            return
+
+        control.en_curso[clase] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            control.en_curso[clase] -= 1
+            semaforo.release()
+
+
+def _cliente(scope) -> str:
+    # Solo el último salto es confiable: lo agrega el proxy de adelante
+    for nombre, valor in scope["headers"]:
+        if nombre == b"x-forwarded-for":
+            ultimo = valor.rsplit(b",", 1)[-1].strip()
+            if ultimo:
+                return ultimo.decode("latin-1")
+    cliente = scope.get("client")
+    return cliente[0] if cliente else "desconocido"
+
+
+def _rechazo(status: int, codigo: str, mensaje: str, reintentar: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        headers={"Retry-After": str(max(1, math.ceil(reintentar)))},
+        content={"success": False, "error_code": codigo, "message": mensaje},
+    )
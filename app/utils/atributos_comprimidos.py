@@ -0,0 +1,81 @@
+import json
+import os
+import zlib
+
+from boto3.dynamodb.types import Binary
+
+# --------------------------------------------------
+# Atributos de texto largos guardados comprimidos
+#
+# DynamoDB cobra la lectura por cada 4 KB del item completo, aunque la
+# consulta proyecte pocos campos. `descripcion` y `requisitos` son casi
+# todo el tamaño de trámites, proyectos y programas, así que al
+# escribirlos se guardan como binario zlib cuando pasan de
+# COMPRESION_ATRIBUTOS_MINIMO bytes (y si comprimidos ocupan menos):
+#
+#   b"\0Z1T" + zlib(texto utf-8)          descripcion
+#   b"\0Z1L" + zlib(lista en JSON)        requisitos
+#
+# La lectura es transparente: lectura_rapida descomprime todo binario con
+# esa marca al deserializar, y solo llega comprimido lo que la consulta
+# proyecta (los listados no piden estos campos). Los items viejos, sin
+# comprimir, se leen igual; scripts/comprimir_atributos los migra.
+#
+# COMPRESION_ATRIBUTOS=false deja de comprimir al escribir (lo ya
+# comprimido se sigue leyendo).
+# --------------------------------------------------
+
+COMPRESION_ATRIBUTOS = os.getenv("COMPRESION_ATRIBUTOS", "true").lower() != "false"
+COMPRESION_ATRIBUTOS_MINIMO = int(os.getenv("COMPRESION_ATRIBUTOS_MINIMO", "512"))
+
+ATRIBUTOS_COMPRIMIBLES = {"descripcion", "requisitos"}
+
+MARCA_TEXTO = b"\0Z1T"
+MARCA_LISTA = b"\0Z1L"
+NIVEL = 6
+
+
+def comprimir_valor(atributo: str, valor):
+    """El valor a escribir en `atributo`: comprimido si conviene, si no tal cual."""
+    if not COMPRESION_ATRIBUTOS or atributo not in ATRIBUTOS_COMPRIMIBLES:
+        return valor
+
+    if isinstance(valor, str):
+        marca, crudo = MARCA_TEXTO, valor.encode("utf-8")
+    elif isinstance(valor, list):
+        marca, crudo = MARCA_LISTA, json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    else:
+        return valor
+
+    if len(crudo) < COMPRESION_ATRIBUTOS_MINIMO:
+        return valor
+
+    comprimido = marca + zlib.compress(crudo, NIVEL)
+    return comprimido if len(comprimido) < len(crudo) else valor
+
+
+def comprimir_item(item: dict) -> dict:
+    """Copia del item con los atributos comprimibles ya comprimidos."""
+    return {atributo: comprimir_valor(atributo, valor) for atributo, valor in item.items()}
+
+
+def descomprimir_valor(valor):
+    """Texto o lista original si `valor` es un binario con marca; si no, el mismo valor."""
+    datos = valor.value if isinstance(valor, Binary) else valor
+    if not isinstance(datos, (bytes, bytearray)):
+        return valor
+
+    marca = bytes(datos[:4])
+    if marca == MARCA_TEXTO:
+        return zlib.decompress(datos[4:]).decode("utf-8")
+    if marca == MARCA_LISTA:
+        return json.loads(zlib.decompress(datos[4:]))
+    return valor
+
+
+def descomprimir_item(item: dict) -> dict:
+    """Descomprime en el lugar los atributos comprimibles (items del recurso boto3)."""
+    for atributo in ATRIBUTOS_COMPRIMIBLES:
+        if atributo in item:
+            item[atributo] = descomprimir_valor(item[atributo])
+    return item
@@ -0,0 +1,259 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+
+from boto3.dynamodb.conditions import Attr
+
+from utils.lectura_rapida import escanear
+from utils.texto import normalizar_frase, PALABRAS_VACIAS
+from utils.vigencia_indices import vigencia_indices, marca_de_construccion
+
+# --------------------------------------------------
+# Autocompletado por prefijo (arreglo ordenado + bisect)
+#
+# - Un arreglo ordenado por tipo con entradas (clave, id).
+# - La clave es el nombre normalizado desde el inicio de cada palabra
+#   significativa: "Ministerio de Salud" se encuentra con "minis" y con "sal".
+# - Buscar = bisect al prefijo y recorrer mientras coincida.
+# - Los handlers de crear/actualizar/habilitar lo mantienen al día.
+#
+# Igual que la búsqueda de trámites, vive en cada proceso y recibe los
+# cambios de otros procesos por la misma lectura del índice de cambios
+# (utils/vigencia_indices.py).
+# --------------------------------------------------
+
+# tipo -> (prefijo del SK del item, campo id, campo nombre)
+TIPOS = {
+    "institucion": ("METADATA", "id_institucion", "nombre"),
+    "tramite": ("TRAMITE#", "id_tramite", "nombre_tramite"),
+    "proyecto": ("PROYECTO#", "id_proyecto", "nombre"),
+    "programa": ("PROGRAMA#", "id_programa", "nombre"),
+}
+
+CAMPOS_FUENTE = ["PK", "SK", "habil"] + sorted({
+    campo for _, id_campo, nombre_campo in TIPOS.values() for campo in (id_campo, nombre_campo)
+})
+
+
+def claves(nombre: str) -> list:
+    """Sufijos del nombre normalizado que empiezan en cada palabra significativa."""
+    normalizado = normalizar_frase(nombre)
+
+    resultado = []
+    inicio = 0
+    for palabra in normalizado.split(" "):
+        if palabra and (inicio == 0 or palabra not in PALABRAS_VACIAS):
+            resultado.append(normalizado[inicio:])
+        inicio += len(palabra) + 1
+
+    return resultado
+
+
+class _Tipo:
+    """Entradas ordenadas de un tipo y los datos de cada documento."""
+
+    def __init__(self):
+        self.entradas = []        # [(clave, id_doc)] ordenado
+        self.documentos = {}      # id_doc -> {"id", "nombre", "habil"}
+        self.claves_doc = {}      # id_doc -> claves (para poder eliminar)
+
+    def indexar(self, id_doc: str, nombre: str, habil: bool):
+        self.eliminar(id_doc)
+
+        claves_doc = claves(nombre)
+        for clave in claves_doc:
+            insort(self.entradas, (clave, id_doc))
+
+        self.claves_doc[id_doc] = claves_doc
+        self.documentos[id_doc] = {"id": id_doc, "nombre": nombre, "habil": habil}
+
+    def eliminar(self, id_doc: str):
+        for clave in self.claves_doc.pop(id_doc, []):
+            posicion = bisect_left(self.entradas, (clave, id_doc))
+            if posicion < len(self.entradas) and self.entradas[posicion] == (clave, id_doc):
+                del self.entradas[posicion]
+        self.documentos.pop(id_doc, None)
+
+    def coincidencias(self, prefijo: str):
+        """(clave, id_doc) en orden alfabético mientras la clave empiece con el prefijo."""
+        entradas = self.entradas
+        posicion = bisect_left(entradas, (prefijo,))
+        while posicion < len(entradas) and entradas[posicion][0].startswith(prefijo):
+            yield entradas[posicion]
+            posicion += 1
+
+
+class IndicePrefijos:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._lock_construccion = threading.Lock()
+        self.tipos = {tipo: _Tipo() for tipo in TIPOS}
+        self.listo = False
+        self._construyendo = False
+        self._pendientes = []
+
+    # ------------------------------
+    # Mantenimiento
+    # ------------------------------
+    def indexar(self, tipo: str, item: dict):
+        _, id_campo, nombre_campo = TIPOS[tipo]
+        datos = (tipo, item[id_campo], item[nombre_campo], item.get("habil", True))
+
+        with self._lock:
+            if self._construyendo:
+                self._pendientes.append(("indexar", datos))
+            self.tipos[tipo].indexar(*datos[1:])
+
+    def actualizar_habil(self, tipo: str, id_doc: str, habil: bool):
+        with self._lock:
+            if self._construyendo:
+                self._pendientes.append(("habil", (tipo, id_doc, habil)))
+            self._actualizar_habil(self.tipos, tipo, id_doc, habil)
+
+    @staticmethod
+    def _actualizar_habil(tipos: dict, tipo: str, id_doc: str, habil: bool):
+        documento = tipos[tipo].documentos.get(id_doc)
+        if documento is not None:
+            documento["habil"] = habil
+
+    # ------------------------------
+    # Construcción
+    # ------------------------------
+    def construir(self, items):
+        """Reemplaza el contenido con los items de la tabla y aplica los cambios recibidos mientras tanto."""
+        nuevos = {tipo: _Tipo() for tipo in TIPOS}
+
+        for item in items:
+            tipo = tipo_de(item)
+            if tipo is None:
+                continue
+
+            _, id_campo, nombre_campo = TIPOS[tipo]
+            destino = nuevos[tipo]
+            id_doc = item[id_campo]
+            claves_doc = claves(item[nombre_campo])
+
+            # Sin insort: se ordena una sola vez al final
+            destino.entradas.extend((clave, id_doc) for clave in claves_doc)
+            destino.claves_doc[id_doc] = claves_doc
+            destino.documentos[id_doc] = {"id": id_doc, "nombre": item[nombre_campo], "habil": item.get("habil", True)}
+
+        for destino in nuevos.values():
+            destino.entradas.sort()
+
+        with self._lock:
+            for operacion, datos in self._pendientes:
+                if operacion == "indexar":
+                    nuevos[datos[0]].indexar(*datos[1:])
+                else:
+                    self._actualizar_habil(nuevos, *datos)
+
+            self.tipos = nuevos
+            self._pendientes = []
+            self._construyendo = False
+            self.listo = True
+
+    def asegurar(self):
+        """Construye el índice si todavía no existe y, si toca, trae los cambios de otros procesos."""
+        if not self.listo:
+            self._construir()
+        vigencia_indices.verificar()
+
+    def reconstruir(self):
+        """Vuelve a escanear; mientras tanto se sigue sugiriendo con el contenido actual."""
+        if self.listo:
+            self._construir(forzar=True)
+
+    def aplicar_cambio(self, item: dict):
+        """Item leído del índice de cambios (instituciones e hijos; el resto se ignora)."""
+        tipo = tipo_de(item)
+        if tipo is not None:
+            self.indexar(tipo, item)
+
+    def _construir(self, forzar: bool = False):
+        with self._lock_construccion:
+            if self.listo and not forzar:
+                return
+
+            with self._lock:
+                self._construyendo = True
+
+            desde = marca_de_construccion()
+            try:
+                self.construir(escanear(filtro=_filtro_fuente(), proyeccion=CAMPOS_FUENTE))
+            except Exception:
+                with self._lock:
+                    self._construyendo = False
+                    self._pendientes = []
+                raise
+
+        vigencia_indices.construido(desde)
+
+    # ------------------------------
+    # Consulta
+    # ------------------------------
+    def sugerir(self, prefijo: str, tipo: str = None, limite: int = 10, habil=None) -> list:
+        prefijo = normalizar_frase(prefijo)
+        if not prefijo:
+            return []
+
+        tipos = [tipo] if tipo is not None else list(TIPOS)
+
+        with self._lock:
+            # Une los tipos en orden alfabético de clave
+            coincidencias = heapq.merge(*[
+                _etiquetar(t, self.tipos[t].coincidencias(prefijo))
+                for t in tipos
+            ])
+
+            vistos = set()
+            resultados = []
+            for _, t, id_doc in coincidencias:
+                # Un nombre puede coincidir por varias palabras: se devuelve una vez
+                if (t, id_doc) in vistos:
+                    continue
+                vistos.add((t, id_doc))
+
+                documento = self.tipos[t].documentos[id_doc]
+                if habil is not None and documento["habil"] != habil:
+                    continue
+
+                resultados.append({"tipo": t, **documento})
+                if len(resultados) >= limite:
+                    break
+
+            return resultados
+
+    def estado(self) -> dict:
+        return {
+            "listo": self.listo,
+            **{tipo: len(datos.documentos) for tipo, datos in self.tipos.items()},
+        }
+
+
+def _etiquetar(tipo: str, coincidencias):
+    for clave, id_doc in coincidencias:
+        yield clave, tipo, id_doc
+
+
+def tipo_de(item: dict):
+    sk = item.get("SK", "")
+    if sk == "METADATA":
+        return "institucion" if item.get("PK", "").startswith("INSTITUCION#") else None
+
+    for tipo, (prefijo_sk, _, _) in TIPOS.items():
+        if prefijo_sk != "METADATA" and sk.startswith(prefijo_sk):
+            return tipo
+    return None
+
+
+def _filtro_fuente():
+    filtro = Attr("PK").begins_with("INSTITUCION#") & Attr("SK").eq("METADATA")
+    for prefijo_sk, _, _ in TIPOS.values():
+        if prefijo_sk != "METADATA":
+            filtro = filtro | Attr("SK").begins_with(prefijo_sk)
+    return filtro
+
+
+indice_nombres = vigencia_indices.registrar(IndicePrefijos())
@@ -0,0 +1,283 @@
+import heapq
+import json
+import math
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+
+from boto3.dynamodb.conditions import Attr
+
+from utils.cambios import MARGEN_RELOJ, tipo_e_id
+from utils.lectura_rapida import escanear
+from utils.texto import tokenizar
+from utils.vigencia_indices import vigencia_indices, marca_de_construccion
+
+# --------------------------------------------------
+# Índice invertido en memoria para la búsqueda de trámites
+#
+# - Se construye con un scan de la tabla (o desde un snapshot JSON).
+# - Los handlers de crear/actualizar/habilitar lo mantienen al día.
+# - Ranking BM25 con peso por campo (el nombre pesa más).
+# - Cada posting guarda el término tf de BM25 ya saturado, calculado con
+#   la longitud promedio de la última construcción; consultar es solo
+#   multiplicar por el idf y quedarse con los mejores.
+#
+# Nota: el índice vive en cada proceso. Los cambios hechos por otros
+# workers o por otras Lambdas llegan por el índice de cambios
+# (utils/vigencia_indices.py), a lo sumo INDICES_VERIFICACION segundos
+# después más la lectura en segundo plano.
+# --------------------------------------------------
+
+BUSQUEDA_SNAPSHOT = os.getenv("BUSQUEDA_SNAPSHOT")
+
+PESOS = {
+    "nombre_tramite": 3.0,
+    "requisitos": 1.5,
+    "descripcion": 1.0,
+}
+
+# Parámetros de BM25
+K1 = 1.2
+B = 0.75
+
+CAMPOS_DOCUMENTO = ["id_tramite", "id_institucion", "nombre_tramite", "habil"]
+CAMPOS_FUENTE = CAMPOS_DOCUMENTO + ["descripcion", "requisitos"]
+
+
+class IndiceInvertido:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._lock_construccion = threading.Lock()
+        self._limpiar()
+        self.listo = False
+        self._construyendo = False
+        self._pendientes = []
+
+    def _limpiar(self):
+        self.postings = {}        # termino -> {id_doc: tf saturado (BM25)}
+        self.terminos_doc = {}    # id_doc -> términos (para poder eliminar)
+        self.documentos = {}      # id_doc -> datos para la respuesta
+        self.longitud_promedio = None
+
+    # ------------------------------
+    # Mantenimiento
+    # ------------------------------
+    def indexar(self, item: dict):
+        with self._lock:
+            if self._construyendo:
+                self._pendientes.append(("indexar", dict(item)))
+            self._indexar(item)
+
+    def _indexar(self, item: dict, frecuencias: Counter = None):
+        id_doc = item["id_tramite"]
+        self._eliminar(id_doc)
+
+        if frecuencias is None:
+            frecuencias = _frecuencias(item)
+
+        longitud = sum(frecuencias.values())
+        if self.longitud_promedio is None:
+            self.longitud_promedio = longitud or 1.0
+
+        normalizacion = K1 * (1 - B + B * longitud / self.longitud_promedio)
+        for termino, frecuencia in frecuencias.items():
+            self.postings.setdefault(termino, {})[id_doc] = frecuencia * (K1 + 1) / (frecuencia + normalizacion)
+
+        self.terminos_doc[id_doc] = list(frecuencias)
+        self.documentos[id_doc] = {campo: item.get(campo) for campo in CAMPOS_DOCUMENTO}
+
+    def _eliminar(self, id_doc: str):
+        for termino in self.terminos_doc.pop(id_doc, []):
+            documentos = self.postings.get(termino)
+            if documentos is not None:
+                documentos.pop(id_doc, None)
+                if not documentos:
+                    del self.postings[termino]
+
+        self.documentos.pop(id_doc, None)
+
+    def actualizar_habil(self, id_doc: str, habil: bool):
+        with self._lock:
+            if self._construyendo:
+                self._pendientes.append(("habil", (id_doc, habil)))
+            self._actualizar_habil(id_doc, habil)
+
+    def _actualizar_habil(self, id_doc: str, habil: bool):
+        if id_doc in self.documentos:
+            self.documentos[id_doc]["habil"] = habil
+
+    # ------------------------------
+    # Construcción
+    # ------------------------------
+    def construir(self, items):
+        """Reemplaza el contenido con los items dados y aplica los cambios recibidos mientras tanto."""
+        analizados = [(item, _frecuencias(item)) for item in items]
+
+        nuevo = IndiceInvertido()
+        if analizados:
+            total = sum(sum(frecuencias.values()) for _, frecuencias in analizados)
+            nuevo.longitud_promedio = total / len(analizados) or 1.0
+
+        for item, frecuencias in analizados:
+            nuevo._indexar(item, frecuencias)
+
+        with self._lock:
+            for operacion, datos in self._pendientes:
+                if operacion == "indexar":
+                    nuevo._indexar(datos)
+                else:
+                    nuevo._actualizar_habil(*datos)
+
+            self.postings = nuevo.postings
+            self.terminos_doc = nuevo.terminos_doc
+            self.documentos = nuevo.documentos
+            self.longitud_promedio = nuevo.longitud_promedio
+            self._pendientes = []
+            self._construyendo = False
+            self.listo = True
+
+    def asegurar(self):
+        """
+        Construye el índice si todavía no existe (la primera búsqueda paga
+        el costo) y, si toca, trae en segundo plano los cambios de otros procesos.
+        """
+        if not self.listo:
+            self._construir()
+        vigencia_indices.verificar()
+
+    def reconstruir(self):
+        """Vuelve a leer la fuente; mientras tanto se sigue buscando en el contenido actual."""
+        if self.listo:
+            self._construir(forzar=True)
+
+    def aplicar_cambio(self, item: dict):
+        """Item leído del índice de cambios (puede ser de cualquier tipo)."""
+        if tipo_e_id(item)[0] == "TRAMITE":
+            self.indexar(item)
+
+    def _construir(self, forzar: bool = False):
+        # Un solo hilo construye; los demás esperan el resultado
+        with self._lock_construccion:
+            if self.listo and not forzar:
+                return
+
+            with self._lock:
+                self._construyendo = True
+
+            try:
+                # El snapshot sirve para arrancar; una reconstrucción lee la tabla
+                if not forzar and BUSQUEDA_SNAPSHOT and os.path.exists(BUSQUEDA_SNAPSHOT):
+                    documentos, desde = cargar_snapshot(BUSQUEDA_SNAPSHOT)
+                else:
+                    desde = marca_de_construccion()
+                    documentos = escanear_tramites()
+                self.construir(documentos)
+            except Exception:
+                with self._lock:
+                    self._construyendo = False
+                    self._pendientes = []
+                raise
+
+        # Los cambios posteriores a la fuente se leen del GSI4
+        vigencia_indices.construido(desde)
+
+    # ------------------------------
+    # Consulta
+    # ------------------------------
+    def buscar(self, consulta: str, limite: int = 20, habil=None) -> list:
+        terminos = set(tokenizar(consulta))
+        if not terminos:
+            return []
+
+        with self._lock:
+            documentos = self.documentos
+            total = len(documentos)
+            listas = [self.postings[t] for t in terminos if t in self.postings]
+            if not listas:
+                return []
+
+            if len(listas) == 1:
+                # Un solo término: el idf no cambia el orden
+                idf = _idf(total, len(listas[0]))
+                puntajes = {id_doc: idf * tf for id_doc, tf in listas[0].items()}
+            else:
+                puntajes = {}
+                for postings in listas:
+                    idf = _idf(total, len(postings))
+                    for id_doc, tf in postings.items():
+                        puntajes[id_doc] = puntajes.get(id_doc, 0.0) + idf * tf
+
+            candidatos = puntajes.items()
+            if habil is not None:
+                candidatos = [(id_doc, p) for id_doc, p in candidatos if documentos[id_doc]["habil"] == habil]
+
+            # Solo los mejores `limite`: evita ordenar todos los documentos que coinciden
+            mejores = heapq.nlargest(limite, candidatos, key=lambda par: par[1])
+
+            return [
+                {**documentos[id_doc], "puntaje": round(puntaje, 4)}
+                for id_doc, puntaje in mejores
+            ]
+
+    def estado(self) -> dict:
+        return {
+            "listo": self.listo,
+            "documentos": len(self.documentos),
+            "terminos": len(self.postings),
+        }
+
+
+def _idf(total: int, con_termino: int) -> float:
+    return math.log(1 + (total - con_termino + 0.5) / (con_termino + 0.5))
+
+
+def _frecuencias(item: dict) -> Counter:
+    """Frecuencia de cada término, ponderada por el campo donde aparece."""
+    frecuencias = Counter()
+    for campo, peso in PESOS.items():
+        valor = item.get(campo)
+        if isinstance(valor, list):
+            valor = " ".join(valor)
+        for termino, cantidad in Counter(tokenizar(valor or "")).items():
+            frecuencias[termino] += peso * cantidad
+    return frecuencias
+
+
+def escanear_tramites():
+    return escanear(
+        filtro=Attr("SK").begins_with("TRAMITE#"),
+        proyeccion=CAMPOS_FUENTE,
+    )
+
+
+# --------------------------------------------------
+# Snapshot (evita el scan al arrancar)
+# --------------------------------------------------
+def guardar_snapshot(ruta: str) -> int:
+    """Escribe los trámites actuales en un archivo JSON. Devuelve la cantidad."""
+    # La versión es el inicio del scan: lo que cambie después llega por el GSI4
+    version = marca_de_construccion()
+    documentos = list(escanear_tramites())
+
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump({"version": version, "documentos": documentos}, archivo, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+    return len(documentos)
+
+
+def cargar_snapshot(ruta: str) -> tuple:
+    """(documentos, versión). Los snapshots anteriores (solo la lista) usan la fecha del archivo."""
+    with open(ruta, encoding="utf-8") as archivo:
+        contenido = json.load(archivo)
+
+    if isinstance(contenido, list):
+        modificado = datetime.utcfromtimestamp(os.path.getmtime(ruta)) - MARGEN_RELOJ
+        return contenido, modificado.isoformat()
+    return contenido["documentos"], contenido["version"]
+
+
+indice_tramites = vigencia_indices.registrar(IndiceInvertido())
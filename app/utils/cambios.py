@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+# --------------------------------------------------
+# Índice de cambios para sincronización incremental (GSI4)
+#
+#   GSI4PK = CAMBIOS#<YYYY-MM>                    (mes de fecha_actualizacion)
+#   GSI4SK = <fecha_actualizacion>#<TIPO>#<id>
+#
+# Cada escritura que toca fecha_actualizacion reescribe las dos claves,
+# así que un registro aparece una sola vez: en su último cambio.
+# El historial se recorre en orden consultando mes por mes (sin scan).
+# Se particiona por mes y no por día: el catálogo cambia poco y un
+# "desde" de hace meses costaría una consulta por cada día vacío.
+# --------------------------------------------------
+
+# tipo -> campo id del registro
+TIPOS_CAMBIO = {
+    "INSTITUCION": "id_institucion",
+    "TRAMITE": "id_tramite",
+    "PROYECTO": "id_proyecto",
+    "PROGRAMA": "id_programa",
+    "REQUISITO": "id_requisito",
+}
+
+# Margen por diferencias de reloj entre quien lee el índice y quien
+# escribe: un cambio con fecha anterior a la última leída (reloj
+# atrasado, o confirmado después que otros) queda dentro del margen
+MARGEN_RELOJ = timedelta(seconds=60)
+
+# Fragmento para UpdateExpression (junto con valores_cambio)
+SET_CAMBIO = "GSI4PK = :gsi4pk, GSI4SK = :gsi4sk"
+
+
+def particion_mes(mes: str) -> str:
+    return f"CAMBIOS#{mes}"
+
+
+def claves_gsi4(tipo: str, id_registro: str, fecha: str) -> dict:
+    return {
+        "GSI4PK": particion_mes(fecha[:7]),
+        "GSI4SK": f"{fecha}#{tipo}#{id_registro}",
+    }
+
+
+def valores_cambio(tipo: str, id_registro: str, fecha: str) -> dict:
+    claves = claves_gsi4(tipo, id_registro, fecha)
+    return {":gsi4pk": claves["GSI4PK"], ":gsi4sk": claves["GSI4SK"]}
+
+
+def releer_desde(desde: str) -> str:
+    """GSI4SK (o fecha) desde donde volver a consultar: MARGEN_RELOJ antes."""
+    return (datetime.fromisoformat(desde.split("#", 1)[0]) - MARGEN_RELOJ).isoformat()
+
+
+def meses_desde(mes: str, hasta: datetime):
+    """Meses (YYYY-MM) desde `mes` hasta el mes de `hasta`, en orden."""
+    anio, numero = int(mes[:4]), int(mes[5:7])
+    while (anio, numero) <= (hasta.year, hasta.month):
+        yield f"{anio:04d}-{numero:02d}"
+        anio, numero = (anio + 1, 1) if numero == 12 else (anio, numero + 1)
+
+
+def tipo_e_id(item: dict) -> tuple:
+    """(TIPO, id) a partir del GSI4SK del item."""
+    _, tipo, id_registro = item["GSI4SK"].rsplit("#", 2)
+    return tipo, id_registro
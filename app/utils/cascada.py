@@ -0,0 +1,373 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from database import TABLE_NAME
+from utils.autocompletado import indice_nombres
+from utils.busqueda import indice_tramites
+from utils.cambios import SET_CAMBIO, valores_cambio
+from utils.contadores import CONTADORES, clave_institucion
+from utils.id_generator import generate_id
+from utils.lectura_rapida import consultar, obtener_item
+from utils.lote import con_reintentos
+from utils.transacciones import client, actualizar, escribir, TransaccionCancelada, motivos_cancelacion
+
+# --------------------------------------------------
+# Habilitar / deshabilitar en cascada los hijos de una institución
+#
+# - Recorre la partición de la institución página por página.
+# - Los hijos de cada página que cambian se escriben en transacciones de
+#   hasta HIJOS_POR_TRANSACCION, cada hijo con la condición de que habil
+#   cambie de verdad, más un solo ADD con el cambio de activos de la
+#   institución: el contador se mueve siempre junto con habil, aunque el
+#   proceso muera a mitad de una página. Las transacciones de una página
+#   van una tras otra: todas tocan el item de la institución, y en
+#   paralelo DynamoDB las cancelaría por TransactionConflict.
+# - Si DynamoDB cancela una transacción por conflicto o falta de
+#   capacidad se reintenta (utils/lote). Si la cancela porque un hijo ya
+#   cambió (otro proceso), ese hijo cuenta como sin_cambio y se repite
+#   con el resto.
+# - Antes de tocar un hijo, el proceso toma el trabajo (propietario y
+#   vencimiento en su registro, SK CASCADA#<id>). Mientras la toma no
+#   venza, otro proceso que reanude el mismo trabajo devuelve el avance
+#   sin procesar nada. Al terminar cada página se guarda el avance con
+#   la condición de seguir siendo el propietario; al salir se suelta.
+# - Una petición trabaja hasta CASCADA_TIEMPO_MAXIMO segundos; lo que
+#   falte se continúa con POST .../cascada/{id_trabajo}/reanudar.
+#
+# Si el proceso muere a mitad de una página, los hijos ya escritos de
+# esa página cuentan como sin_cambio al reanudar (el avance del trabajo
+# no los ve), pero los activos de la institución quedan correctos.
+#
+# Deshabilitar marca a cada hijo que apaga (DESHABILITADO_EN_CASCADA), y
+# habilitar solo enciende los marcados: los que un operador deshabilitó
+# uno por uno siguen deshabilitados (cuentan como sin_cambio). Habilitar
+# o deshabilitar un hijo individualmente quita la marca.
+# --------------------------------------------------
+
+CASCADA_TIEMPO_MAXIMO = float(os.getenv("CASCADA_TIEMPO_MAXIMO", "20"))
+
+# Segundos que la toma de un trabajo dura más allá de su tiempo máximo:
+# cubre la última página y, si el proceso muere, es lo que espera un
+# reanudar antes de poder continuar
+CASCADA_MARGEN_TOMA = float(os.getenv("CASCADA_MARGEN_TOMA", "60"))
+
+TAMANO_PAGINA = 200
+
+# Hijos por transacción: DynamoDB acepta 100 operaciones, una es el ADD
+HIJOS_POR_TRANSACCION = 99
+
+DESHABILITADO_EN_CASCADA = "deshabilitado_en_cascada"
+
+# Ids de hijos que no se pudieron actualizar que se guardan en el trabajo
+MAXIMO_IDS_FALLIDOS = 50
+
+# Campos que cambian con cada página
+CAMPOS_AVANCE = [
+    "estado",
+    "paginas",
+    "procesados",
+    "actualizados",
+    "sin_cambio",
+    "fallidos",
+    "ids_fallidos",
+    "fecha_actualizacion",
+]
+
+CAMPOS_TRABAJO = [
+    "id_trabajo",
+    "id_institucion",
+    "habil",
+    *CAMPOS_AVANCE,
+    "ultima_clave",
+    "fecha_creacion",
+]
+
+
+def clave_trabajo(id_institucion: str, id_trabajo: str) -> dict:
+    return {"PK": f"INSTITUCION#{id_institucion}", "SK": f"CASCADA#{id_trabajo}"}
+
+
+def nuevo_trabajo(id_institucion: str, id_trabajo: str, habil: bool, now: str) -> dict:
+    return {
+        **clave_trabajo(id_institucion, id_trabajo),
+        "id_trabajo": id_trabajo,
+        "id_institucion": id_institucion,
+        "habil": habil,
+        "estado": "en_curso",
+        "paginas": 0,
+        "procesados": 0,
+        "actualizados": 0,
+        "sin_cambio": 0,
+        "fallidos": 0,
+        "ids_fallidos": [],
+        "fecha_creacion": now,
+        "fecha_actualizacion": now,
+    }
+
+
+def iniciar(id_institucion: str, habil: bool) -> dict:
+    """Registra un trabajo nuevo y lo ejecuta hasta terminar o agotar el tiempo."""
+    now = datetime.utcnow().isoformat()
+    trabajo = nuevo_trabajo(id_institucion, generate_id("CSC-"), habil, now)
+
+    client.put_item(
+        TableName=TABLE_NAME,
+        Item=trabajo,
+        ConditionExpression="attribute_not_exists(PK)",
+    )
+    return ejecutar(trabajo)
+
+
+def obtener(id_institucion: str, id_trabajo: str):
+    return obtener_item(clave_trabajo(id_institucion, id_trabajo), proyeccion=CAMPOS_TRABAJO)
+
+
+def ejecutar(trabajo: dict, tiempo_maximo: float = None) -> dict:
+    """Procesa páginas hasta terminar, agotar el tiempo o perder el trabajo frente a otro proceso."""
+    if trabajo["estado"] != "en_curso":
+        return trabajo
+
+    tiempo_maximo = CASCADA_TIEMPO_MAXIMO if tiempo_maximo is None else tiempo_maximo
+    limite = time.monotonic() + tiempo_maximo
+    propietario = generate_id("EJC-")
+
+    if not _tomar(trabajo, propietario, tiempo_maximo + CASCADA_MARGEN_TOMA):
+        # Otro proceso lo está ejecutando: se devuelve su avance
+        return obtener(trabajo["id_institucion"], trabajo["id_trabajo"])
+
+    try:
+        while trabajo["estado"] == "en_curso" and time.monotonic() < limite:
+            siguiente = _procesar_pagina(trabajo, propietario)
+            if siguiente is None:
+                # La toma venció y otro proceso avanzó el trabajo
+                return obtener(trabajo["id_institucion"], trabajo["id_trabajo"])
+            trabajo = siguiente
+    finally:
+        _soltar(trabajo, propietario)
+
+    return trabajo
+
+
+def _tomar(trabajo: dict, propietario: str, segundos: float) -> bool:
+    ahora = datetime.utcnow()
+    try:
+        client.update_item(
+            TableName=TABLE_NAME,
+            Key=clave_trabajo(trabajo["id_institucion"], trabajo["id_trabajo"]),
+            UpdateExpression="SET #propietario = :propietario, #vence = :vence",
+            ConditionExpression=(
+                "#estado = :en_curso AND (attribute_not_exists(#propietario)"
+                " OR #propietario = :propietario OR #vence < :ahora)"
+            ),
+            ExpressionAttributeNames={"#propietario": "propietario", "#vence": "vence", "#estado": "estado"},
+            ExpressionAttributeValues={
+                ":propietario": propietario,
+                ":vence": (ahora + timedelta(seconds=segundos)).isoformat(),
+                ":ahora": ahora.isoformat(),
+                ":en_curso": "en_curso",
+            },
+        )
+    except ClientError as error:
+        if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+    return True
+
+
+def _soltar(trabajo: dict, propietario: str):
+    try:
+        client.update_item(
+            TableName=TABLE_NAME,
+            Key=clave_trabajo(trabajo["id_institucion"], trabajo["id_trabajo"]),
+            UpdateExpression="REMOVE #propietario, #vence",
+            ConditionExpression="#propietario = :propietario",
+            ExpressionAttributeNames={"#propietario": "propietario", "#vence": "vence"},
+            ExpressionAttributeValues={":propietario": propietario},
+        )
+    except ClientError as error:
+        # Ya la tomó otro proceso (venció): no se toca
+        if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+
+
+# --------------------------------------------------
+# Una página
+# --------------------------------------------------
+def _procesar_pagina(trabajo: dict, propietario: str):
+    id_institucion = trabajo["id_institucion"]
+    habil = trabajo["habil"]
+    now = datetime.utcnow().isoformat()
+
+    response = consultar(
+        Key("PK").eq(f"INSTITUCION#{id_institucion}"),
+        proyeccion=["PK", "SK", "habil", DESHABILITADO_EN_CASCADA],
+        limite=TAMANO_PAGINA,
+        inicio=trabajo.get("ultima_clave"),
+    )
+
+    hijos = [item for item in response.get("Items", []) if _tipo(item) in CONTADORES]
+    resultados = [(*_tipo_e_id(item), "sin_cambio") for item in hijos if not _debe_cambiar(item, habil)]
+
+    por_escribir = [item for item in hijos if _debe_cambiar(item, habil)]
+    for posicion in range(0, len(por_escribir), HIJOS_POR_TRANSACCION):
+        grupo = por_escribir[posicion:posicion + HIJOS_POR_TRANSACCION]
+        resultados.extend(_cambiar_grupo(id_institucion, grupo, habil, now))
+
+    actualizados = [(tipo, id_hijo) for tipo, id_hijo, resultado in resultados if resultado == "actualizado"]
+    fallidos = [id_hijo for _, id_hijo, resultado in resultados if resultado == "fallido"]
+    ultima_clave = response.get("LastEvaluatedKey")
+
+    siguiente = {
+        **trabajo,
+        "estado": "en_curso" if ultima_clave else "completado",
+        "paginas": trabajo["paginas"] + 1,
+        "procesados": trabajo["procesados"] + len(resultados),
+        "actualizados": trabajo["actualizados"] + len(actualizados),
+        "sin_cambio": trabajo["sin_cambio"] + len(resultados) - len(actualizados) - len(fallidos),
+        "fallidos": trabajo["fallidos"] + len(fallidos),
+        "ids_fallidos": (trabajo["ids_fallidos"] + fallidos)[:MAXIMO_IDS_FALLIDOS],
+        "fecha_actualizacion": now,
+    }
+    siguiente.pop("ultima_clave", None)
+    if ultima_clave:
+        siguiente["ultima_clave"] = ultima_clave
+
+    # Los hijos ya están escritos, se guarde o no el avance
+    for tipo, id_hijo in actualizados:
+        indice_nombres.actualizar_habil(tipo.lower(), id_hijo, habil)
+        if tipo == "TRAMITE":
+            indice_tramites.actualizar_habil(id_hijo, habil)
+
+    try:
+        client.update_item(TableName=TABLE_NAME, **_guardar_avance(trabajo, siguiente, propietario))
+    except ClientError as error:
+        if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return None
+        raise
+
+    return siguiente
+
+
+def _guardar_avance(anterior: dict, siguiente: dict, propietario: str) -> dict:
+    campos = list(CAMPOS_AVANCE)
+    if "ultima_clave" in siguiente:
+        campos.append("ultima_clave")
+
+    expresion = "SET " + ", ".join(f"#{campo} = :{campo}" for campo in campos)
+    if "ultima_clave" not in siguiente:
+        expresion += " REMOVE #ultima_clave"
+
+    return {
+        "Key": clave_trabajo(anterior["id_institucion"], anterior["id_trabajo"]),
+        "UpdateExpression": expresion,
+        "ExpressionAttributeValues": {
+            **{f":{campo}": siguiente[campo] for campo in campos},
+            ":paginas_anterior": anterior["paginas"],
+            ":propietario": propietario,
+        },
+        "ExpressionAttributeNames": {
+            **{f"#{campo}": campo for campo in [*CAMPOS_AVANCE, "ultima_clave"]},
+            "#propietario": "propietario",
+        },
+        "ConditionExpression": "#paginas = :paginas_anterior AND #propietario = :propietario",
+    }
+
+
+# --------------------------------------------------
+# Hijos
+# --------------------------------------------------
+def _tipo(item: dict) -> str:
+    return item["SK"].split("#", 1)[0]
+
+
+def _tipo_e_id(item: dict) -> tuple:
+    tipo, id_hijo = item["SK"].split("#", 1)
+    return tipo, id_hijo
+
+
+def _debe_cambiar(item: dict, habil: bool) -> bool:
+    # Ya está en el estado pedido: no se escribe
+    if item.get("habil") == habil:
+        return False
+
+    # Deshabilitado por un operador, no por una cascada: se respeta
+    return not habil or bool(item.get(DESHABILITADO_EN_CASCADA))
+
+
+def _cambiar_grupo(id_institucion: str, grupo: list, habil: bool, now: str) -> list:
+    """Devuelve [(tipo, id, "actualizado" | "sin_cambio" | "fallido")]."""
+    resultados = []
+    pendientes = list(grupo)
+
+    while pendientes:
+        operaciones = [
+            *(_actualizacion_hijo(item, habil, now) for item in pendientes),
+            _ajuste_activos(id_institucion, pendientes, habil),
+        ]
+        try:
+            con_reintentos(lambda: escribir(operaciones))
+        except TransaccionCancelada as error:
+            motivos = motivos_cancelacion(error)[:len(pendientes)]
+            cambiados = {i for i, motivo in enumerate(motivos) if motivo == "ConditionalCheckFailed"}
+            if not cambiados:
+                # Reintentos agotados o la institución ya no existe
+                resultados.extend((*_tipo_e_id(item), "fallido") for item in pendientes)
+                return resultados
+
+            # Otro proceso ya cambió esos hijos: se repite sin ellos
+            resultados.extend((*_tipo_e_id(pendientes[i]), "sin_cambio") for i in sorted(cambiados))
+            pendientes = [item for i, item in enumerate(pendientes) if i not in cambiados]
+            continue
+        except ClientError:
+            resultados.extend((*_tipo_e_id(item), "fallido") for item in pendientes)
+            return resultados
+
+        resultados.extend((*_tipo_e_id(item), "actualizado") for item in pendientes)
+        return resultados
+
+    return resultados
+
+
+def _actualizacion_hijo(item: dict, habil: bool, now: str) -> dict:
+    tipo, id_hijo = _tipo_e_id(item)
+
+    expresion = "SET #habil = :habil, fecha_actualizacion = :fecha, " + SET_CAMBIO
+    valores = {
+        ":habil": habil,
+        ":fecha": now,
+        **valores_cambio(tipo, id_hijo, now),
+    }
+    if habil:
+        expresion += " REMOVE #cascada"
+        condicion = "#habil <> :habil AND #cascada = :marca"
+    else:
+        expresion += ", #cascada = :marca"
+        condicion = "#habil <> :habil"
+    valores[":marca"] = True
+
+    return actualizar(
+        {"PK": item["PK"], "SK": item["SK"]},
+        expresion,
+        valores,
+        nombres={"#habil": "habil", "#cascada": DESHABILITADO_EN_CASCADA},
+        condicion=condicion,
+    )
+
+
+def _ajuste_activos(id_institucion: str, hijos: list, habil: bool) -> dict:
+    """Un solo ADD sobre la institución con el cambio de activos de cada tipo."""
+    cambios = {}
+    for item in hijos:
+        tipo = _tipo(item)
+        cambios[tipo] = cambios.get(tipo, 0) + (1 if habil else -1)
+
+    return actualizar(
+        clave_institucion(id_institucion),
+        "ADD " + ", ".join(f"{CONTADORES[tipo][1]} :{tipo.lower()}" for tipo in cambios),
+        {f":{tipo.lower()}": cantidad for tipo, cantidad in cambios.items()},
+        condicion="attribute_exists(PK)",
+    )
@@ -0,0 +1,359 @@
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+from boto3.dynamodb.conditions import Attr, Key
+
+from utils.cambios import MARGEN_RELOJ, particion_mes, meses_desde, releer_desde, tipo_e_id
+from utils.lectura_rapida import consultar, escanear
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json estándar
+    orjson = None
+
+# --------------------------------------------------
+# Snapshot del catálogo público (solo lectura)
+#
+# scripts/snapshot_catalogo compila las instituciones y sus trámites
+# hábiles en un archivo binario indexado que se empaqueta con la Lambda.
+# Con CATALOGO_SNAPSHOT=<archivo>, los GET de instituciones y trámites
+# leen de ese archivo (mmap, sin cargarlo entero) y solo van a DynamoDB
+# para lo que no está o cambió después del snapshot.
+#
+# Formato (little endian):
+#
+#   cabecera  "<8sIII"   MAGIA, FORMATO, cantidad de entradas, largo de meta
+#   meta      JSON       {"version", "generado", "instituciones", "tramites"}
+#   índice    "<48sQI"   clave, posición y largo del valor; ordenado por clave
+#   valores   JSON       uno por entrada
+#
+# Claves:
+#   I/<id_institucion>   item de la institución
+#   T/<id_tramite>       item del trámite (solo hábiles)
+#   LI                   [{id_institucion, nombre, habil}]
+#   LT/<id_institucion>  [{id_tramite, nombre_tramite, habil}] (hábiles)
+#
+# Vigencia: `version` es el instante en que empezó la generación. Cada
+# CATALOGO_VERIFICACION segundos se consulta el índice de cambios (GSI4)
+# desde esa versión; lo que cambió desde entonces (y las listas y
+# contadores que lo contienen) se lee de DynamoDB. Con más de
+# MAXIMO_CAMBIOS cambios, o si se corrigió un requisito compartido
+# (utils/requisitos.py), el snapshot se da por vencido entero.
+# --------------------------------------------------
+
+CATALOGO_SNAPSHOT = os.getenv("CATALOGO_SNAPSHOT")
+CATALOGO_VERIFICACION = float(os.getenv("CATALOGO_VERIFICACION", "30"))
+
+MAGIA = b"DGIDACAT"
+FORMATO = 1
+CABECERA = struct.Struct("<8sIII")
+ENTRADA = struct.Struct("<48sQI")
+
+MAXIMO_CAMBIOS = 1000
+
+ATRIBUTOS_INDICES = {"PK", "SK", "GSI1PK", "GSI1SK", "GSI2PK", "GSI2SK", "GSI3PK", "GSI3SK", "GSI4PK", "GSI4SK"}
+
+logger = logging.getLogger(__name__)
+
+
+def _json(valor) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(valor)
+    return json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _leer_json(datos):
+    if orjson is not None:
+        return orjson.loads(datos)
+    return json.loads(bytes(datos))
+
+
+# --------------------------------------------------
+# Generación
+# --------------------------------------------------
+def generar(ruta: str) -> dict:
+    """Escribe el snapshot del catálogo actual en `ruta`. Devuelve su meta."""
+    version = (datetime.utcnow() - MARGEN_RELOJ).isoformat()
+
+    instituciones = {}
+    tramites = {}
+    filtro = (
+        (Attr("PK").begins_with("INSTITUCION#") & Attr("SK").eq("METADATA"))
+        | (Attr("SK").begins_with("TRAMITE#") & Attr("habil").eq(True))
+    )
+    for item in escanear(filtro=filtro):
+        datos = {campo: valor for campo, valor in item.items() if campo not in ATRIBUTOS_INDICES}
+        if item["SK"] == "METADATA":
+            instituciones[datos["id_institucion"]] = datos
+        else:
+            tramites[datos["id_tramite"]] = datos
+
+    valores = {
+        "LI": [
+            {"id_institucion": i["id_institucion"], "nombre": i["nombre"], "habil": i["habil"]}
+            for i in instituciones.values()
+        ],
+    }
+    for id_institucion, institucion in instituciones.items():
+        valores[f"I/{id_institucion}"] = institucion
+        valores[f"LT/{id_institucion}"] = []
+    for id_tramite, tramite in tramites.items():
+        valores[f"T/{id_tramite}"] = tramite
+        lista = valores.get(f"LT/{tramite['id_institucion']}")
+        if lista is not None:
+            lista.append({"id_tramite": id_tramite, "nombre_tramite": tramite["nombre_tramite"], "habil": True})
+
+    meta = {
+        "version": version,
+        "generado": datetime.utcnow().isoformat(),
+        "instituciones": len(instituciones),
+        "tramites": len(tramites),
+    }
+    _escribir(ruta, meta, valores)
+    return meta
+
+
+def _escribir(ruta: str, meta: dict, valores: dict):
+    claves = sorted(valores)
+    meta_bytes = _json(meta)
+    inicio_valores = CABECERA.size + len(meta_bytes) + ENTRADA.size * len(claves)
+
+    indice = []
+    cuerpos = []
+    posicion = inicio_valores
+    for clave in claves:
+        clave_bytes = clave.encode("utf-8")
+        if len(clave_bytes) > 48:
+            raise ValueError(f"Clave demasiado larga para el snapshot: {clave}")
+        cuerpo = _json(valores[clave])
+        indice.append(ENTRADA.pack(clave_bytes, posicion, len(cuerpo)))
+        cuerpos.append(cuerpo)
+        posicion += len(cuerpo)
+
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(CABECERA.pack(MAGIA, FORMATO, len(claves), len(meta_bytes)))
+        archivo.write(meta_bytes)
+        archivo.writelines(indice)
+        archivo.writelines(cuerpos)
+    os.replace(temporal, ruta)
+
+
+# --------------------------------------------------
+# Lectura
+# --------------------------------------------------
+class Snapshot:
+    """Archivo mapeado en memoria; busca por clave con búsqueda binaria sobre el índice."""
+
+    def __init__(self, ruta: str):
+        with open(ruta, "rb") as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magia, formato, self.entradas, largo_meta = CABECERA.unpack_from(self._mapa, 0)
+        if magia != MAGIA or formato != FORMATO:
+            raise ValueError(f"{ruta} no es un snapshot del catálogo (formato {FORMATO}).")
+
+        self.meta = _leer_json(self._mapa[CABECERA.size:CABECERA.size + largo_meta])
+        self._inicio_indice = CABECERA.size + largo_meta
+        self._claves = _ClavesDelIndice(self)
+
+    def clave(self, posicion: int) -> bytes:
+        inicio = self._inicio_indice + posicion * ENTRADA.size
+        return self._mapa[inicio:inicio + 48].rstrip(b"\0")
+
+    def obtener(self, clave: str):
+        clave_bytes = clave.encode("utf-8")
+        posicion = bisect.bisect_left(self._claves, clave_bytes)
+        if posicion == self.entradas or self._claves[posicion] != clave_bytes:
+            return None
+
+        _, inicio, largo = ENTRADA.unpack_from(self._mapa, self._inicio_indice + posicion * ENTRADA.size)
+        return _leer_json(self._mapa[inicio:inicio + largo])
+
+
+class _ClavesDelIndice:
+    """Secuencia de claves para bisect, leída del mmap a demanda."""
+
+    def __init__(self, snapshot: Snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return self._snapshot.entradas
+
+    def __getitem__(self, posicion: int) -> bytes:
+        return self._snapshot.clave(posicion)
+
+
+# --------------------------------------------------
+# Catálogo con verificación de vigencia
+# --------------------------------------------------
+class Catalogo:
+
+    def __init__(self, ruta: str = CATALOGO_SNAPSHOT, verificacion: float = CATALOGO_VERIFICACION):
+        self.ruta = ruta
+        self.verificacion = verificacion
+        self._lock = threading.Lock()
+        self._lock_verificacion = threading.Lock()
+        self._snapshot = None
+        self._cargado = False
+        self._cambiados = set()      # claves del snapshot que ya no están vigentes
+        self._ultimo_cambio = None   # último GSI4SK visto
+        self._verificado_en = None
+        self.vencido = False
+        self.metricas = {"aciertos": 0, "ausentes": 0, "desactualizados": 0, "verificaciones": 0}
+
+    # ------------------------------
+    # Consultas de los handlers
+    # Devuelven None cuando hay que leer de DynamoDB.
+    # ------------------------------
+    def institucion(self, id_institucion: str):
+        return self._obtener(f"I/{id_institucion}")
+
+    def instituciones(self):
+        return self._obtener("LI")
+
+    def tramite(self, id_tramite: str):
+        return self._obtener(f"T/{id_tramite}")
+
+    def tramites_habiles(self, id_institucion: str):
+        return self._obtener(f"LT/{id_institucion}")
+
+    def _obtener(self, clave: str):
+        snapshot = self._abrir()
+        if snapshot is None:
+            return None
+
+        self._verificar()
+        if self.vencido or clave in self._cambiados:
+            self._contar("desactualizados")
+            return None
+
+        valor = snapshot.obtener(clave)
+        self._contar("aciertos" if valor is not None else "ausentes")
+        return valor
+
+    def _contar(self, metrica: str):
+        with self._lock:
+            self.metricas[metrica] += 1
+
+    def _abrir(self):
+        if self._cargado:
+            return self._snapshot
+
+        with self._lock:
+            if not self._cargado:
+                if self.ruta and os.path.exists(self.ruta):
+                    try:
+                        self._snapshot = Snapshot(self.ruta)
+                    except ValueError as error:
+                        logger.warning("Snapshot del catálogo ignorado: %s", error)
+                self._cargado = True
+        return self._snapshot
+
+    # ------------------------------
+    # Vigencia
+    # ------------------------------
+    def _verificar(self):
+        ahora = time.monotonic()
+        if self._verificado_en is not None and ahora - self._verificado_en < self.verificacion:
+            return
+
+        # La primera verificación se espera; las siguientes las hace un
+        # solo hilo y el resto sigue con el último estado conocido
+        if not self._lock_verificacion.acquire(blocking=self._verificado_en is None):
+            return
+        try:
+            if self._verificado_en is not None and time.monotonic() - self._verificado_en < self.verificacion:
+                return
+            try:
+                self._leer_cambios()
+            except Exception as error:
+                # Sin DynamoDB se sigue sirviendo el snapshot con lo último que se supo
+                logger.warning("No se pudo verificar la vigencia del catálogo: %s", error)
+            self._verificado_en = time.monotonic()
+        finally:
+            self._lock_verificacion.release()
+
+    def _leer_cambios(self):
+        """
+        Suma a _cambiados lo que el índice de cambios registró desde la versión del snapshot.
+
+        Después de la primera lectura se relee desde MARGEN_RELOJ antes del
+        último cambio visto: un cambio con fecha anterior (reloj atrasado o
+        confirmado más tarde) puede aparecer detrás de él.
+        """
+        self.metricas["verificaciones"] += 1
+        desde = self._snapshot.meta["version"]
+        if self._ultimo_cambio:
+            desde = max(desde, releer_desde(self._ultimo_cambio))
+
+        for mes in meses_desde(desde[:7], datetime.utcnow()):
+            inicio = None
+            while True:
+                response = consultar(
+                    Key("GSI4PK").eq(particion_mes(mes)) & Key("GSI4SK").gt(desde),
+                    indice="GSI4",
+                    proyeccion=["GSI4SK", "id_institucion"],
+                    inicio=inicio,
+                )
+                items = response.get("Items", [])
+                cambiados = set()
+                for item in items:
+                    if tipo_e_id(item)[0] == "REQUISITO":
+                        # Un requisito corregido cambia trámites que el índice no nombra
+                        self.vencido = True
+                        return
+                    cambiados.update(_claves_afectadas(item))
+
+                # Lo releído dentro del margen ya está en _cambiados
+                if len(self._cambiados | cambiados) > MAXIMO_CAMBIOS:
+                    self.vencido = True
+                    return
+
+                # Cada página se suma antes de avanzar _ultimo_cambio: si la
+                # siguiente falla, la próxima verificación sigue desde aquí
+                self._cambiados |= cambiados
+                if items:
+                    self._ultimo_cambio = max(self._ultimo_cambio or "", items[-1]["GSI4SK"])
+
+                inicio = response.get("LastEvaluatedKey")
+                if not inicio:
+                    break
+
+    def estado(self) -> dict:
+        snapshot = self._abrir()
+        if snapshot is None:
+            return {"habilitado": False}
+
+        return {
+            "habilitado": True,
+            **snapshot.meta,
+            "vencido": self.vencido,
+            "claves_desactualizadas": len(self._cambiados),
+            **self.metricas,
+        }
+
+
+def _claves_afectadas(item: dict) -> set:
+    """Claves del snapshot que deja de cubrir un registro cambiado."""
+    tipo, id_registro = tipo_e_id(item)
+    id_institucion = item.get("id_institucion")
+
+    if tipo == "INSTITUCION":
+        return {f"I/{id_registro}", "LI"}
+
+    # Hijos: cambian sus propios datos y los contadores de la institución
+    claves = {f"I/{id_institucion}"} if id_institucion else set()
+    if tipo == "TRAMITE":
+        claves |= {f"T/{id_registro}", f"LT/{id_institucion}"}
+    return claves
+
+
+catalogo = Catalogo()
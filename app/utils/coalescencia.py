@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+
+# --------------------------------------------------
+# Coalescencia de lecturas idénticas ("singleflight")
+#
+# Si llegan varias lecturas iguales mientras la primera todavía espera
+# a DynamoDB, las demás no salen a la red: esperan esa misma respuesta.
+# Solo se comparte la llamada en curso, no hay caché: la siguiente
+# lectura después de que termina vuelve a salir.
+#
+# hacer(operacion, parametros, funcion) se usa desde los handlers
+# síncronos (hilos del threadpool de FastAPI).
+#
+# COALESCENCIA=false lo desactiva.
+# --------------------------------------------------
+
+COALESCENCIA = os.getenv("COALESCENCIA", "true").lower() != "false"
+
+
+class _Vuelo:
+    __slots__ = ("evento", "resultado", "error", "seguidores")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+        self.seguidores = 0
+
+
+class Coalescedor:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vuelos = {}
+        self._metricas = {}
+
+    def hacer(self, operacion: str, parametros: dict, funcion):
+        """Ejecuta funcion() o, si ya hay una igual en curso, espera su resultado."""
+        if not COALESCENCIA:
+            return funcion()
+
+        clave = (operacion, _clave(parametros))
+
+        with self._lock:
+            vuelo = self._vuelos.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[clave] = _Vuelo()
+            else:
+                vuelo.seguidores += 1
+            self._contar(operacion, lider)
+
+        if not lider:
+            vuelo.evento.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.resultado
+
+        try:
+            vuelo.resultado = funcion()
+            return vuelo.resultado
+        except BaseException as error:
+            vuelo.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._vuelos[clave]
+                self._registrar_seguidores(operacion, vuelo.seguidores)
+            vuelo.evento.set()
+
+    # ------------------------------
+    # Métricas
+    # ------------------------------
+    def _contar(self, operacion: str, lider: bool):
+        metricas = self._metricas.setdefault(operacion, {"llamadas": 0, "coalescidas": 0, "max_seguidores": 0})
+        metricas["llamadas" if lider else "coalescidas"] += 1
+
+    def _registrar_seguidores(self, operacion: str, seguidores: int):
+        metricas = self._metricas[operacion]
+        metricas["max_seguidores"] = max(metricas["max_seguidores"], seguidores)
+
+    def metricas(self) -> dict:
+        """Por operación: llamadas a DynamoDB, lecturas que se sumaron a una en curso y el máximo por llamada."""
+        with self._lock:
+            return {
+                "habilitada": COALESCENCIA,
+                "en_vuelo": len(self._vuelos),
+                "operaciones": {operacion: dict(valores) for operacion, valores in self._metricas.items()},
+            }
+
+
+def _clave(parametros: dict) -> str:
+    return json.dumps(parametros, sort_keys=True, separators=(",", ":"))
+
+
+coalescedor = Coalescedor()
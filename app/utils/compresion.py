@@ -0,0 +1,243 @@
+import base64
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se negocia gzip
+    brotli = None
+
+# --------------------------------------------------
+# Compresión de respuestas (gzip / brotli)
+#
+# - Se negocia según Accept-Encoding (se prefiere br si está disponible).
+# - Respuestas completas menores a COMPRESION_MINIMA bytes salen sin comprimir.
+# - Toda respuesta de tipo comprimible lleva Vary: Accept-Encoding (se haya
+#   comprimido o no), sumado a los valores de Vary que ya tuviera.
+# - Respuestas en streaming se comprimen por fragmento (flush en cada envío).
+# - El nivel se elige por prefijo de ruta (NIVELES_POR_RUTA).
+# --------------------------------------------------
+
+COMPRESION_MINIMA = int(os.getenv("COMPRESION_MINIMA", "1024"))
+
+# Nivel por prefijo de ruta. Los listados de trámites (descripciones y
+# requisitos largos) compensan un nivel más alto.
+NIVELES_POR_RUTA = {
+    "/tramites": {"br": 5, "gzip": 6},
+    "/proyectos": {"br": 4, "gzip": 6},
+    "/programas": {"br": 4, "gzip": 6},
+    "/instituciones": {"br": 4, "gzip": 6},
+}
+NIVEL_POR_DEFECTO = {"br": 4, "gzip": 5}
+
+TIPOS_COMPRIMIBLES = ("application/json", "text/")
+
+
+def niveles_para(ruta: str) -> dict:
+    for prefijo, niveles in NIVELES_POR_RUTA.items():
+        if ruta.startswith(prefijo):
+            return niveles
+    return NIVEL_POR_DEFECTO
+
+
+def negociar(accept_encoding: str):
+    """Devuelve 'br', 'gzip' o None según Accept-Encoding (respeta q=0)."""
+    aceptadas = {}
+
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                calidad = float(parametros[2:])
+            except ValueError:
+                calidad = 0.0
+
+        aceptadas[nombre.strip().lower()] = calidad
+
+    comodin = aceptadas.get("*", 0.0)
+    candidatas = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    mejor, mejor_calidad = None, 0.0
+    for codificacion in candidatas:
+        calidad = aceptadas.get(codificacion, comodin)
+        if calidad > mejor_calidad:
+            mejor, mejor_calidad = codificacion, calidad
+
+    return mejor
+
+
+class _Compresor:
+
+    def __init__(self, codificacion: str, nivel: int):
+        self.codificacion = codificacion
+
+        if codificacion == "br":
+            self._brotli = brotli.Compressor(quality=nivel)
+        else:
+            # wbits=31 -> formato gzip
+            self._zlib = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        if self.codificacion == "br":
+            return self._brotli.process(datos) + self._brotli.flush()
+        return self._zlib.compress(datos) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self) -> bytes:
+        if self.codificacion == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+# --------------------------------------------------
+# Middleware ASGI
+# --------------------------------------------------
+class CompresionMiddleware:
+
+    def __init__(self, app, minimo: int = COMPRESION_MINIMA):
+        self.app = app
+        self.minimo = minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for nombre, valor in scope["headers"]:
+            if nombre == b"accept-encoding":
+                accept_encoding = valor.decode("latin-1")
+                break
+
+        codificacion = negociar(accept_encoding)
+        nivel = niveles_para(scope["path"])[codificacion] if codificacion else None
+        inicio = None
+        compresor = None
+        pasar_directo = False
+
+        async def enviar(mensaje):
+            nonlocal inicio, compresor, pasar_directo
+
+            if mensaje["type"] == "http.response.start":
+                inicio = mensaje
+                return
+
+            if mensaje["type"] != "http.response.body" or pasar_directo:
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas = mensaje.get("more_body", False)
+
+            # Primer fragmento: decidir si se comprime
+            if compresor is None:
+                headers = inicio.get("headers", [])
+
+                if not _es_comprimible(inicio["status"], headers):
+                    pasar_directo = True
+                    await send(inicio)
+                    await send(mensaje)
+                    return
+
+                # Sin comprimir esta vez, pero con otro Accept-Encoding podría
+                # haber salido comprimida: los caches deben distinguirlas
+                if codificacion is None or (not mas and len(cuerpo) < self.minimo):
+                    pasar_directo = True
+                    await send({**inicio, "headers": _con_vary(headers)})
+                    await send(mensaje)
+                    return
+
+                compresor = _Compresor(codificacion, nivel)
+
+                if not mas:
+                    comprimido = compresor.comprimir(cuerpo) + compresor.terminar()
+                    await send({**inicio, "headers": _headers_comprimidos(headers, codificacion, len(comprimido))})
+                    await send({"type": "http.response.body", "body": comprimido})
+                    return
+
+                await send({**inicio, "headers": _headers_comprimidos(headers, codificacion, None)})
+
+            datos = compresor.comprimir(cuerpo)
+            if not mas:
+                datos += compresor.terminar()
+
+            await send({"type": "http.response.body", "body": datos, "more_body": mas})
+
+        await self.app(scope, receive, enviar)
+
+
+def _es_comprimible(status: int, headers: list) -> bool:
+    if status < 200 or status in (204, 304):
+        return False
+
+    tipo = b""
+    for nombre, valor in headers:
+        nombre = nombre.lower()
+        if nombre == b"content-encoding":
+            return False
+        if nombre == b"content-type":
+            tipo = valor
+
+    return tipo.decode("latin-1").startswith(TIPOS_COMPRIMIBLES)
+
+
+def _headers_comprimidos(headers: list, codificacion: str, longitud):
+    resultado = [
+        (nombre, valor)
+        for nombre, valor in _con_vary(headers)
+        if nombre.lower() != b"content-length"
+    ]
+
+    resultado.append((b"content-encoding", codificacion.encode()))
+    if longitud is not None:
+        resultado.append((b"content-length", str(longitud).encode()))
+
+    return resultado
+
+
+def _con_vary(headers: list) -> list:
+    """Headers con Accept-Encoding en Vary, conservando los valores que ya tenía."""
+    valores = []
+    resultado = []
+    for nombre, valor in headers:
+        if nombre.lower() == b"vary":
+            valores.extend(v.strip() for v in valor.split(b",") if v.strip())
+        else:
+            resultado.append((nombre, valor))
+
+    if any(v == b"*" or v.lower() == b"accept-encoding" for v in valores):
+        return headers
+
+    resultado.append((b"vary", b", ".join(valores + [b"Accept-Encoding"])))
+    return resultado
+
+
+# --------------------------------------------------
+# Mangum / API Gateway
+# Mangum intenta decodificar el cuerpo como texto cuando el content-type
+# es JSON; un cuerpo comprimido debe viajar siempre en base64.
+# --------------------------------------------------
+def asegurar_base64(respuesta: dict) -> dict:
+    if respuesta.get("isBase64Encoded") or not respuesta.get("body"):
+        return respuesta
+
+    headers = {
+        nombre.lower(): valor
+        for nombre, valor in (respuesta.get("headers") or {}).items()
+    }
+    for nombre, valores in (respuesta.get("multiValueHeaders") or {}).items():
+        if valores:
+            headers.setdefault(nombre.lower(), valores[0])
+
+    if "content-encoding" not in headers:
+        return respuesta
+
+    # Mangum ya decodificó los bytes como UTF-8: se recuperan exactos
+    cuerpo = respuesta["body"].encode("utf-8")
+    return {
+        **respuesta,
+        "body": base64.b64encode(cuerpo).decode("ascii"),
+        "isBase64Encoded": True,
+    }
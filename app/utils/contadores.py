@@ -0,0 +1,101 @@
+from fastapi import HTTPException
+
+from utils.transacciones import actualizar, escribir, TransaccionCancelada, motivos_cancelacion
+from utils.escritura_lotes import ESCRITURA_LOTES, escritor
+from utils.atributos_comprimidos import comprimir_item
+
+# --------------------------------------------------
+# Contadores por institución (en su item METADATA)
+#
+# crear / habilitar / deshabilitar de trámites, proyectos y programas
+# ajustan estos contadores con ADD en la misma transacción que escribe
+# el registro hijo, así obtener_institucion y /resumen cuentan en O(1).
+# scripts/reparar_contadores recalcula los valores desde la partición.
+# --------------------------------------------------
+
+# tipo -> (atributo total, atributo activos)
+CONTADORES = {
+    "TRAMITE": ("total_tramites", "tramites_activos"),
+    "PROYECTO": ("total_proyectos", "proyectos_activos"),
+    "PROGRAMA": ("total_programas", "programas_activos"),
+}
+
+# Valores iniciales para una institución nueva
+CONTADORES_INICIALES = {
+    atributo: 0 for atributos in CONTADORES.values() for atributo in atributos
+}
+
+
+def clave_institucion(id_institucion: str) -> dict:
+    return {"PK": f"INSTITUCION#{id_institucion}", "SK": "METADATA"}
+
+
+def ajuste_institucion(id_institucion: str, tipo: str, total: int = 0, activos: int = 0) -> dict:
+    """
+    Operación de transacción que suma a los contadores de la institución.
+    Falla (ConditionalCheckFailed) si la institución no existe.
+    """
+    atributo_total, atributo_activos = CONTADORES[tipo]
+    sumas = []
+    valores = {}
+
+    if total:
+        sumas.append(f"{atributo_total} :total")
+        valores[":total"] = total
+    if activos:
+        sumas.append(f"{atributo_activos} :activos")
+        valores[":activos"] = activos
+
+    return actualizar(
+        clave_institucion(id_institucion),
+        "ADD " + ", ".join(sumas),
+        valores,
+        condicion="attribute_exists(PK)",
+    )
+
+
+def crear_con_contador(operacion_hijo: dict, id_institucion: str, tipo: str, habil: bool):
+    """Escribe el hijo y suma a los contadores; 404 si la institución no existe."""
+    # Se escribe una copia con los textos largos comprimidos; el item
+    # original queda intacto para la respuesta
+    put = operacion_hijo["Put"]
+    operacion_hijo = {**operacion_hijo, "Put": {**put, "Item": comprimir_item(put["Item"])}}
+
+    if ESCRITURA_LOTES:
+        # Agrupado con los creates simultáneos (utils/escritura_lotes.py)
+        atributo_total, atributo_activos = CONTADORES[tipo]
+        escritor.escribir(
+            operacion_hijo["Put"]["Item"],
+            clave_institucion(id_institucion),
+            {atributo_total: 1, atributo_activos: 1 if habil else 0},
+        )
+        return
+
+    try:
+        escribir([
+            operacion_hijo,
+            ajuste_institucion(id_institucion, tipo, total=1, activos=1 if habil else 0),
+        ])
+    except TransaccionCancelada as error:
+        if motivos_cancelacion(error)[1:2] == ["ConditionalCheckFailed"]:
+            raise HTTPException(status_code=404, detail="La institución no existe.")
+        raise
+
+
+def cambiar_habil_con_contador(operacion_hijo: dict, id_institucion: str, tipo: str, habil: bool) -> bool:
+    """
+    Cambia habil del hijo y ajusta los activos de la institución.
+    `operacion_hijo` debe llevar la condición de que habil cambia de verdad:
+    si el hijo ya estaba en ese estado no se toca nada y se devuelve False.
+    """
+    try:
+        escribir([
+            operacion_hijo,
+            ajuste_institucion(id_institucion, tipo, activos=1 if habil else -1),
+        ])
+    except TransaccionCancelada as error:
+        if motivos_cancelacion(error)[:1] == ["ConditionalCheckFailed"]:
+            return False
+        raise
+
+    return True
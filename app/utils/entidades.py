@@ -0,0 +1,463 @@
+import inspect
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, HTTPException, Query
+
+from database import TABLE_NAME
+from models.lote import ResultadoLote
+from utils.lectura_rapida import obtener_item, consultar
+from utils.respuestas import responder_item, responder_lista
+from utils.autocompletado import indice_nombres
+from utils.cambios import claves_gsi4, valores_cambio, SET_CAMBIO
+from utils.atributos_comprimidos import comprimir_valor, descomprimir_item
+from utils.contadores import clave_institucion, crear_con_contador, cambiar_habil_con_contador
+from utils.transacciones import client, poner, actualizar
+from utils.requisitos import referenciar, asignaciones, resolver
+from utils.lote import objetivos, actualizar_lote, resumen
+from utils.cascada import DESHABILITADO_EN_CASCADA
+
+# --------------------------------------------------
+# Entidades hijas de una institución (trámites, proyectos, programas)
+#
+# Cada una se declara una vez (Entidad) y este módulo genera sus rutas
+# con la misma implementación para todas:
+#
+#   PK     = INSTITUCION#<id_institucion>
+#   SK     = <TIPO>#<id>
+#   GSI1PK = <TIPO>#<id>, GSI1SK = METADATA    (acceso directo por id)
+#   GSI4   = cambios (utils/cambios.py)
+#
+# Lo propio de cada entidad (otros índices, filtros del lote, snapshot
+# del catálogo, índices en memoria) se declara como ganchos; las rutas
+# que solo tiene una entidad (p. ej. /tramites/buscar) se agregan en su
+# router antes de registrar las genéricas.
+# --------------------------------------------------
+
+NO_HAY_CAMBIOS = "No hay campos para actualizar o no coinciden con los existentes"
+
+
+class Entidad:
+
+    def __init__(
+        self,
+        tipo: str,
+        prefijo_id: str,
+        etiqueta: str,
+        modelo_crear,
+        modelo_actualizar,
+        modelo_respuesta,
+        modelo_lista,
+        modelo_lote,
+        claves_derivadas=None,
+        filtro_lote=None,
+        catalogo_item=None,
+        catalogo_habiles=None,
+        indices=(),
+        verbo_baja: str = "deshabilitar",
+    ):
+        """
+        tipo:             prefijo de las claves (TRAMITE)
+        prefijo_id:       prefijo de los ids generados (TRM)
+        etiqueta:         nombre en los mensajes (Trámite)
+        modelo_*:         modelos de pydantic de cada ruta; los campos de
+                          modelo_lista son la proyección del listado
+        claves_derivadas: (valores, id_institucion, id) -> atributos extra
+                          cuando cambian los campos de los que dependen
+                          (p. ej. las claves del índice por estado)
+        filtro_lote:      (datos del lote) -> {atributo: valor} o None
+        catalogo_*:       lecturas desde el snapshot del catálogo (None si no aplica)
+        indices:          índices en memoria con indexar(item) y actualizar_habil(id, habil)
+        verbo_baja:       nombre del handler de DELETE (deshabilitar_<nombre>)
+        """
+        self.tipo = tipo
+        self.prefijo_id = prefijo_id
+        self.etiqueta = etiqueta
+        self.nombre = tipo.lower()
+        self.plural = f"{self.nombre}s"
+        self.campo_id = f"id_{self.nombre}"
+
+        self.modelo_crear = modelo_crear
+        self.modelo_actualizar = modelo_actualizar
+        self.modelo_respuesta = modelo_respuesta
+        self.modelo_lista = modelo_lista
+        self.modelo_lote = modelo_lote
+        self.campos_lista = list(modelo_lista.model_fields)
+
+        self.claves_derivadas = claves_derivadas
+        self.filtro_lote = filtro_lote
+        self.catalogo_item = catalogo_item
+        self.catalogo_habiles = catalogo_habiles
+        self.indices = tuple(indices)
+        self.verbo_baja = verbo_baja
+
+    def nuevo_id(self) -> str:
+        return f"{self.prefijo_id}-{uuid.uuid4().hex[:8]}"
+
+    def no_encontrado(self) -> HTTPException:
+        return HTTPException(
+            status_code=404,
+            detail=f"{self.etiqueta} no encontrado, verificar {self.campo_id} ingresado"
+        )
+
+    def derivadas(self, valores: dict, id_institucion: str, id_registro: str) -> dict:
+        if self.claves_derivadas is None:
+            return {}
+        return self.claves_derivadas(valores, id_institucion, id_registro)
+
+    def indexar(self, item: dict):
+        for indice in self.indices:
+            indice.indexar(item)
+        indice_nombres.indexar(self.nombre, item)
+
+    def actualizar_habil(self, id_registro: str, habil: bool):
+        for indice in self.indices:
+            indice.actualizar_habil(id_registro, habil)
+        indice_nombres.actualizar_habil(self.nombre, id_registro, habil)
+
+
+# --------------------------------------------------
+# Lecturas compartidas
+# --------------------------------------------------
+def verificar_institucion(id_institucion: str):
+    """404 si la institución no existe (solo lee la clave)."""
+    if obtener_item(clave_institucion(id_institucion), proyeccion=["PK"]) is None:
+        raise HTTPException(
+            status_code=404,
+            detail="La institución no existe."
+        )
+
+
+def buscar(entidad: Entidad, id_registro: str, proyeccion: Optional[list] = None) -> dict:
+    """El registro por su id (GSI1); 404 si no existe."""
+    response = consultar(
+        Key("GSI1PK").eq(f"{entidad.tipo}#{id_registro}"),
+        indice="GSI1",
+        proyeccion=proyeccion,
+    )
+
+    items = response.get("Items", [])
+    if not items:
+        raise entidad.no_encontrado()
+
+    return items[0]
+
+
+def _ubicar(entidad: Entidad, id_registro: str) -> dict:
+    # Para escribir basta la clave y la institución: no se leen ni
+    # descomprimen los textos largos
+    return buscar(entidad, id_registro, proyeccion=["PK", "SK", "id_institucion"])
+
+
+# --------------------------------------------------
+# Escritura condicional de cambios
+# --------------------------------------------------
+def escribir_cambios(
+    clave: dict,
+    cambios: dict,
+    tipo: str,
+    id_registro: str,
+    quitar: list = (),
+    no_encontrado: str = None,
+) -> dict:
+    """
+    Aplica `cambios` (más fecha_actualizacion y las claves de GSI4) con un
+    solo UpdateItem y devuelve el item escrito. La condición de que el
+    item exista reemplaza la lectura previa: si no existe, 404 con
+    `no_encontrado`.
+    """
+    now = datetime.utcnow().isoformat()
+    asignaciones_item = {**cambios, "fecha_actualizacion": now}
+
+    try:
+        response = client.update_item(
+            TableName=TABLE_NAME,
+            Key=clave,
+            UpdateExpression="SET " + ", ".join(
+                [f"#{campo} = :{campo}" for campo in asignaciones_item] + [SET_CAMBIO]
+            ) + (" REMOVE " + ", ".join(quitar) if quitar else ""),
+            ConditionExpression="attribute_exists(PK)",
+            ExpressionAttributeNames={f"#{campo}": campo for campo in asignaciones_item},
+            ExpressionAttributeValues={
+                **{f":{campo}": comprimir_valor(campo, valor) for campo, valor in asignaciones_item.items()},
+                **valores_cambio(tipo, id_registro, now),
+            },
+            ReturnValues="ALL_NEW",
+        )
+    except ClientError as error:
+        if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            raise HTTPException(status_code=404, detail=no_encontrado)
+        raise
+
+    return descomprimir_item(response["Attributes"])
+
+
+def _para_guardar(cambios: dict) -> tuple:
+    """(asignaciones, atributos a quitar): los requisitos van como texto o referencias según el modo."""
+    if "requisitos" not in cambios:
+        return cambios, []
+
+    cambios = dict(cambios)
+    guardar, quitar = asignaciones(cambios.pop("requisitos"))
+    return {**cambios, **guardar}, [quitar]
+
+
+# --------------------------------------------------
+# Operaciones
+# --------------------------------------------------
+def crear_registro(entidad: Entidad, data) -> dict:
+    now = datetime.utcnow().isoformat()
+    id_registro = entidad.nuevo_id()
+    valores = data.model_dump()
+
+    item = {
+        # PK principal (agrupado por institución)
+        "PK": f"INSTITUCION#{data.id_institucion}",
+        "SK": f"{entidad.tipo}#{id_registro}",
+
+        # GSI para acceso directo por id
+        "GSI1PK": f"{entidad.tipo}#{id_registro}",
+        "GSI1SK": "METADATA",
+
+        # GSI de cambios (sincronización incremental)
+        **claves_gsi4(entidad.tipo, id_registro, now),
+
+        **entidad.derivadas(valores, data.id_institucion, id_registro),
+
+        # Datos
+        entidad.campo_id: id_registro,
+        **valores,
+        "fecha_creacion": now,
+        "fecha_actualizacion": now,
+    }
+
+    # Con el catálogo de requisitos se guardan solo los ids
+    guardado = referenciar(item)
+
+    # La transacción exige que la institución exista (404 si no)
+    # y suma el registro a sus contadores
+    crear_con_contador(
+        poner(guardado, condicion="attribute_not_exists(PK)"),
+        data.id_institucion, entidad.tipo, data.habil,
+    )
+
+    # Cada requisito se devuelve con el texto que quedó en el catálogo
+    item = resolver([dict(guardado)])[0]
+    entidad.indexar(item)
+    return item
+
+
+def listar_registros(entidad: Entidad, id_institucion: str, habil: Optional[bool]):
+    # El snapshot del catálogo solo tiene los registros hábiles
+    if habil is True and entidad.catalogo_habiles is not None:
+        items = entidad.catalogo_habiles(id_institucion)
+        if items is not None:
+            return responder_lista(items)
+
+    verificar_institucion(id_institucion)
+
+    # El filtro por habil viaja a DynamoDB: no se transfieren los descartados
+    response = consultar(
+        Key("PK").eq(f"INSTITUCION#{id_institucion}") &
+        Key("SK").begins_with(f"{entidad.tipo}#"),
+        proyeccion=entidad.campos_lista,
+        filtro=Attr("habil").eq(habil) if habil is not None else None,
+    )
+
+    return responder_lista([
+        {campo: item[campo] for campo in entidad.campos_lista}
+        for item in response.get("Items", [])
+    ])
+
+
+def obtener_registro(entidad: Entidad, id_registro: str):
+    if entidad.catalogo_item is not None:
+        item = entidad.catalogo_item(id_registro)
+        if item is not None:
+            return responder_item(item, entidad.modelo_respuesta)
+
+    return responder_item(buscar(entidad, id_registro), entidad.modelo_respuesta)
+
+
+def actualizar_registro(entidad: Entidad, id_registro: str, data) -> dict:
+    cambios = data.model_dump(exclude_none=True)
+    if not cambios:
+        raise HTTPException(status_code=400, detail=NO_HAY_CAMBIOS)
+
+    registro = _ubicar(entidad, id_registro)
+    asignaciones_item, quitar = _para_guardar(cambios)
+
+    item = escribir_cambios(
+        {"PK": registro["PK"], "SK": registro["SK"]},
+        {**asignaciones_item, **entidad.derivadas(cambios, registro["id_institucion"], id_registro)},
+        entidad.tipo,
+        id_registro,
+        quitar=quitar,
+        no_encontrado=entidad.no_encontrado().detail,
+    )
+
+    item = resolver([item])[0]
+    entidad.indexar(item)
+    return item
+
+
+def actualizar_registros_lote(entidad: Entidad, data) -> dict:
+    cambios = data.cambios.model_dump(exclude_none=True)
+    if not cambios:
+        raise HTTPException(status_code=400, detail=NO_HAY_CAMBIOS)
+
+    filtro = entidad.filtro_lote(data) if entidad.filtro_lote is not None else None
+    asignaciones_item, quitar = _para_guardar(cambios)
+
+    # Asignaciones propias de cada registro (p. ej. su clave en el índice por estado)
+    extra = None
+    if entidad.claves_derivadas is not None:
+        extra = lambda destino: entidad.derivadas(
+            cambios, destino["PK"].split("#", 1)[1], destino["id"]
+        )
+
+    resultados = actualizar_lote(
+        entidad.tipo,
+        objetivos(entidad.tipo, ids=data.ids, id_institucion=data.id_institucion, filtro=filtro),
+        asignaciones_item,
+        filtro=filtro,
+        extra=extra,
+        quitar=quitar,
+    )
+
+    for resultado in resultados:
+        if resultado["resultado"] == "actualizado":
+            entidad.indexar(resultado["item"])
+
+    return resumen(resultados)
+
+
+def cambiar_habil(entidad: Entidad, id_registro: str, habil: bool) -> dict:
+    now = datetime.utcnow().isoformat()
+    registro = buscar(
+        entidad, id_registro,
+        proyeccion=["PK", "SK", "id_institucion", "habil", DESHABILITADO_EN_CASCADA],
+    )
+    clave = {"PK": registro["PK"], "SK": registro["SK"]}
+
+    # Ya lo había deshabilitado una cascada: desde ahora es decisión del
+    # operador y habilitar la institución no lo vuelve a encender
+    tomado = False
+    if not habil and registro.get("habil") is False and registro.get(DESHABILITADO_EN_CASCADA):
+        try:
+            client.update_item(**actualizar(
+                clave,
+                "SET fecha_actualizacion = :fecha, " + SET_CAMBIO + " REMOVE #cascada",
+                {
+                    ":fecha": now,
+                    ":marca": True,
+                    **valores_cambio(entidad.tipo, id_registro, now),
+                },
+                nombres={"#cascada": DESHABILITADO_EN_CASCADA},
+                condicion="attribute_exists(PK) AND #cascada = :marca",
+            )["Update"])
+            tomado = True
+        except ClientError as error:
+            # Una cascada lo volvió a habilitar entre la lectura y la
+            # escritura: se deshabilita por el camino normal
+            if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+    if not tomado:
+        # Solo si el estado cambia: así el contador de activos no se desfasa
+        cambiar_habil_con_contador(
+            actualizar(
+                clave,
+                "SET habil = :habil, fecha_actualizacion = :fecha, " + SET_CAMBIO + " REMOVE #cascada",
+                {
+                    ":habil": habil,
+                    ":fecha": now,
+                    **valores_cambio(entidad.tipo, id_registro, now),
+                },
+                nombres={"#cascada": DESHABILITADO_EN_CASCADA},
+                condicion="habil <> :habil",
+            ),
+            registro["id_institucion"], entidad.tipo, habil,
+        )
+
+    entidad.actualizar_habil(id_registro, habil)
+    return {
+        "message": f"{entidad.etiqueta} habilitado correctamente"
+        if habil else
+        f"{entidad.etiqueta} deshabilitado correctamente"
+    }
+
+
+# --------------------------------------------------
+# Rutas
+# Los handlers llevan el nombre y los parámetros de siempre
+# (crear_tramite, id_tramite, ...): de ellos salen el operationId
+# de OpenAPI y la clave de benchmarks/presupuestos.py.
+# --------------------------------------------------
+def _handler(nombre: str, funcion, **parametros):
+    funcion.__name__ = funcion.__qualname__ = nombre
+    funcion.__signature__ = inspect.Signature([
+        inspect.Parameter(
+            parametro,
+            inspect.Parameter.KEYWORD_ONLY,
+            annotation=anotacion,
+            default=defecto[0] if defecto else inspect.Parameter.empty,
+        )
+        for parametro, (anotacion, *defecto) in parametros.items()
+    ])
+    return funcion
+
+
+def registrar_rutas(router: APIRouter, entidad: Entidad):
+    """Agrega al router las rutas CRUD de la entidad."""
+    nombre, plural, campo_id = entidad.nombre, entidad.plural, entidad.campo_id
+    por_id = f"/{{{campo_id}}}"
+
+    router.add_api_route("", _handler(
+        f"crear_{nombre}",
+        lambda data: crear_registro(entidad, data),
+        data=(entidad.modelo_crear,),
+    ), methods=["POST"], response_model=entidad.modelo_respuesta)
+
+    router.add_api_route("", _handler(
+        f"listar_{plural}",
+        lambda id_institucion, habil: listar_registros(entidad, id_institucion, habil),
+        id_institucion=(str, Query(...)),
+        habil=(Optional[bool], Query(None)),
+    ), methods=["GET"], response_model=List[entidad.modelo_lista])
+
+    router.add_api_route(por_id, _handler(
+        f"obtener_{nombre}",
+        lambda **ruta: obtener_registro(entidad, ruta[campo_id]),
+        **{campo_id: (str,)},
+    ), methods=["GET"], response_model=entidad.modelo_respuesta)
+
+    # Declarada antes de /{id} para que no la capture
+    router.add_api_route("/lote", _handler(
+        f"actualizar_{plural}_lote",
+        lambda data: actualizar_registros_lote(entidad, data),
+        data=(entidad.modelo_lote,),
+    ), methods=["PATCH"], response_model=ResultadoLote)
+
+    router.add_api_route(por_id, _handler(
+        f"actualizar_{nombre}",
+        lambda data, **ruta: actualizar_registro(entidad, ruta[campo_id], data),
+        **{campo_id: (str,)},
+        data=(entidad.modelo_actualizar,),
+    ), methods=["PATCH"], response_model=entidad.modelo_respuesta)
+
+    # Baja lógica
+    router.add_api_route(por_id, _handler(
+        f"{entidad.verbo_baja}_{nombre}",
+        lambda **ruta: cambiar_habil(entidad, ruta[campo_id], False),
+        **{campo_id: (str,)},
+    ), methods=["DELETE"])
+
+    router.add_api_route(f"{por_id}/habilitar", _handler(
+        f"habilitar_{nombre}",
+        lambda **ruta: cambiar_habil(entidad, ruta[campo_id], True),
+        **{campo_id: (str,)},
+    ), methods=["PATCH"])
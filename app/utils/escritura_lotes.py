@@ -0,0 +1,232 @@
+import logging
+import os
+import random
+import threading
+import time
+
+from fastapi import HTTPException
+
+from database import TABLE_NAME, DynamoDBNoDisponible
+from utils.lote import en_paralelo
+from utils.transacciones import client
+
+# --------------------------------------------------
+# Escrituras agrupadas de registros nuevos (opcional)
+#
+# Con ESCRITURA_LOTES=true, los creates que llegan dentro de una ventana
+# de ESCRITURA_LOTE_INTERVALO_MS se escriben juntos:
+#
+#   1. BatchGetItem de las instituciones del lote (404 si no existe)
+#   2. BatchWriteItem de los registros, de a ESCRITURA_LOTE_TAMANO (máx. 25)
+#   3. Un UpdateItem ADD por institución con la suma de sus contadores
+#
+# Cada petición espera hasta que su registro y sus contadores están
+# escritos. El primero que llega a una ventana vacía es el "líder": espera
+# la ventana (o a que se llene el lote) y escribe por todos.
+#
+# A diferencia del camino normal (una transacción por registro), el
+# registro y el contador no son atómicos: si el proceso muere entre los
+# pasos 2 y 3, o si el ADD falla, scripts/reparar_contadores corrige la
+# diferencia. Un registro que ya quedó escrito responde bien aunque falle
+# su contador o el resto del lote: un reintento del cliente lo duplicaría.
+#
+# Los pasos 1 y 2 tampoco son atómicos (verificar y después escribir sin
+# condición): si la institución se borra físicamente entre los dos, el
+# registro queda huérfano. Las bajas de la API son lógicas (habil), así
+# que solo un borrado directo en la tabla puede caer en esa ventana.
+# --------------------------------------------------
+
+ESCRITURA_LOTES = os.getenv("ESCRITURA_LOTES", "false").lower() == "true"
+ESCRITURA_LOTE_TAMANO = min(int(os.getenv("ESCRITURA_LOTE_TAMANO", "25")), 25)
+ESCRITURA_LOTE_INTERVALO_MS = float(os.getenv("ESCRITURA_LOTE_INTERVALO_MS", "5"))
+
+# Reintentos de los items que DynamoDB devuelve sin procesar
+REINTENTOS_PENDIENTES = 8
+ESPERA_BASE = 0.02
+
+logger = logging.getLogger(__name__)
+
+
+class _Pendiente:
+    __slots__ = ("item", "clave_padre", "sumas", "evento", "error", "escrito")
+
+    def __init__(self, item: dict, clave_padre: dict, sumas: dict):
+        self.item = item
+        self.clave_padre = clave_padre
+        self.sumas = sumas
+        self.evento = threading.Event()
+        self.error = None
+        self.escrito = False
+
+
+class EscritorPorLotes:
+
+    def __init__(self, tamano: int = ESCRITURA_LOTE_TAMANO, intervalo_ms: float = ESCRITURA_LOTE_INTERVALO_MS):
+        self.tamano = tamano
+        self.intervalo = intervalo_ms / 1000
+        self._lock = threading.Lock()
+        self._cola = []
+        self._lleno = threading.Event()
+        self._hay_lider = False
+        self.metricas = {"registros": 0, "lotes": 0, "llamadas_batch_write": 0}
+
+    def escribir(self, item: dict, clave_padre: dict, sumas: dict):
+        """
+        Escribe `item` junto con los de otras peticiones y suma `sumas`
+        (atributo -> cantidad) al item `clave_padre`, que debe existir.
+        Vuelve cuando todo quedó escrito; lanza el error de este item si falló.
+        """
+        pendiente = _Pendiente(item, clave_padre, sumas)
+
+        with self._lock:
+            self._cola.append(pendiente)
+            lider = not self._hay_lider
+            self._hay_lider = True
+            if len(self._cola) >= self.tamano:
+                self._lleno.set()
+
+        if lider:
+            self._lleno.wait(self.intervalo)
+            with self._lock:
+                lote, self._cola = self._cola, []
+                self._hay_lider = False
+                self._lleno.clear()
+
+            partes = [lote[inicio:inicio + self.tamano] for inicio in range(0, len(lote), self.tamano)]
+            en_paralelo(self._escribir_lote, partes)
+
+        pendiente.evento.wait()
+        if pendiente.error is not None:
+            raise pendiente.error
+
+    # ------------------------------
+    # Un lote (máx. 25 registros)
+    # ------------------------------
+    def _escribir_lote(self, lote: list):
+        try:
+            existentes = _padres_existentes([p.clave_padre for p in lote])
+
+            validos = []
+            for pendiente in lote:
+                if _id_clave(pendiente.clave_padre) in existentes:
+                    validos.append(pendiente)
+                else:
+                    pendiente.error = HTTPException(status_code=404, detail="La institución no existe.")
+
+            if validos:
+                try:
+                    llamadas = _batch_write(validos)
+                finally:
+                    # También si el resto del lote falló: esos ya existen
+                    escritos = [p for p in validos if p.escrito]
+                    _sumar_a_padres(escritos)
+                    with self._lock:
+                        self.metricas["registros"] += len(escritos)
+
+                with self._lock:
+                    self.metricas["lotes"] += 1
+                    self.metricas["llamadas_batch_write"] += llamadas
+        except Exception as error:
+            for pendiente in lote:
+                if pendiente.error is None and not pendiente.escrito:
+                    pendiente.error = error
+        finally:
+            for pendiente in lote:
+                pendiente.evento.set()
+
+    def estado(self) -> dict:
+        with self._lock:
+            return {
+                "habilitada": ESCRITURA_LOTES,
+                "tamano": self.tamano,
+                "intervalo_ms": self.intervalo * 1000,
+                "en_cola": len(self._cola),
+                **self.metricas,
+            }
+
+
+def _id_clave(clave: dict) -> tuple:
+    return clave["PK"], clave["SK"]
+
+
+def _padres_existentes(claves: list) -> set:
+    pendientes = list({_id_clave(clave): clave for clave in claves}.values())
+    existentes = set()
+
+    for intento in range(REINTENTOS_PENDIENTES):
+        response = client.batch_get_item(RequestItems={
+            TABLE_NAME: {"Keys": pendientes, "ProjectionExpression": "PK, SK"},
+        })
+        existentes.update(_id_clave(item) for item in response["Responses"].get(TABLE_NAME, []))
+
+        pendientes = response.get("UnprocessedKeys", {}).get(TABLE_NAME, {}).get("Keys", [])
+        if not pendientes:
+            return existentes
+        _esperar(intento)
+
+    raise DynamoDBNoDisponible(1.0)
+
+
+def _batch_write(pendientes: list) -> int:
+    """
+    Escribe los items; reintenta los que vuelven sin procesar y marca
+    `escrito` en cada uno apenas DynamoDB lo confirma. Devuelve las
+    llamadas hechas.
+    """
+    restantes = {_id_clave(p.item): p for p in pendientes}
+
+    for intento in range(REINTENTOS_PENDIENTES):
+        response = client.batch_write_item(RequestItems={
+            TABLE_NAME: [{"PutRequest": {"Item": p.item}} for p in restantes.values()],
+        })
+        sin_procesar = {
+            _id_clave(solicitud["PutRequest"]["Item"])
+            for solicitud in response.get("UnprocessedItems", {}).get(TABLE_NAME, [])
+        }
+        for clave in list(restantes):
+            if clave not in sin_procesar:
+                restantes.pop(clave).escrito = True
+
+        if not restantes:
+            return intento + 1
+        _esperar(intento)
+
+    raise DynamoDBNoDisponible(1.0)
+
+
+def _sumar_a_padres(pendientes: list):
+    """Un ADD por padre con la suma de todos sus registros del lote."""
+    por_padre = {}
+    for pendiente in pendientes:
+        clave, sumas = por_padre.setdefault(_id_clave(pendiente.clave_padre), (pendiente.clave_padre, {}))
+        for atributo, cantidad in pendiente.sumas.items():
+            sumas[atributo] = sumas.get(atributo, 0) + cantidad
+
+    def sumar(clave_y_sumas):
+        clave, sumas = clave_y_sumas
+        sumas = {atributo: cantidad for atributo, cantidad in sumas.items() if cantidad}
+        if not sumas:
+            return
+        try:
+            client.update_item(
+                TableName=TABLE_NAME,
+                Key=clave,
+                UpdateExpression="ADD " + ", ".join(f"#a{i} :a{i}" for i in range(len(sumas))),
+                ExpressionAttributeNames={f"#a{i}": atributo for i, atributo in enumerate(sumas)},
+                ExpressionAttributeValues={f":a{i}": cantidad for i, cantidad in enumerate(sumas.values())},
+            )
+        except Exception as error:
+            # Los registros ya están escritos: el create no falla por su contador
+            logger.error(
+                "No se sumaron %s a %s (corregir con scripts/reparar_contadores): %s",
+                sumas, clave["PK"], error,
+            )
+
+    en_paralelo(sumar, list(por_padre.values()))
+
+
+def _esperar(intento: int):
+    time.sleep(random.uniform(0, ESPERA_BASE * 2 ** intento))
+
+
+escritor = EscritorPorLotes()
@@ -0,0 +1,28 @@
+from utils.texto import normalizar_frase
+
+# --------------------------------------------------
+# Índice de proyectos por estado (GSI3)
+#
+#   GSI3PK = ESTADO_PROYECTO#<estado>
+#   GSI3SK = INSTITUCION#<id_institucion>#PROYECTO#<id_proyecto>
+#
+# Todos los proyectos de un estado -> GSI3PK = ...
+# Solo los de una institución      -> ... AND begins_with(GSI3SK, INSTITUCION#<id>#)
+#
+# El estado se normaliza en la clave ("En ejecución" = "en ejecucion").
+# --------------------------------------------------
+
+
+def clave_estado(estado: str) -> str:
+    return normalizar_frase(estado)
+
+
+def claves_gsi3(estado: str, id_institucion: str, id_proyecto: str) -> dict:
+    return {
+        "GSI3PK": f"ESTADO_PROYECTO#{clave_estado(estado)}",
+        "GSI3SK": f"INSTITUCION#{id_institucion}#PROYECTO#{id_proyecto}",
+    }
+
+
+def prefijo_institucion(id_institucion: str) -> str:
+    return f"INSTITUCION#{id_institucion}#"
@@ -0,0 +1,102 @@
+from utils.texto import normalizar_frase
+from utils.transacciones import actualizar
+
+# --------------------------------------------------
+# Índice geográfico de instituciones (GSI2)
+#
+#   GSI2PK = DEPARTAMENTO#<departamento>
+#   GSI2SK = MUNICIPIO#<municipio>#INSTITUCION#<id>
+#
+# Por departamento -> GSI2PK = ...
+# Por municipio    -> GSI2PK = ... AND begins_with(GSI2SK, MUNICIPIO#<municipio>#)
+#
+# Los nombres se normalizan en la clave ("Petén" y "peten" son el mismo
+# departamento). Los conteos viven en items contador bajo CONTADORES_PK
+# y se ajustan en la misma transacción que escribe la institución.
+# --------------------------------------------------
+
+CONTADORES_PK = "CONTADORES#GEOGRAFIA"
+
+
+def clave_lugar(nombre: str) -> str:
+    return normalizar_frase(nombre)
+
+
+def claves_gsi2(departamento: str, municipio: str, id_institucion: str) -> dict:
+    return {
+        "GSI2PK": f"DEPARTAMENTO#{clave_lugar(departamento)}",
+        "GSI2SK": f"MUNICIPIO#{clave_lugar(municipio)}#INSTITUCION#{id_institucion}",
+    }
+
+
+def prefijo_municipio(municipio: str) -> str:
+    return f"MUNICIPIO#{clave_lugar(municipio)}#"
+
+
+def clave_contador(departamento: str, municipio: str = None) -> dict:
+    sk = f"DEPARTAMENTO#{clave_lugar(departamento)}"
+    if municipio is not None:
+        sk += f"#MUNICIPIO#{clave_lugar(municipio)}"
+    return {"PK": CONTADORES_PK, "SK": sk}
+
+
+def ajustes_contadores(movimientos: list) -> list:
+    """
+    Operaciones de transacción para una lista de (departamento, municipio, cantidad).
+
+    Los movimientos sobre el mismo contador se suman antes (una transacción
+    no puede tocar dos veces el mismo item) y los que quedan en cero se omiten.
+    """
+    netos = {}
+
+    for departamento, municipio, cantidad in movimientos:
+        for muni in (None, municipio):
+            clave = clave_contador(departamento, muni)
+            actual = netos.setdefault(clave["SK"], {"clave": clave, "cantidad": 0})
+            actual["cantidad"] += cantidad
+            actual["departamento"] = departamento
+            actual["municipio"] = muni
+
+    operaciones = []
+    for neto in netos.values():
+        if neto["cantidad"] == 0:
+            continue
+
+        # "total" es palabra reservada de DynamoDB
+        expresion = "ADD #total :cantidad SET departamento = :departamento"
+        valores = {":cantidad": neto["cantidad"], ":departamento": neto["departamento"]}
+        if neto["municipio"] is not None:
+            expresion += ", municipio = :municipio"
+            valores[":municipio"] = neto["municipio"]
+
+        operaciones.append(actualizar(neto["clave"], expresion, valores, nombres={"#total": "total"}))
+
+    return operaciones
+
+
+def agrupar_contadores(items: list) -> list:
+    """Items contador -> [{departamento, total, municipios: [{municipio, total}]}]."""
+    departamentos = {}
+    municipios = {}
+
+    for item in items:
+        total = int(item.get("total", 0))
+        if total <= 0:
+            continue
+
+        if "#MUNICIPIO#" in item["SK"]:
+            departamento_sk = item["SK"].split("#MUNICIPIO#")[0]
+            municipios.setdefault(departamento_sk, []).append({
+                "municipio": item["municipio"],
+                "total": total,
+            })
+        else:
+            departamentos[item["SK"]] = {
+                "departamento": item["departamento"],
+                "total": total,
+            }
+
+    return [
+        {**datos, "municipios": municipios.get(sk, [])}
+        for sk, datos in sorted(departamentos.items())
+    ]
@@ -0,0 +1,238 @@
+import hashlib
+import logging
+import os
+import random
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from database import TABLE_NAME
+from utils.transacciones import client
+
+# --------------------------------------------------
+# Idempotency-Key para los POST de creación
+#
+# - La primera petición con una clave la reserva con un put condicional
+#   (PK IDEMPOTENCIA#<clave>, SK <ruta>) y, al terminar, guarda su
+#   respuesta (status, headers y cuerpo) en el mismo item.
+# - Un reintento con la misma clave y el mismo cuerpo recibe esa
+#   respuesta guardada sin volver a ejecutar el handler
+#   (header Idempotent-Replayed: true).
+# - Misma clave con otro cuerpo: 422. Mientras la primera sigue en
+#   curso: 409 con Retry-After.
+# - Solo se guardan las respuestas 2xx; con otro status la clave se
+#   libera y un reintento vuelve a ejecutar el handler (p. ej. un 404
+#   porque la institución todavía no existía).
+# - La clave se libera si el handler falla sin responder. Si ya respondió
+#   (el registro está creado) se guarda aunque el cliente se haya
+#   desconectado, y guardar se reintenta: un error ahí no anula la
+#   respuesta ya enviada, solo se registra en el log.
+# - DynamoDB borra los items vencidos con TTL sobre `expira`.
+# --------------------------------------------------
+
+IDEMPOTENCIA_TTL_HORAS = float(os.getenv("IDEMPOTENCIA_TTL_HORAS", "24"))
+
+# Segundos que una petición en curso retiene la clave; si el proceso muere,
+# pasado este tiempo otra petición con la misma clave la puede tomar
+BLOQUEO_SEGUNDOS = 60
+
+LARGO_MAXIMO_CLAVE = 255
+
+# Reintentos al guardar la respuesta (espera exponencial con jitter)
+REINTENTOS_GUARDAR = 5
+ESPERA_BASE = 0.05
+
+RUTAS_IDEMPOTENTES = {"/instituciones", "/tramites", "/proyectos", "/programas"}
+
+# Headers que no se guardan (se recalculan o no aplican a la repetición)
+HEADERS_OMITIDOS = {b"content-length", b"date", b"server"}
+
+logger = logging.getLogger(__name__)
+
+
+def _clave(clave_idempotencia: str, ruta: str) -> dict:
+    return {"PK": f"IDEMPOTENCIA#{clave_idempotencia}", "SK": f"POST {ruta}"}
+
+
+def reservar(clave: dict, huella: str) -> bool:
+    """Put condicional: True si la clave quedó reservada para esta petición."""
+    ahora = int(time.time())
+    try:
+        client.put_item(
+            TableName=TABLE_NAME,
+            Item={
+                **clave,
+                "estado": "en_curso",
+                "huella": huella,
+                "bloqueo_hasta": ahora + BLOQUEO_SEGUNDOS,
+                "expira": ahora + int(IDEMPOTENCIA_TTL_HORAS * 3600),
+            },
+            # Libre, vencida (TTL pendiente de borrar) o abandonada en curso
+            ConditionExpression=(
+                "attribute_not_exists(PK) OR expira < :ahora"
+                " OR (#estado = :en_curso AND bloqueo_hasta < :ahora)"
+            ),
+            ExpressionAttributeNames={"#estado": "estado"},
+            ExpressionAttributeValues={":ahora": ahora, ":en_curso": "en_curso"},
+        )
+    except client.exceptions.ConditionalCheckFailedException:
+        return False
+    return True
+
+
+def guardar(clave: dict, status: int, headers: list, cuerpo: bytes):
+    client.update_item(
+        TableName=TABLE_NAME,
+        Key=clave,
+        UpdateExpression="SET #estado = :completado, status_http = :status, headers_http = :headers, cuerpo = :cuerpo",
+        ExpressionAttributeNames={"#estado": "estado"},
+        ExpressionAttributeValues={
+            ":completado": "completado",
+            ":status": status,
+            ":headers": [[nombre.decode("latin-1"), valor.decode("latin-1")] for nombre, valor in headers],
+            ":cuerpo": cuerpo,
+        },
+    )
+
+
+def guardar_con_reintentos(clave: dict, status: int, headers: list, cuerpo: bytes) -> bool:
+    for intento in range(REINTENTOS_GUARDAR):
+        try:
+            guardar(clave, status, headers, cuerpo)
+            return True
+        except Exception as error:
+            if intento == REINTENTOS_GUARDAR - 1:
+                # La clave queda en curso hasta BLOQUEO_SEGUNDOS: un reintento
+                # posterior vuelve a ejecutar el create
+                logger.error("No se pudo guardar la respuesta de %s: %s", clave["PK"], error)
+                return False
+            time.sleep(random.uniform(0, ESPERA_BASE * 2 ** intento))
+
+
+def liberar(clave: dict):
+    client.delete_item(TableName=TABLE_NAME, Key=clave)
+
+
+def leer(clave: dict):
+    return client.get_item(TableName=TABLE_NAME, Key=clave, ConsistentRead=True).get("Item")
+
+
+# --------------------------------------------------
+# Middleware ASGI
+# --------------------------------------------------
+class IdempotenciaMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in RUTAS_IDEMPOTENTES:
+            await self.app(scope, receive, send)
+            return
+
+        clave_idempotencia = None
+        for nombre, valor in scope["headers"]:
+            if nombre == b"idempotency-key":
+                clave_idempotencia = valor.decode("latin-1").strip()
+                break
+
+        if clave_idempotencia is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not clave_idempotencia or len(clave_idempotencia) > LARGO_MAXIMO_CLAVE:
+            await _error(400, "IDEMPOTENCY_KEY_INVALIDA", f"Idempotency-Key debe tener entre 1 y {LARGO_MAXIMO_CLAVE} caracteres.")(scope, receive, send)
+            return
+
+        # El cuerpo se lee completo para la huella y se vuelve a entregar al handler
+        mensajes = []
+        cuerpo = b""
+        while True:
+            mensaje = await receive()
+            mensajes.append(mensaje)
+            cuerpo += mensaje.get("body", b"")
+            if mensaje["type"] != "http.request" or not mensaje.get("more_body", False):
+                break
+
+        async def recibir():
+            return mensajes.pop(0) if mensajes else await receive()
+
+        clave = _clave(clave_idempotencia, scope["path"])
+        huella = hashlib.sha256(cuerpo).hexdigest()
+
+        if not await run_in_threadpool(reservar, clave, huella):
+            await self._repetir(clave, huella, scope, recibir, send)
+            return
+
+        inicio = None
+        partes = []
+        completa = False
+
+        async def enviar(mensaje):
+            nonlocal inicio, completa
+            if mensaje["type"] == "http.response.start":
+                # Se envía con el primer fragmento: si el cliente ya se fue,
+                # la respuesta completa igual queda registrada aquí
+                inicio = mensaje
+                return
+            if mensaje["type"] == "http.response.body":
+                partes.append(mensaje.get("body", b""))
+                completa = not mensaje.get("more_body", False)
+                if len(partes) == 1:
+                    await send(inicio)
+            await send(mensaje)
+
+        try:
+            await self.app(scope, recibir, enviar)
+        except BaseException:
+            # El handler no llegó a responder: no hay nada que repetir
+            if not completa:
+                await run_in_threadpool(liberar, clave)
+                raise
+            await self._registrar(clave, inicio, partes)
+            raise
+
+        if not completa:
+            await run_in_threadpool(liberar, clave)
+            return
+        await self._registrar(clave, inicio, partes)
+
+    async def _registrar(self, clave: dict, inicio: dict, partes: list):
+        if not 200 <= inicio["status"] < 300:
+            await run_in_threadpool(liberar, clave)
+            return
+
+        headers = [(n, v) for n, v in inicio.get("headers", []) if n.lower() not in HEADERS_OMITIDOS]
+        await run_in_threadpool(guardar_con_reintentos, clave, inicio["status"], headers, b"".join(partes))
+
+    async def _repetir(self, clave: dict, huella: str, scope, receive, send):
+        item = await run_in_threadpool(leer, clave)
+
+        if item is None:
+            # Se liberó entre el put y la lectura (la primera no respondió 2xx)
+            await _error(409, "IDEMPOTENCY_KEY_EN_CURSO", "La petición original no terminó, intentar de nuevo.", reintentar=1)(scope, receive, send)
+            return
+
+        if item["huella"] != huella:
+            await _error(422, "IDEMPOTENCY_KEY_REUTILIZADA", "Idempotency-Key ya se usó con otro cuerpo.")(scope, receive, send)
+            return
+
+        if item["estado"] != "completado":
+            await _error(409, "IDEMPOTENCY_KEY_EN_CURSO", "Una petición con esta Idempotency-Key todavía está en curso.", reintentar=1)(scope, receive, send)
+            return
+
+        cuerpo = item["cuerpo"].value
+        headers = [(nombre.encode("latin-1"), valor.encode("latin-1")) for nombre, valor in item["headers_http"]]
+        headers += [(b"content-length", str(len(cuerpo)).encode()), (b"idempotent-replayed", b"true")]
+
+        await send({"type": "http.response.start", "status": int(item["status_http"]), "headers": headers})
+        await send({"type": "http.response.body", "body": cuerpo})
+
+
+def _error(status: int, codigo: str, mensaje: str, reintentar: int = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        headers={"Retry-After": str(reintentar)} if reintentar else None,
+        content={"success": False, "error_code": codigo, "message": mensaje},
+    )
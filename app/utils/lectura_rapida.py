@@ -0,0 +1,307 @@
+import os
+import random
+import time
+from typing import Optional
+
+from boto3.dynamodb.conditions import ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeSerializer
+
+from database import get_dynamodb_resource, get_dynamodb_data_client, TABLE_NAME, DynamoDBNoDisponible
+from utils.coalescencia import coalescedor
+from utils.atributos_comprimidos import descomprimir_valor, descomprimir_item
+from utils.requisitos import resolver as resolver_requisitos, ATRIBUTO_REFERENCIAS
+
+# --------------------------------------------------
+# Lectura rápida sobre el cliente de bajo nivel
+#
+# El recurso Table de boto3 pasa cada atributo por TypeDeserializer
+# (y convierte números a Decimal). Nuestros items solo usan strings,
+# booleanos y listas de strings, así que este módulo los convierte
+# directamente a dicts listos para la respuesta.
+#
+# DYNAMODB_LECTURA_RAPIDA=false vuelve al camino del recurso
+# (útil para comparar en benchmarks/carga.py).
+#
+# GetItem y Query idénticos y simultáneos comparten una sola llamada
+# (utils/coalescencia.py); cada petición deserializa su propia copia.
+#
+# Los atributos de texto guardados comprimidos (utils/atributos_comprimidos.py)
+# se devuelven ya descomprimidos, en los dos caminos, y los requisitos
+# guardados como referencias (utils/requisitos.py) ya resueltos a texto.
+# --------------------------------------------------
+
+LECTURA_RAPIDA = os.getenv("DYNAMODB_LECTURA_RAPIDA", "true").lower() != "false"
+
+dynamodb = get_dynamodb_resource()
+table = dynamodb.Table(TABLE_NAME)
+client = get_dynamodb_data_client()
+
+_serializador = TypeSerializer()
+
+# BatchGetItem: claves por llamada y reintentos de las que vuelven sin procesar
+CLAVES_POR_LOTE = 100
+REINTENTOS_PENDIENTES = 8
+ESPERA_BASE = 0.02
+
+
+# --------------------------------------------------
+# Deserialización (formato DynamoDB -> Python)
+# --------------------------------------------------
+def deserializar_valor(valor: dict):
+    # Caso más común primero: strings
+    texto = valor.get("S")
+    if texto is not None:
+        return texto
+
+    if "BOOL" in valor:
+        return valor["BOOL"]
+
+    if "L" in valor:
+        return [
+            elemento["S"] if "S" in elemento else deserializar_valor(elemento)
+            for elemento in valor["L"]
+        ]
+
+    if "N" in valor:
+        numero = valor["N"]
+        if "." in numero or "e" in numero or "E" in numero:
+            return float(numero)
+        return int(numero)
+
+    if "NULL" in valor:
+        return None
+
+    if "M" in valor:
+        return deserializar_item(valor["M"])
+
+    if "SS" in valor:
+        return list(valor["SS"])
+
+    if "B" in valor:
+        return descomprimir_valor(valor["B"])
+
+    if "NS" in valor:
+        return [deserializar_valor({"N": numero}) for numero in valor["NS"]]
+
+    if "BS" in valor:
+        return list(valor["BS"])
+
+    raise TypeError(f"Tipo DynamoDB no soportado: {list(valor)}")
+
+
+def deserializar_item(item: dict) -> dict:
+    resultado = {}
+
+    for nombre, valor in item.items():
+        texto = valor.get("S")
+        resultado[nombre] = texto if texto is not None else deserializar_valor(valor)
+
+    return resultado
+
+
+def serializar_clave(clave: dict) -> dict:
+    return {nombre: _serializador.serialize(valor) for nombre, valor in clave.items()}
+
+
+def _proyeccion(atributos, nombres: dict) -> str:
+    # Pedir `requisitos` incluye sus referencias, para poder resolverlas
+    if "requisitos" in atributos:
+        atributos = [*atributos, ATRIBUTO_REFERENCIAS]
+
+    marcadores = []
+
+    for posicion, atributo in enumerate(atributos):
+        marcador = f"#p{posicion}"
+        nombres[marcador] = atributo
+        marcadores.append(marcador)
+
+    return ", ".join(marcadores)
+
+
+# --------------------------------------------------
+# Obtener un item por clave primaria
+# Devuelve el item o None
+# --------------------------------------------------
+def obtener_item(clave: dict, proyeccion: Optional[list] = None) -> Optional[dict]:
+    if not LECTURA_RAPIDA:
+        kwargs = {"Key": clave}
+        if proyeccion:
+            nombres = {}
+            kwargs["ProjectionExpression"] = _proyeccion(proyeccion, nombres)
+            kwargs["ExpressionAttributeNames"] = nombres
+        item = table.get_item(**kwargs).get("Item")
+        return resolver_requisitos([descomprimir_item(item)])[0] if item is not None else None
+
+    kwargs = {"TableName": TABLE_NAME, "Key": serializar_clave(clave)}
+
+    if proyeccion:
+        nombres = {}
+        kwargs["ProjectionExpression"] = _proyeccion(proyeccion, nombres)
+        kwargs["ExpressionAttributeNames"] = nombres
+
+    item = coalescedor.hacer("GetItem", kwargs, lambda: client.get_item(**kwargs)).get("Item")
+    return resolver_requisitos([deserializar_item(item)])[0] if item is not None else None
+
+
+# --------------------------------------------------
+# Obtener varios items por clave primaria (BatchGetItem)
+# Devuelve los que existen, sin orden garantizado
+# --------------------------------------------------
+def obtener_items(claves: list) -> list:
+    items = []
+
+    for inicio in range(0, len(claves), CLAVES_POR_LOTE):
+        lote = claves[inicio:inicio + CLAVES_POR_LOTE]
+        if not LECTURA_RAPIDA:
+            pendientes = lote
+            leer = dynamodb.batch_get_item
+            convertir = descomprimir_item
+        else:
+            pendientes = [serializar_clave(clave) for clave in lote]
+            leer = client.batch_get_item
+            convertir = deserializar_item
+
+        for intento in range(REINTENTOS_PENDIENTES):
+            response = leer(RequestItems={TABLE_NAME: {"Keys": pendientes}})
+            items.extend(convertir(item) for item in response["Responses"].get(TABLE_NAME, []))
+
+            pendientes = response.get("UnprocessedKeys", {}).get(TABLE_NAME, {}).get("Keys", [])
+            if not pendientes:
+                break
+            time.sleep(random.uniform(0, ESPERA_BASE * 2 ** intento))
+        else:
+            raise DynamoDBNoDisponible(1.0)
+
+    return resolver_requisitos(items)
+
+
+# --------------------------------------------------
+# Consultar por condición de clave (tabla o índice)
+# Devuelve {"Items": [...], "LastEvaluatedKey": ...} como el recurso
+# --------------------------------------------------
+def consultar(
+    condicion,
+    indice: Optional[str] = None,
+    proyeccion: Optional[list] = None,
+    filtro=None,
+    limite: Optional[int] = None,
+    inicio: Optional[dict] = None,
+) -> dict:
+    if not LECTURA_RAPIDA:
+        kwargs = {"KeyConditionExpression": condicion}
+        if indice:
+            kwargs["IndexName"] = indice
+        if filtro is not None:
+            kwargs["FilterExpression"] = filtro
+        if limite:
+            kwargs["Limit"] = limite
+        if inicio:
+            kwargs["ExclusiveStartKey"] = inicio
+        if proyeccion:
+            nombres = {}
+            kwargs["ProjectionExpression"] = _proyeccion(proyeccion, nombres)
+            kwargs["ExpressionAttributeNames"] = nombres
+        response = table.query(**kwargs)
+        for item in response.get("Items", []):
+            descomprimir_item(item)
+        resolver_requisitos(response.get("Items", []))
+        return response
+
+    constructor = ConditionExpressionBuilder()
+    clave = constructor.build_expression(condicion, is_key_condition=True)
+
+    nombres = dict(clave.attribute_name_placeholders)
+    valores = dict(clave.attribute_value_placeholders)
+
+    kwargs = {
+        "TableName": TABLE_NAME,
+        "KeyConditionExpression": clave.condition_expression,
+    }
+
+    if indice:
+        kwargs["IndexName"] = indice
+
+    if filtro is not None:
+        construido = constructor.build_expression(filtro)
+        kwargs["FilterExpression"] = construido.condition_expression
+        nombres.update(construido.attribute_name_placeholders)
+        valores.update(construido.attribute_value_placeholders)
+
+    if proyeccion:
+        kwargs["ProjectionExpression"] = _proyeccion(proyeccion, nombres)
+
+    if limite:
+        kwargs["Limit"] = limite
+
+    if inicio:
+        kwargs["ExclusiveStartKey"] = serializar_clave(inicio)
+
+    kwargs["ExpressionAttributeNames"] = nombres
+    kwargs["ExpressionAttributeValues"] = {
+        marcador: _serializador.serialize(valor)
+        for marcador, valor in valores.items()
+    }
+
+    response = coalescedor.hacer("Query", kwargs, lambda: client.query(**kwargs))
+
+    resultado = {"Items": resolver_requisitos([deserializar_item(item) for item in response.get("Items", [])])}
+    if "LastEvaluatedKey" in response:
+        resultado["LastEvaluatedKey"] = deserializar_item(response["LastEvaluatedKey"])
+
+    return resultado
+
+
+# --------------------------------------------------
+# Recorrer toda la tabla (construcción de índices en memoria)
+# Generador de items, página por página
+# --------------------------------------------------
+def escanear(filtro=None, proyeccion: Optional[list] = None):
+    inicio = None
+
+    while True:
+        if not LECTURA_RAPIDA:
+            kwargs = {}
+            if filtro is not None:
+                kwargs["FilterExpression"] = filtro
+            if proyeccion:
+                nombres = {}
+                kwargs["ProjectionExpression"] = _proyeccion(proyeccion, nombres)
+                kwargs["ExpressionAttributeNames"] = nombres
+            if inicio:
+                kwargs["ExclusiveStartKey"] = inicio
+
+            response = table.scan(**kwargs)
+            yield from resolver_requisitos([descomprimir_item(item) for item in response.get("Items", [])])
+        else:
+            kwargs = {"TableName": TABLE_NAME}
+            nombres = {}
+            valores = {}
+
+            if filtro is not None:
+                construido = ConditionExpressionBuilder().build_expression(filtro)
+                kwargs["FilterExpression"] = construido.condition_expression
+                nombres.update(construido.attribute_name_placeholders)
+                valores.update(construido.attribute_value_placeholders)
+
+            if proyeccion:
+                kwargs["ProjectionExpression"] = _proyeccion(proyeccion, nombres)
+
+            if nombres:
+                kwargs["ExpressionAttributeNames"] = nombres
+            if valores:
+                kwargs["ExpressionAttributeValues"] = {
+                    marcador: _serializador.serialize(valor)
+                    for marcador, valor in valores.items()
+                }
+            if inicio:
+                kwargs["ExclusiveStartKey"] = serializar_clave(inicio)
+
+            response = client.scan(**kwargs)
+            yield from resolver_requisitos([deserializar_item(item) for item in response.get("Items", [])])
+
+            if "LastEvaluatedKey" in response:
+                response["LastEvaluatedKey"] = deserializar_item(response["LastEvaluatedKey"])
+
+        inicio = response.get("LastEvaluatedKey")
+        if not inicio:
+            break
@@ -0,0 +1,213 @@
+import contextvars
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+
+from database import TABLE_NAME, ERRORES_DE_CAPACIDAD
+from utils.cambios import SET_CAMBIO, valores_cambio
+from utils.atributos_comprimidos import comprimir_valor, descomprimir_item
+from utils.lectura_rapida import consultar
+from utils.requisitos import resolver
+from utils.transacciones import client, motivos_cancelacion
+
+# --------------------------------------------------
+# Escrituras por lote (muchos registros en una petición)
+#
+# - Cada registro se escribe con su propio UpdateItem; se lanzan en
+#   paralelo con hilos acotados por LOTE_PARALELISMO.
+# - Si DynamoDB responde por falta de capacidad (o una transacción
+#   choca con otra) se reintenta con espera exponencial aleatoria; lo
+#   demás se reporta por registro.
+# --------------------------------------------------
+
+LOTE_PARALELISMO = int(os.getenv("LOTE_PARALELISMO", "16"))
+
+# Registros que acepta una petición (ids explícitos o resultado del filtro)
+MAXIMO_ITEMS = 1000
+
+# Reintentos por falta de capacidad (espera aleatoria hasta base * 2^intento).
+# Se suman a los del cliente (database.py): un lote largo prefiere esperar
+# a que baje el throttling antes que marcar registros como fallidos.
+REINTENTOS = 8
+ESPERA_BASE = 0.05
+ESPERA_MAXIMA = 2.0
+
+# Motivos por los que una transacción cancelada se puede repetir tal cual
+MOTIVOS_REINTENTABLES = {"TransactionConflict", "ThrottlingError", "ProvisionedThroughputExceeded"}
+
+
+def _reintentable(error: ClientError) -> bool:
+    codigo = error.response["Error"]["Code"]
+    if codigo == "TransactionCanceledException":
+        motivos = motivos_cancelacion(error)
+        return "ConditionalCheckFailed" not in motivos and any(m in MOTIVOS_REINTENTABLES for m in motivos)
+    return codigo in ERRORES_DE_CAPACIDAD
+
+
+def con_reintentos(operacion):
+    for intento in range(REINTENTOS):
+        try:
+            return operacion()
+        except ClientError as error:
+            if not _reintentable(error) or intento == REINTENTOS - 1:
+                raise
+            time.sleep(random.uniform(0, min(ESPERA_MAXIMA, ESPERA_BASE * 2 ** intento)))
+
+
+def en_paralelo(funcion, elementos: list, paralelismo: int = None) -> list:
+    """
+    Aplica la función a cada elemento con hilos acotados; conserva el orden.
+    Cada llamada corre con una copia del contexto de la petición, así las
+    mediciones por petición (benchmarks, perfilado) ven sus llamadas.
+    """
+    if len(elementos) <= 1:
+        return [funcion(elemento) for elemento in elementos]
+
+    contexto = contextvars.copy_context()
+    hilos_maximos = min(paralelismo or LOTE_PARALELISMO, len(elementos))
+
+    with ThreadPoolExecutor(max_workers=hilos_maximos) as hilos:
+        return list(hilos.map(lambda elemento: contexto.copy().run(funcion, elemento), elementos))
+
+
+# --------------------------------------------------
+# Registros a actualizar: [{"id", "PK", "SK"}]
+# --------------------------------------------------
+def objetivos(tipo: str, ids: list = None, id_institucion: str = None, filtro: dict = None) -> list:
+    """
+    - ids + id_institucion: las claves se arman sin leer nada.
+    - solo ids: una consulta al GSI1 por id (en paralelo).
+    - solo id_institucion: consulta de su partición, con el filtro.
+    Los ids que no existen vuelven con PK None.
+    """
+    if ids and id_institucion:
+        return [
+            {"id": id_hijo, "PK": f"INSTITUCION#{id_institucion}", "SK": f"{tipo}#{id_hijo}"}
+            for id_hijo in dict.fromkeys(ids)
+        ]
+
+    if ids:
+        return en_paralelo(lambda id_hijo: _buscar_por_id(tipo, id_hijo), list(dict.fromkeys(ids)))
+
+    encontrados = []
+    inicio = None
+    while True:
+        response = consultar(
+            Key("PK").eq(f"INSTITUCION#{id_institucion}") & Key("SK").begins_with(f"{tipo}#"),
+            proyeccion=["PK", "SK"],
+            filtro=_filtro(filtro),
+            inicio=inicio,
+        )
+
+        for item in response.get("Items", []):
+            encontrados.append({"id": item["SK"].split("#", 1)[1], **item})
+
+        if len(encontrados) > MAXIMO_ITEMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"El filtro coincide con más de {MAXIMO_ITEMS} registros; acotarlo o enviar ids."
+            )
+
+        inicio = response.get("LastEvaluatedKey")
+        if not inicio:
+            return encontrados
+
+
+def _buscar_por_id(tipo: str, id_hijo: str) -> dict:
+    response = con_reintentos(lambda: consultar(
+        Key("GSI1PK").eq(f"{tipo}#{id_hijo}"),
+        indice="GSI1",
+        proyeccion=["PK", "SK"],
+    ))
+    items = response.get("Items", [])
+    return {"id": id_hijo, "PK": None, "SK": None, **(items[0] if items else {})}
+
+
+def _filtro(filtro: dict):
+    condicion = None
+    for campo, valor in (filtro or {}).items():
+        condicion = Attr(campo).eq(valor) if condicion is None else condicion & Attr(campo).eq(valor)
+    return condicion
+
+
+# --------------------------------------------------
+# Actualización
+# --------------------------------------------------
+def actualizar_lote(
+    tipo: str,
+    destinos: list,
+    cambios: dict,
+    filtro: dict = None,
+    extra=None,
+    quitar: list = None,
+) -> list:
+    """
+    Aplica `cambios` a cada destino y devuelve un resultado por registro:
+    {"id", "resultado": "actualizado" | "no_encontrado" | "fallido", "detalle", "item"}.
+
+    - `filtro` también se exige como condición de la escritura (un id
+      explícito que no lo cumple queda como no_encontrado).
+    - `extra(item_destino)` devuelve asignaciones adicionales por registro
+      (p. ej. las claves del índice por estado).
+    - `quitar`: atributos a eliminar en la misma escritura.
+    """
+    now = datetime.utcnow().isoformat()
+
+    def uno(destino: dict) -> dict:
+        if destino["PK"] is None:
+            return {"id": destino["id"], "resultado": "no_encontrado"}
+
+        asignaciones = {**cambios, **(extra(destino) if extra else {}), "fecha_actualizacion": now}
+        condiciones = ["attribute_exists(PK)"] + [f"#f_{campo} = :f_{campo}" for campo in (filtro or {})]
+
+        try:
+            response = con_reintentos(lambda: client.update_item(
+                TableName=TABLE_NAME,
+                Key={"PK": destino["PK"], "SK": destino["SK"]},
+                UpdateExpression="SET " + ", ".join(
+                    [f"#{campo} = :{campo}" for campo in asignaciones] + [SET_CAMBIO]
+                ) + (" REMOVE " + ", ".join(quitar) if quitar else ""),
+                ConditionExpression=" AND ".join(condiciones),
+                ExpressionAttributeNames={
+                    **{f"#{campo}": campo for campo in asignaciones},
+                    **{f"#f_{campo}": campo for campo in (filtro or {})},
+                },
+                ExpressionAttributeValues={
+                    **{f":{campo}": comprimir_valor(campo, valor) for campo, valor in asignaciones.items()},
+                    **{f":f_{campo}": valor for campo, valor in (filtro or {}).items()},
+                    **valores_cambio(tipo, destino["id"], now),
+                },
+                ReturnValues="ALL_NEW",
+            ))
+        except ClientError as error:
+            codigo = error.response["Error"]["Code"]
+            if codigo == "ConditionalCheckFailedException":
+                return {"id": destino["id"], "resultado": "no_encontrado"}
+            return {"id": destino["id"], "resultado": "fallido", "detalle": codigo}
+
+        return {"id": destino["id"], "resultado": "actualizado", "item": resolver([descomprimir_item(response["Attributes"])])[0]}
+
+    return en_paralelo(uno, destinos)
+
+
+def resumen(resultados: list) -> dict:
+    """Totales por resultado y el detalle de cada registro (sin el item escrito)."""
+    totales = {"actualizados": 0, "no_encontrados": 0, "fallidos": 0}
+    nombres = {"actualizado": "actualizados", "no_encontrado": "no_encontrados", "fallido": "fallidos"}
+
+    for resultado in resultados:
+        totales[nombres[resultado["resultado"]]] += 1
+
+    return {
+        **totales,
+        "resultados": [
+            {campo: valor for campo, valor in resultado.items() if campo != "item"}
+            for resultado in resultados
+        ],
+    }
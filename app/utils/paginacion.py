@@ -0,0 +1,42 @@
+import base64
+import json
+
+from fastapi import HTTPException
+
+# --------------------------------------------------
+# Cursores de paginación
+# El LastEvaluatedKey de DynamoDB viaja al cliente como un string
+# opaco (JSON en base64 url-safe) y vuelve en ?cursor=
+# --------------------------------------------------
+
+
+def codificar_cursor(clave):
+    if not clave:
+        return None
+
+    datos = json.dumps(clave, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(datos).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    if not cursor:
+        return None
+
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        clave = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="El cursor no es válido.")
+
+    if not isinstance(clave, dict) or not all(isinstance(v, str) for v in clave.values()):
+        raise HTTPException(status_code=400, detail="El cursor no es válido.")
+
+    return clave
+
+
+def pagina(respuesta: dict, items: list) -> dict:
+    """Arma la respuesta paginada a partir del resultado de consultar()."""
+    return {
+        "items": items,
+        "siguiente": codificar_cursor(respuesta.get("LastEvaluatedKey")),
+    }
@@ -0,0 +1,388 @@
+import contextvars
+import functools
+import hmac
+import inspect
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+
+# --------------------------------------------------
+# Perfilado bajo demanda (CPU y memoria)
+#
+# Solo se activa si existe la variable PERFILADO_TOKEN.
+# Sin ella, main.py no registra el middleware ni las rutas /admin/perfilado,
+# por lo que el costo en producción es cero.
+#
+# Los resultados quedan en el proceso que atendió la petición. Con varios
+# workers (servidor.py), /admin/perfilado responde con los del worker que
+# recibe esa consulta: los perfiles de CPU se comparten definiendo
+# PERFILADO_DIR en un disco común a todos; la ventana de memoria mide
+# solo el worker que recibió el POST.
+# --------------------------------------------------
+
+PERFILADO_TOKEN = os.getenv("PERFILADO_TOKEN")
+PERFILADO_DIR = os.getenv("PERFILADO_DIR")
+HEADER_PERFILADO = "x-perfilado"
+
+# Intervalo de muestreo del perfil de CPU (milisegundos)
+INTERVALO_MUESTREO = float(os.getenv("PERFILADO_INTERVALO_MS", "2")) / 1000
+
+# Solo se contabilizan pilas que pasan por el código de la API
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ESTE_ARCHIVO = os.path.abspath(__file__)
+
+# Últimos resultados en memoria (consultables desde /admin/perfilado)
+perfiles_cpu = deque(maxlen=20)
+diferencias_memoria = deque(maxlen=5)
+
+_lock = threading.Lock()
+_ventana_memoria = {
+    "restantes": 0,
+    "total": 0,
+    "base": None,
+    "inicio": None,
+    "numero": 0,        # cambia con cada ventana nueva
+    "procesando": 0,    # ventanas cerradas cuya comparación sigue en curso
+}
+
+
+def perfilado_habilitado() -> bool:
+    return bool(PERFILADO_TOKEN)
+
+
+def token_valido(valor) -> bool:
+    # Comparación en tiempo constante: no revela cuántos caracteres coinciden
+    return (
+        perfilado_habilitado()
+        and isinstance(valor, str)
+        and hmac.compare_digest(valor.encode(), PERFILADO_TOKEN.encode())
+    )
+
+
+# --------------------------------------------------
+# Perfil de CPU por muestreo
+# Formato de salida: "pilas plegadas" (folded stacks),
+# compatible con flamegraph.pl y speedscope
+#
+# Solo se muestrea el hilo que ejecuta el handler de la petición
+# perfilada, no las demás peticiones en curso. Con el perfilado activo,
+# cada endpoint se envuelve (etiquetar_handlers): al empezar, el
+# envoltorio avisa al muestreador de la petición (_perfil_en_curso, que
+# el threadpool copia del middleware) en qué hilo corre y con qué frame.
+# Un endpoint síncrono corre en un hilo del threadpool; uno async, en el
+# hilo del event loop, y se muestrea solo mientras su frame está en la
+# pila (no mientras espera un await).
+# --------------------------------------------------
+_perfil_en_curso = contextvars.ContextVar("perfil_en_curso", default=None)
+
+
+class MuestreadorCPU:
+
+    def __init__(self, intervalo: float = INTERVALO_MUESTREO):
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self.muestras = 0
+        self._handler = None     # (ident del hilo, frame del envoltorio) cuando empieza el handler
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+
+    def iniciar(self):
+        # Antes de que la petición siga: el threadpool copia este contexto
+        self._token = _perfil_en_curso.set(self)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        self._hilo.join()
+        _perfil_en_curso.reset(self._token)
+
+    def registrar_handler(self, frame):
+        """Llamado desde el hilo del handler, con el frame del envoltorio."""
+        self._handler = (threading.get_ident(), frame)
+
+    def _ejecutar(self):
+        while not self._detener.wait(self.intervalo):
+            frame = self._frame_del_handler()
+            if frame is None:
+                continue
+
+            pila = _pila_de_frame(frame)
+            if pila:
+                self.pilas[pila] += 1
+                self.muestras += 1
+
+    def _frame_del_handler(self):
+        """Frame actual del hilo del handler, o None si no está corriendo."""
+        if self._handler is None:
+            return None
+
+        # El hilo vuelve al pool al terminar: solo cuenta mientras siga en el endpoint
+        ident, envoltorio = self._handler
+        frame = sys._current_frames().get(ident)
+        return frame if _en_la_pila(frame, envoltorio) else None
+
+    def plegado(self) -> str:
+        return "\n".join(
+            f"{pila} {cantidad}"
+            for pila, cantidad in self.pilas.most_common()
+        )
+
+
+def etiquetar_handlers(app):
+    """Envuelve el endpoint de cada ruta para que avise al muestreador de su petición."""
+    for ruta in app.routes:
+        dependant = getattr(ruta, "dependant", None)
+        if dependant is not None and dependant.call is not None:
+            dependant.call = _etiquetado(dependant.call)
+
+
+def _etiquetado(endpoint):
+    # Conserva si es async o no: FastAPI decide con eso si usa el threadpool
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def envoltorio(*args, **kwargs):
+            _avisar_handler()
+            return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def envoltorio(*args, **kwargs):
+            _avisar_handler()
+            return endpoint(*args, **kwargs)
+    return envoltorio
+
+
+def _avisar_handler():
+    muestreador = _perfil_en_curso.get()
+    if muestreador is not None:
+        muestreador.registrar_handler(sys._getframe(1))
+
+
+def _en_la_pila(frame, buscado) -> bool:
+    while frame is not None:
+        if frame is buscado:
+            return True
+        frame = frame.f_back
+    return False
+
+
+def _pila_de_frame(frame):
+    nombres = []
+    en_app = False
+
+    while frame is not None:
+        archivo = os.path.abspath(frame.f_code.co_filename)
+
+        # El envoltorio de etiquetar_handlers no aporta a la pila
+        if archivo == ESTE_ARCHIVO:
+            frame = frame.f_back
+            continue
+
+        if archivo.startswith(APP_DIR):
+            en_app = True
+
+        carpeta, nombre_archivo = os.path.split(archivo)
+        nombres.append(
+            f"{os.path.basename(carpeta)}/{nombre_archivo}:{frame.f_code.co_name}"
+        )
+        frame = frame.f_back
+
+    # Se ignoran hilos inactivos o ajenos a la petición (pool, event loop en espera)
+    if not en_app:
+        return None
+
+    nombres.reverse()
+    return ";".join(nombres)
+
+
+# --------------------------------------------------
+# Ventana de memoria con tracemalloc
+#
+# La foto final y la comparación pueden tardar segundos con un heap
+# grande: corren en un hilo aparte, no en el event loop ni con _lock
+# tomado (las peticiones lo toman al terminar).
+# --------------------------------------------------
+def iniciar_ventana_memoria(peticiones: int):
+    with _lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+
+    base = tracemalloc.take_snapshot()
+
+    with _lock:
+        _ventana_memoria["restantes"] = peticiones
+        _ventana_memoria["total"] = peticiones
+        _ventana_memoria["base"] = base
+        _ventana_memoria["inicio"] = datetime.utcnow().isoformat()
+        _ventana_memoria["numero"] += 1
+
+
+def estado_ventana_memoria():
+    return {
+        "pid": os.getpid(),
+        "activa": _ventana_memoria["restantes"] > 0,
+        "peticiones_restantes": _ventana_memoria["restantes"],
+        "peticiones_ventana": _ventana_memoria["total"],
+        "inicio": _ventana_memoria["inicio"],
+        "procesando": _ventana_memoria["procesando"] > 0,
+    }
+
+
+def _registrar_peticion_memoria():
+    with _lock:
+        if _ventana_memoria["restantes"] <= 0:
+            return
+
+        _ventana_memoria["restantes"] -= 1
+        if _ventana_memoria["restantes"] > 0:
+            return
+
+        # Se copia todo lo de esta ventana: otra puede empezar enseguida
+        ventana = {
+            "base": _ventana_memoria["base"],
+            "inicio": _ventana_memoria["inicio"],
+            "fin": datetime.utcnow().isoformat(),
+            "peticiones": _ventana_memoria["total"],
+            "numero": _ventana_memoria["numero"],
+        }
+        _ventana_memoria["base"] = None
+        _ventana_memoria["procesando"] += 1
+
+    threading.Thread(target=_cerrar_ventana_memoria, args=(ventana,), daemon=True).start()
+
+
+def _cerrar_ventana_memoria(ventana: dict):
+    try:
+        final = tracemalloc.take_snapshot()
+        with _lock:
+            # Si ya empezó otra ventana, sigue necesitando tracemalloc
+            if _ventana_memoria["numero"] == ventana["numero"]:
+                tracemalloc.stop()
+
+        # Se excluyen las asignaciones del propio perfilador
+        filtros = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, ESTE_ARCHIVO),
+        ]
+        estadisticas = final.filter_traces(filtros).compare_to(ventana["base"].filter_traces(filtros), "lineno")
+
+        resultado = {
+            "id": uuid.uuid4().hex[:8],
+            "inicio": ventana["inicio"],
+            "fin": ventana["fin"],
+            "peticiones": ventana["peticiones"],
+            "diferencia_total_kb": round(sum(e.size_diff for e in estadisticas) / 1024, 1),
+            "top": [
+                {
+                    "ubicacion": str(e.traceback[0]),
+                    "diferencia_kb": round(e.size_diff / 1024, 1),
+                    "diferencia_bloques": e.count_diff,
+                    "total_kb": round(e.size / 1024, 1),
+                }
+                for e in estadisticas[:25]
+            ],
+        }
+
+        diferencias_memoria.append(resultado)
+        _guardar_en_disco(
+            f"memoria-{resultado['id']}.txt",
+            "\n".join(str(e) for e in estadisticas[:100]),
+        )
+    finally:
+        with _lock:
+            _ventana_memoria["procesando"] -= 1
+
+
+def _guardar_en_disco(nombre: str, contenido: str):
+    if not PERFILADO_DIR:
+        return
+
+    os.makedirs(PERFILADO_DIR, exist_ok=True)
+    with open(os.path.join(PERFILADO_DIR, nombre), "w", encoding="utf-8") as archivo:
+        archivo.write(contenido)
+
+
+# --------------------------------------------------
+# Middleware ASGI
+# Perfila la petición si trae el header X-Perfilado con el token correcto
+# --------------------------------------------------
+class PerfiladoMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/admin/perfilado"):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            solicitado = any(
+                nombre == HEADER_PERFILADO.encode() and token_valido(valor.decode())
+                for nombre, valor in scope["headers"]
+            )
+
+            if not solicitado:
+                await self.app(scope, receive, send)
+                return
+
+            muestreador = MuestreadorCPU()
+            inicio = time.perf_counter()
+            muestreador.iniciar()
+
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                muestreador.detener()
+                _registrar_perfil_cpu(scope, muestreador, time.perf_counter() - inicio)
+        finally:
+            _registrar_peticion_memoria()
+
+
+def _registrar_perfil_cpu(scope, muestreador: MuestreadorCPU, duracion: float):
+    perfil = {
+        "id": uuid.uuid4().hex[:8],
+        "pid": os.getpid(),
+        "fecha": datetime.utcnow().isoformat(),
+        "metodo": scope["method"],
+        "ruta": scope["path"],
+        "duracion_ms": round(duracion * 1000, 2),
+        "muestras": muestreador.muestras,
+        "plegado": muestreador.plegado(),
+    }
+
+    perfiles_cpu.append(perfil)
+    _guardar_en_disco(f"cpu-{perfil['id']}.folded", perfil["plegado"])
+
+
+def buscar_perfil_cpu(id_perfil: str):
+    """Perfil de este worker o, si no está, el que otro escribió en PERFILADO_DIR."""
+    for perfil in perfiles_cpu:
+        if perfil["id"] == id_perfil:
+            return perfil
+
+    # El id viene de la URL: solo hex, para no salir de la carpeta
+    if not PERFILADO_DIR or len(id_perfil) != 8 or any(c not in "0123456789abcdef" for c in id_perfil):
+        return None
+    try:
+        with open(os.path.join(PERFILADO_DIR, f"cpu-{id_perfil}.folded"), encoding="utf-8") as archivo:
+            return {"id": id_perfil, "plegado": archivo.read()}
+    except FileNotFoundError:
+        return None
+
+
+def perfiles_cpu_en_disco(maximo: int = 20) -> list:
+    """Ids de los últimos perfiles de CPU en PERFILADO_DIR (de todos los workers)."""
+    if not PERFILADO_DIR or not os.path.isdir(PERFILADO_DIR):
+        return []
+
+    archivos = [
+        entrada for entrada in os.scandir(PERFILADO_DIR)
+        if entrada.name.startswith("cpu-") and entrada.name.endswith(".folded")
+    ]
+    archivos.sort(key=lambda entrada: entrada.stat().st_mtime, reverse=True)
+    return [entrada.name[len("cpu-"):-len(".folded")] for entrada in archivos[:maximo]]
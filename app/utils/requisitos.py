@@ -0,0 +1,319 @@
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from botocore.exceptions import ClientError
+
+from database import get_dynamodb_data_client, TABLE_NAME, DynamoDBNoDisponible
+from utils.texto import normalizar
+from utils.transacciones import client as client_escritura
+
+# --------------------------------------------------
+# Catálogo compartido de requisitos (opcional)
+#
+# Los mismos requisitos ("DPI vigente", "Recibo de luz") se repiten en
+# miles de trámites. Con REQUISITOS_NORMALIZADOS=true cada texto se
+# guarda una sola vez:
+#
+#   PK = REQUISITO#<id>   SK = METADATA   {id_requisito, texto, ...}
+#
+# y el trámite guarda solo los ids en `requisitos_ref`. El id sale del
+# texto exacto (sin espacios de más), así que el mismo requisito escrito
+# en dos trámites comparte el item y cada trámite lee el texto que envió.
+#
+# Con REQUISITOS_IGNORAR_MAYUSCULAS=true el id sale del texto normalizado
+# (minúsculas, sin acentos): "DPI vigente" y "dpi vigente" son el mismo
+# requisito, y ambos trámites leen el texto con que se creó.
+#
+# La API no cambia: los creates y PATCH siguen recibiendo `requisitos`
+# como lista de textos, y lectura_rapida resuelve `requisitos_ref` a
+# `requisitos` con un BatchGetItem por página de items (solo los ids que
+# no están en la caché del proceso).
+#
+# Los items con `requisitos` en texto (anteriores o escritos sin la
+# variable) se leen igual; scripts/normalizar_requisitos los migra.
+#
+# PATCH /requisitos/{id} cambia el texto en todos los trámites que lo
+# usan: en este proceso al instante, en los demás cuando vence su caché
+# (REQUISITOS_CACHE_SEGUNDOS). El id no cambia; el del texto nuevo queda
+# como alias del requisito corregido:
+#
+#   PK = REQUISITO#<id del texto nuevo>   SK = METADATA   {id_requisito, alias_de}
+#
+# para que un trámite que después escriba el texto corregido use el mismo
+# requisito en lugar de crear otro igual.
+# --------------------------------------------------
+
+REQUISITOS_NORMALIZADOS = os.getenv("REQUISITOS_NORMALIZADOS", "false").lower() == "true"
+REQUISITOS_IGNORAR_MAYUSCULAS = os.getenv("REQUISITOS_IGNORAR_MAYUSCULAS", "false").lower() == "true"
+REQUISITOS_CACHE_SEGUNDOS = float(os.getenv("REQUISITOS_CACHE_SEGUNDOS", "300"))
+REQUISITOS_CACHE_MAXIMO = int(os.getenv("REQUISITOS_CACHE_MAXIMO", "20000"))
+
+ATRIBUTO_REFERENCIAS = "requisitos_ref"
+
+# Límite de claves por BatchGetItem
+CLAVES_POR_LECTURA = 100
+
+# Reintentos de las claves que DynamoDB devuelve sin procesar
+REINTENTOS_PENDIENTES = 8
+ESPERA_BASE = 0.02
+
+logger = logging.getLogger(__name__)
+
+client = get_dynamodb_data_client()
+
+
+def id_requisito(texto: str) -> str:
+    clave = " ".join(texto.split())
+    if REQUISITOS_IGNORAR_MAYUSCULAS:
+        clave = normalizar(clave)
+    return f"REQ-{hashlib.blake2b(clave.encode('utf-8'), digest_size=6).hexdigest()}"
+
+
+def clave_requisito(id_req: str) -> dict:
+    return {"PK": f"REQUISITO#{id_req}", "SK": "METADATA"}
+
+
+# --------------------------------------------------
+# Caché de textos por id (con vencimiento)
+# --------------------------------------------------
+class CacheDeRequisitos:
+
+    def __init__(self, segundos: float = REQUISITOS_CACHE_SEGUNDOS, maximo: int = REQUISITOS_CACHE_MAXIMO):
+        self.segundos = segundos
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._textos = {}        # id -> (texto, vence)
+        self._alias = {}         # id del texto corregido -> id del requisito (no cambian)
+        self.metricas = {"aciertos": 0, "leidos": 0, "lecturas": 0, "faltantes": 0}
+
+    def textos(self, ids) -> dict:
+        """
+        {id: texto} de los ids pedidos (un alias trae el texto de su
+        requisito); los que no existen quedan fuera.
+        """
+        ahora = time.monotonic()
+        ids = list(dict.fromkeys(ids))
+        encontrados = {}
+        pendientes = []
+
+        with self._lock:
+            for id_req in ids:
+                guardado = self._textos.get(self._alias.get(id_req, id_req))
+                if guardado is not None and guardado[1] > ahora:
+                    encontrados[id_req] = guardado[0]
+                else:
+                    pendientes.append(self._alias.get(id_req, id_req))
+            self.metricas["aciertos"] += len(encontrados)
+
+        if pendientes:
+            pendientes = list(dict.fromkeys(pendientes))
+            leidos, alias = _leer(pendientes)
+            lecturas = -(-len(pendientes) // CLAVES_POR_LECTURA)
+
+            # Alias recién conocidos: falta el texto de su requisito
+            destinos = [destino for destino in dict.fromkeys(alias.values()) if destino not in leidos]
+            if destinos:
+                leidos.update(_leer(destinos)[0])
+                lecturas += -(-len(destinos) // CLAVES_POR_LECTURA)
+
+            with self._lock:
+                self.metricas["leidos"] += len(leidos)
+                self.metricas["lecturas"] += lecturas
+                self.metricas["faltantes"] += sum(
+                    1 for id_req in pendientes if id_req not in leidos and id_req not in alias
+                )
+            self.guardar(leidos, alias)
+
+            for id_req in ids:
+                if id_req not in encontrados:
+                    texto = leidos.get(self.canonico(id_req))
+                    if texto is not None:
+                        encontrados[id_req] = texto
+
+        return encontrados
+
+    def canonico(self, id_req: str) -> str:
+        """Id del requisito al que apunta un alias conocido (o el mismo id)."""
+        return self._alias.get(id_req, id_req)
+
+    def guardar(self, textos: dict, alias: dict = None):
+        vence = time.monotonic() + self.segundos
+        alias = alias or {}
+        with self._lock:
+            if len(self._textos) + len(self._alias) + len(textos) + len(alias) > self.maximo:
+                self._textos.clear()
+                self._alias.clear()
+            for id_req, texto in textos.items():
+                self._textos[id_req] = (texto, vence)
+            self._alias.update(alias)
+
+    def olvidar(self, id_req: str):
+        with self._lock:
+            self._textos.pop(id_req, None)
+
+    def estado(self) -> dict:
+        return {
+            "normalizados": REQUISITOS_NORMALIZADOS,
+            "ignorar_mayusculas": REQUISITOS_IGNORAR_MAYUSCULAS,
+            "en_cache": len(self._textos),
+            **self.metricas,
+        }
+
+
+def _leer(ids: list) -> tuple:
+    """({id: texto}, {alias: id del requisito}) con BatchGetItem, de a CLAVES_POR_LECTURA."""
+    textos = {}
+    alias = {}
+
+    for inicio in range(0, len(ids), CLAVES_POR_LECTURA):
+        pendientes = [
+            {"PK": {"S": f"REQUISITO#{id_req}"}, "SK": {"S": "METADATA"}}
+            for id_req in ids[inicio:inicio + CLAVES_POR_LECTURA]
+        ]
+
+        for intento in range(REINTENTOS_PENDIENTES):
+            response = client.batch_get_item(RequestItems={
+                TABLE_NAME: {"Keys": pendientes, "ProjectionExpression": "id_requisito, texto, alias_de"},
+            })
+            for item in response["Responses"].get(TABLE_NAME, []):
+                if "alias_de" in item:
+                    alias[item["id_requisito"]["S"]] = item["alias_de"]["S"]
+                else:
+                    textos[item["id_requisito"]["S"]] = item["texto"]["S"]
+
+            pendientes = response.get("UnprocessedKeys", {}).get(TABLE_NAME, {}).get("Keys", [])
+            if not pendientes:
+                break
+            _esperar(intento)
+        else:
+            raise DynamoDBNoDisponible(1.0)
+
+    return textos, alias
+
+
+def _esperar(intento: int):
+    time.sleep(random.uniform(0, ESPERA_BASE * 2 ** intento))
+
+
+cache = CacheDeRequisitos()
+
+
+# --------------------------------------------------
+# Escritura: textos -> ids
+# --------------------------------------------------
+def registrar(textos: list) -> list:
+    """
+    Ids de los textos, en el mismo orden. Un texto que es la corrección de
+    otro requisito toma el id de ese requisito. Crea los que todavía no
+    existen (put condicional: si otro proceso lo creó o lo editó antes, se
+    respeta el que está).
+    """
+    ids = [id_requisito(texto) for texto in textos]
+    existentes = cache.textos(ids)
+    now = datetime.utcnow().isoformat()
+
+    nuevos = {}
+    for posicion, (id_req, texto) in enumerate(zip(ids, textos)):
+        if id_req in existentes or id_req in nuevos:
+            ids[posicion] = cache.canonico(id_req)
+            continue
+        try:
+            client_escritura.put_item(
+                TableName=TABLE_NAME,
+                Item={
+                    **clave_requisito(id_req),
+                    "id_requisito": id_req,
+                    "texto": texto,
+                    "fecha_creacion": now,
+                    "fecha_actualizacion": now,
+                },
+                ConditionExpression="attribute_not_exists(PK)",
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            # Puede ser un alias que otro proceso acaba de crear
+            cache.textos([id_req])
+            ids[posicion] = cache.canonico(id_req)
+            continue
+        nuevos[id_req] = texto
+
+    cache.guardar(nuevos)
+    return ids
+
+
+def registrar_alias(id_req: str, texto: str):
+    """
+    Tras corregir el texto de `id_req`: el id del texto nuevo pasa a
+    apuntar a ese requisito. Si ya existe (otro requisito con ese texto o
+    un alias anterior), se deja como está.
+    """
+    id_alias = id_requisito(texto)
+    if id_alias == id_req:
+        return
+
+    try:
+        client_escritura.put_item(
+            TableName=TABLE_NAME,
+            Item={
+                **clave_requisito(id_alias),
+                "id_requisito": id_alias,
+                "alias_de": id_req,
+                "fecha_creacion": datetime.utcnow().isoformat(),
+            },
+            ConditionExpression="attribute_not_exists(PK)",
+        )
+    except ClientError as error:
+        if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return
+
+    cache.guardar({}, {id_alias: id_req})
+
+
+def asignaciones(requisitos: list) -> tuple:
+    """
+    ({atributo: valor} a guardar, atributo a quitar) para una lista de
+    requisitos en texto, según el modo activo.
+    """
+    if REQUISITOS_NORMALIZADOS:
+        return {ATRIBUTO_REFERENCIAS: registrar(requisitos)}, "requisitos"
+    return {"requisitos": requisitos}, ATRIBUTO_REFERENCIAS
+
+
+def referenciar(item: dict) -> dict:
+    """Copia del item a guardar: con `requisitos_ref` en lugar del texto si el modo está activo."""
+    if not REQUISITOS_NORMALIZADOS or "requisitos" not in item:
+        return item
+
+    guardado = {atributo: valor for atributo, valor in item.items() if atributo != "requisitos"}
+    guardado[ATRIBUTO_REFERENCIAS] = registrar(item["requisitos"])
+    return guardado
+
+
+# --------------------------------------------------
+# Lectura: ids -> textos
+# --------------------------------------------------
+def resolver(items: list) -> list:
+    """Reemplaza en el lugar `requisitos_ref` por `requisitos` (una lectura para todos los items)."""
+    con_referencias = [item for item in items if ATRIBUTO_REFERENCIAS in item]
+    if not con_referencias:
+        return items
+
+    textos = cache.textos(
+        id_req for item in con_referencias for id_req in item[ATRIBUTO_REFERENCIAS]
+    )
+
+    for item in con_referencias:
+        ids = item.pop(ATRIBUTO_REFERENCIAS)
+        faltantes = [id_req for id_req in ids if id_req not in textos]
+        if faltantes:
+            logger.warning("Requisitos inexistentes referenciados: %s", ", ".join(faltantes))
+        item["requisitos"] = [textos.get(id_req, id_req) for id_req in ids]
+
+    return items
@@ -0,0 +1,87 @@
+import os
+from decimal import Decimal
+from functools import lru_cache
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json estándar
+    orjson = None
+
+# --------------------------------------------------
+# Respuestas rápidas para items confiables
+#
+# Los items leídos de nuestra propia tabla ya tienen la forma correcta,
+# así que con RESPUESTA_RAPIDA=true los handlers de lectura los proyectan
+# a los campos del modelo y los codifican con orjson, sin pasar por la
+# validación de response_model. Sin la variable, el comportamiento es
+# el de siempre (FastAPI valida y serializa).
+# --------------------------------------------------
+
+RESPUESTA_RAPIDA = os.getenv("RESPUESTA_RAPIDA", "false").lower() == "true"
+
+# Atributos de clave que nunca se exponen
+ATRIBUTOS_CLAVE = {"PK", "SK", "GSI1PK", "GSI1SK"}
+
+
+def _por_defecto(valor):
+    # Números del recurso boto3 (Decimal) en respuestas de escritura
+    if isinstance(valor, Decimal):
+        return int(valor) if valor == valor.to_integral_value() else float(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+class RespuestaRapida(JSONResponse):
+
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, default=_por_defecto)
+
+
+@lru_cache(maxsize=None)
+def _campos(modelo) -> tuple:
+    """(nombre, valor por defecto) de cada campo; requeridos sin defecto -> omitidos si faltan."""
+    campos = []
+
+    for nombre, campo in modelo.model_fields.items():
+        if campo.is_required():
+            campos.append((nombre, False, None))
+        else:
+            campos.append((nombre, True, campo.get_default(call_default_factory=True)))
+
+    return tuple(campos)
+
+
+def item_confiable(item: dict, modelo=None) -> dict:
+    """Proyecta un item de la tabla a los campos del modelo (sin validar)."""
+    if modelo is None:
+        return {campo: valor for campo, valor in item.items() if campo not in ATRIBUTOS_CLAVE}
+
+    resultado = {}
+    for nombre, tiene_defecto, defecto in _campos(modelo):
+        if nombre in item:
+            resultado[nombre] = item[nombre]
+        elif tiene_defecto:
+            resultado[nombre] = defecto
+
+    return resultado
+
+
+# --------------------------------------------------
+# Helpers para los handlers
+# Devuelven la respuesta rápida si está habilitada; si no,
+# el contenido tal cual para que FastAPI lo valide.
+# --------------------------------------------------
+def responder_item(item: dict, modelo):
+    if not RESPUESTA_RAPIDA:
+        return item
+    return RespuestaRapida(content=item_confiable(item, modelo))
+
+
+def responder_lista(items):
+    """Para contenido ya armado con los campos exactos del modelo (listados, páginas, resúmenes)."""
+    if not RESPUESTA_RAPIDA:
+        return items
+    return RespuestaRapida(content=items)
@@ -0,0 +1,64 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# --------------------------------------------------
+# Normalización de texto en español
+# Usada por la búsqueda y el autocompletado para que
+# "Licencias", "licencia" y "LICENCIA" coincidan y
+# los acentos no importen ("tramite" == "trámite").
+# --------------------------------------------------
+
+PALABRAS_VACIAS = {
+    "a", "al", "ante", "con", "como", "de", "del", "el", "en", "es", "la",
+    "las", "lo", "los", "o", "para", "por", "que", "se", "sin", "sobre",
+    "su", "sus", "un", "una", "unas", "unos", "y",
+}
+
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9ñ]+")
+_SEPARADORES = re.compile(r"[\W_]+")
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin acentos (conserva la ñ)."""
+    texto = texto.lower().replace("ñ", "\0")
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return texto.replace("\0", "ñ")
+
+
+def normalizar_frase(texto: str) -> str:
+    """Texto normalizado con las palabras separadas por un solo espacio (sin puntuación)."""
+    return " ".join(p for p in _NO_ALFANUMERICO.split(normalizar(texto)) if p)
+
+
+def _raiz(palabra: str) -> str:
+    # Plurales regulares: "certificaciones" -> "certificacion", "requisitos" -> "requisito"
+    if len(palabra) > 4 and palabra.endswith("es") and palabra[-3] in "nrldj":
+        return palabra[:-2]
+    if len(palabra) > 3 and palabra.endswith("s"):
+        return palabra[:-1]
+    return palabra
+
+
+@lru_cache(maxsize=65536)
+def _terminos_palabra(palabra: str) -> tuple:
+    # El vocabulario es chico y se repite mucho: normalizar cada palabra
+    # una sola vez abarata la construcción del índice.
+    return tuple(
+        _raiz(parte)
+        for parte in _NO_ALFANUMERICO.split(normalizar(palabra))
+        if parte and parte not in PALABRAS_VACIAS
+    )
+
+
+def tokenizar(texto: str) -> list:
+    """Tokens normalizados, sin palabras vacías y reducidos a singular."""
+    if not texto:
+        return []
+
+    terminos = []
+    for palabra in _SEPARADORES.split(texto):
+        if palabra:
+            terminos.extend(_terminos_palabra(palabra))
+    return terminos
@@ -0,0 +1,51 @@
+from database import get_dynamodb_resource, TABLE_NAME
+
+# --------------------------------------------------
+# Escrituras transaccionales (TransactWriteItems)
+#
+# Se usa el cliente del recurso: igual que Table, serializa los valores
+# de Python, así que las operaciones se arman con str/bool/int normales.
+# --------------------------------------------------
+
+client = get_dynamodb_resource().meta.client
+
+TransaccionCancelada = client.exceptions.TransactionCanceledException
+
+
+def poner(item: dict, condicion: str = None, valores: dict = None) -> dict:
+    operacion = {"TableName": TABLE_NAME, "Item": item}
+    if condicion:
+        operacion["ConditionExpression"] = condicion
+    if valores:
+        operacion["ExpressionAttributeValues"] = valores
+    return {"Put": operacion}
+
+
+def actualizar(
+    clave: dict,
+    expresion: str,
+    valores: dict = None,
+    nombres: dict = None,
+    condicion: str = None,
+) -> dict:
+    operacion = {"TableName": TABLE_NAME, "Key": clave, "UpdateExpression": expresion}
+    if valores:
+        operacion["ExpressionAttributeValues"] = valores
+    if nombres:
+        operacion["ExpressionAttributeNames"] = nombres
+    if condicion:
+        operacion["ConditionExpression"] = condicion
+    return {"Update": operacion}
+
+
+def escribir(operaciones: list):
+    """Ejecuta las operaciones en una sola transacción (todas o ninguna)."""
+    client.transact_write_items(TransactItems=operaciones)
+
+
+def motivos_cancelacion(error) -> list:
+    """Código de cada operación de una transacción cancelada ('None' si no falló)."""
+    return [
+        motivo.get("Code", "None")
+        for motivo in error.response.get("CancellationReasons", [])
+    ]
@@ -0,0 +1,184 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from boto3.dynamodb.conditions import Key
+
+from utils.cambios import MARGEN_RELOJ, particion_mes, meses_desde, releer_desde, tipo_e_id
+from utils.lectura_rapida import consultar, obtener_items
+
+# --------------------------------------------------
+# Vigencia de los índices en memoria (búsqueda y autocompletado)
+#
+# Cada proceso construye sus índices una vez (scan o snapshot) y sus
+# handlers los mantienen al día. Lo que escriben otros workers u otras
+# Lambdas llega por el índice de cambios (GSI4), como en el catálogo
+# (utils/catalogo.py): cuando pasaron INDICES_VERIFICACION segundos, la
+# siguiente consulta a un índice lanza en segundo plano una lectura de
+# los registros cambiados desde la última vez, y cada uno se reindexa en
+# todos los índices registrados (una sola consulta para todos).
+#
+# Con más de MAXIMO_CAMBIOS cambios, o si se corrigió un requisito
+# compartido (cambia trámites que el GSI4 no nombra), los índices se
+# reconstruyen desde su fuente mientras siguen respondiendo con lo que
+# tienen. Si la consulta falla se sigue con lo último que se supo.
+#
+# INDICES_VERIFICACION=0 desactiva la verificación.
+# --------------------------------------------------
+
+INDICES_VERIFICACION = float(os.getenv("INDICES_VERIFICACION", "30"))
+
+MAXIMO_CAMBIOS = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def marca_de_construccion() -> str:
+    """Desde dónde leer cambios para un índice cuya fuente se empieza a leer ahora."""
+    return (datetime.utcnow() - MARGEN_RELOJ).isoformat()
+
+
+class VigenciaIndices:
+    """
+    Los índices registrados implementan:
+      aplicar_cambio(item)  reindexa un item leído del GSI4 (si es de su tipo)
+      reconstruir()         vuelve a leer su fuente completa (si ya estaba construido)
+    y avisan con construido(desde) cada vez que terminan una construcción.
+    """
+
+    def __init__(self, verificacion: float = INDICES_VERIFICACION):
+        self.verificacion = verificacion
+        self._indices = []
+        self._lock = threading.Lock()
+        self._desde = None           # último GSI4SK aplicado (o marca de construcción)
+        self._verificado_en = None
+        self._en_curso = False
+        self._requisito_aplicado = ""  # GSI4SK del último requisito que causó una reconstrucción
+        self.metricas = {"verificaciones": 0, "cambios_aplicados": 0, "reconstrucciones": 0, "errores": 0}
+
+    def registrar(self, indice):
+        self._indices.append(indice)
+        return indice
+
+    def construido(self, desde: str):
+        # Con varios índices se lee desde el más atrasado: reaplicar un
+        # cambio que un índice ya tiene no lo altera
+        with self._lock:
+            if self._desde is None or desde < self._desde:
+                self._desde = desde
+            if self._verificado_en is None:
+                self._verificado_en = time.monotonic()
+
+    def verificar(self):
+        """Si pasó el intervalo, lee los cambios en segundo plano (la petición no espera)."""
+        if self.verificacion <= 0:
+            return
+
+        with self._lock:
+            if (
+                self._desde is None
+                or self._en_curso
+                or time.monotonic() - self._verificado_en < self.verificacion
+            ):
+                return
+            self._en_curso = True
+
+        threading.Thread(target=self.actualizar, daemon=True).start()
+
+    def actualizar(self):
+        """Aplica los cambios registrados desde la última lectura (o reconstruye)."""
+        desde = self._desde
+        if desde is None:
+            return
+        try:
+            self.metricas["verificaciones"] += 1
+            cambios, ultimo = _leer_cambios(desde, self._requisito_aplicado)
+
+            if cambios is None:
+                self.metricas["reconstrucciones"] += 1
+                # Cada índice vuelve a avisar con su nueva marca
+                with self._lock:
+                    self._desde = None
+                try:
+                    for indice in self._indices:
+                        indice.reconstruir()
+                except Exception:
+                    # Los que no se reconstruyeron siguen necesitando los
+                    # cambios desde la marca anterior: se vuelve a ella
+                    with self._lock:
+                        self._desde = desde if self._desde is None else min(self._desde, desde)
+                    raise
+                if ultimo is not None:
+                    self._requisito_aplicado = ultimo
+                return
+
+            for item in cambios:
+                for indice in self._indices:
+                    indice.aplicar_cambio(item)
+            self.metricas["cambios_aplicados"] += len(cambios)
+
+            with self._lock:
+                # Si un índice se construyó mientras tanto, su marca puede ser anterior
+                if self._desde == desde:
+                    self._desde = ultimo
+                elif self._desde is not None:
+                    self._desde = min(self._desde, ultimo)
+        except Exception as error:
+            self.metricas["errores"] += 1
+            logger.warning("No se pudieron leer los cambios para los índices en memoria: %s", error)
+        finally:
+            with self._lock:
+                self._verificado_en = time.monotonic()
+                self._en_curso = False
+
+    def estado(self) -> dict:
+        return {"desde": self._desde, **self.metricas}
+
+
+def _leer_cambios(desde: str, requisito_aplicado: str) -> tuple:
+    """
+    (items cambiados después de `desde`, último GSI4SK leído).
+    (None, GSI4SK del requisito) o (None, None) si hay que reconstruir.
+
+    Se relee desde MARGEN_RELOJ antes: un proceso con el reloj atrasado
+    puede registrar un cambio con una fecha anterior a la ya leída.
+
+    El GSI4 solo trae claves: los registros completos se leen al final
+    con BatchGetItem.
+    """
+    cambios = []
+    ultimo = desde
+    desde = releer_desde(desde)
+
+    for mes in meses_desde(desde[:7], datetime.utcnow()):
+        inicio = None
+        while True:
+            response = consultar(
+                Key("GSI4PK").eq(particion_mes(mes)) & Key("GSI4SK").gt(desde),
+                indice="GSI4",
+                proyeccion=["PK", "SK", "GSI4SK"],
+                inicio=inicio,
+            )
+            for item in response.get("Items", []):
+                if tipo_e_id(item)[0] == "REQUISITO":
+                    # Releído dentro del margen: ya se reconstruyó por él
+                    if item["GSI4SK"] <= requisito_aplicado:
+                        continue
+                    return None, item["GSI4SK"]
+                cambios.append(item)
+                ultimo = max(ultimo, item["GSI4SK"])
+
+            if len(cambios) > MAXIMO_CAMBIOS:
+                return None, None
+
+            inicio = response.get("LastEvaluatedKey")
+            if not inicio:
+                break
+
+    claves = {(item["PK"], item["SK"]) for item in cambios}
+    return obtener_items([{"PK": pk, "SK": sk} for pk, sk in claves]), ultimo
+
+
+vigencia_indices = VigenciaIndices()
@@ -0,0 +1,128 @@
+"""
+Ahorro de la compresión de descripcion/requisitos (utils/atributos_comprimidos).
+
+No necesita DynamoDB: los items se generan con benchmarks/datos.py y el
+tamaño se calcula con las reglas de DynamoDB (nombres + valores; las
+listas suman 3 bytes más 1 por elemento). Con eso informa:
+
+- tamaño promedio de trámites, proyectos y programas, antes y después;
+- RCU de una lectura por id (GetItem, eventualmente consistente);
+- RCU de listar la partición de cada institución (Query: se cobra el
+  tamaño completo de los items aunque se proyecten pocos campos);
+- tiempo de comprimir al escribir y de descomprimir al leer.
+
+Para medir contra DynamoDB Local, correr benchmarks/carga.py con
+COMPRESION_ATRIBUTOS=false y con el valor por defecto, y comparar las dos
+corridas con benchmarks/comparar.py (columnas p50/p95 y rcu).
+
+Uso:
+    python benchmarks/atributos_comprimidos.py --tramites 20000
+    python benchmarks/atributos_comprimidos.py --repetir-descripcion 4   # textos de varios KB
+"""
+import argparse
+import math
+import time
+from collections import defaultdict
+
+# Solo por su efecto: agrega app/ a sys.path para los imports de abajo
+import entorno  # noqa: F401
+from datos import generar
+from utils.atributos_comprimidos import comprimir_item, descomprimir_item
+
+TIPOS = ("TRAMITE#", "PROYECTO#", "PROGRAMA#")
+
+
+def tamano_valor(valor) -> int:
+    if isinstance(valor, bool) or valor is None:
+        return 1
+    if isinstance(valor, str):
+        return len(valor.encode("utf-8"))
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, (int, float)):
+        return math.ceil(len(str(valor).lstrip("-").replace(".", "")) / 2) + 1
+    if isinstance(valor, list):
+        return 3 + sum(tamano_valor(elemento) + 1 for elemento in valor)
+    if isinstance(valor, dict):
+        return 3 + sum(len(nombre.encode("utf-8")) + tamano_valor(v) + 1 for nombre, v in valor.items())
+    raise TypeError(type(valor).__name__)
+
+
+def tamano_item(item: dict) -> int:
+    return sum(len(nombre.encode("utf-8")) + tamano_valor(valor) for nombre, valor in item.items())
+
+
+def rcu(tamano: int) -> float:
+    # Lectura eventualmente consistente: media unidad por cada 4 KB
+    return math.ceil(tamano / 4096) * 0.5
+
+
+def cronometrar(funcion, items, repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for item in items:
+            funcion(item)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instituciones", type=int, default=2000)
+    parser.add_argument("--tramites", type=int, default=20000)
+    parser.add_argument("--proyectos", type=int, default=4000)
+    parser.add_argument("--programas", type=int, default=4000)
+    parser.add_argument("--repetir-descripcion", type=int, default=1,
+                        help="Multiplica el largo de las descripciones generadas")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    items, _ = generar(
+        instituciones=args.instituciones,
+        tramites=args.tramites,
+        proyectos=args.proyectos,
+        programas=args.programas,
+    )
+    hijos = [item for item in items if item["SK"].startswith(TIPOS)]
+    for item in hijos:
+        if item.get("descripcion"):
+            item["descripcion"] = " ".join([item["descripcion"]] * args.repetir_descripcion)
+
+    comprimidos = [comprimir_item(item) for item in hijos]
+
+    print(f"items: {len(hijos)} (trámites, proyectos y programas)")
+    print()
+    print(f"{'':<34}{'sin comprimir':>16}{'comprimido':>16}{'ahorro':>10}")
+
+    def fila(nombre: str, antes: float, despues: float, formato: str = "{:,.1f}"):
+        ahorro = f"{(antes - despues) / antes * 100:.1f}%" if antes else "n/a"
+        print(f"{nombre:<34}{formato.format(antes):>16}{formato.format(despues):>16}{ahorro:>10}")
+
+    tamanos = [tamano_item(item) for item in hijos]
+    tamanos_comprimidos = [tamano_item(item) for item in comprimidos]
+    fila("tamaño promedio (bytes)", sum(tamanos) / len(tamanos), sum(tamanos_comprimidos) / len(tamanos))
+    fila("RCU por GetItem (promedio)",
+         sum(map(rcu, tamanos)) / len(tamanos), sum(map(rcu, tamanos_comprimidos)) / len(tamanos), "{:.3f}")
+
+    # Un Query por partición y tipo, como listar_tramites/proyectos/programas
+    particiones = defaultdict(lambda: [0, 0])
+    for item, antes, despues in zip(hijos, tamanos, tamanos_comprimidos):
+        clave = (item["PK"], item["SK"].split("#", 1)[0])
+        particiones[clave][0] += antes
+        particiones[clave][1] += despues
+    rcu_antes = [rcu(antes) for antes, _ in particiones.values()]
+    rcu_despues = [rcu(despues) for _, despues in particiones.values()]
+    fila("RCU por listado (promedio)", sum(rcu_antes) / len(rcu_antes), sum(rcu_despues) / len(rcu_despues), "{:.3f}")
+    fila("RCU por listado (máximo)", max(rcu_antes), max(rcu_despues), "{:.1f}")
+    fila("RCU de recorrer todo", sum(rcu_antes), sum(rcu_despues), "{:,.1f}")
+
+    print()
+    tiempo_comprimir = cronometrar(comprimir_item, hijos, args.repeticiones)
+    tiempo_descomprimir = cronometrar(lambda item: descomprimir_item(dict(item)), comprimidos, args.repeticiones)
+    print(f"comprimir al escribir     {tiempo_comprimir / len(hijos) * 1e6:8.1f} µs por item")
+    print(f"descomprimir al leer      {tiempo_descomprimir / len(hijos) * 1e6:8.1f} µs por item")
+
+
+if __name__ == "__main__":
+    main()
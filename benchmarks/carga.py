@@ -0,0 +1,146 @@
+"""
+Prueba de carga reproducible contra DynamoDB Local.
+
+Uso (desde la raíz del repositorio, con `docker compose up dynamodb`):
+    python benchmarks/carga.py --peticiones 300 --concurrencia 16
+
+Siembra una tabla propia (api_data_nube_bench), ejecuta cada ruta con
+concurrencia controlada y guarda un JSON en benchmarks/resultados/
+con p50/p95/p99, throughput y llamadas a DynamoDB por petición.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from entorno import BENCHMARKS_DIR, agregar_argumentos, preparar
+from instrumentacion import instrumentacion
+from cliente_asgi import solicitar, CicloDeVida
+from escenarios import ESCENARIOS
+
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+async def ejecutar_escenario(app, escenario, ids, peticiones: int, concurrencia: int, semilla: int):
+    rnd = random.Random(f"{semilla}-{escenario.nombre}")
+    solicitudes = [escenario.construir(rnd, ids) for _ in range(peticiones)]
+    semaforo = asyncio.Semaphore(concurrencia)
+    duraciones = []
+    errores = {}
+
+    async def una(ruta, cuerpo):
+        async with semaforo:
+            respuesta = await solicitar(app, escenario.metodo, ruta, cuerpo)
+
+        duraciones.append(respuesta.duracion)
+        if respuesta.status >= 400:
+            errores[respuesta.status] = errores.get(respuesta.status, 0) + 1
+
+    instrumentacion.reiniciar()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(una(ruta, cuerpo) for ruta, cuerpo in solicitudes))
+    total = time.perf_counter() - inicio
+    consumo = instrumentacion.global_
+
+    return {
+        "metodo": escenario.metodo,
+        "peticiones": peticiones,
+        "concurrencia": concurrencia,
+        "errores": errores,
+        "p50_ms": round(percentil(duraciones, 50) * 1000, 2),
+        "p95_ms": round(percentil(duraciones, 95) * 1000, 2),
+        "p99_ms": round(percentil(duraciones, 99) * 1000, 2),
+        "media_ms": round(sum(duraciones) / len(duraciones) * 1000, 2),
+        "throughput_rps": round(peticiones / total, 1),
+        "llamadas_dynamodb_por_peticion": round(consumo.total_llamadas / peticiones, 2),
+        "llamadas_por_operacion": {
+            operacion: round(cantidad / peticiones, 2)
+            for operacion, cantidad in consumo.llamadas.items()
+        },
+        "rcu_por_peticion": round(consumo.rcu / peticiones, 2),
+        "wcu_por_peticion": round(consumo.wcu / peticiones, 2),
+    }
+
+
+def commit_actual() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR,
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+async def principal(args):
+    app, ids, parametros = preparar(args)
+    seleccion = [e for e in ESCENARIOS if not args.solo or e.nombre in args.solo]
+    resultados = {}
+
+    async with CicloDeVida(app):
+        for escenario in seleccion:
+            # Calentamiento: conexiones, caches y compilación de validadores
+            await ejecutar_escenario(app, escenario, ids, min(10, args.peticiones), 1, args.semilla + 1)
+
+            resultado = await ejecutar_escenario(
+                app, escenario, ids, args.peticiones, args.concurrencia, args.semilla
+            )
+            resultados[escenario.nombre] = resultado
+            print(
+                f"{escenario.nombre:<26} p50={resultado['p50_ms']:>8}ms "
+                f"p95={resultado['p95_ms']:>8}ms p99={resultado['p99_ms']:>8}ms "
+                f"{resultado['throughput_rps']:>8} rps "
+                f"{resultado['llamadas_dynamodb_por_peticion']:>5} llamadas/pet",
+                file=sys.stderr,
+            )
+
+    return {
+        "commit": commit_actual(),
+        "fecha": datetime.utcnow().isoformat(),
+        "etiqueta": args.etiqueta,
+        "datos": parametros,
+        "peticiones": args.peticiones,
+        "concurrencia": args.concurrencia,
+        "escenarios": resultados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    agregar_argumentos(parser)
+    parser.add_argument("--peticiones", type=int, default=300, help="Peticiones por escenario")
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--solo", nargs="*", help="Nombres de escenarios a ejecutar")
+    parser.add_argument("--etiqueta", default="", help="Texto libre para identificar la corrida")
+    parser.add_argument("--salida", help="Archivo JSON de salida")
+    args = parser.parse_args()
+
+    reporte = asyncio.run(principal(args))
+
+    salida = args.salida or os.path.join(
+        BENCHMARKS_DIR,
+        "resultados",
+        f"{reporte['commit']}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json",
+    )
+    os.makedirs(os.path.dirname(salida), exist_ok=True)
+
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+
+    print(f"Resultados guardados en {salida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
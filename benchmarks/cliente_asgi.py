@@ -0,0 +1,113 @@
+"""
+Cliente ASGI mínimo para invocar la app en el mismo proceso.
+
+Evita el costo de red/HTTP del cliente para que la medición refleje
+el trabajo de la API (validación, serialización y llamadas a DynamoDB).
+"""
+import asyncio
+import json
+import time
+from urllib.parse import quote
+
+
+class Respuesta:
+
+    def __init__(self, status: int, headers: list, cuerpo: bytes, duracion: float):
+        self.status = status
+        self.headers = headers
+        self.cuerpo = cuerpo
+        self.duracion = duracion
+
+    def header(self, nombre: str):
+        nombre = nombre.lower().encode()
+        for clave, valor in self.headers:
+            if clave.lower() == nombre:
+                return valor.decode()
+        return None
+
+    def json(self):
+        return json.loads(self.cuerpo)
+
+
+async def solicitar(app, metodo: str, ruta: str, cuerpo=None, headers=None) -> Respuesta:
+    datos = json.dumps(cuerpo).encode() if cuerpo is not None else b""
+    path, _, query = ruta.partition("?")
+
+    encabezados = [
+        (b"host", b"benchmark"),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(datos)).encode()),
+    ]
+    for clave, valor in (headers or {}).items():
+        encabezados.append((clave.lower().encode(), valor.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": metodo,
+        "scheme": "http",
+        "path": path,
+        "raw_path": quote(path).encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": encabezados,
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+
+    terminado = asyncio.Event()
+    enviado = False
+    estado = {"status": 500, "headers": []}
+    partes = []
+
+    async def receive():
+        nonlocal enviado
+        if not enviado:
+            enviado = True
+            return {"type": "http.request", "body": datos, "more_body": False}
+
+        await terminado.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mensaje):
+        if mensaje["type"] == "http.response.start":
+            estado["status"] = mensaje["status"]
+            estado["headers"] = mensaje.get("headers", [])
+        elif mensaje["type"] == "http.response.body":
+            partes.append(mensaje.get("body", b""))
+            if not mensaje.get("more_body", False):
+                terminado.set()
+
+    inicio = time.perf_counter()
+    await app(scope, receive, send)
+    duracion = time.perf_counter() - inicio
+    terminado.set()
+
+    return Respuesta(estado["status"], estado["headers"], b"".join(partes), duracion)
+
+
+class CicloDeVida:
+    """Ejecuta los eventos startup/shutdown de la app (lifespan ASGI)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._entrada = asyncio.Queue()
+        self._salida = asyncio.Queue()
+        self._tarea = None
+
+    async def __aenter__(self):
+        self._tarea = asyncio.create_task(
+            self.app({"type": "lifespan", "asgi": {"version": "3.0"}}, self._entrada.get, self._salida.put)
+        )
+        await self._entrada.put({"type": "lifespan.startup"})
+        mensaje = await self._salida.get()
+
+        if mensaje["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Fallo en el arranque de la app: {mensaje}")
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._entrada.put({"type": "lifespan.shutdown"})
+        await self._salida.get()
+        await self._tarea
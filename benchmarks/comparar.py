@@ -0,0 +1,60 @@
+"""
+Compara dos corridas de benchmarks/carga.py.
+
+Uso:
+    python benchmarks/comparar.py resultados/antes.json resultados/despues.json
+"""
+import argparse
+import json
+
+METRICAS = [
+    ("p50_ms", "p50"),
+    ("p95_ms", "p95"),
+    ("p99_ms", "p99"),
+    ("throughput_rps", "rps"),
+    ("llamadas_dynamodb_por_peticion", "llamadas"),
+    ("rcu_por_peticion", "rcu"),
+]
+
+
+def cargar(ruta: str) -> dict:
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+def variacion(antes: float, despues: float) -> str:
+    if not antes:
+        return "   n/a"
+    return f"{(despues - antes) / antes * 100:+6.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("antes")
+    parser.add_argument("despues")
+    args = parser.parse_args()
+
+    antes = cargar(args.antes)
+    despues = cargar(args.despues)
+
+    print(f"Antes:   {antes['commit']} {antes.get('etiqueta', '')} ({antes['fecha']})")
+    print(f"Después: {despues['commit']} {despues.get('etiqueta', '')} ({despues['fecha']})")
+    print()
+
+    encabezado = f"{'escenario':<26}" + "".join(f"{nombre:>25}" for _, nombre in METRICAS)
+    print(encabezado)
+    print("-" * len(encabezado))
+
+    for escenario, resultado in despues["escenarios"].items():
+        previo = antes["escenarios"].get(escenario)
+        if previo is None:
+            continue
+
+        fila = f"{escenario:<26}"
+        for clave, _ in METRICAS:
+            fila += f"{previo[clave]:>8} → {resultado[clave]:>6} {variacion(previo[clave], resultado[clave])}"
+        print(fila)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Generación determinista de datos de prueba con volúmenes realistas.
+
+Los items tienen la misma forma que escriben los routers, pero se
+cargan directamente con batch_writer para que la siembra sea rápida.
+"""
+import random
+from datetime import datetime, timedelta
+
+DEPARTAMENTOS = {
+    "Guatemala": ["Guatemala", "Mixco", "Villa Nueva", "San Miguel Petapa", "Amatitlán"],
+    "Sacatepéquez": ["Antigua Guatemala", "Ciudad Vieja", "Jocotenango"],
+    "Quetzaltenango": ["Quetzaltenango", "Coatepeque", "Salcajá"],
+    "Escuintla": ["Escuintla", "Santa Lucía Cotzumalguapa", "Puerto San José"],
+    "Petén": ["Flores", "San Benito", "Poptún"],
+    "Alta Verapaz": ["Cobán", "San Pedro Carchá", "Chisec"],
+    "Huehuetenango": ["Huehuetenango", "Chiantla", "Jacaltenango"],
+    "Izabal": ["Puerto Barrios", "Livingston", "Morales"],
+    "Chimaltenango": ["Chimaltenango", "Tecpán Guatemala", "Patzún"],
+    "Zacapa": ["Zacapa", "Gualán", "Estanzuela"],
+}
+
+REQUISITOS = [
+    "DPI vigente",
+    "Recibo de luz",
+    "Recibo de agua",
+    "Fotocopia de DPI",
+    "Certificado de nacimiento",
+    "Constancia de RTU",
+    "Solvencia fiscal",
+    "Fotografía tamaño cédula",
+    "Formulario de solicitud firmado",
+    "Carta de solicitud dirigida a la autoridad",
+    "Patente de comercio",
+    "Escritura de constitución de sociedad",
+    "Nombramiento de representante legal",
+    "Constancia de inscripción en el IGSS",
+    "Boleta de pago",
+    "Croquis de ubicación",
+    "Estudio de impacto ambiental",
+    "Licencia de construcción",
+    "Certificación del Registro de la Propiedad",
+    "Antecedentes penales",
+    "Antecedentes policiacos",
+]
+
+PALABRAS = (
+    "trámite solicitud registro ciudadano institución servicio público atención "
+    "documento requisito municipal departamento gestión licencia permiso renovación "
+    "inscripción certificado constancia pago proceso evaluación revisión aprobación "
+    "plazo días hábiles ventanilla ciudadanía información oficina central regional "
+    "formulario digital presencial seguimiento expediente resolución notificación"
+).split()
+
+TIPOS_TRAMITE = ["Licencia", "Permiso", "Certificación", "Registro", "Constancia", "Renovación"]
+CANALES = ["Presencial", "En línea", "Mixto"]
+COSTOS = ["Gratuito", "Q25.00", "Q50.00", "Q100.00", "Q250.00"]
+ESTADOS_PROYECTO = ["planificado", "en ejecución", "finalizado", "suspendido"]
+
+
+def _texto(rnd: random.Random, minimo: int, maximo: int) -> str:
+    cantidad = rnd.randint(minimo, maximo)
+    return " ".join(rnd.choice(PALABRAS) for _ in range(cantidad)).capitalize() + "."
+
+
+def _fecha(rnd: random.Random) -> str:
+    base = datetime(2024, 1, 1) + timedelta(seconds=rnd.randint(0, 60 * 60 * 24 * 600))
+    return base.isoformat()
+
+
+def generar(instituciones: int, tramites: int, proyectos: int, programas: int, semilla: int = 42):
+    """
+    Devuelve (items, ids) donde ids agrupa los identificadores generados
+    por tipo, para que los escenarios elijan claves existentes.
+    """
+    # Import diferido: la app debe importarse después de instalar la instrumentación
+    from utils.geografia import claves_gsi2, clave_contador
+    from utils.estados import claves_gsi3
+    from utils.cambios import claves_gsi4
+    from utils.contadores import CONTADORES, CONTADORES_INICIALES
+    from utils.cascada import nuevo_trabajo
+    from utils.requisitos import id_requisito, clave_requisito
+
+    rnd = random.Random(semilla)
+    items = []
+    conteos = {}
+    ids = {"instituciones": [], "tramites": [], "proyectos": [], "programas": [], "cascadas": [], "requisitos": []}
+
+    for numero in range(instituciones):
+        id_institucion = f"INST-{numero:08x}"
+        departamento = rnd.choice(list(DEPARTAMENTOS))
+        municipio = rnd.choice(DEPARTAMENTOS[departamento])
+        fecha = _fecha(rnd)
+
+        for muni in (None, municipio):
+            contador = conteos.setdefault(clave_contador(departamento, muni)["SK"], {
+                **clave_contador(departamento, muni),
+                "departamento": departamento,
+                **({"municipio": muni} if muni else {}),
+                "total": 0,
+            })
+            contador["total"] += 1
+
+        items.append({
+            "PK": f"INSTITUCION#{id_institucion}",
+            "SK": "METADATA",
+            "GSI1PK": "INSTITUCIONES",
+            "GSI1SK": f"INSTITUCION#{id_institucion}",
+            **claves_gsi4("INSTITUCION", id_institucion, fecha),
+            **claves_gsi2(departamento, municipio, id_institucion),
+            "id_institucion": id_institucion,
+            "nombre": f"Institución {_texto(rnd, 2, 5)[:-1]} {numero}",
+            "departamento_sede": departamento,
+            "municipio_sede": municipio,
+            "telefono": f"{rnd.randint(2000, 7999)}-{rnd.randint(0, 9999):04d}",
+            "correo": f"contacto{numero}@institucion.gob.gt",
+            "habil": rnd.random() > 0.05,
+            "fecha_creacion": fecha,
+            "fecha_actualizacion": fecha,
+            **CONTADORES_INICIALES,
+        })
+        ids["instituciones"].append(id_institucion)
+
+    items.extend(conteos.values())
+
+    def institucion_de() -> str:
+        # Distribución sesgada: pocas instituciones concentran muchos registros
+        indice = int(instituciones * (rnd.random() ** 2))
+        return ids["instituciones"][min(indice, instituciones - 1)]
+
+    for numero in range(tramites):
+        id_tramite = f"TRM-{numero:08x}"
+        id_institucion = institucion_de()
+        fecha = _fecha(rnd)
+
+        items.append({
+            "PK": f"INSTITUCION#{id_institucion}",
+            "SK": f"TRAMITE#{id_tramite}",
+            "GSI1PK": f"TRAMITE#{id_tramite}",
+            "GSI1SK": "METADATA",
+            **claves_gsi4("TRAMITE", id_tramite, fecha),
+            "id_tramite": id_tramite,
+            "id_institucion": id_institucion,
+            "nombre_tramite": f"{rnd.choice(TIPOS_TRAMITE)} de {_texto(rnd, 2, 6)[:-1]}",
+            "descripcion": _texto(rnd, 40, 250),
+            "tipo_tramite": rnd.choice(TIPOS_TRAMITE),
+            "canal_atencion": rnd.choice(CANALES),
+            "costo": rnd.choice(COSTOS),
+            "requisitos": rnd.sample(REQUISITOS, rnd.randint(2, 8)),
+            "habil": rnd.random() > 0.1,
+            "fecha_creacion": fecha,
+            "fecha_actualizacion": fecha,
+        })
+        ids["tramites"].append(id_tramite)
+
+    for numero in range(proyectos):
+        id_proyecto = f"PRY-{numero:08x}"
+        id_institucion = institucion_de()
+        estado = rnd.choice(ESTADOS_PROYECTO)
+        fecha = _fecha(rnd)
+
+        items.append({
+            "PK": f"INSTITUCION#{id_institucion}",
+            "SK": f"PROYECTO#{id_proyecto}",
+            "GSI1PK": f"PROYECTO#{id_proyecto}",
+            "GSI1SK": "METADATA",
+            **claves_gsi4("PROYECTO", id_proyecto, fecha),
+            **claves_gsi3(estado, id_institucion, id_proyecto),
+            "id_proyecto": id_proyecto,
+            "id_institucion": id_institucion,
+            "nombre": f"Proyecto {_texto(rnd, 2, 6)[:-1]}",
+            "descripcion": _texto(rnd, 20, 150),
+            "estado_proyecto": estado,
+            "habil": rnd.random() > 0.1,
+            "fecha_creacion": fecha,
+            "fecha_actualizacion": fecha,
+        })
+        ids["proyectos"].append(id_proyecto)
+
+    for numero in range(programas):
+        id_programa = f"PRG-{numero:08x}"
+        id_institucion = institucion_de()
+        fecha = _fecha(rnd)
+
+        items.append({
+            "PK": f"INSTITUCION#{id_institucion}",
+            "SK": f"PROGRAMA#{id_programa}",
+            "GSI1PK": f"PROGRAMA#{id_programa}",
+            "GSI1SK": "METADATA",
+            **claves_gsi4("PROGRAMA", id_programa, fecha),
+            "id_programa": id_programa,
+            "id_institucion": id_institucion,
+            "nombre": f"Programa {_texto(rnd, 2, 6)[:-1]}",
+            "descripcion": _texto(rnd, 20, 150),
+            "habil": rnd.random() > 0.1,
+            "fecha_creacion": fecha,
+            "fecha_actualizacion": fecha,
+        })
+        ids["programas"].append(id_programa)
+
+    # Contadores por institución, como los mantienen los routers
+    metadatos = {item["PK"]: item for item in items if item["SK"] == "METADATA"}
+    for item in items:
+        tipo = item["SK"].split("#", 1)[0]
+        if tipo in CONTADORES and item["PK"] in metadatos:
+            atributo_total, atributo_activos = CONTADORES[tipo]
+            metadatos[item["PK"]][atributo_total] += 1
+            metadatos[item["PK"]][atributo_activos] += 1 if item["habil"] else 0
+
+    # Trabajos en cascada ya completados (consulta y reanudación)
+    for numero, id_institucion in enumerate(ids["instituciones"][:10]):
+        id_trabajo = f"CSC-{numero:08x}"
+        items.append({
+            **nuevo_trabajo(id_institucion, id_trabajo, True, _fecha(rnd)),
+            "estado": "completado",
+            "paginas": 1,
+        })
+        ids["cascadas"].append((id_institucion, id_trabajo))
+
+    # Catálogo compartido de requisitos (los trámites los guardan en texto;
+    # entorno.py los cambia por referencias con REQUISITOS_NORMALIZADOS)
+    for texto in REQUISITOS:
+        fecha = _fecha(rnd)
+        items.append({
+            **clave_requisito(id_requisito(texto)),
+            "id_requisito": id_requisito(texto),
+            "texto": texto,
+            "fecha_creacion": fecha,
+            "fecha_actualizacion": fecha,
+        })
+        ids["requisitos"].append(id_requisito(texto))
+
+    return items, ids
+
+
+def sembrar(table, items):
+    with table.batch_writer() as lote:
+        for item in items:
+            lote.put_item(Item=item)
+
+
+# --------------------------------------------------
+# Cuerpos para los escenarios de escritura
+# --------------------------------------------------
+def cuerpo_institucion(rnd: random.Random) -> dict:
+    departamento = rnd.choice(list(DEPARTAMENTOS))
+    return {
+        "nombre": f"Institución {_texto(rnd, 2, 4)[:-1]}",
+        "departamento_sede": departamento,
+        "municipio_sede": rnd.choice(DEPARTAMENTOS[departamento]),
+        "telefono": f"{rnd.randint(2000, 7999)}-{rnd.randint(0, 9999):04d}",
+        "correo": "benchmark@institucion.gob.gt",
+    }
+
+
+def cuerpo_tramite(rnd: random.Random, id_institucion: str) -> dict:
+    return {
+        "id_institucion": id_institucion,
+        "nombre_tramite": f"{rnd.choice(TIPOS_TRAMITE)} de {_texto(rnd, 2, 5)[:-1]}",
+        "descripcion": _texto(rnd, 40, 250),
+        "tipo_tramite": rnd.choice(TIPOS_TRAMITE),
+        "canal_atencion": rnd.choice(CANALES),
+        "costo": rnd.choice(COSTOS),
+        "requisitos": rnd.sample(REQUISITOS, rnd.randint(2, 8)),
+        "habil": True,
+    }
+
+
+def cuerpo_proyecto(rnd: random.Random, id_institucion: str) -> dict:
+    return {
+        "id_institucion": id_institucion,
+        "nombre": f"Proyecto {_texto(rnd, 2, 5)[:-1]}",
+        "descripcion": _texto(rnd, 20, 150),
+        "estado_proyecto": rnd.choice(ESTADOS_PROYECTO),
+        "habil": True,
+    }
+
+
+def cuerpo_programa(rnd: random.Random, id_institucion: str) -> dict:
+    return {
+        "id_institucion": id_institucion,
+        "nombre": f"Programa {_texto(rnd, 2, 5)[:-1]}",
+        "descripcion": _texto(rnd, 20, 150),
+        "habil": True,
+    }
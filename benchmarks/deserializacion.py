@@ -0,0 +1,65 @@
+"""
+Microbenchmark de deserialización: TypeDeserializer (camino del recurso
+boto3) contra el deserializador especializado de utils/lectura_rapida.
+
+No necesita DynamoDB: los items se generan con benchmarks/datos.py y se
+convierten al formato de la API de DynamoDB con TypeSerializer.
+
+Uso:
+    python benchmarks/deserializacion.py --items 20000
+"""
+import argparse
+import time
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+# Solo por su efecto: agrega app/ a sys.path para los imports de abajo
+import entorno  # noqa: F401
+from datos import generar
+from utils.lectura_rapida import deserializar_item
+
+
+def cronometrar(funcion, items, repeticiones: int) -> float:
+    mejor = float("inf")
+
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for item in items:
+            funcion(item)
+        mejor = min(mejor, time.perf_counter() - inicio)
+
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    items, _ = generar(instituciones=max(1, args.items // 10), tramites=args.items, proyectos=0, programas=0)
+    serializador = TypeSerializer()
+    crudos = [
+        {nombre: serializador.serialize(valor) for nombre, valor in item.items()}
+        for item in items
+    ]
+
+    deserializador = TypeDeserializer()
+
+    def recurso(item):
+        return {nombre: deserializador.deserialize(valor) for nombre, valor in item.items()}
+
+    # Ambos caminos deben producir lo mismo para nuestros tipos
+    assert recurso(crudos[0]) == deserializar_item(crudos[0])
+
+    tiempo_recurso = cronometrar(recurso, crudos, args.repeticiones)
+    tiempo_rapido = cronometrar(deserializar_item, crudos, args.repeticiones)
+
+    print(f"items:           {len(crudos)}")
+    print(f"TypeDeserializer {tiempo_recurso * 1000:9.1f} ms  ({len(crudos) / tiempo_recurso:,.0f} items/s)")
+    print(f"lectura_rapida   {tiempo_rapido * 1000:9.1f} ms  ({len(crudos) / tiempo_rapido:,.0f} items/s)")
+    print(f"aceleración      {tiempo_recurso / tiempo_rapido:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
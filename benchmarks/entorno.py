@@ -0,0 +1,88 @@
+"""
+Preparación común de los benchmarks: variables de entorno, tabla,
+siembra de datos e importación de la app instrumentada.
+"""
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "app")
+
+# Tabla propia para no mezclar datos con la de desarrollo
+os.environ.setdefault("DYNAMODB_TABLE", "api_data_nube_bench")
+os.environ.setdefault("DYNAMODB_ENDPOINT", "http://localhost:8001")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from instrumentacion import instrumentacion  # noqa: E402
+from datos import generar, sembrar  # noqa: E402
+
+# La instrumentación debe quedar registrada antes de que los routers creen sus clientes
+instrumentacion.instalar()
+
+CLAVE_SEMILLA = {"PK": "BENCHMARK#SEMILLA", "SK": "METADATA"}
+
+
+def agregar_argumentos(parser, instituciones=2000, tramites=20000, proyectos=4000, programas=4000):
+    parser.add_argument("--instituciones", type=int, default=instituciones)
+    parser.add_argument("--tramites", type=int, default=tramites)
+    parser.add_argument("--proyectos", type=int, default=proyectos)
+    parser.add_argument("--programas", type=int, default=programas)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--resembrar", action="store_true",
+                        help="Elimina y vuelve a crear la tabla de benchmark")
+
+
+def preparar(args):
+    """Crea/siembra la tabla si hace falta y devuelve (app, ids)."""
+    from database import get_dynamodb_client, get_dynamodb_resource, TABLE_NAME
+    from scripts.crear_tabla import crear_tabla, agregar_indices_faltantes, INDICES
+    from utils.atributos_comprimidos import comprimir_item, COMPRESION_ATRIBUTOS, COMPRESION_ATRIBUTOS_MINIMO
+    from utils.requisitos import id_requisito, REQUISITOS_NORMALIZADOS, ATRIBUTO_REFERENCIAS
+
+    client = get_dynamodb_client()
+    table = get_dynamodb_resource().Table(TABLE_NAME)
+
+    if args.resembrar and TABLE_NAME in client.list_tables()["TableNames"]:
+        client.delete_table(TableName=TABLE_NAME)
+        client.get_waiter("table_not_exists").wait(TableName=TABLE_NAME)
+
+    if not crear_tabla(TABLE_NAME, client):
+        agregar_indices_faltantes(TABLE_NAME, client)
+
+    parametros = {
+        "instituciones": args.instituciones,
+        "tramites": args.tramites,
+        "proyectos": args.proyectos,
+        "programas": args.programas,
+        "semilla": args.semilla,
+    }
+    items, ids = generar(**parametros)
+
+    # Sembrados igual que los escribiría la API
+    if REQUISITOS_NORMALIZADOS:
+        for item in items:
+            if "requisitos" in item:
+                item[ATRIBUTO_REFERENCIAS] = [id_requisito(texto) for texto in item.pop("requisitos")]
+    items = [comprimir_item(item) for item in items]
+
+    # Un índice nuevo cambia la forma de los items, y un tipo de id nuevo
+    # agrega items: cualquiera de los dos fuerza una nueva siembra
+    parametros["indices"] = INDICES
+    parametros["tipos"] = sorted(ids)
+    # Comprimir o no los textos largos cambia el tamaño (y el RCU) de los items
+    parametros["compresion_atributos"] = COMPRESION_ATRIBUTOS_MINIMO if COMPRESION_ATRIBUTOS else None
+    # Requisitos en texto o como referencias al catálogo compartido
+    parametros["requisitos_normalizados"] = REQUISITOS_NORMALIZADOS
+
+    semilla_actual = table.get_item(Key=CLAVE_SEMILLA).get("Item", {})
+    if semilla_actual.get("parametros") != parametros:
+        print(f"Sembrando {len(items)} items en {TABLE_NAME}...", file=sys.stderr)
+        sembrar(table, items)
+        table.put_item(Item={**CLAVE_SEMILLA, "parametros": parametros})
+
+    import main
+
+    return main.app, ids, parametros
@@ -0,0 +1,143 @@
+"""
+Un escenario por ruta de la API.
+
+Cada escenario recibe un random.Random y los ids sembrados y devuelve
+(ruta, cuerpo) para una petición.
+"""
+from datos import (
+    DEPARTAMENTOS,
+    ESTADOS_PROYECTO,
+    REQUISITOS,
+    cuerpo_institucion,
+    cuerpo_tramite,
+    cuerpo_proyecto,
+    cuerpo_programa,
+)
+
+
+class Escenario:
+
+    def __init__(self, nombre: str, metodo: str, construir):
+        self.nombre = nombre
+        self.metodo = metodo
+        self.construir = construir
+
+
+CONSULTAS_BUSQUEDA = ["licencia", "certificado+dpi", "solvencia+fiscal", "recibo+de+luz", "patente"]
+PREFIJOS_AUTOCOMPLETADO = ["i", "ins", "lic", "perm", "reg", "pro"]
+
+
+def _uno(rnd, ids, tipo):
+    return rnd.choice(ids[tipo])
+
+
+def _varios(rnd, ids, tipo, cantidad=5):
+    return rnd.sample(ids[tipo], cantidad)
+
+
+def _ruta_cambios(rnd):
+    # Las fechas sembradas van de 2024-01 a mediados de 2025
+    desde = f"{rnd.choice([2024, 2025])}-{rnd.randint(1, 6):02d}-{rnd.randint(1, 28):02d}T00:00:00"
+    return f"/cambios?desde={desde}&limite=100"
+
+
+def _ruta_departamento(rnd):
+    departamento = rnd.choice(list(DEPARTAMENTOS))
+    if rnd.random() < 0.5:
+        return f"/instituciones/departamentos/{departamento}?limite=50"
+    municipio = rnd.choice(DEPARTAMENTOS[departamento])
+    return f"/instituciones/departamentos/{departamento}?municipio={municipio}&limite=50"
+
+
+ESCENARIOS = [
+    # Instituciones
+    Escenario("crear_institucion", "POST",
+              lambda rnd, ids: ("/instituciones", cuerpo_institucion(rnd))),
+    Escenario("obtener_institucion", "GET",
+              lambda rnd, ids: (f"/instituciones/{_uno(rnd, ids, 'instituciones')}", None)),
+    Escenario("listar_instituciones", "GET",
+              lambda rnd, ids: ("/instituciones?habil=true", None)),
+    Escenario("resumen_institucion", "GET",
+              lambda rnd, ids: (f"/instituciones/{_uno(rnd, ids, 'instituciones')}/resumen", None)),
+    Escenario("contar_por_departamento", "GET",
+              lambda rnd, ids: ("/instituciones/departamentos", None)),
+    Escenario("listar_por_departamento", "GET",
+              lambda rnd, ids: (_ruta_departamento(rnd), None)),
+    Escenario("actualizar_institucion", "PATCH",
+              lambda rnd, ids: (f"/instituciones/{_uno(rnd, ids, 'instituciones')}",
+                                {"telefono": f"{rnd.randint(2000, 7999)}-{rnd.randint(0, 9999):04d}"})),
+    Escenario("habilitar_institucion", "PATCH",
+              lambda rnd, ids: (f"/instituciones/{_uno(rnd, ids, 'instituciones')}/habilitar", None)),
+    Escenario("eliminar_institucion", "DELETE",
+              lambda rnd, ids: (f"/instituciones/{_uno(rnd, ids, 'instituciones')}", None)),
+    Escenario("obtener_trabajo_cascada", "GET",
+              lambda rnd, ids: ("/instituciones/{}/cascada/{}".format(*_uno(rnd, ids, "cascadas")), None)),
+    Escenario("reanudar_trabajo_cascada", "POST",
+              lambda rnd, ids: ("/instituciones/{}/cascada/{}/reanudar".format(*_uno(rnd, ids, "cascadas")), None)),
+
+    # Trámites
+    Escenario("crear_tramite", "POST",
+              lambda rnd, ids: ("/tramites", cuerpo_tramite(rnd, _uno(rnd, ids, "instituciones")))),
+    Escenario("listar_tramites", "GET",
+              lambda rnd, ids: (f"/tramites?id_institucion={_uno(rnd, ids, 'instituciones')}", None)),
+    Escenario("buscar_tramites", "GET",
+              lambda rnd, ids: (f"/tramites/buscar?q={rnd.choice(CONSULTAS_BUSQUEDA)}", None)),
+    Escenario("obtener_tramite", "GET",
+              lambda rnd, ids: (f"/tramites/{_uno(rnd, ids, 'tramites')}", None)),
+    Escenario("actualizar_tramite", "PATCH",
+              lambda rnd, ids: (f"/tramites/{_uno(rnd, ids, 'tramites')}", {"costo": "Q75.00"})),
+    Escenario("actualizar_tramites_lote", "PATCH",
+              lambda rnd, ids: ("/tramites/lote", {"ids": _varios(rnd, ids, "tramites"), "cambios": {"costo": "Q75.00"}})),
+    Escenario("habilitar_tramite", "PATCH",
+              lambda rnd, ids: (f"/tramites/{_uno(rnd, ids, 'tramites')}/habilitar", None)),
+    Escenario("deshabilitar_tramite", "DELETE",
+              lambda rnd, ids: (f"/tramites/{_uno(rnd, ids, 'tramites')}", None)),
+
+    # Proyectos
+    Escenario("crear_proyecto", "POST",
+              lambda rnd, ids: ("/proyectos", cuerpo_proyecto(rnd, _uno(rnd, ids, "instituciones")))),
+    Escenario("listar_proyectos", "GET",
+              lambda rnd, ids: (f"/proyectos?id_institucion={_uno(rnd, ids, 'instituciones')}", None)),
+    Escenario("listar_por_estado", "GET",
+              lambda rnd, ids: (f"/proyectos/por-estado/{rnd.choice(ESTADOS_PROYECTO)}?limite=50", None)),
+    Escenario("obtener_proyecto", "GET",
+              lambda rnd, ids: (f"/proyectos/{_uno(rnd, ids, 'proyectos')}", None)),
+    Escenario("actualizar_proyecto", "PATCH",
+              lambda rnd, ids: (f"/proyectos/{_uno(rnd, ids, 'proyectos')}", {"estado_proyecto": "finalizado"})),
+    Escenario("actualizar_proyectos_lote", "PATCH",
+              lambda rnd, ids: ("/proyectos/lote", {"ids": _varios(rnd, ids, "proyectos"), "cambios": {"estado_proyecto": "finalizado"}})),
+    Escenario("habilitar_proyecto", "PATCH",
+              lambda rnd, ids: (f"/proyectos/{_uno(rnd, ids, 'proyectos')}/habilitar", None)),
+    Escenario("eliminar_proyecto", "DELETE",
+              lambda rnd, ids: (f"/proyectos/{_uno(rnd, ids, 'proyectos')}", None)),
+
+    # Programas
+    Escenario("crear_programa", "POST",
+              lambda rnd, ids: ("/programas", cuerpo_programa(rnd, _uno(rnd, ids, "instituciones")))),
+    Escenario("listar_programas", "GET",
+              lambda rnd, ids: (f"/programas?id_institucion={_uno(rnd, ids, 'instituciones')}", None)),
+    Escenario("obtener_programa", "GET",
+              lambda rnd, ids: (f"/programas/{_uno(rnd, ids, 'programas')}", None)),
+    Escenario("actualizar_programa", "PATCH",
+              lambda rnd, ids: (f"/programas/{_uno(rnd, ids, 'programas')}", {"descripcion": "Actualizado"})),
+    Escenario("actualizar_programas_lote", "PATCH",
+              lambda rnd, ids: ("/programas/lote", {"ids": _varios(rnd, ids, "programas"), "cambios": {"descripcion": "Actualizado"}})),
+    Escenario("habilitar_programa", "PATCH",
+              lambda rnd, ids: (f"/programas/{_uno(rnd, ids, 'programas')}/habilitar", None)),
+    Escenario("deshabilitar_programa", "DELETE",
+              lambda rnd, ids: (f"/programas/{_uno(rnd, ids, 'programas')}", None)),
+
+    # Autocompletado
+    Escenario("autocompletar", "GET",
+              lambda rnd, ids: (f"/autocompletar?prefijo={rnd.choice(PREFIJOS_AUTOCOMPLETADO)}", None)),
+
+    # Catálogo de requisitos
+    Escenario("obtener_requisito", "GET",
+              lambda rnd, ids: (f"/requisitos/{_uno(rnd, ids, 'requisitos')}", None)),
+    Escenario("actualizar_requisito", "PATCH",
+              lambda rnd, ids: (f"/requisitos/{_uno(rnd, ids, 'requisitos')}", {"texto": rnd.choice(REQUISITOS)})),
+
+    # Sincronización incremental
+    Escenario("listar_cambios", "GET",
+              lambda rnd, ids: (_ruta_cambios(rnd), None)),
+]
@@ -0,0 +1,110 @@
+"""
+Contadores de llamadas a DynamoDB mediante eventos de botocore.
+
+Se registran sobre la sesión por defecto de boto3, por lo que
+instalar() debe llamarse ANTES de importar la app (los routers crean
+sus clientes al importarse y heredan los eventos de la sesión).
+"""
+import contextvars
+import threading
+from collections import Counter
+
+import boto3
+
+_consumo_actual = contextvars.ContextVar("consumo_dynamodb", default=None)
+
+
+class Consumo:
+    """Acumula llamadas, unidades de capacidad e items leídos."""
+
+    def __init__(self):
+        self.llamadas = Counter()
+        self.rcu = 0.0
+        self.wcu = 0.0
+        self.escaneados = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_llamadas(self) -> int:
+        return sum(self.llamadas.values())
+
+    def registrar(self, operacion: str, respuesta: dict):
+        capacidad = respuesta.get("ConsumedCapacity") or []
+        if isinstance(capacidad, dict):
+            capacidad = [capacidad]
+
+        with self._lock:
+            self.llamadas[operacion] += 1
+            self.escaneados += respuesta.get("ScannedCount", 0)
+
+            for consumo in capacidad:
+                self.rcu += consumo.get("ReadCapacityUnits", 0.0)
+                self.wcu += consumo.get("WriteCapacityUnits", 0.0)
+
+                # DynamoDB Local solo informa CapacityUnits en algunas operaciones
+                if "ReadCapacityUnits" not in consumo and "WriteCapacityUnits" not in consumo:
+                    if operacion in OPERACIONES_ESCRITURA:
+                        self.wcu += consumo.get("CapacityUnits", 0.0)
+                    else:
+                        self.rcu += consumo.get("CapacityUnits", 0.0)
+
+    def como_dict(self) -> dict:
+        return {
+            "llamadas": self.total_llamadas,
+            "por_operacion": dict(self.llamadas),
+            "rcu": round(self.rcu, 2),
+            "wcu": round(self.wcu, 2),
+            "items_escaneados": self.escaneados,
+        }
+
+
+OPERACIONES_ESCRITURA = {
+    "PutItem",
+    "UpdateItem",
+    "DeleteItem",
+    "BatchWriteItem",
+    "TransactWriteItems",
+}
+
+
+class Instrumentacion:
+
+    def __init__(self):
+        self.global_ = Consumo()
+        self._instalada = False
+
+    def instalar(self):
+        if self._instalada:
+            return
+
+        if boto3.DEFAULT_SESSION is None:
+            boto3.setup_default_session()
+
+        eventos = boto3.DEFAULT_SESSION.events
+        eventos.register("provide-client-params.dynamodb", self._pedir_capacidad)
+        eventos.register("after-call.dynamodb", self._registrar)
+        self._instalada = True
+
+    def reiniciar(self):
+        self.global_ = Consumo()
+
+    def medir(self) -> Consumo:
+        """Asocia un Consumo nuevo al contexto actual (una petición)."""
+        consumo = Consumo()
+        _consumo_actual.set(consumo)
+        return consumo
+
+    @staticmethod
+    def _pedir_capacidad(params, model, **kwargs):
+        if "ReturnConsumedCapacity" in model.input_shape.members:
+            params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+    def _registrar(self, parsed, model, **kwargs):
+        self.global_.registrar(model.name, parsed)
+
+        consumo = _consumo_actual.get()
+        if consumo is not None:
+            consumo.registrar(model.name, parsed)
+
+
+instrumentacion = Instrumentacion()
@@ -0,0 +1,204 @@
+"""
+Presupuesto de viajes a DynamoDB por endpoint.
+
+Uso (desde la raíz del repositorio, con `docker compose up dynamodb`):
+    python benchmarks/presupuestos.py
+
+Ejecuta cada ruta de los routers contra la tabla de benchmark, mide por
+petición las llamadas a DynamoDB, RCU/WCU e items leídos, y termina con
+código 1 si algún endpoint excede su presupuesto o si existe una ruta
+sin presupuesto declarado. Pensado para correr en CI.
+"""
+import argparse
+import asyncio
+import random
+import sys
+
+from fastapi.routing import APIRoute
+
+from entorno import agregar_argumentos, preparar
+from instrumentacion import instrumentacion
+from cliente_asgi import solicitar, CicloDeVida
+from escenarios import ESCENARIOS
+
+
+class Presupuesto:
+    """Máximos por petición. None = no se controla."""
+
+    def __init__(self, llamadas: int, rcu: float = None, wcu: float = None, escaneados: int = None):
+        self.llamadas = llamadas
+        self.rcu = rcu
+        self.wcu = wcu
+        self.escaneados = escaneados
+
+
+# --------------------------------------------------
+# Presupuestos declarados (clave = nombre del handler)
+# Al agregar una llamada a DynamoDB en un endpoint, este
+# archivo debe actualizarse de forma explícita.
+# --------------------------------------------------
+PRESUPUESTOS = {
+    # Instituciones
+    "crear_institucion": Presupuesto(llamadas=1, wcu=6),  # transacción: institución + 2 contadores
+    "resumen_institucion": Presupuesto(llamadas=1, rcu=0.5),
+    "contar_por_departamento": Presupuesto(llamadas=1),
+    "listar_por_departamento": Presupuesto(llamadas=1),
+    "obtener_institucion": Presupuesto(llamadas=1, rcu=0.5),
+    "listar_instituciones": Presupuesto(llamadas=1),
+    "actualizar_institucion": Presupuesto(llamadas=2, rcu=0.5, wcu=1),
+    "habilitar_institucion": Presupuesto(llamadas=1, wcu=1),  # escritura condicional, sin lectura previa
+    "eliminar_institucion": Presupuesto(llamadas=1, wcu=1),
+    "obtener_trabajo_cascada": Presupuesto(llamadas=1, rcu=0.5),
+    "reanudar_trabajo_cascada": Presupuesto(llamadas=1, rcu=0.5),  # sobre un trabajo completado
+
+    # Trámites
+    # Transacciones: 2 WCU por KB del trámite (hasta 3 KB) + 2 de los contadores
+    "crear_tramite": Presupuesto(llamadas=1, wcu=8),
+    "listar_tramites": Presupuesto(llamadas=2),
+    "buscar_tramites": Presupuesto(llamadas=0),  # índice en memoria (se construye al arrancar)
+    "obtener_tramite": Presupuesto(llamadas=1, rcu=1, escaneados=1),
+    "actualizar_tramite": Presupuesto(llamadas=2, rcu=1, wcu=3, escaneados=1),
+    "actualizar_tramites_lote": Presupuesto(llamadas=10),  # 5 ids: una consulta y una escritura por id
+    "habilitar_tramite": Presupuesto(llamadas=2, rcu=1, wcu=8, escaneados=1),
+    "deshabilitar_tramite": Presupuesto(llamadas=2, rcu=1, wcu=8, escaneados=1),
+
+    # Proyectos
+    "crear_proyecto": Presupuesto(llamadas=1, wcu=4),  # transacción: proyecto + contadores
+    "listar_proyectos": Presupuesto(llamadas=2),
+    "listar_por_estado": Presupuesto(llamadas=1),
+    "obtener_proyecto": Presupuesto(llamadas=1, rcu=1, escaneados=1),
+    "actualizar_proyecto": Presupuesto(llamadas=2, rcu=1, wcu=2, escaneados=1),
+    "actualizar_proyectos_lote": Presupuesto(llamadas=10),  # 5 ids: una consulta y una escritura por id
+    "habilitar_proyecto": Presupuesto(llamadas=2, rcu=1, wcu=4, escaneados=1),
+    "eliminar_proyecto": Presupuesto(llamadas=2, rcu=1, wcu=4, escaneados=1),
+
+    # Programas
+    "crear_programa": Presupuesto(llamadas=1, wcu=4),  # transacción: programa + contadores
+    "listar_programas": Presupuesto(llamadas=2),
+    "obtener_programa": Presupuesto(llamadas=1, rcu=1, escaneados=1),
+    "actualizar_programa": Presupuesto(llamadas=2, rcu=1, wcu=2, escaneados=1),
+    "actualizar_programas_lote": Presupuesto(llamadas=10),  # 5 ids: una consulta y una escritura por id
+    "habilitar_programa": Presupuesto(llamadas=2, rcu=1, wcu=4, escaneados=1),
+    "deshabilitar_programa": Presupuesto(llamadas=2, rcu=1, wcu=4, escaneados=1),
+
+    # Autocompletado (índice en memoria)
+    "autocompletar": Presupuesto(llamadas=0),
+
+    # Catálogo de requisitos
+    "obtener_requisito": Presupuesto(llamadas=1, rcu=0.5),
+    "actualizar_requisito": Presupuesto(llamadas=2, wcu=2),  # corrección + alias del texto nuevo
+
+    # Sincronización incremental: a lo sumo una consulta por mes (MESES_POR_PAGINA)
+    # y un BatchGetItem por cada 100 registros (el escenario pide limite=100)
+    "listar_cambios": Presupuesto(llamadas=13),
+}
+
+# Rutas fuera del contrato (diagnóstico y administración)
+RUTAS_EXCLUIDAS = {"root", "health", "metricas"}
+PREFIJOS_EXCLUIDOS = ("/admin",)
+
+
+def rutas_sin_presupuesto(app) -> list:
+    faltantes = []
+
+    for ruta in app.routes:
+        if not isinstance(ruta, APIRoute):
+            continue
+        if ruta.name in RUTAS_EXCLUIDAS or ruta.path.startswith(PREFIJOS_EXCLUIDOS):
+            continue
+        if ruta.name not in PRESUPUESTOS:
+            faltantes.append(f"{','.join(sorted(ruta.methods))} {ruta.path} ({ruta.name})")
+
+    return faltantes
+
+
+def excesos(presupuesto: Presupuesto, medido: dict) -> list:
+    limites = [
+        ("llamadas", presupuesto.llamadas, medido["llamadas"]),
+        ("rcu", presupuesto.rcu, medido["rcu"]),
+        ("wcu", presupuesto.wcu, medido["wcu"]),
+        ("items_escaneados", presupuesto.escaneados, medido["items_escaneados"]),
+    ]
+    return [
+        f"{nombre} {valor} > {limite}"
+        for nombre, limite, valor in limites
+        if limite is not None and valor > limite
+    ]
+
+
+async def medir_escenario(app, escenario, ids, repeticiones: int, semilla: int) -> dict:
+    """Devuelve el peor consumo observado por petición."""
+    rnd = random.Random(f"{semilla}-{escenario.nombre}")
+    peor = None
+
+    for _ in range(repeticiones):
+        ruta, cuerpo = escenario.construir(rnd, ids)
+
+        async def una():
+            consumo = instrumentacion.medir()
+            respuesta = await solicitar(app, escenario.metodo, ruta, cuerpo)
+            return respuesta, consumo.como_dict()
+
+        # Cada petición en su propia tarea: su propio contexto de medición
+        respuesta, medido = await asyncio.create_task(una())
+
+        if respuesta.status >= 400:
+            raise RuntimeError(f"{escenario.nombre}: {ruta} respondió {respuesta.status}")
+
+        if peor is None or medido["llamadas"] > peor["llamadas"] or medido["rcu"] + medido["wcu"] > peor["rcu"] + peor["wcu"]:
+            peor = medido
+
+    return peor
+
+
+async def principal(args) -> int:
+    app, ids, _ = preparar(args)
+    fallas = []
+
+    for faltante in rutas_sin_presupuesto(app):
+        fallas.append(f"Ruta sin presupuesto declarado: {faltante}")
+
+    async with CicloDeVida(app):
+        for escenario in ESCENARIOS:
+            presupuesto = PRESUPUESTOS.get(escenario.nombre)
+            if presupuesto is None:
+                continue
+
+            medido = await medir_escenario(app, escenario, ids, args.repeticiones, args.semilla)
+            problemas = excesos(presupuesto, medido)
+            estado = "EXCEDE" if problemas else "ok"
+
+            print(
+                f"{escenario.nombre:<26} {estado:<7} llamadas={medido['llamadas']}/{presupuesto.llamadas} "
+                f"rcu={medido['rcu']} wcu={medido['wcu']} escaneados={medido['items_escaneados']} "
+                f"{medido['por_operacion']}"
+            )
+            for problema in problemas:
+                fallas.append(f"{escenario.nombre}: {problema}")
+
+    nombres_escenarios = {e.nombre for e in ESCENARIOS}
+    for nombre in PRESUPUESTOS:
+        if nombre not in nombres_escenarios:
+            fallas.append(f"Presupuesto sin escenario que lo ejecute: {nombre}")
+
+    if fallas:
+        print("\nPresupuesto excedido:", file=sys.stderr)
+        for falla in fallas:
+            print(f"  - {falla}", file=sys.stderr)
+        return 1
+
+    print("\nTodos los endpoints dentro de su presupuesto.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    agregar_argumentos(parser, instituciones=200, tramites=2000, proyectos=400, programas=400)
+    parser.add_argument("--repeticiones", type=int, default=5, help="Peticiones por endpoint")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(principal(args)))
+
+
+if __name__ == "__main__":
+    main()
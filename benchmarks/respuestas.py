@@ -0,0 +1,82 @@
+"""
+Microbenchmark de renderizado de listados: validación con response_model
+y JSONResponse estándar contra utils/respuestas (items confiables + orjson).
+
+No necesita DynamoDB. Mide el CPU por respuesta para páginas de listado
+y para el detalle de trámites.
+
+Uso:
+    python benchmarks/respuestas.py --items 2000
+"""
+import argparse
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+# Solo por su efecto: agrega app/ a sys.path para los imports de abajo
+import entorno  # noqa: F401
+from datos import generar
+from models.tramites import TramiteListItem, TramiteResponse
+from utils.respuestas import RespuestaRapida, item_confiable, orjson
+
+
+def cronometrar(funcion, repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000, help="Items por página de listado")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    items, _ = generar(instituciones=1, tramites=args.items, proyectos=0, programas=0)
+    tramites = [item for item in items if item["SK"].startswith("TRAMITE#")]
+    listado = [
+        {"id_tramite": t["id_tramite"], "nombre_tramite": t["nombre_tramite"], "habil": t["habil"]}
+        for t in tramites
+    ]
+
+    adaptador_lista = TypeAdapter(List[TramiteListItem])
+    adaptador_detalle = TypeAdapter(TramiteResponse)
+
+    # Lo que hace FastAPI con response_model: validar, volcar a modo json y codificar
+    def lista_validada():
+        contenido = adaptador_lista.dump_python(adaptador_lista.validate_python(listado), mode="json")
+        return JSONResponse(content=contenido).body
+
+    def lista_rapida():
+        return RespuestaRapida(content=listado).body
+
+    def detalles_validados():
+        for tramite in tramites:
+            contenido = adaptador_detalle.dump_python(adaptador_detalle.validate_python(tramite), mode="json")
+            JSONResponse(content=contenido)
+
+    def detalles_rapidos():
+        for tramite in tramites:
+            RespuestaRapida(content=item_confiable(tramite, TramiteResponse))
+
+    print(f"encoder: {'orjson' if orjson else 'json (orjson no instalado)'}")
+    print(f"listado de {len(listado)} items:")
+    validado = cronometrar(lista_validada, args.repeticiones)
+    rapido = cronometrar(lista_rapida, args.repeticiones)
+    print(f"  response_model + json   {validado * 1000:8.2f} ms")
+    print(f"  confiable + orjson      {rapido * 1000:8.2f} ms   ({validado / rapido:.1f}x)")
+
+    print(f"{len(tramites)} respuestas de detalle:")
+    validado = cronometrar(detalles_validados, max(1, args.repeticiones // 4))
+    rapido = cronometrar(detalles_rapidos, max(1, args.repeticiones // 4))
+    print(f"  response_model + json   {validado / len(tramites) * 1e6:8.1f} µs/respuesta")
+    print(f"  confiable + orjson      {rapido / len(tramites) * 1e6:8.1f} µs/respuesta   ({validado / rapido:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
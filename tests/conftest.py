@@ -0,0 +1,41 @@
+"""
+Pruebas sin Docker: la app corre sobre el motor en memoria
+(ALMACENAMIENTO=memoria), con la tabla creada por el propio proceso.
+
+Uso (desde la raíz del repositorio):
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+# Antes de importar la app: las variables se leen al cargar cada módulo
+os.environ.setdefault("ALMACENAMIENTO", "memoria")
+os.environ.setdefault("BUSQUEDA_PRECARGA", "false")
+os.environ.setdefault("REQUISITOS_NORMALIZADOS", "true")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def cliente():
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+
+@pytest.fixture
+def institucion(cliente):
+    response = cliente.post("/instituciones", json={
+        "nombre": "Institución de prueba",
+        "departamento_sede": "Guatemala",
+        "municipio_sede": "Guatemala",
+        "telefono": "5555-5555",
+        "correo": "pruebas@ejemplo.com",
+    })
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id_institucion"]
@@ -0,0 +1,21 @@
+import pytest
+
+from utils.admision import clase_de_ruta
+
+
+@pytest.mark.parametrize("metodo, ruta, consulta, clase", [
+    ("DELETE", "/instituciones/INST-1", b"cascada=true", "masiva"),
+    ("PATCH", "/instituciones/INST-1/habilitar", b"cascada=1", "masiva"),
+    ("PATCH", "/instituciones/INST-1/habilitar", b"cascada=True", "masiva"),
+    ("DELETE", "/instituciones/INST-1", b"cascada=on", "masiva"),
+    ("DELETE", "/instituciones/INST-1", b"cascada=yes", "masiva"),
+    ("DELETE", "/instituciones/INST-1", b"cascada=false", "escritura"),
+    ("DELETE", "/instituciones/INST-1", b"xcascada=true", "escritura"),
+    ("POST", "/instituciones/INST-1/cascada/CSC-1/reanudar", b"", "masiva"),
+    ("GET", "/instituciones/INST-1/cascada/CSC-1", b"", "lectura"),
+    ("PATCH", "/tramites/lote", b"", "masiva"),
+    ("GET", "/cambios", b"desde=2025-01-01", "lectura"),
+    ("GET", "/tramites", b"", "lectura"),
+])
+def test_clase_de_ruta(metodo, ruta, consulta, clase):
+    assert clase_de_ruta(metodo, ruta, consulta) == clase
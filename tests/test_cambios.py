@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.paginacion import codificar_cursor
+
+
+@pytest.mark.parametrize("particion", ["CAMBIOS#", "CAMBIOS#2025-13", "CAMBIOS#2025-1", "CAMBIOS#abc", "TRAMITE#2025-01", 7])
+def test_cursor_con_mes_invalido_es_400(cliente, particion):
+    response = cliente.get("/cambios", params={
+        "desde": "2025-01-01T00:00:00",
+        "cursor": codificar_cursor({"GSI4PK": particion}),
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "El cursor no es válido."
+
+
+def test_cursor_de_mes_valido(cliente):
+    response = cliente.get("/cambios", params={
+        "desde": "2025-01-01T00:00:00",
+        "cursor": codificar_cursor({"GSI4PK": "CAMBIOS#2025-02"}),
+    })
+    assert response.status_code == 200, response.text
+
+
+def test_datos_sin_atributos_internos(cliente, institucion):
+    desde = (datetime.utcnow() - timedelta(minutes=1)).isoformat()
+    response = cliente.post("/tramites", json={
+        "id_institucion": institucion,
+        "nombre_tramite": "Trámite apagado en cascada",
+        "descripcion": "Trámite de prueba",
+        "tipo_tramite": "licencia",
+        "canal_atencion": "presencial",
+        "costo": "0",
+        "habil": True,
+        "requisitos": ["DPI vigente"],
+    })
+    id_tramite = response.json()["id_tramite"]
+    assert cliente.delete(f"/instituciones/{institucion}?cascada=true").status_code == 200
+
+    cambios = []
+    cursor = None
+    while True:
+        pagina = cliente.get("/cambios", params={"desde": desde, "cursor": cursor}).json()
+        cambios.extend(pagina["items"])
+        cursor = pagina["siguiente"]
+        if cursor is None:
+            break
+
+    tramite = [cambio for cambio in cambios if cambio["id"] == id_tramite]
+    assert len(tramite) == 1
+    datos = tramite[0]["datos"]
+    assert datos["habil"] is False
+    assert datos["requisitos"] == ["DPI vigente"]
+    assert not {"deshabilitado_en_cascada", "PK", "SK", "GSI1PK", "GSI4SK"} & set(datos)
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+from almacenamiento.motor import TransaccionCancelada
+from database import TABLE_NAME, get_motor_local
+from utils import cascada
+from utils.transacciones import client
+
+
+def _crear_tramite(cliente, id_institucion: str, nombre: str) -> str:
+    response = cliente.post("/tramites", json={
+        "id_institucion": id_institucion,
+        "nombre_tramite": nombre,
+        "descripcion": "Trámite de prueba",
+        "tipo_tramite": "licencia",
+        "canal_atencion": "presencial",
+        "costo": "0",
+        "habil": True,
+        "requisitos": ["DPI vigente"],
+    })
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id_tramite"]
+
+
+def _habil(cliente, id_tramite: str) -> bool:
+    return cliente.get(f"/tramites/{id_tramite}").json()["habil"]
+
+
+def test_habilitar_en_cascada_respeta_los_hijos_deshabilitados_a_mano(cliente, institucion):
+    activo = _crear_tramite(cliente, institucion, "Activo")
+    antes = _crear_tramite(cliente, institucion, "Deshabilitado antes de la baja")
+    durante = _crear_tramite(cliente, institucion, "Deshabilitado durante la baja")
+
+    assert cliente.delete(f"/tramites/{antes}").status_code == 200
+
+    baja = cliente.delete(f"/instituciones/{institucion}?cascada=true").json()["cascada"]
+    assert (baja["actualizados"], baja["sin_cambio"]) == (2, 1)
+
+    # Ya apagado por la cascada, el operador también lo deshabilita
+    assert cliente.delete(f"/tramites/{durante}").status_code == 200
+
+    alta = cliente.patch(f"/instituciones/{institucion}/habilitar?cascada=true").json()["cascada"]
+    assert alta["estado"] == "completado"
+    assert (alta["actualizados"], alta["sin_cambio"]) == (1, 2)
+
+    assert _habil(cliente, activo) is True
+    assert _habil(cliente, antes) is False
+    assert _habil(cliente, durante) is False
+    assert cliente.get(f"/instituciones/{institucion}/resumen").json()["tramites"]["activos"] == 1
+
+
+def test_reanudar_no_procesa_un_trabajo_tomado_por_otro_proceso(cliente, institucion):
+    id_tramite = _crear_tramite(cliente, institucion, "Sigue activo")
+
+    trabajo = cascada.nuevo_trabajo(institucion, "CSC-prueba01", False, datetime.utcnow().isoformat())
+    client.put_item(TableName=TABLE_NAME, Item=trabajo)
+    assert cascada._tomar(trabajo, "EJC-otro", 60)
+
+    response = cliente.post(f"/instituciones/{institucion}/cascada/CSC-prueba01/reanudar")
+    assert response.status_code == 200, response.text
+    assert (response.json()["estado"], response.json()["procesados"]) == ("en_curso", 0)
+    assert _habil(cliente, id_tramite) is True
+
+    # Al soltarlo, el reanudar lo termina y los activos siguen a habil
+    cascada._soltar(trabajo, "EJC-otro")
+    response = cliente.post(f"/instituciones/{institucion}/cascada/CSC-prueba01/reanudar")
+    assert response.json()["estado"] == "completado"
+    assert _habil(cliente, id_tramite) is False
+    assert cliente.get(f"/instituciones/{institucion}/resumen").json()["tramites"]["activos"] == 0
+
+
+def test_cascada_con_conflictos_de_transaccion(cliente, institucion, monkeypatch):
+    ids = [_crear_tramite(cliente, institucion, f"Trámite {numero}") for numero in range(5)]
+
+    # Como DynamoDB con otra transacción sobre la institución en curso:
+    # las dos primeras se cancelan por TransactionConflict
+    motor = get_motor_local()
+    original = motor.transaccion
+    llamadas = []
+
+    def con_conflictos(operaciones):
+        llamadas.append(len(operaciones))
+        if len(llamadas) <= 2:
+            raise TransaccionCancelada(
+                [{"Code": "None"}] * (len(operaciones) - 1) + [{"Code": "TransactionConflict"}]
+            )
+        return original(operaciones)
+
+    monkeypatch.setattr(motor, "transaccion", con_conflictos)
+    baja = cliente.delete(f"/instituciones/{institucion}?cascada=true").json()["cascada"]
+    monkeypatch.undo()
+
+    assert (baja["estado"], baja["actualizados"], baja["fallidos"]) == ("completado", 5, 0)
+    # Una transacción para los 5 hijos y su ADD, repetida tras cada conflicto
+    assert llamadas == [6, 6, 6]
+    assert all(_habil(cliente, id_tramite) is False for id_tramite in ids)
+    assert cliente.get(f"/instituciones/{institucion}/resumen").json()["tramites"]["activos"] == 0
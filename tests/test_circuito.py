@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from database import Circuito, DynamoDBNoDisponible
+
+
+class _Respuesta:
+    status_code = 200
+
+
+def _llamada_ok(circuito: Circuito):
+    circuito.antes()
+    circuito.despues(_Respuesta(), {})
+
+
+def _en_otro_hilo(funcion):
+    hilo = threading.Thread(target=funcion)
+    hilo.start()
+    hilo.join()
+
+
+def test_solo_la_prueba_cierra_el_circuito():
+    circuito = Circuito(fallas=2, espera=0)
+
+    # Una llamada empieza antes de que se abra y termina bien después
+    circuito.antes()
+    _en_otro_hilo(lambda: [circuito.antes(), circuito._falla("ReadTimeoutError")])
+    _en_otro_hilo(lambda: [circuito.antes(), circuito._falla("ReadTimeoutError")])
+    assert circuito.estado == "abierto"
+
+    circuito.despues(_Respuesta(), {})
+    assert circuito.estado == "abierto"
+
+    # La prueba sí lo cierra
+    _llamada_ok(circuito)
+    assert circuito.estado == "cerrado"
+
+
+def test_errores_ajenos_a_la_red_no_reinician_las_fallas():
+    circuito = Circuito(fallas=3, espera=60)
+
+    for _ in range(2):
+        circuito.antes()
+        circuito._falla("ReadTimeoutError")
+        circuito.antes()
+        circuito.despues_error(ValueError("parámetro inválido"))
+
+    circuito.antes()
+    circuito._falla("ReadTimeoutError")
+    assert circuito.estado == "abierto"
+    with pytest.raises(DynamoDBNoDisponible):
+        circuito.antes()
+
+
+def test_prueba_sin_resultado_libera_el_lugar():
+    circuito = Circuito(fallas=1, espera=0)
+    circuito.antes()
+    circuito._falla("ReadTimeoutError")
+
+    circuito.antes()
+    circuito.despues_error(ValueError("parámetro inválido"))
+    assert (circuito.estado, circuito.prueba_en_curso) == ("semiabierto", False)
+
+    _llamada_ok(circuito)
+    assert circuito.estado == "cerrado"
@@ -0,0 +1,89 @@
+import threading
+import uuid
+
+import pytest
+
+import utils.escritura_lotes as escritura_lotes
+from utils.escritura_lotes import EscritorPorLotes
+from utils.lectura_rapida import obtener_item
+from utils.transacciones import client
+
+CLAVE_TOTAL = "total_tramites"
+
+
+def _clave_institucion(id_institucion: str) -> dict:
+    return {"PK": f"INSTITUCION#{id_institucion}", "SK": "METADATA"}
+
+
+def _item(id_institucion: str) -> dict:
+    return {"PK": f"INSTITUCION#{id_institucion}", "SK": f"TRAMITE#TRM-{uuid.uuid4().hex[:8]}", "habil": True}
+
+
+def _total(id_institucion: str) -> int:
+    return int(obtener_item(_clave_institucion(id_institucion)).get(CLAVE_TOTAL, 0))
+
+
+def _escribir_juntos(escritor: EscritorPorLotes, id_institucion: str, cantidad: int) -> list:
+    """Escribe `cantidad` items desde hilos distintos; devuelve (item, error) de cada uno."""
+    resultados = [None] * cantidad
+
+    def escribir(posicion: int):
+        item = _item(id_institucion)
+        try:
+            escritor.escribir(item, _clave_institucion(id_institucion), {CLAVE_TOTAL: 1})
+            resultados[posicion] = (item, None)
+        except Exception as error:
+            resultados[posicion] = (item, error)
+
+    hilos = [threading.Thread(target=escribir, args=(posicion,)) for posicion in range(cantidad)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+@pytest.fixture
+def sin_espera(monkeypatch):
+    monkeypatch.setattr(escritura_lotes, "ESPERA_BASE", 0)
+
+
+def test_falla_del_contador_no_falla_el_create(cliente, institucion, monkeypatch, caplog, sin_espera):
+    total_antes = _total(institucion)
+
+    def update_item_caido(**pedido):
+        raise ConnectionError("sin red")
+
+    monkeypatch.setattr(client, "update_item", update_item_caido)
+    resultados = _escribir_juntos(EscritorPorLotes(tamano=3, intervalo_ms=200), institucion, 3)
+    monkeypatch.undo()
+
+    for item, error in resultados:
+        assert error is None
+        assert obtener_item({"PK": item["PK"], "SK": item["SK"]}) is not None
+    assert _total(institucion) == total_antes
+    assert "reparar_contadores" in caplog.text
+
+
+def test_falla_parcial_del_lote_solo_afecta_a_los_no_escritos(cliente, institucion, monkeypatch, sin_espera):
+    total_antes = _total(institucion)
+    batch_write_item = client.batch_write_item
+
+    def escribe_solo_el_primero(RequestItems):
+        (tabla, solicitudes), = RequestItems.items()
+        batch_write_item(RequestItems={tabla: solicitudes[:1]})
+        return {"UnprocessedItems": {tabla: solicitudes[1:]} if solicitudes[1:] else {}}
+
+    monkeypatch.setattr(client, "batch_write_item", escribe_solo_el_primero)
+    monkeypatch.setattr(escritura_lotes, "REINTENTOS_PENDIENTES", 2)
+    resultados = _escribir_juntos(EscritorPorLotes(tamano=3, intervalo_ms=200), institucion, 3)
+    monkeypatch.undo()
+
+    escritos = [item for item, error in resultados if error is None]
+    fallidos = [item for item, error in resultados if error is not None]
+    assert len(escritos) == 2
+    assert len(fallidos) == 1
+    for item in escritos:
+        assert obtener_item({"PK": item["PK"], "SK": item["SK"]}) is not None
+    assert obtener_item({"PK": fallidos[0]["PK"], "SK": fallidos[0]["SK"]}) is None
+    assert _total(institucion) == total_antes + 2
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import uuid
+
+import main
+import utils.idempotencia as idempotencia
+
+
+def _tramite(id_institucion: str) -> dict:
+    return {
+        "id_institucion": id_institucion,
+        "nombre_tramite": "Licencia idempotente",
+        "descripcion": "Trámite de prueba",
+        "tipo_tramite": "licencia",
+        "canal_atencion": "presencial",
+        "costo": "0",
+        "habil": True,
+        "requisitos": ["DPI vigente"],
+    }
+
+
+def _total_tramites(cliente, id_institucion: str) -> int:
+    return cliente.get(f"/instituciones/{id_institucion}/resumen").json()["tramites"]["total"]
+
+
+def _post_con_desconexion(ruta: str, cuerpo: dict, clave: str):
+    """POST directo a la app ASGI cuyo cliente se desconecta al recibir la respuesta."""
+    datos = json.dumps(cuerpo).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": ruta, "raw_path": ruta.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 1), "server": ("test", 80),
+        "headers": [
+            (b"host", b"test"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(datos)).encode()),
+            (b"idempotency-key", clave.encode()),
+        ],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": datos, "more_body": False}
+
+    async def send(mensaje):
+        raise OSError("cliente desconectado")
+
+    try:
+        asyncio.run(main.app(scope, receive, send))
+    except OSError:
+        pass
+
+
+def test_desconexion_despues_de_crear_no_duplica(cliente, institucion):
+    clave = uuid.uuid4().hex
+    _post_con_desconexion("/tramites", _tramite(institucion), clave)
+    assert _total_tramites(cliente, institucion) == 1
+
+    # Mismo cuerpo byte a byte (la huella es del cuerpo crudo)
+    reintento = cliente.post(
+        "/tramites",
+        content=json.dumps(_tramite(institucion)),
+        headers={"Idempotency-Key": clave, "Content-Type": "application/json"},
+    )
+    assert reintento.status_code == 200
+    assert reintento.headers["idempotent-replayed"] == "true"
+    assert _total_tramites(cliente, institucion) == 1
+
+
+def test_fallas_al_guardar_se_reintentan(cliente, institucion, monkeypatch):
+    guardar = idempotencia.guardar
+    fallas = []
+
+    def guardar_con_fallas(*args):
+        if len(fallas) < 2:
+            fallas.append(1)
+            raise RuntimeError("DynamoDB no responde")
+        guardar(*args)
+
+    monkeypatch.setattr(idempotencia, "guardar", guardar_con_fallas)
+    monkeypatch.setattr(idempotencia, "ESPERA_BASE", 0)
+
+    clave = uuid.uuid4().hex
+    primera = cliente.post("/tramites", json=_tramite(institucion), headers={"Idempotency-Key": clave})
+    assert primera.status_code == 200
+    assert len(fallas) == 2
+
+    reintento = cliente.post("/tramites", json=_tramite(institucion), headers={"Idempotency-Key": clave})
+    assert reintento.headers["idempotent-replayed"] == "true"
+    assert reintento.json()["id_tramite"] == primera.json()["id_tramite"]
+
+
+def test_si_guardar_falla_siempre_la_respuesta_igual_llega(cliente, institucion, monkeypatch):
+    def guardar_siempre_falla(*args):
+        raise RuntimeError("DynamoDB no responde")
+
+    monkeypatch.setattr(idempotencia, "guardar", guardar_siempre_falla)
+    monkeypatch.setattr(idempotencia, "ESPERA_BASE", 0)
+
+    response = cliente.post("/tramites", json=_tramite(institucion), headers={"Idempotency-Key": uuid.uuid4().hex})
+    assert response.status_code == 200
+    assert _total_tramites(cliente, institucion) == 1
+
+
+def test_las_respuestas_4xx_no_se_guardan(cliente):
+    clave = uuid.uuid4().hex
+    cuerpo = _tramite("INST-inexistente")
+
+    primera = cliente.post("/tramites", json=cuerpo, headers={"Idempotency-Key": clave})
+    assert primera.status_code == 404
+
+    reintento = cliente.post("/tramites", json=cuerpo, headers={"Idempotency-Key": clave})
+    assert reintento.status_code == 404
+    assert "idempotent-replayed" not in reintento.headers
@@ -0,0 +1,91 @@
+import asyncio
+import contextvars
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+from utils import perfilado
+from utils.texto import tokenizar
+
+TEXTO = "Licencia sanitaria de funcionamiento para establecimientos de alimentos " * 20
+
+
+def _trabajar():
+    # Pasa por código de la API (las pilas ajenas a app/ se descartan)
+    limite = time.monotonic() + 0.2
+    while time.monotonic() < limite:
+        tokenizar(TEXTO)
+
+
+def _perfilar(ejecutar) -> int:
+    muestreador = perfilado.MuestreadorCPU(intervalo=0.002)
+    muestreador.iniciar()
+    try:
+        ejecutar()
+    finally:
+        muestreador.detener()
+    return muestreador.muestras
+
+
+def test_muestrea_el_hilo_de_un_handler_sincrono():
+    endpoint = perfilado._etiquetado(lambda: _trabajar())
+
+    def en_el_threadpool():
+        # Como run_in_threadpool: otro hilo con una copia del contexto
+        contexto = contextvars.copy_context()
+        hilo = threading.Thread(target=contexto.run, args=(endpoint,))
+        hilo.start()
+        hilo.join()
+
+    assert _perfilar(en_el_threadpool) > 0
+
+
+def test_muestrea_un_handler_async():
+    async def trabajar():
+        _trabajar()
+
+    endpoint = perfilado._etiquetado(trabajar)
+    assert _perfilar(lambda: asyncio.run(endpoint())) > 0
+
+
+def test_no_muestrea_otras_peticiones():
+    otra = threading.Thread(target=perfilado._etiquetado(_trabajar))
+    assert _perfilar(lambda: (otra.start(), otra.join())) == 0
+
+
+def test_ventana_de_memoria_se_compara_fuera_de_la_peticion(monkeypatch):
+    monkeypatch.setattr(perfilado, "diferencias_memoria", deque(maxlen=5))
+    perfilado.iniciar_ventana_memoria(2)
+    inicio = perfilado.estado_ventana_memoria()["inicio"]
+
+    perfilado._registrar_peticion_memoria()
+    perfilado._registrar_peticion_memoria()
+
+    # Una ventana nueva enseguida no cambia los datos de la anterior
+    perfilado.iniciar_ventana_memoria(5)
+
+    limite = time.monotonic() + 10
+    while not perfilado.diferencias_memoria and time.monotonic() < limite:
+        time.sleep(0.01)
+
+    resultado = perfilado.diferencias_memoria[-1]
+    assert (resultado["inicio"], resultado["peticiones"]) == (inicio, 2)
+    # La ventana nueva sigue midiendo
+    assert tracemalloc.is_tracing()
+    assert perfilado.estado_ventana_memoria()["peticiones_restantes"] == 5
+
+    for _ in range(5):
+        perfilado._registrar_peticion_memoria()
+    while perfilado.estado_ventana_memoria()["procesando"] and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert not tracemalloc.is_tracing()
+
+
+def test_perfil_de_otro_worker_se_lee_de_perfilado_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(perfilado, "PERFILADO_DIR", str(tmp_path))
+    (tmp_path / "cpu-0badcafe.folded").write_text("main;tokenizar 3\n", encoding="utf-8")
+
+    assert perfilado.buscar_perfil_cpu("0badcafe")["plegado"] == "main;tokenizar 3\n"
+    assert perfilado.perfiles_cpu_en_disco() == ["0badcafe"]
+    assert perfilado.buscar_perfil_cpu("../cpu-0badcafe") is None
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Variables que conftest.py define para las demás pruebas: los presupuestos
+# son los del modo por defecto
+VARIABLES_DE_PRUEBAS = ("BUSQUEDA_PRECARGA", "REQUISITOS_NORMALIZADOS")
+
+
+def test_endpoints_dentro_de_su_presupuesto():
+    # En otro proceso: la instrumentación se instala antes de importar la
+    # app, con su propia tabla sembrada
+    entorno = {
+        nombre: valor for nombre, valor in os.environ.items()
+        if nombre not in VARIABLES_DE_PRUEBAS
+    }
+    entorno["ALMACENAMIENTO"] = "memoria"
+
+    resultado = subprocess.run(
+        [
+            sys.executable, os.path.join(RAIZ, "benchmarks", "presupuestos.py"),
+            "--instituciones", "10", "--tramites", "50", "--proyectos", "10", "--programas", "10",
+            "--repeticiones", "2",
+        ],
+        cwd=RAIZ,
+        env=entorno,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+
+    assert resultado.returncode == 0, resultado.stdout + resultado.stderr
@@ -0,0 +1,77 @@
+import pytest
+
+from database import TABLE_NAME
+from utils import requisitos
+from utils.requisitos import REQUISITOS_NORMALIZADOS, cache, id_requisito
+from utils.transacciones import client
+
+pytestmark = pytest.mark.skipif(not REQUISITOS_NORMALIZADOS, reason="requiere REQUISITOS_NORMALIZADOS=true")
+
+
+def _crear_tramite(cliente, id_institucion: str, requisitos: list) -> dict:
+    response = cliente.post("/tramites", json={
+        "id_institucion": id_institucion,
+        "nombre_tramite": "Licencia de prueba",
+        "descripcion": "Trámite de prueba",
+        "tipo_tramite": "licencia",
+        "canal_atencion": "presencial",
+        "costo": "0",
+        "habil": True,
+        "requisitos": requisitos,
+    })
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def _referencias(tramite: dict) -> list:
+    """Ids guardados en el item (la API los devuelve ya resueltos a texto)."""
+    item = client.get_item(
+        TableName=TABLE_NAME,
+        Key={"PK": f"INSTITUCION#{tramite['id_institucion']}", "SK": f"TRAMITE#{tramite['id_tramite']}"},
+    )["Item"]
+    return item["requisitos_ref"]
+
+
+def test_corregir_y_crear_con_el_texto_nuevo_reusa_el_requisito(cliente, institucion):
+    original = _crear_tramite(cliente, institucion, ["Constancia de ingresos"])
+    id_req = _referencias(original)[0]
+    assert id_req == id_requisito("Constancia de ingresos")
+
+    response = cliente.patch(f"/requisitos/{id_req}", json={"texto": "Constancia de ingresos laborales"})
+    assert response.status_code == 200, response.text
+    assert response.json()["id_requisito"] == id_req
+
+    nuevo = _crear_tramite(cliente, institucion, ["Constancia de ingresos laborales"])
+    assert _referencias(nuevo) == [id_req]
+    assert nuevo["requisitos"] == ["Constancia de ingresos laborales"]
+
+    # Otro proceso no tiene el alias en su caché: lo encuentra en la tabla
+    cache._textos.clear()
+    cache._alias.clear()
+    otro = _crear_tramite(cliente, institucion, ["Constancia de ingresos laborales"])
+    assert _referencias(otro) == [id_req]
+
+    # El texto anterior también sigue llevando al mismo requisito
+    anterior = _crear_tramite(cliente, institucion, ["Constancia de  ingresos "])
+    assert _referencias(anterior) == [id_req]
+
+    # El alias no es un requisito
+    id_alias = id_requisito("Constancia de ingresos laborales")
+    assert cliente.get(f"/requisitos/{id_alias}").status_code == 404
+    assert cliente.patch(f"/requisitos/{id_alias}", json={"texto": "Otro"}).status_code == 404
+
+
+def test_cada_tramite_lee_el_texto_que_envio(cliente, institucion):
+    original = _crear_tramite(cliente, institucion, ["Recibo de luz reciente"])
+    variante = _crear_tramite(cliente, institucion, ["recibo de luz RECIENTE"])
+
+    assert _referencias(original) != _referencias(variante)
+    assert cliente.get(f"/tramites/{original['id_tramite']}").json()["requisitos"] == ["Recibo de luz reciente"]
+    assert cliente.get(f"/tramites/{variante['id_tramite']}").json()["requisitos"] == ["recibo de luz RECIENTE"]
+
+
+def test_ignorar_mayusculas_es_opcional(monkeypatch):
+    assert id_requisito("Título vigente") != id_requisito("titulo  vigente")
+
+    monkeypatch.setattr(requisitos, "REQUISITOS_IGNORAR_MAYUSCULAS", True)
+    assert id_requisito("Título vigente") == id_requisito("titulo  vigente")
@@ -0,0 +1,31 @@
+import utils.vigencia_indices as vigencia
+
+
+class _Indice:
+    def __init__(self, vigencia_indices, falla: bool = False):
+        self.vigencia_indices = vigencia_indices
+        self.falla = falla
+
+    def aplicar_cambio(self, item: dict):
+        pass
+
+    def reconstruir(self):
+        if self.falla:
+            raise RuntimeError("scan fallido")
+        self.vigencia_indices.construido("2025-03-01T00:00:00")
+
+
+def test_reconstruccion_fallida_conserva_la_marca_anterior(monkeypatch):
+    monkeypatch.setattr(vigencia, "_leer_cambios", lambda desde, requisito: (None, "2025-02-01T00:00:00#REQUISITO#REQ-1"))
+
+    vigencia_indices = vigencia.VigenciaIndices(verificacion=30)
+    vigencia_indices.registrar(_Indice(vigencia_indices))
+    vigencia_indices.registrar(_Indice(vigencia_indices, falla=True))
+    vigencia_indices.construido("2025-01-01T00:00:00")
+
+    vigencia_indices.actualizar()
+
+    # Sigue verificando desde antes del requisito: se reconstruye otra vez
+    assert vigencia_indices.estado()["desde"] == "2025-01-01T00:00:00"
+    assert vigencia_indices.estado()["errores"] == 1
+    assert vigencia_indices._requisito_aplicado == ""